@@ -0,0 +1,99 @@
+"""
+🔄 ACTUALIZACIÓN INCREMENTAL DE DATOS HISTÓRICOS
+=================================================
+
+En lugar de volver a descargar los períodos completos (20y / 730d / 60d),
+lee la última fecha guardada de cada serie en el almacén, pide solo las
+barras que faltan, elimina las solapadas y las anexa de forma atómica.
+
+Ejecutar:
+    python actualizar_historico.py              # 5m y 1h (por defecto)
+    python actualizar_historico.py 1d 1h 5m     # intervalos elegidos
+    python actualizar_historico.py 5m --cada 5  # repetir cada 5 minutos
+
+Requiere haber ejecutado antes: python descargar_historico_MEJORADO.py
+"""
+
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+import warnings
+warnings.filterwarnings('ignore')
+
+from datos.activos import todos_los_tickers
+from datos.almacen import AlmacenHistorico
+from datos.descarga import MotorDescarga, FuenteYahoo, LimitadorTasa
+
+DATA_DIR = Path("data_historico")
+
+
+def actualizar(intervalos):
+    """Una pasada de actualización incremental; devuelve las barras nuevas"""
+    almacen = AlmacenHistorico(DATA_DIR)
+
+    if not almacen.existe():
+        print("❌ No existe el almacén consolidado. Ejecuta primero:")
+        print("   python descargar_historico_MEJORADO.py")
+        return 0
+
+    motor = MotorDescarga(
+        fuente=FuenteYahoo(),
+        almacen=almacen,
+        workers=6,
+        limitadores={'yahoo': LimitadorTasa(tasa=2.0, capacidad=4)},
+        reintentos=3,
+        backoff=2.0,
+        lote=len(todos_los_tickers()) * len(intervalos),
+        incremental=True
+    )
+    trabajos = MotorDescarga.trabajos_para(todos_los_tickers(), intervalos)
+
+    registros_antes = sum(info['registros'] for info in almacen.particiones().values())
+    inicio = time.time()
+
+    # Cada pasada empieza con el libro vacío: un 'ok' de una pasada anterior
+    # no significa que la serie esté al día ahora
+    motor.libro.borrar()
+    resultados = motor.ejecutar(trabajos)
+
+    # Segunda vuelta solo para los que fallaron (los 'ok' del libro se saltan)
+    fallidos = [t for t in trabajos if resultados[(t[0], t[2])][0] == 'error']
+    if fallidos:
+        print(f"🔁 Reintentando {len(fallidos)} series con error...")
+        resultados.update(motor.ejecutar(fallidos))
+
+    registros_despues = sum(info['registros'] for info in almacen.particiones().values())
+    nuevas = registros_despues - registros_antes
+    errores = sum(1 for estado, _ in resultados.values() if estado == 'error')
+
+    print(f"[{datetime.now():%H:%M:%S}] ✅ {nuevas:,} barras nuevas "
+          f"({len(trabajos)} series {'/'.join(intervalos)}) en {time.time() - inicio:.1f}s"
+          + (f" | ⚠️ {errores} con error" if errores else ""))
+
+    if motor.libro.completo():
+        motor.libro.borrar()
+    return nuevas
+
+
+if __name__ == '__main__':
+    argumentos = sys.argv[1:]
+    cada = None
+    if '--cada' in argumentos:
+        posicion = argumentos.index('--cada')
+        cada = float(argumentos[posicion + 1])
+        del argumentos[posicion:posicion + 2]
+
+    intervalos = argumentos or ['5m', '1h']
+
+    print("="*60)
+    print("🔄 ACTUALIZACIÓN INCREMENTAL DE DATOS HISTÓRICOS")
+    print("="*60)
+    print(f"📁 Almacén: {(DATA_DIR / 'historico.parquet').absolute()}")
+    print(f"⏱️  Intervalos: {', '.join(intervalos)}\n")
+
+    actualizar(intervalos)
+
+    while cada:
+        time.sleep(cada * 60)
+        actualizar(intervalos)
@@ -1,35 +1,235 @@
 """
 Módulo para obtener datos de Alpha Vantage
+Las peticiones pasan por un programador en segundo plano que respeta el límite
+del plan gratis (5/min) y guarda las respuestas con un TTL por endpoint
 """
 import requests
 import pandas as pd
+from concurrent.futures import Future
 from datetime import datetime
+import queue
+import threading
 import time
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 from config import API_KEYS
+from datos.limites import LimitadorTasa
 
 BASE_URL = 'https://www.alphavantage.co/query'
+PETICIONES_POR_MINUTO = 5  # Límite del plan gratis
 
-def obtener_sentimiento_noticias(tickers='GOLD', limite=50):
+# Segundos de validez según la frecuencia con que se actualiza cada endpoint
+TTL_POR_FUNCION = {
+    'NEWS_SENTIMENT': 30 * 60,
+    'TIME_SERIES_INTRADAY': 5 * 60,
+    'TIME_SERIES_DAILY': 6 * 3600,
+    'TIME_SERIES_DAILY_ADJUSTED': 6 * 3600,
+    'TIME_SERIES_WEEKLY': 24 * 3600,
+    'TIME_SERIES_MONTHLY': 24 * 3600,
+}
+TTL_INDICADORES = 24 * 3600  # REAL_GDP, INFLATION, ...: datos mensuales o trimestrales
+
+# Nombre del parámetro que lleva el símbolo en cada función
+PARAMETRO_SIMBOLO = {'NEWS_SENTIMENT': 'tickers'}
+
+
+class ErrorAlphaVantage(Exception):
+    """Respuesta de error o aviso de límite de Alpha Vantage"""
+
+
+class ProgramadorAlphaVantage:
+    """
+    Cola de peticiones a Alpha Vantage enviadas por un hilo en segundo plano
+
+    Quien llama recibe al instante un Future (o el valor en caché); el hilo
+    envía las peticiones al ritmo permitido sin bloquear al script de Streamlit.
+    Peticiones iguales en vuelo comparten el mismo Future.
+
+    Args:
+        api_key: Clave de la API (por defecto la de config.py)
+        base_url: URL del endpoint
+        por_minuto: Peticiones por minuto permitidas
+        timeout: Timeout de cada petición (segundos)
+    """
+
+    def __init__(self, api_key=None, base_url=BASE_URL, por_minuto=PETICIONES_POR_MINUTO, timeout=30):
+        self.api_key = api_key or API_KEYS['alphavantage']
+        self.base_url = base_url
+        self.timeout = timeout
+        # Capacidad 1: ninguna ráfaga, como máximo `por_minuto` en cualquier minuto
+        self.limitador = LimitadorTasa(tasa=por_minuto / 60.0, capacidad=1)
+        self.session = requests.Session()
+
+        self._cola = queue.Queue()
+        self._cache = {}
+        self._pendientes = {}
+        self._lock = threading.Lock()
+        self._hilo = None
+        self.aciertos = 0
+        self.enviadas = 0
+
+    @staticmethod
+    def _clave(function, symbol, interval, params):
+        return (function, symbol, interval, tuple(sorted(params.items())))
+
+    @staticmethod
+    def ttl(function):
+        return TTL_POR_FUNCION.get(function, TTL_INDICADORES)
+
+    def en_cache(self, function, symbol=None, interval=None, **params):
+        """Respuesta vigente en caché (None si no hay)"""
+        clave = self._clave(function, symbol, interval, params)
+        with self._lock:
+            entrada = self._cache.get(clave)
+            if entrada is not None and time.time() < entrada[0]:
+                return entrada[1]
+        return None
+
+    def solicitar(self, function, symbol=None, interval=None, **params):
+        """
+        Encolar una petición
+
+        Args:
+            function: Función de la API (NEWS_SENTIMENT, TIME_SERIES_DAILY, REAL_GDP...)
+            symbol: Símbolo o tickers (opcional)
+            interval: Intervalo (opcional)
+            **params: Parámetros extra de la API (limit, ...)
+
+        Returns:
+            Future con el dict JSON de la respuesta (ya resuelto si estaba en caché)
+        """
+        clave = self._clave(function, symbol, interval, params)
+        with self._lock:
+            entrada = self._cache.get(clave)
+            if entrada is not None and time.time() < entrada[0]:
+                self.aciertos += 1
+                future = Future()
+                future.set_result(entrada[1])
+                return future
+            if clave in self._pendientes:
+                return self._pendientes[clave]
+
+            future = Future()
+            self._pendientes[clave] = future
+            self._iniciar()
+
+        self._cola.put((clave, future))
+        return future
+
+    def obtener(self, function, symbol=None, interval=None, espera=None, **params):
+        """Versión bloqueante de solicitar (espera: segundos máximos, None = sin límite)"""
+        return self.solicitar(function, symbol, interval, **params).result(timeout=espera)
+
+    def _iniciar(self):
+        if self._hilo is None or not self._hilo.is_alive():
+            self._hilo = threading.Thread(target=self._trabajar, name='alpha_vantage', daemon=True)
+            self._hilo.start()
+
+    def _parametros(self, clave):
+        function, symbol, interval, extra = clave
+        params = {'function': function, 'apikey': self.api_key, **dict(extra)}
+        if symbol is not None:
+            params[PARAMETRO_SIMBOLO.get(function, 'symbol')] = symbol
+        if interval is not None:
+            params['interval'] = interval
+        return params
+
+    def _enviar(self, clave):
+        response = self.session.get(self.base_url, params=self._parametros(clave), timeout=self.timeout)
+        response.raise_for_status()
+        data = response.json()
+
+        # Los errores y avisos de límite llegan con estado 200: no se guardan en caché
+        for campo in ['Error Message', 'Note', 'Information']:
+            if campo in data:
+                raise ErrorAlphaVantage(data[campo])
+        return data
+
+    def _trabajar(self):
+        while True:
+            tarea = self._cola.get()
+            if tarea is None:
+                return
+            clave, future = tarea
+            if not future.set_running_or_notify_cancel():
+                continue  # Cancelado por cerrar()
+
+            self.limitador.adquirir()
+            try:
+                data = self._enviar(clave)
+            except Exception as e:
+                with self._lock:
+                    self._pendientes.pop(clave, None)
+                future.set_exception(e)
+                continue
+
+            with self._lock:
+                self.enviadas += 1
+                self._cache[clave] = (time.time() + self.ttl(clave[0]), data)
+                self._pendientes.pop(clave, None)
+            future.set_result(data)
+
+    def en_cola(self):
+        with self._lock:
+            return len(self._pendientes)
+
+    def estadisticas(self):
+        with self._lock:
+            return {
+                'en_cache': len(self._cache),
+                'en_cola': len(self._pendientes),
+                'aciertos': self.aciertos,
+                'enviadas': self.enviadas,
+            }
+
+    def cerrar(self):
+        """Detener el hilo y cancelar las peticiones pendientes"""
+        with self._lock:
+            for future in self._pendientes.values():
+                future.cancel()
+            self._pendientes.clear()
+        self._cola.put(None)
+        self.session.close()
+
+
+_programador = None
+_programador_lock = threading.Lock()
+
+def obtener_programador():
+    """Programador compartido del módulo (un único ritmo para toda la API key)"""
+    global _programador
+    with _programador_lock:
+        if _programador is None:
+            _programador = ProgramadorAlphaVantage()
+        return _programador
+
+def _resultado(future, bloquear, espera):
+    """Resultado del future, o None si no se quiere esperar y aún no llegó"""
+    if not bloquear and not future.done():
+        return None
+    return future.result(timeout=espera)
+
+def obtener_sentimiento_noticias(tickers='GOLD', limite=50, bloquear=True, espera=120):
     """
     Obtener sentimiento de noticias desde Alpha Vantage
     
     Args:
         tickers: Ticker o palabra clave (GOLD, GLD, etc.)
         limite: Número de noticias (max 1000, pero gratis solo 50)
+        bloquear: False para no esperar: si no está en caché devuelve vacío
+                  y la petición sigue en cola para la próxima llamada
+        espera: Segundos máximos de espera si bloquear=True
     """
     try:
-        params = {
-            'function': 'NEWS_SENTIMENT',
-            'tickers': tickers,
-            'limit': min(limite, 50),  # API gratis limitada
-            'apikey': API_KEYS['alphavantage']
-        }
-        
-        response = requests.get(BASE_URL, params=params)
-        data = response.json()
+        future = obtener_programador().solicitar(
+            'NEWS_SENTIMENT', symbol=tickers,
+            limit=min(limite, 50)  # API gratis limitada
+        )
+        data = _resultado(future, bloquear, espera)
+        if data is None:
+            print(f"⏳ Alpha Vantage: sentimiento de {tickers} en cola")
+            return pd.DataFrame()
         
         if 'feed' not in data:
             print(f"⚠️ Alpha Vantage: {data.get('Note', 'Sin datos')}")
@@ -62,17 +262,22 @@ def obtener_sentimiento_noticias(tickers='GOLD', limite=50):
         
         return df
         
+    except ErrorAlphaVantage as e:
+        print(f"⚠️ Alpha Vantage: {str(e)}")
+        return pd.DataFrame()
     except Exception as e:
         print(f"❌ Error en Alpha Vantage: {str(e)}")
         return pd.DataFrame()
 
-def obtener_datos_commodity(simbolo='GOLD', intervalo='daily'):
+def obtener_datos_commodity(simbolo='GOLD', intervalo='daily', bloquear=True, espera=120):
     """
     Obtener datos de commodities (oro, plata, etc.)
     
     Args:
         simbolo: GOLD, SILVER, COPPER, etc.
         intervalo: daily, weekly, monthly
+        bloquear: False para devolver {} al instante si aún no hay respuesta
+        espera: Segundos máximos de espera si bloquear=True
     """
     try:
         funcion_map = {
@@ -81,17 +286,14 @@ def obtener_datos_commodity(simbolo='GOLD', intervalo='daily'):
             'monthly': 'TIME_SERIES_MONTHLY'
         }
         
-        params = {
-            'function': funcion_map.get(intervalo, 'TIME_SERIES_DAILY'),
-            'symbol': simbolo,
-            'apikey': API_KEYS['alphavantage']
-        }
-        
-        response = requests.get(BASE_URL, params=params)
-        data = response.json()
-        
-        # Nota: La API gratis tiene límites estrictos (5 requests/min)
-        time.sleep(12)  # Esperar entre requests
+        # El límite del plan gratis (5 requests/min) lo respeta el programador
+        future = obtener_programador().solicitar(
+            funcion_map.get(intervalo, 'TIME_SERIES_DAILY'), symbol=simbolo
+        )
+        data = _resultado(future, bloquear, espera)
+        if data is None:
+            print(f"⏳ Alpha Vantage: datos de {simbolo} en cola")
+            return {}
         
         print(f"✅ Alpha Vantage: Datos de {simbolo} obtenidos")
         return data
@@ -100,7 +302,7 @@ def obtener_datos_commodity(simbolo='GOLD', intervalo='daily'):
         print(f"❌ Error obteniendo datos de {simbolo}: {str(e)}")
         return {}
 
-def obtener_indicadores_economicos(indicador='REAL_GDP'):
+def obtener_indicadores_economicos(indicador='REAL_GDP', bloquear=True, espera=120):
     """
     Obtener indicadores económicos
     
@@ -111,14 +313,11 @@ def obtener_indicadores_economicos(indicador='REAL_GDP'):
     - FEDERAL_FUNDS_RATE: Tasa de interés Fed
     """
     try:
-        params = {
-            'function': indicador,
-            'interval': 'quarterly',
-            'apikey': API_KEYS['alphavantage']
-        }
-        
-        response = requests.get(BASE_URL, params=params)
-        data = response.json()
+        future = obtener_programador().solicitar(indicador, interval='quarterly')
+        data = _resultado(future, bloquear, espera)
+        if data is None:
+            print(f"⏳ Alpha Vantage: indicador {indicador} en cola")
+            return {}
         
         print(f"✅ Alpha Vantage: Indicador {indicador} obtenido")
         return data
@@ -131,6 +330,14 @@ if __name__ == '__main__':
     # Prueba
     print("Probando Alpha Vantage...")
     
+    # Encolar todo de una vez: el hilo las envía a 5/min sin bloquear este script
+    programador = obtener_programador()
+    futuros = {
+        'oro diario': programador.solicitar('TIME_SERIES_DAILY', symbol='GOLD'),
+        'PIB real': programador.solicitar('REAL_GDP', interval='quarterly'),
+    }
+    print(f"\n{programador.en_cola()} peticiones en cola")
+    
     print("\n1. Sentimiento de noticias sobre oro:")
     df_sentiment = obtener_sentimiento_noticias('GOLD', limite=10)
     
@@ -141,3 +348,6 @@ if __name__ == '__main__':
         print(f"\nSentimiento promedio: {df_sentiment['sentimiento'].mean():.3f}")
     else:
         print("\n❌ No se obtuvieron datos de sentimiento")
+    
+    print(f"\n{programador.estadisticas()}")
+    programador.cerrar()
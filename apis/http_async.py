@@ -0,0 +1,264 @@
+"""
+Capa de descarga HTTP concurrente para scraping y APIs
+asyncio + una requests.Session compartida (pool de conexiones) ejecutada en
+un pool de hilos propio, con límite de concurrencia y pausa de cortesía
+por host y un plazo global que devuelve resultados parciales
+"""
+import asyncio
+import hashlib
+import json
+import os
+import pickle
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+USER_AGENT = ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+              '(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36')
+
+DIR_CACHE_HTTP = Path("data_historico") / "cache" / "http"
+
+
+def ejecutar(corrutina):
+    """Ejecutar una corrutina desde código síncrono (también dentro de un loop activo)"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(corrutina)
+
+    # Ya hay un loop en este hilo (notebooks): ejecutar en un hilo aparte
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, corrutina).result()
+
+
+def _escribir_atomico(ruta, contenido):
+    temporal = ruta.with_name(f"{ruta.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    temporal.write_bytes(contenido)
+    os.replace(temporal, ruta)
+
+
+class Respuesta:
+    """
+    Resultado de una descarga (contenido en bytes para parsear sin red)
+
+    Atributos:
+        sin_cambios: True si el servidor respondió 304 o el contenido tiene el
+                     mismo hash que la copia guardada
+        hash: sha1 del contenido
+        bytes_red: Bytes de cuerpo recibidos por la red (0 en un 304)
+    """
+
+    def __init__(self, url, estado, contenido, cabeceras, segundos,
+                 sin_cambios=False, bytes_red=None):
+        self.url = url
+        self.estado = estado
+        self.contenido = contenido
+        self.cabeceras = cabeceras
+        self.segundos = segundos
+        self.sin_cambios = sin_cambios
+        self.hash = hashlib.sha1(contenido).hexdigest()
+        self.bytes_red = len(contenido) if bytes_red is None else bytes_red
+
+    @property
+    def ok(self):
+        return 200 <= self.estado < 300 or self.estado == 304
+
+
+class CacheHTTP:
+    """
+    Copia en disco de las respuestas con sus validadores (ETag / Last-Modified)
+
+    Por cada URL guarda el cuerpo, los validadores, el hash del contenido y
+    resultados derivados (p.ej. las noticias ya parseadas) atados a ese hash.
+
+    Args:
+        directorio: Carpeta de la caché (compartida entre procesos)
+    """
+
+    def __init__(self, directorio=DIR_CACHE_HTTP):
+        self.directorio = Path(directorio)
+        self.directorio.mkdir(parents=True, exist_ok=True)
+
+    def _base(self, url):
+        return self.directorio / hashlib.sha1(url.encode('utf-8')).hexdigest()
+
+    def meta(self, url):
+        """Validadores y hash guardados de una URL (None si no hay copia)"""
+        try:
+            with open(self._base(url).with_suffix('.json'), encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def validadores(self, url):
+        """Cabeceras condicionales para la próxima petición"""
+        meta = self.meta(url) or {}
+        headers = {}
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+        return headers
+
+    def cuerpo(self, url):
+        return self._base(url).with_suffix('.body').read_bytes()
+
+    def guardar(self, url, contenido, cabeceras):
+        """Guardar cuerpo y validadores de una respuesta 200"""
+        base = self._base(url)
+        _escribir_atomico(base.with_suffix('.body'), contenido)
+        meta = {
+            'url': url,
+            'etag': cabeceras.get('ETag'),
+            'last_modified': cabeceras.get('Last-Modified'),
+            'hash': hashlib.sha1(contenido).hexdigest(),
+            'guardado': time.time(),
+        }
+        _escribir_atomico(base.with_suffix('.json'), json.dumps(meta).encode('utf-8'))
+
+    def derivado(self, url, nombre, hash_contenido):
+        """Resultado derivado del contenido con ese hash (None si no existe o es de otro)"""
+        try:
+            with open(self._base(url).with_suffix(f'.{nombre}.pkl'), 'rb') as f:
+                guardado_hash, valor = pickle.load(f)
+        except Exception:
+            return None
+        return valor if guardado_hash == hash_contenido else None
+
+    def guardar_derivado(self, url, nombre, hash_contenido, valor):
+        ruta = self._base(url).with_suffix(f'.{nombre}.pkl')
+        _escribir_atomico(ruta, pickle.dumps((hash_contenido, valor)))
+
+
+class ClienteHTTPAsync:
+    """
+    Cliente HTTP con pool de conexiones y cortesía por host
+
+    Args:
+        headers: Cabeceras por defecto de la sesión
+        timeout: Timeout de cada petición (segundos)
+        por_host: Peticiones simultáneas máximas a un mismo host
+        pausa_host: Segundos mínimos entre peticiones al mismo host
+        conexiones: Tamaño del pool de conexiones de la sesión
+        cache: CacheHTTP opcional para peticiones condicionales (GET con validadores)
+    """
+
+    def __init__(self, headers=None, timeout=10, por_host=2, pausa_host=1.0, conexiones=20,
+                 cache=None):
+        self.timeout = timeout
+        self.cache = cache
+        self.por_host = por_host
+        self.pausa_host = pausa_host
+
+        self.session = requests.Session()
+        self.session.headers.update(headers or {'User-Agent': USER_AGENT})
+        adaptador = HTTPAdapter(pool_connections=conexiones, pool_maxsize=conexiones)
+        self.session.mount('http://', adaptador)
+        self.session.mount('https://', adaptador)
+
+        # Pool propio (no el del loop) para que el plazo global no espere a
+        # las peticiones lentas al cerrar el loop
+        self._hilos = ThreadPoolExecutor(max_workers=conexiones, thread_name_prefix='http')
+        self._semaforos = weakref.WeakKeyDictionary()
+        self._ultimo_acceso = {}
+        self._lock = threading.Lock()
+
+    def _semaforo(self, host):
+        # Los semáforos de asyncio pertenecen a un event loop: uno por loop y host
+        por_loop = self._semaforos.setdefault(asyncio.get_running_loop(), {})
+        if host not in por_loop:
+            por_loop[host] = asyncio.Semaphore(self.por_host)
+        return por_loop[host]
+
+    async def _esperar_turno(self, host):
+        """Respetar la pausa de cortesía del host (las pausas de otros hosts no bloquean)"""
+        while True:
+            with self._lock:
+                ahora = time.monotonic()
+                siguiente = self._ultimo_acceso.get(host, 0.0) + self.pausa_host
+                if ahora >= siguiente:
+                    self._ultimo_acceso[host] = ahora
+                    return
+            await asyncio.sleep(siguiente - ahora)
+
+    def _get(self, url, headers=None):
+        inicio = time.time()
+        meta = None
+        if self.cache is not None:
+            meta = self.cache.meta(url)
+            headers = {**self.cache.validadores(url), **(headers or {})}
+
+        response = self.session.get(url, headers=headers, timeout=self.timeout)
+        segundos = time.time() - inicio
+
+        if self.cache is None:
+            return Respuesta(url, response.status_code, response.content,
+                             dict(response.headers), segundos)
+
+        if response.status_code == 304 and meta is not None:
+            # Sin cambios: el cuerpo sale del disco, por la red solo llegan cabeceras
+            try:
+                return Respuesta(url, 304, self.cache.cuerpo(url), dict(response.headers),
+                                 segundos, sin_cambios=True, bytes_red=0)
+            except FileNotFoundError:
+                response = self.session.get(url, timeout=self.timeout)
+
+        contenido = response.content
+        sin_cambios = False
+        if response.status_code == 200:
+            sin_cambios = meta is not None and meta.get('hash') == hashlib.sha1(contenido).hexdigest()
+            self.cache.guardar(url, contenido, response.headers)
+        return Respuesta(url, response.status_code, contenido, dict(response.headers),
+                         time.time() - inicio, sin_cambios=sin_cambios)
+
+    async def obtener(self, url, headers=None):
+        """Descargar una URL respetando los límites de su host"""
+        host = urlparse(url).netloc
+        async with self._semaforo(host):
+            await self._esperar_turno(host)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._hilos, self._get, url, headers)
+
+    async def obtener_varios(self, urls, plazo=None, headers=None):
+        """
+        Descargar varias URLs en paralelo
+
+        Args:
+            urls: Lista de URLs
+            plazo: Segundos máximos para el conjunto (None = sin límite)
+            headers: dict url -> cabeceras extra (opcional)
+
+        Returns:
+            dict url -> Respuesta o Exception; las URLs sin terminar en el plazo no aparecen
+        """
+        headers = headers or {}
+        tareas = {asyncio.create_task(self.obtener(url, headers.get(url))): url for url in urls}
+        if not tareas:
+            return {}
+
+        terminadas, pendientes = await asyncio.wait(tareas, timeout=plazo)
+        for tarea in pendientes:
+            tarea.cancel()
+
+        resultados = {}
+        for tarea in terminadas:
+            url = tareas[tarea]
+            try:
+                resultados[url] = tarea.result()
+            except Exception as e:
+                resultados[url] = e
+        return resultados
+
+    def descargar(self, urls, plazo=None, headers=None):
+        """Versión síncrona de obtener_varios"""
+        return ejecutar(self.obtener_varios(urls, plazo, headers))
+
+    def cerrar(self):
+        self._hilos.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
@@ -3,59 +3,43 @@ Módulo para obtener noticias reales desde NewsAPI
 """
 from newsapi import NewsApiClient
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 from config import API_KEYS
+from apis.news_archive import ArchivoNoticias, IngestorNewsAPI
 
-def obtener_noticias_oro(dias=7, idioma='en'):
+CONSULTA_ORO = 'gold OR "gold price" OR "gold market"'
+
+def obtener_noticias_oro(dias=7, idioma='en', palabras=None):
     """
     Obtener noticias reales sobre oro desde NewsAPI
     
+    Solo se piden a la API las noticias posteriores a las ya archivadas
+    (data_historico/noticias.db); la respuesta sale del archivo local.
+    
     Args:
         dias: Número de días hacia atrás para buscar
         idioma: 'en' (inglés) o 'es' (español)
+        palabras: Filtro opcional de texto completo ('fed OR rates')
     
     Returns:
         DataFrame con noticias
     """
     try:
-        # Inicializar cliente
-        newsapi = NewsApiClient(api_key=API_KEYS['newsapi'])
+        archivo = ArchivoNoticias()
         
-        # Calcular fecha de inicio
-        fecha_desde = (datetime.now() - timedelta(days=dias)).strftime('%Y-%m-%d')
-        
-        # Buscar noticias (NewsAPI gratuito: máximo 100 resultados)
-        noticias = newsapi.get_everything(
-            q='gold OR "gold price" OR "gold market"',
-            language=idioma,
-            sort_by='publishedAt',
-            from_param=fecha_desde,
-            page_size=100
-        )
-        
-        # Procesar artículos
-        datos = []
-        for articulo in noticias.get('articles', []):
-            # Combinar título y descripción para análisis
-            texto_completo = f"{articulo.get('title', '')} {articulo.get('description', '')}"
-            
-            datos.append({
-                'fecha': pd.to_datetime(articulo['publishedAt']),
-                'titulo': articulo.get('title', 'Sin título'),
-                'descripcion': articulo.get('description', ''),
-                'texto': texto_completo,
-                'fuente': articulo['source']['name'],
-                'url': articulo.get('url', ''),
-                'autor': articulo.get('author', 'Desconocido')
-            })
+        if API_KEYS['newsapi']:
+            ingestor = IngestorNewsAPI(NewsApiClient(api_key=API_KEYS['newsapi']), archivo)
+            resumen = ingestor.ingerir(CONSULTA_ORO, idioma=idioma, dias=dias)
+            if resumen['paginas']:
+                print(f"📡 NewsAPI: {resumen['paginas']} páginas, {resumen['nuevos']} noticias nuevas")
         
-        df = pd.DataFrame(datos)
+        desde = datetime.now(timezone.utc) - timedelta(days=dias)
+        df = archivo.consultar(desde=desde, palabras=palabras, idioma=idioma)
         
         if not df.empty:
-            df = df.sort_values('fecha', ascending=False)
             print(f"✅ NewsAPI: {len(df)} noticias obtenidas")
         else:
             print("⚠️ NewsAPI: No se encontraron noticias")
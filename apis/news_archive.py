@@ -0,0 +1,430 @@
+"""
+Archivo local de noticias con búsqueda de texto completo (SQLite + FTS5)
+Los artículos se guardan una sola vez por URL; los dashboards consultan el
+archivo por rango de fechas y palabras clave sin gastar cuota de NewsAPI
+"""
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+import pandas as pd
+
+from datos.almacen import bloqueo_archivo
+
+RUTA_ARCHIVO = Path("data_historico") / "noticias.db"
+RUTA_CUOTA = Path("data_historico") / "newsapi_cuota.json"
+
+COLUMNAS = ['fecha', 'titulo', 'descripcion', 'texto', 'fuente', 'url', 'autor']
+
+
+def _iso(fecha):
+    """Fecha como texto ISO en UTC (ordenable lexicográficamente)"""
+    fecha = pd.Timestamp(fecha)
+    fecha = fecha.tz_localize('UTC') if fecha.tzinfo is None else fecha.tz_convert('UTC')
+    return fecha.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+class ArchivoNoticias:
+    """
+    Artículos indexados por URL, fecha y texto (FTS5 sobre título y descripción)
+
+    Args:
+        ruta: Archivo SQLite (compartido entre procesos)
+    """
+
+    def __init__(self, ruta=RUTA_ARCHIVO):
+        self.ruta = Path(ruta)
+        self.ruta.parent.mkdir(parents=True, exist_ok=True)
+        with self._conectar() as con:
+            con.execute("PRAGMA journal_mode=WAL")
+            con.executescript("""
+                CREATE TABLE IF NOT EXISTS noticias (
+                    id INTEGER PRIMARY KEY,
+                    url TEXT NOT NULL UNIQUE,
+                    fecha TEXT NOT NULL,
+                    titulo TEXT,
+                    descripcion TEXT,
+                    texto TEXT,
+                    fuente TEXT,
+                    autor TEXT,
+                    idioma TEXT,
+                    consulta TEXT,
+                    ingresado TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS noticias_fecha ON noticias (fecha);
+
+                CREATE VIRTUAL TABLE IF NOT EXISTS noticias_fts USING fts5(
+                    titulo, descripcion, content='noticias', content_rowid='id'
+                );
+                CREATE TRIGGER IF NOT EXISTS noticias_ai AFTER INSERT ON noticias BEGIN
+                    INSERT INTO noticias_fts (rowid, titulo, descripcion)
+                    VALUES (new.id, new.titulo, new.descripcion);
+                END;
+                CREATE TRIGGER IF NOT EXISTS noticias_ad AFTER DELETE ON noticias BEGIN
+                    INSERT INTO noticias_fts (noticias_fts, rowid, titulo, descripcion)
+                    VALUES ('delete', old.id, old.titulo, old.descripcion);
+                END;
+                CREATE TRIGGER IF NOT EXISTS noticias_au AFTER UPDATE ON noticias BEGIN
+                    INSERT INTO noticias_fts (noticias_fts, rowid, titulo, descripcion)
+                    VALUES ('delete', old.id, old.titulo, old.descripcion);
+                    INSERT INTO noticias_fts (rowid, titulo, descripcion)
+                    VALUES (new.id, new.titulo, new.descripcion);
+                END;
+
+                CREATE TABLE IF NOT EXISTS ingestas (
+                    consulta TEXT NOT NULL,
+                    idioma TEXT NOT NULL,
+                    momento TEXT NOT NULL,
+                    PRIMARY KEY (consulta, idioma)
+                );
+
+                CREATE TABLE IF NOT EXISTS progreso_ingesta (
+                    consulta TEXT NOT NULL,
+                    idioma TEXT NOT NULL,
+                    marca TEXT,
+                    pendiente TEXT,
+                    tope TEXT,
+                    PRIMARY KEY (consulta, idioma)
+                );
+            """)
+
+    def _conectar(self):
+        return sqlite3.connect(self.ruta, timeout=30)
+
+    def guardar(self, articulos, idioma=None, consulta=None):
+        """
+        Insertar o actualizar artículos por URL
+
+        Args:
+            articulos: Lista de dicts o DataFrame con las columnas de COLUMNAS
+
+        Returns:
+            Número de artículos que no estaban en el archivo
+        """
+        if isinstance(articulos, pd.DataFrame):
+            articulos = articulos.to_dict('records')
+        ahora = _iso(datetime.now(timezone.utc))
+        filas = [
+            (a['url'], _iso(a['fecha']), a.get('titulo'), a.get('descripcion'), a.get('texto'),
+             a.get('fuente'), a.get('autor'), idioma, consulta, ahora)
+            for a in articulos if a.get('url')
+        ]
+        if not filas:
+            return 0
+
+        with self._conectar() as con:
+            antes = con.execute("SELECT COUNT(*) FROM noticias").fetchone()[0]
+            con.executemany("""
+                INSERT INTO noticias (url, fecha, titulo, descripcion, texto, fuente, autor,
+                                      idioma, consulta, ingresado)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    fecha = excluded.fecha, titulo = excluded.titulo,
+                    descripcion = excluded.descripcion, texto = excluded.texto,
+                    fuente = excluded.fuente, autor = excluded.autor
+            """, filas)
+            despues = con.execute("SELECT COUNT(*) FROM noticias").fetchone()[0]
+        return despues - antes
+
+    def consultar(self, desde=None, hasta=None, palabras=None, idioma=None, limite=None):
+        """
+        Buscar artículos archivados
+
+        Args:
+            desde, hasta: Rango de fechas de publicación (inclusive)
+            palabras: Consulta FTS5 sobre título y descripción ('gold AND fed', 'oro OR plata')
+            idioma: Filtrar por idioma de ingesta
+            limite: Máximo de filas (las más recientes)
+
+        Returns:
+            DataFrame con las columnas de obtener_noticias_oro, más recientes primero
+        """
+        condiciones, parametros = [], []
+        origen = "noticias n"
+        if palabras:
+            origen = "noticias_fts JOIN noticias n ON n.id = noticias_fts.rowid"
+            condiciones.append("noticias_fts MATCH ?")
+            parametros.append(palabras)
+        if desde is not None:
+            condiciones.append("n.fecha >= ?")
+            parametros.append(_iso(desde))
+        if hasta is not None:
+            condiciones.append("n.fecha <= ?")
+            parametros.append(_iso(hasta))
+        if idioma is not None:
+            condiciones.append("n.idioma = ?")
+            parametros.append(idioma)
+
+        sql = f"SELECT {', '.join('n.' + c for c in COLUMNAS)} FROM {origen}"
+        if condiciones:
+            sql += " WHERE " + " AND ".join(condiciones)
+        sql += " ORDER BY n.fecha DESC"
+        if limite:
+            sql += f" LIMIT {int(limite)}"
+
+        with self._conectar() as con:
+            df = pd.read_sql_query(sql, con, params=parametros)
+        df['fecha'] = pd.to_datetime(df['fecha'], utc=True)
+        return df
+
+    def ultima_fecha(self, consulta=None, idioma=None):
+        """Fecha de publicación más reciente archivada (None si no hay)"""
+        sql, parametros = "SELECT MAX(fecha) FROM noticias WHERE 1 = 1", []
+        if consulta is not None:
+            sql += " AND consulta = ?"
+            parametros.append(consulta)
+        if idioma is not None:
+            sql += " AND idioma = ?"
+            parametros.append(idioma)
+        with self._conectar() as con:
+            valor = con.execute(sql, parametros).fetchone()[0]
+        return pd.Timestamp(valor) if valor else None
+
+    def ultima_ingesta(self, consulta, idioma):
+        with self._conectar() as con:
+            fila = con.execute("SELECT momento FROM ingestas WHERE consulta = ? AND idioma = ?",
+                               (consulta, idioma)).fetchone()
+        return pd.Timestamp(fila[0]) if fila else None
+
+    def marcar_ingesta(self, consulta, idioma):
+        with self._conectar() as con:
+            con.execute("INSERT OR REPLACE INTO ingestas (consulta, idioma, momento) VALUES (?, ?, ?)",
+                        (consulta, idioma, _iso(datetime.now(timezone.utc))))
+
+    def progreso(self, consulta, idioma):
+        """
+        Estado de la ingesta incremental de una consulta
+
+        Returns:
+            dict con marca (todo lo publicado hasta esa fecha ya está archivado),
+            pendiente (punto desde el que falta paginar hacia atrás hasta la
+            marca, o None) y tope (lo más nuevo traído por la ingesta cortada)
+        """
+        with self._conectar() as con:
+            fila = con.execute("SELECT marca, pendiente, tope FROM progreso_ingesta "
+                               "WHERE consulta = ? AND idioma = ?", (consulta, idioma)).fetchone()
+        if fila is None:
+            # Archivos anteriores a esta tabla: la última noticia hace de marca
+            return {'marca': self.ultima_fecha(consulta, idioma), 'pendiente': None, 'tope': None}
+        marca, pendiente, tope = (pd.Timestamp(v) if v else None for v in fila)
+        return {'marca': marca, 'pendiente': pendiente, 'tope': tope}
+
+    def guardar_progreso(self, consulta, idioma, marca, pendiente=None, tope=None):
+        valores = [_iso(v) if v is not None else None for v in (marca, pendiente, tope)]
+        with self._conectar() as con:
+            con.execute("INSERT OR REPLACE INTO progreso_ingesta (consulta, idioma, marca, pendiente, tope) "
+                        "VALUES (?, ?, ?, ?, ?)", [consulta, idioma] + valores)
+
+    def __len__(self):
+        with self._conectar() as con:
+            return con.execute("SELECT COUNT(*) FROM noticias").fetchone()[0]
+
+
+class PresupuestoCuota:
+    """
+    Contador de peticiones por día UTC guardado en disco
+
+    Args:
+        limite_diario: Peticiones permitidas por día (NewsAPI gratuito: 100)
+        ruta: Archivo JSON compartido por todos los procesos
+    """
+
+    def __init__(self, limite_diario=100, ruta=RUTA_CUOTA):
+        self.limite_diario = limite_diario
+        self.ruta = Path(ruta)
+        self._lock = threading.Lock()
+
+    def _hoy(self):
+        return datetime.now(timezone.utc).strftime('%Y-%m-%d')
+
+    def _leer(self):
+        try:
+            with open(self.ruta, encoding='utf-8') as f:
+                estado = json.load(f)
+        except (FileNotFoundError, ValueError):
+            estado = {}
+        if estado.get('dia') != self._hoy():
+            estado = {'dia': self._hoy(), 'usadas': 0}
+        return estado
+
+    def restantes(self):
+        with self._lock:
+            return max(0, self.limite_diario - self._leer()['usadas'])
+
+    def consumir(self, n=1):
+        """Reservar n peticiones; False si no alcanza el presupuesto de hoy"""
+        # Leer-modificar-escribir bajo bloqueo de archivo: varios workers de
+        # Streamlit comparten el contador
+        with self._lock, bloqueo_archivo(self.ruta):
+            estado = self._leer()
+            if estado['usadas'] + n > self.limite_diario:
+                return False
+            estado['usadas'] += n
+            self.ruta.parent.mkdir(parents=True, exist_ok=True)
+            temporal = self.ruta.with_name(f"{self.ruta.name}.{os.getpid()}.tmp")
+            with open(temporal, 'w', encoding='utf-8') as f:
+                json.dump(estado, f)
+            os.replace(temporal, self.ruta)
+            return True
+
+
+class IngestorNewsAPI:
+    """
+    Trae de NewsAPI solo lo que no está archivado, página a página y dentro de la cuota
+
+    Args:
+        cliente: NewsApiClient (o cualquier objeto con get_everything)
+        archivo: ArchivoNoticias
+        presupuesto: PresupuestoCuota
+        page_size: Artículos por página (máx. 100)
+        max_paginas: Páginas máximas por ingesta
+        intervalo_minimo: No volver a consultar la API antes de este tiempo
+        solapamiento: Margen hacia atrás desde la última noticia archivada
+    """
+
+    def __init__(self, cliente, archivo=None, presupuesto=None, page_size=100, max_paginas=5,
+                 intervalo_minimo=timedelta(minutes=15), solapamiento=timedelta(hours=1)):
+        self.cliente = cliente
+        self.archivo = archivo if archivo is not None else ArchivoNoticias()
+        self.presupuesto = presupuesto if presupuesto is not None else PresupuestoCuota()
+        self.page_size = page_size
+        self.max_paginas = max_paginas
+        self.intervalo_minimo = intervalo_minimo
+        self.solapamiento = solapamiento
+
+    @staticmethod
+    def _articulo(articulo):
+        titulo = articulo.get('title') or 'Sin título'
+        descripcion = articulo.get('description') or ''
+        return {
+            'fecha': pd.to_datetime(articulo['publishedAt']),
+            'titulo': titulo,
+            'descripcion': descripcion,
+            # Combinar título y descripción para análisis
+            'texto': f"{articulo.get('title', '')} {articulo.get('description', '')}",
+            'fuente': (articulo.get('source') or {}).get('name'),
+            'url': articulo.get('url', ''),
+            'autor': articulo.get('author') or 'Desconocido'
+        }
+
+    def _paginar(self, consulta, idioma, desde, hasta, marca, paginas, resumen):
+        """
+        Pedir páginas (más recientes primero) entre desde y hasta
+
+        Returns:
+            (completo, mas_nueva, mas_antigua): completo es True si se llegó a
+            la marca o se agotaron los resultados; False si se cortó antes
+            (cuota, error de la API como maximumResultsReached o `paginas`)
+        """
+        mas_nueva = mas_antigua = None
+        for pagina in range(1, paginas + 1):
+            if not self.presupuesto.consumir():
+                print("⚠️ NewsAPI: cuota diaria agotada, se usa solo el archivo local")
+                return False, mas_nueva, mas_antigua
+
+            parametros = {
+                'q': consulta,
+                'language': idioma,
+                'sort_by': 'publishedAt',
+                'from_param': desde.strftime('%Y-%m-%dT%H:%M:%S'),
+                'page_size': self.page_size,
+                'page': pagina
+            }
+            if hasta is not None:
+                parametros['to'] = hasta.strftime('%Y-%m-%dT%H:%M:%S')
+            try:
+                respuesta = self.cliente.get_everything(**parametros)
+            except Exception as e:
+                # El plan gratuito corta en 100 resultados (maximumResultsReached)
+                print(f"⚠️ NewsAPI página {pagina}: {str(e)[:80]}")
+                return False, mas_nueva, mas_antigua
+
+            articulos = [self._articulo(a) for a in respuesta.get('articles', [])]
+            nuevos = self.archivo.guardar(articulos, idioma=idioma, consulta=consulta)
+            resumen['paginas'] += 1
+            resumen['recibidos'] += len(articulos)
+            resumen['nuevos'] += nuevos
+            if not articulos:
+                return True, mas_nueva, mas_antigua
+
+            fechas = [pd.Timestamp(a['fecha']) for a in articulos]
+            fechas = [f.tz_localize('UTC') if f.tzinfo is None else f for f in fechas]
+            mas_nueva = max(fechas) if mas_nueva is None else max(mas_nueva, max(fechas))
+            mas_antigua = min(fechas) if mas_antigua is None else min(mas_antigua, min(fechas))
+
+            # Ordenado por fecha: al llegar a la marca lo que sigue ya está archivado
+            total = respuesta.get('totalResults', 0)
+            if (marca is not None and mas_antigua <= marca) or \
+                    len(articulos) < self.page_size or pagina * self.page_size >= total:
+                return True, mas_nueva, mas_antigua
+        return False, mas_nueva, mas_antigua
+
+    def ingerir(self, consulta, idioma='en', dias=7):
+        """
+        Traer artículos nuevos de una consulta y guardarlos en el archivo
+
+        La marca solo avanza cuando el paginado llega a lo ya archivado o agota
+        los resultados. Si se corta antes, se guarda desde dónde seguir y la
+        próxima ingesta pagina hacia atrás desde ahí antes de pedir lo nuevo.
+
+        Returns:
+            dict con paginas, recibidos y nuevos
+        """
+        resumen = {'paginas': 0, 'recibidos': 0, 'nuevos': 0}
+
+        ultima_ingesta = self.archivo.ultima_ingesta(consulta, idioma)
+        if ultima_ingesta is not None and \
+                pd.Timestamp.now(tz='UTC') - ultima_ingesta < self.intervalo_minimo:
+            return resumen
+
+        inicio_ventana = pd.Timestamp.now(tz='UTC') - timedelta(days=dias)
+        progreso = self.archivo.progreso(consulta, idioma)
+        marca, pendiente, tope = progreso['marca'], progreso['pendiente'], progreso['tope']
+
+        def desde_marca():
+            return inicio_ventana if marca is None else max(inicio_ventana, marca - self.solapamiento)
+
+        if pendiente is not None:
+            # Hueco de una ingesta cortada: entre la marca y `pendiente`
+            completo, _, mas_antigua = True, None, None
+            if pendiente > desde_marca():
+                completo, _, mas_antigua = self._paginar(
+                    consulta, idioma, desde_marca(), pendiente, marca, self.max_paginas, resumen
+                )
+            if completo:
+                marca = tope if marca is None else max(marca, tope)
+                pendiente = tope = None
+            elif mas_antigua is not None:
+                pendiente = mas_antigua
+
+        paginas = self.max_paginas - resumen['paginas']
+        if pendiente is None and paginas > 0:
+            completo, mas_nueva, mas_antigua = self._paginar(
+                consulta, idioma, desde_marca(), None, marca, paginas, resumen
+            )
+            if completo:
+                if mas_nueva is not None:
+                    marca = mas_nueva if marca is None else max(marca, mas_nueva)
+            elif mas_nueva is not None:
+                pendiente, tope = mas_antigua, mas_nueva
+
+        self.archivo.guardar_progreso(consulta, idioma, marca, pendiente, tope)
+        self.archivo.marcar_ingesta(consulta, idioma)
+        return resumen
+
+if __name__ == '__main__':
+    import time
+
+    print("Archivo local de noticias...\n")
+
+    archivo = ArchivoNoticias()
+    print(f"✅ {len(archivo):,} noticias archivadas")
+    print(f"   Cuota NewsAPI restante hoy: {PresupuestoCuota().restantes()}")
+
+    inicio = time.time()
+    df = archivo.consultar(desde=datetime.now() - timedelta(days=7), palabras='fed OR rates')
+    print(f"\nÚltimos 7 días con 'fed OR rates': {len(df)} noticias en {(time.time() - inicio) * 1000:.1f} ms")
+    if not df.empty:
+        print(df[['fecha', 'titulo', 'fuente']].head(5))
@@ -0,0 +1,252 @@
+"""
+Agrupación de noticias casi duplicadas con MinHash + LSH
+Las notas de agencia republicadas con títulos ligeramente distintos (NewsAPI,
+Kitco, Mining.com...) quedan en un mismo grupo que se puntúa una sola vez
+"""
+import re
+import unicodedata
+import zlib
+import numpy as np
+import pandas as pd
+
+# Primo mayor que 2**32 para el hashing universal (a*x + b) mod P
+PRIMO = np.uint64(4294967311)
+NUM_PERMUTACIONES = 120
+BANDAS = 20            # 20 bandas x 6 filas: umbral LSH ~ (1/20)**(1/6) = 0.61
+TAMANO_SHINGLE = 5     # n-gramas de caracteres (robusto para títulos cortos)
+UMBRAL_JACCARD = 0.6
+
+
+def normalizar(texto):
+    """Minúsculas, sin acentos ni puntuación y con espacios colapsados"""
+    texto = unicodedata.normalize('NFKD', str(texto).lower())
+    texto = ''.join(c for c in texto if not unicodedata.combining(c))
+    return ' '.join(re.sub(r'[^\w\s]', ' ', texto).split())
+
+
+def shingles(texto, k=TAMANO_SHINGLE):
+    """Hashes (uint32) de los n-gramas de caracteres del texto normalizado"""
+    texto = normalizar(texto)
+    if len(texto) <= k:
+        grams = {texto}
+    else:
+        grams = {texto[i:i + k] for i in range(len(texto) - k + 1)}
+    return np.fromiter((zlib.crc32(g.encode('utf-8')) for g in grams), dtype=np.uint64)
+
+
+class IndiceMinHash:
+    """
+    Firmas MinHash de varios textos y búsqueda de candidatos por bandas LSH
+
+    Args:
+        num_permutaciones: Largo de la firma
+        bandas: Bandas LSH (num_permutaciones debe ser múltiplo)
+        semilla: Semilla de las permutaciones (fija para firmas reproducibles)
+    """
+
+    def __init__(self, num_permutaciones=NUM_PERMUTACIONES, bandas=BANDAS, semilla=1):
+        if num_permutaciones % bandas:
+            raise ValueError("num_permutaciones debe ser múltiplo de bandas")
+        self.num_permutaciones = num_permutaciones
+        self.bandas = bandas
+        self.filas = num_permutaciones // bandas
+
+        rng = np.random.default_rng(semilla)
+        self.a = rng.integers(1, 2**32, size=num_permutaciones, dtype=np.uint64)
+        self.b = rng.integers(0, 2**32, size=num_permutaciones, dtype=np.uint64)
+
+    def firma(self, hashes):
+        """Firma MinHash (num_permutaciones,) de un conjunto de hashes de shingles"""
+        # (n_shingles x num_permutaciones) en una sola operación; a*x+b < 2**64
+        valores = (hashes[:, None] * self.a[None, :] + self.b[None, :]) % PRIMO
+        return valores.min(axis=0)
+
+    def firmas(self, textos):
+        return np.vstack([self.firma(shingles(t)) for t in textos]) if len(textos) else \
+            np.empty((0, self.num_permutaciones), dtype=np.uint64)
+
+    def candidatos(self, firmas):
+        """Pares (i, j) que coinciden en al menos una banda"""
+        pares = set()
+        for banda in range(self.bandas):
+            cubetas = {}
+            bloque = firmas[:, banda * self.filas:(banda + 1) * self.filas]
+            for i, fila in enumerate(bloque):
+                cubetas.setdefault(fila.tobytes(), []).append(i)
+            for miembros in cubetas.values():
+                for j in miembros[1:]:
+                    pares.add((miembros[0], j))
+        return pares
+
+
+def agrupar_similares(textos, umbral=UMBRAL_JACCARD, indice=None):
+    """
+    Agrupar textos casi duplicados
+
+    Args:
+        textos: Secuencia de textos
+        umbral: Similitud de Jaccard estimada mínima para unir dos textos
+        indice: IndiceMinHash (opcional)
+
+    Returns:
+        np.ndarray con el id de grupo de cada texto (índice del primer miembro)
+    """
+    textos = ['' if t is None or (isinstance(t, float) and np.isnan(t)) else str(t) for t in textos]
+    indice = indice or IndiceMinHash()
+    firmas = indice.firmas(textos)
+
+    # Union-find sobre los pares candidatos que superan el umbral
+    padre = np.arange(len(textos))
+
+    def raiz(i):
+        while padre[i] != i:
+            padre[i] = padre[padre[i]]
+            i = padre[i]
+        return i
+
+    # Los textos vacíos comparten la misma firma: cada uno queda en su propio grupo
+    vacios = [not normalizar(t) for t in textos]
+    for i, j in indice.candidatos(firmas):
+        if vacios[i] or vacios[j]:
+            continue
+        if np.mean(firmas[i] == firmas[j]) >= umbral:
+            ri, rj = raiz(i), raiz(j)
+            if ri != rj:
+                padre[max(ri, rj)] = min(ri, rj)
+
+    return np.array([raiz(i) for i in range(len(textos))], dtype=np.int64)
+
+
+class IndiceIncremental:
+    """
+    Agrupación en línea para noticias que llegan por partes
+
+    Cada texto nuevo solo se compara con los representantes que comparten
+    alguna cubeta LSH; si ninguno supera el umbral, abre un grupo nuevo.
+
+    Args:
+        umbral: Similitud de Jaccard estimada mínima
+        indice: IndiceMinHash (opcional)
+    """
+
+    def __init__(self, umbral=UMBRAL_JACCARD, indice=None):
+        self.umbral = umbral
+        self.indice = indice or IndiceMinHash()
+        self.cubetas = [{} for _ in range(self.indice.bandas)]
+        self.firmas = []
+        self.tamanos = []
+        self.fuentes = []
+
+    def _bandas(self, firma):
+        filas = self.indice.filas
+        for banda in range(self.indice.bandas):
+            yield banda, firma[banda * filas:(banda + 1) * filas].tobytes()
+
+    def agregar(self, texto, fuente=None):
+        """
+        Asignar un texto a su grupo
+
+        Returns:
+            (grupo, nuevo): id del grupo y True si el texto abre un grupo nuevo
+        """
+        texto = '' if texto is None or (isinstance(texto, float) and np.isnan(texto)) else str(texto)
+        firma = self.indice.firma(shingles(texto))
+        vacio = not normalizar(texto)
+
+        candidatos = set()
+        for banda, clave in self._bandas(firma):
+            if vacio:   # Un texto vacío no se une a nadie ni recibe a nadie
+                break
+            candidatos.update(self.cubetas[banda].get(clave, ()))
+
+        for grupo in sorted(candidatos):
+            if np.mean(self.firmas[grupo] == firma) >= self.umbral:
+                self.tamanos[grupo] += 1
+                if fuente is not None:
+                    self.fuentes[grupo].setdefault(str(fuente), None)
+                return grupo, False
+
+        grupo = len(self.firmas)
+        self.firmas.append(firma)
+        self.tamanos.append(1)
+        self.fuentes.append({} if fuente is None else {str(fuente): None})
+        if vacio:
+            return grupo, True
+        for banda, clave in self._bandas(firma):
+            self.cubetas[banda].setdefault(clave, []).append(grupo)
+        return grupo, True
+
+    def __len__(self):
+        return len(self.firmas)
+
+
+def deduplicar_noticias(df, columna_texto='texto', umbral=UMBRAL_JACCARD):
+    """
+    Quedarse con una noticia por grupo de casi duplicados
+
+    Args:
+        df: DataFrame de noticias
+        columna_texto: Columna sobre la que se comparan los textos
+        umbral: Similitud de Jaccard mínima
+
+    Returns:
+        DataFrame con el primer artículo de cada grupo y las columnas
+        cluster_tamano (artículos del grupo), cluster_fuentes y peso
+        (1 + ln(tamaño): una nota replicada pesa más que una aislada,
+        pero no cuenta una vez por cada réplica)
+    """
+    if df.empty or columna_texto not in df.columns:
+        return df
+
+    df = df.reset_index(drop=True)
+    grupos = agrupar_similares(df[columna_texto].tolist(), umbral)
+
+    tamanos = pd.Series(grupos).value_counts()
+    representantes = df.loc[np.unique(grupos)].copy()
+    representantes['cluster_tamano'] = tamanos.reindex(representantes.index).to_numpy()
+    if 'fuente' in df.columns:
+        fuentes = df.groupby(grupos)['fuente'].agg(lambda f: ', '.join(dict.fromkeys(f.astype(str))))
+        representantes['cluster_fuentes'] = fuentes.reindex(representantes.index).to_numpy()
+    representantes['peso'] = 1.0 + np.log(representantes['cluster_tamano'])
+
+    return representantes.reset_index(drop=True)
+
+
+def sentimiento_ponderado(df, columna='sentimiento'):
+    """Promedio del sentimiento ponderado por 'peso' si existe (si no, media simple)"""
+    if df.empty or columna not in df.columns:
+        return 0.0
+    valores = df[columna].dropna()
+    if valores.empty:
+        return 0.0
+    if 'peso' not in df.columns:
+        return float(valores.mean())
+    pesos = df.loc[valores.index, 'peso'].fillna(0)
+    if pesos.sum() <= 0:
+        return float(valores.mean())
+    return float(np.average(valores, weights=pesos))
+
+
+if __name__ == '__main__':
+    import time
+
+    print("Probando agrupación de casi duplicados...\n")
+
+    titulares = [
+        "Gold hits record high as Fed signals rate cuts",
+        "Gold hits record high as Fed signals rate cuts - Reuters",
+        "Gold hits record highs as the Fed signals rate cuts",
+        "Silver slips as dollar strengthens",
+        "Oro alcanza máximo histórico por recorte de tasas de la Fed",
+        "Oro alcanza maximo historico por recorte de tasas de la FED",
+    ]
+    grupos = agrupar_similares(titulares)
+    for titular, grupo in zip(titulares, grupos):
+        print(f"  [{grupo}] {titular}")
+
+    rng = np.random.default_rng(0)
+    palabras = np.array([f"palabra{i}" for i in range(5000)])
+    masivo = [' '.join(rng.choice(palabras, 12)) for _ in range(10000)]
+    inicio = time.time()
+    grupos = agrupar_similares(masivo + masivo[:2000])
+    print(f"\n✅ {len(masivo) + 2000:,} textos -> {len(np.unique(grupos)):,} grupos en {time.time() - inicio:.2f}s")
@@ -0,0 +1,130 @@
+"""
+Índice invertido de noticias por palabra clave
+Se construye una vez por actualización de noticias (palabra -> filas que la
+contienen) y responde qué noticias mencionan a un activo con búsquedas en
+diccionario en lugar de recorrer todos los textos por cada activo
+"""
+import numpy as np
+import pandas as pd
+
+from apis.news_dedup import normalizar
+from datos.activos import alias_de, todos_los_tickers
+
+
+def tokens(texto):
+    """Palabras del texto normalizado (minúsculas, sin acentos ni puntuación)"""
+    return normalizar(texto).split()
+
+
+class IndiceNoticias:
+    """
+    Listas de filas por palabra de un conjunto de noticias
+
+    Un alias de una palabra ('oro', 'btc') es una búsqueda directa; uno de
+    varias ('s&p 500', 'gas natural') intersecta las listas de sus palabras y
+    solo confirma la frase en esas pocas filas.
+
+    Args:
+        textos: Secuencia de textos (la posición es el id de fila)
+    """
+
+    def __init__(self, textos):
+        self.textos = [' '.join(tokens('' if t is None or (isinstance(t, float) and np.isnan(t)) else t))
+                       for t in textos]
+        listas = {}
+        for fila, texto in enumerate(self.textos):
+            for palabra in set(texto.split()):
+                listas.setdefault(palabra, []).append(fila)
+        self.listas = {palabra: np.array(filas, dtype=np.int64) for palabra, filas in listas.items()}
+
+    @classmethod
+    def desde_df(cls, df, columna='texto'):
+        """Índice de la columna de texto de un DataFrame (filas = posiciones)"""
+        if df is None or df.empty or columna not in df.columns:
+            return cls([])
+        return cls(df[columna].tolist())
+
+    def buscar(self, termino):
+        """Filas (ordenadas) cuyo texto contiene el término como palabra o frase"""
+        palabras = tokens(termino)
+        if not palabras:
+            return np.empty(0, dtype=np.int64)
+        vacia = np.empty(0, dtype=np.int64)
+        filas = self.listas.get(palabras[0], vacia)
+        for palabra in palabras[1:]:
+            filas = np.intersect1d(filas, self.listas.get(palabra, vacia), assume_unique=True)
+        if len(palabras) > 1 and len(filas):
+            frase = f" {' '.join(palabras)} "
+            filas = filas[[frase in f" {self.textos[fila]} " for fila in filas]]
+        return filas
+
+    def filas(self, terminos):
+        """Filas que contienen alguno de los términos"""
+        encontradas = [self.buscar(termino) for termino in terminos]
+        encontradas = [f for f in encontradas if len(f)]
+        if not encontradas:
+            return np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate(encontradas))
+
+    def __len__(self):
+        return len(self.textos)
+
+
+def sentimiento_por_activo(df, tickers=None, columna='sentimiento', indice=None):
+    """
+    Sentimiento promedio de las noticias que mencionan a cada activo
+
+    Args:
+        df: DataFrame de noticias con 'texto' y la columna de sentimiento
+        tickers: Tickers a evaluar (por defecto los 80 de ACTIVOS)
+        indice: IndiceNoticias ya construido sobre df (opcional)
+
+    Returns:
+        dict ticker -> sentimiento medio (solo activos con noticias)
+    """
+    if df is None or df.empty or columna not in df.columns:
+        return {}
+    indice = indice or IndiceNoticias.desde_df(df)
+    valores = df[columna].to_numpy(dtype=float)
+
+    resultado = {}
+    for ticker in tickers or todos_los_tickers():
+        filas = indice.filas(alias_de(ticker))
+        relacionadas = valores[filas]
+        relacionadas = relacionadas[~np.isnan(relacionadas)]
+        if len(relacionadas):
+            resultado[ticker] = float(relacionadas.mean())
+    return resultado
+
+
+if __name__ == '__main__':
+    import time
+
+    print("Probando índice invertido de noticias...\n")
+
+    noticias = pd.DataFrame({
+        'texto': ["Gold hits record high as Fed signals rate cuts",
+                  "El oro y la plata suben; el dólar cae",
+                  "Bitcoin (BTC) slips while the S&P 500 closes flat",
+                  "Natural gas and crude oil rally",
+                  "Nuevo tesoro arqueológico en Perú"],
+        'sentimiento': [0.6, 0.4, -0.3, 0.2, 0.1],
+    })
+    indice = IndiceNoticias.desde_df(noticias)
+    for termino in ['oro', 's&p 500', 'gas natural', 'natural gas', 'dolar']:
+        print(f"  {termino!r}: filas {indice.buscar(termino).tolist()}")
+    print(f"\n✅ {sentimiento_por_activo(noticias)}")
+
+    rng = np.random.default_rng(0)
+    vocabulario = np.array([f"palabra{i}" for i in range(5000)] + ['gold', 'oil', 'bitcoin', 'dollar'])
+    masivo = pd.DataFrame({
+        'texto': [' '.join(rng.choice(vocabulario, 25)) for _ in range(5000)],
+        'sentimiento': rng.uniform(-1, 1, 5000),
+    })
+    inicio = time.time()
+    indice = IndiceNoticias.desde_df(masivo)
+    construccion = time.time() - inicio
+    inicio = time.time()
+    sentimientos = sentimiento_por_activo(masivo, indice=indice)
+    print(f"✅ {len(masivo):,} noticias: índice en {construccion:.2f}s, "
+          f"80 activos en {(time.time() - inicio) * 1000:.1f} ms ({len(sentimientos)} con noticias)")
@@ -0,0 +1,310 @@
+"""
+Pipeline de noticias por etapas: fuentes -> normalizador -> agrupación de
+duplicados -> sentimiento -> salida
+Cada etapa corre en su hilo y se comunica con la siguiente por una cola
+acotada: si una etapa se atrasa, las anteriores esperan (contrapresión) en
+lugar de acumular memoria. Los lotes puntuados llegan a la interfaz apenas
+están listos, sin esperar a la fuente más lenta.
+"""
+import queue
+import threading
+import time
+import numpy as np
+import pandas as pd
+
+from apis.news_dedup import IndiceIncremental, UMBRAL_JACCARD
+
+FIN = object()  # Marca de fin de una fuente / etapa
+
+COLUMNAS_TEXTO = ['titulo', 'descripcion', 'resumen']
+TAMANO_COLA = 8
+TAMANO_LOTE = 32  # Noticias por lote puntuado (lotes chicos = primeras noticias antes)
+
+
+def normalizar_lote(df, fuente=None):
+    """
+    Llevar un lote de cualquier fuente al formato común
+
+    Args:
+        df: DataFrame de NewsAPI, scraping, Alpha Vantage o Twitter
+        fuente: Nombre a usar si el lote no trae columna 'fuente'
+
+    Returns:
+        DataFrame con 'texto' no vacío, 'fecha' sin zona horaria (UTC) y 'fuente'
+    """
+    if df is None or df.empty:
+        return pd.DataFrame()
+    df = df.reset_index(drop=True)
+
+    if 'texto' not in df.columns:
+        partes = [df[c].fillna('').astype(str) for c in COLUMNAS_TEXTO if c in df.columns]
+        if not partes:
+            return pd.DataFrame()
+        texto = partes[0]
+        for parte in partes[1:]:
+            texto = texto + ' ' + parte
+        df['texto'] = texto
+    df['texto'] = df['texto'].fillna('').astype(str).str.split().str.join(' ')
+    df = df[df['texto'].str.len() >= 3]
+
+    if 'fuente' not in df.columns:
+        df['fuente'] = fuente or 'Desconocida'
+    if 'fecha' in df.columns:
+        df['fecha'] = pd.to_datetime(df['fecha'], utc=True, errors='coerce').dt.tz_localize(None)
+
+    return df.reset_index(drop=True)
+
+
+class PipelineNoticias:
+    """
+    Recolección, agrupación y puntuación de noticias en flujo
+
+    Args:
+        fuentes: dict nombre -> función(publicar); cada función llama a
+                 publicar(df) por cada lote que obtiene (ver fuente_*)
+        analizador: AnalizadorSentimiento (None = no puntuar)
+        tamano_cola: Capacidad de cada cola entre etapas
+        tamano_lote: Noticias por lote enviado al analizador
+        plazo: Segundos máximos de todo el pipeline (resultados parciales)
+        umbral: Similitud mínima para agrupar casi duplicados
+        indice_sentimiento: IndiceSentimiento opcional donde la salida registra
+                            cada lote puntuado (serie temporal persistente)
+    """
+
+    def __init__(self, fuentes, analizador=None, tamano_cola=TAMANO_COLA, tamano_lote=TAMANO_LOTE,
+                 plazo=30, umbral=UMBRAL_JACCARD, indice_sentimiento=None):
+        self.fuentes = dict(fuentes)
+        self.analizador = analizador
+        self.indice_sentimiento = indice_sentimiento
+        self.tamano_cola = tamano_cola
+        self.tamano_lote = tamano_lote
+        self.plazo = plazo
+        self.indice = IndiceIncremental(umbral)
+
+        self.conteos = {nombre: 0 for nombre in self.fuentes}
+        self.recibidas = 0
+        self.lotes = []
+        self.primer_lote = None  # Segundos hasta el primer lote puntuado
+        self._detener = threading.Event()
+
+    def _poner(self, cola, item):
+        """put bloqueante que se rinde si el pipeline se detuvo"""
+        while not self._detener.is_set():
+            try:
+                cola.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _leer(self, cola):
+        while not self._detener.is_set():
+            try:
+                return cola.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return FIN
+
+    def _correr_fuente(self, nombre, funcion, salida):
+        def publicar(df):
+            if df is not None and not df.empty:
+                self._poner(salida, (nombre, df))
+        try:
+            funcion(publicar)
+        except Exception as e:
+            print(f"⚠️ Fuente {nombre}: {str(e)[:80]}")
+        finally:
+            self._poner(salida, (nombre, FIN))
+
+    def _normalizar(self, entrada, salida):
+        activas = len(self.fuentes)
+        while activas:
+            item = self._leer(entrada)
+            if item is FIN:  # Pipeline detenido
+                break
+            nombre, df = item
+            if df is FIN:
+                activas -= 1
+                continue
+            df = normalizar_lote(df, nombre)
+            if not df.empty:
+                self.conteos[nombre] += len(df)
+                self._poner(salida, df)
+        self._poner(salida, FIN)
+
+    def _deduplicar(self, entrada, salida):
+        while True:
+            df = self._leer(entrada)
+            if df is FIN:
+                break
+            self.recibidas += len(df)
+            fuentes = df['fuente'] if 'fuente' in df.columns else [None] * len(df)
+            grupos, nuevos = [], []
+            for texto, fuente in zip(df['texto'], fuentes):
+                grupo, nuevo = self.indice.agregar(texto, fuente)
+                grupos.append(grupo)
+                nuevos.append(nuevo)
+            df = df.assign(_grupo=grupos)[np.array(nuevos, dtype=bool)]
+            for inicio in range(0, len(df), self.tamano_lote):
+                self._poner(salida, df.iloc[inicio:inicio + self.tamano_lote].reset_index(drop=True))
+        self._poner(salida, FIN)
+
+    def _puntuar(self, entrada, salida):
+        while True:
+            df = self._leer(entrada)
+            if df is FIN:
+                break
+            if self.analizador is not None:
+                puntajes = self.analizador.analizar_lote(df['texto'])
+                df = pd.concat([df.drop(columns=[c for c in puntajes.columns if c in df.columns]),
+                                puntajes], axis=1)
+            self._poner(salida, df)
+        self._poner(salida, FIN)
+
+    def iterar(self):
+        """
+        Ejecutar el pipeline
+
+        Yields:
+            DataFrame de cada lote de noticias únicas ya puntuadas, en orden de llegada
+        """
+        inicio = time.time()
+        colas = [queue.Queue(maxsize=self.tamano_cola) for _ in range(4)]
+        hilos = [
+            threading.Thread(target=self._correr_fuente, args=(nombre, funcion, colas[0]),
+                             name=f'fuente-{nombre}', daemon=True)
+            for nombre, funcion in self.fuentes.items()
+        ]
+        hilos += [
+            threading.Thread(target=self._normalizar, args=(colas[0], colas[1]), daemon=True),
+            threading.Thread(target=self._deduplicar, args=(colas[1], colas[2]), daemon=True),
+            threading.Thread(target=self._puntuar, args=(colas[2], colas[3]), daemon=True),
+        ]
+        for hilo in hilos:
+            hilo.start()
+
+        try:
+            while True:
+                restante = None if self.plazo is None else self.plazo - (time.time() - inicio)
+                if restante is not None and restante <= 0:
+                    print(f"⏱️ Pipeline de noticias: plazo de {self.plazo}s agotado (resultados parciales)")
+                    break
+                try:
+                    df = colas[3].get(timeout=restante)
+                except queue.Empty:
+                    continue
+                if df is FIN:
+                    break
+                if self.primer_lote is None:
+                    self.primer_lote = time.time() - inicio
+                self.lotes.append(df)
+                if self.indice_sentimiento is not None and 'sentimiento' in df.columns:
+                    try:
+                        self.indice_sentimiento.registrar(df)
+                    except Exception as e:
+                        print(f"⚠️ Índice de sentimiento: {str(e)[:80]}")
+                yield df
+        finally:
+            # Libera a las etapas bloqueadas (también si el consumidor deja de iterar)
+            self._detener.set()
+
+    def resultado(self):
+        """
+        DataFrame final con lo recibido hasta ahora
+
+        Incluye cluster_tamano, cluster_fuentes y peso (1 + ln(tamaño)) como
+        deduplicar_noticias, con los tamaños finales de cada grupo.
+        """
+        if not self.lotes:
+            return pd.DataFrame()
+        df = pd.concat(self.lotes, ignore_index=True)
+        grupos = df.pop('_grupo').to_numpy()
+        tamanos = np.asarray(self.indice.tamanos)
+        df['cluster_tamano'] = tamanos[grupos]
+        df['cluster_fuentes'] = [', '.join(self.indice.fuentes[g]) for g in grupos]
+        df['peso'] = 1.0 + np.log(df['cluster_tamano'])
+        return df
+
+    def ejecutar(self, al_lote=None):
+        """
+        Ejecutar hasta el final (o el plazo) y devolver el DataFrame completo
+
+        Args:
+            al_lote: Función opcional (df_lote) llamada con cada lote; el
+                     DataFrame completo se arma una sola vez al final
+        """
+        for df in self.iterar():
+            if al_lote is not None:
+                al_lote(df)
+        return self.resultado()
+
+
+# ============================================
+# ADAPTADORES DE FUENTES
+# ============================================
+
+def fuente_newsapi(dias=7, idioma='en'):
+    """NewsAPI (un solo lote desde el archivo local)"""
+    from apis.news_api import obtener_noticias_oro
+    def funcion(publicar):
+        publicar(obtener_noticias_oro(dias=dias, idioma=idioma))
+    return funcion
+
+
+def fuente_scraping(max_por_fuente=15, plazo=20):
+    """Web scraping: un lote por sitio, apenas se parsea"""
+    from apis.web_scraper import WebScraperNoticias
+    from apis.http_async import ejecutar
+    def funcion(publicar):
+        scraper = WebScraperNoticias()
+        try:
+            ejecutar(scraper.scrape_async(
+                max_por_fuente, plazo,
+                al_llegar=lambda clave, noticias: publicar(pd.DataFrame(noticias))
+            ))
+        finally:
+            scraper.cliente.cerrar()
+    return funcion
+
+
+def fuente_alpha_vantage(tickers='GOLD', limite=50):
+    """Alpha Vantage NEWS_SENTIMENT (pasa por su programador de peticiones)"""
+    from apis.alpha_vantage import obtener_sentimiento_noticias
+    def funcion(publicar):
+        publicar(obtener_sentimiento_noticias(tickers, limite=limite))
+    return funcion
+
+
+def fuente_twitter(query='gold OR oro', max_tweets=100):
+    """Twitter/X: un lote por página de resultados"""
+    from apis.twitter_api import obtener_cliente
+    def funcion(publicar):
+        for df in obtener_cliente().buscar_paginas(f"{query} -is:retweet lang:en", max_tweets):
+            publicar(df)
+    return funcion
+
+
+if __name__ == '__main__':
+    from apis.sentiment_analyzer import AnalizadorSentimiento
+
+    print("Probando pipeline de noticias...\n")
+
+    def fuente_rapida(publicar):
+        publicar(pd.DataFrame({'titulo': ["Gold hits record high as Fed signals rate cuts"] * 3
+                                         + ["Silver slips as dollar strengthens"]}))
+
+    def fuente_lenta(publicar):
+        for i in range(3):
+            time.sleep(1)
+            publicar(pd.DataFrame({'titulo': [f"Gold hits record high as Fed signals rate cuts - {i}",
+                                              f"Central banks add {i + 10} tonnes of gold reserves"]}))
+
+    pipeline = PipelineNoticias({'rapida': fuente_rapida, 'lenta': fuente_lenta},
+                                analizador=AnalizadorSentimiento())
+    for lote in pipeline.iterar():
+        print(f"  +{len(lote)} noticias: {lote['texto'].str[:40].tolist()}")
+
+    df = pipeline.resultado()
+    print(f"\n✅ Primer lote en {pipeline.primer_lote:.2f}s; "
+          f"{pipeline.recibidas} recibidas -> {len(df)} únicas")
+    print(df[['texto', 'fuente', 'cluster_tamano', 'sentimiento']])
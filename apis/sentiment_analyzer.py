@@ -1,16 +1,81 @@
 """
 Módulo para análisis de sentimiento real usando VADER y TextBlob
 """
+from concurrent.futures import ProcessPoolExecutor
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-from textblob import TextBlob
+from textblob.en.sentiments import PatternAnalyzer
 import pandas as pd
 import numpy as np
 
+# Columnas numéricas en el orden de la matriz de resultados
+CAMPOS_NUMERICOS = [
+    'sentimiento', 'vader_compound', 'vader_pos', 'vader_neg', 'vader_neu',
+    'textblob_polarity', 'textblob_subjectivity'
+]
+NEUTRO = (0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0)
+
+# Textos únicos por lote y mínimo para que valga la pena abrir procesos
+TAMANO_LOTE = 512
+MINIMO_PARA_PROCESOS = 2000
+
+# Analizadores por proceso (se crean una sola vez en cada worker)
+_analizadores_proceso = None
+
+
+def _es_texto_valido(texto):
+    return bool(texto) and not pd.isna(texto) and len(str(texto).strip()) >= 3
+
+
+def _puntuar(vader, patron, texto):
+    """Scores numéricos de un texto válido en el orden de CAMPOS_NUMERICOS"""
+    vader_scores = vader.polarity_scores(texto)
+
+    # TextBlob(texto).sentiment usa PatternAnalyzer; se reutiliza uno solo
+    try:
+        textblob_polarity, textblob_subjectivity = patron.analyze(texto)
+    except:
+        textblob_polarity = 0.0
+        textblob_subjectivity = 0.0
+
+    # Combinar ambos métodos (promedio ponderado)
+    sentimiento_final = vader_scores['compound'] * 0.6 + textblob_polarity * 0.4
+
+    return (sentimiento_final, vader_scores['compound'], vader_scores['pos'],
+            vader_scores['neg'], vader_scores['neu'],
+            textblob_polarity, textblob_subjectivity)
+
+
+def _puntuar_lote(textos):
+    """Puntuar un lote de textos en un proceso worker"""
+    global _analizadores_proceso
+    if _analizadores_proceso is None:
+        _analizadores_proceso = (SentimentIntensityAnalyzer(), PatternAnalyzer())
+    vader, patron = _analizadores_proceso
+
+    resultado = np.empty((len(textos), len(CAMPOS_NUMERICOS)), dtype=np.float64)
+    for i, texto in enumerate(textos):
+        resultado[i] = _puntuar(vader, patron, texto)
+    return resultado
+
+
+def etiquetar(sentimiento):
+    """Clasificar un arreglo de sentimientos en Positivo / Negativo / Neutral"""
+    sentimiento = np.asarray(sentimiento)
+    return np.select([sentimiento >= 0.05, sentimiento <= -0.05],
+                     ['Positivo', 'Negativo'], default='Neutral')
+
+
 class AnalizadorSentimiento:
     """Analiza sentimiento de textos usando VADER y TextBlob"""
     
-    def __init__(self):
+    def __init__(self, memo=None):
+        """
+        Args:
+            memo: MemoSentimiento opcional para no volver a puntuar textos ya vistos
+        """
         self.vader = SentimentIntensityAnalyzer()
+        self.patron = PatternAnalyzer()
+        self.memo = memo
     
     def analizar_texto(self, texto):
         """
@@ -19,63 +84,91 @@ class AnalizadorSentimiento:
         Returns:
             dict con scores de sentimiento
         """
-        if not texto or pd.isna(texto) or len(str(texto).strip()) < 3:
-            return {
-                'sentimiento': 0.0,
-                'vader_compound': 0.0,
-                'vader_pos': 0.0,
-                'vader_neg': 0.0,
-                'vader_neu': 1.0,
-                'textblob_polarity': 0.0,
-                'textblob_subjectivity': 0.0,
-                'sentimiento_label': 'Neutral'
-            }
-        
-        texto_str = str(texto)
-        
-        # VADER (mejor para redes sociales, maneja emojis y slang)
-        vader_scores = self.vader.polarity_scores(texto_str)
-        
-        # TextBlob (mejor para noticias formales)
-        try:
-            blob = TextBlob(texto_str)
-            textblob_polarity = blob.sentiment.polarity
-            textblob_subjectivity = blob.sentiment.subjectivity
-        except:
-            textblob_polarity = 0.0
-            textblob_subjectivity = 0.0
-        
-        # Combinar ambos métodos (promedio ponderado)
-        # VADER compound va de -1 a 1
-        # TextBlob polarity va de -1 a 1
-        sentimiento_final = (vader_scores['compound'] * 0.6 + textblob_polarity * 0.4)
-        
-        # Clasificar
-        if sentimiento_final >= 0.05:
-            label = 'Positivo'
-        elif sentimiento_final <= -0.05:
-            label = 'Negativo'
+        if not _es_texto_valido(texto):
+            scores = NEUTRO
         else:
-            label = 'Neutral'
-        
-        return {
-            'sentimiento': float(sentimiento_final),
-            'vader_compound': float(vader_scores['compound']),
-            'vader_pos': float(vader_scores['pos']),
-            'vader_neg': float(vader_scores['neg']),
-            'vader_neu': float(vader_scores['neu']),
-            'textblob_polarity': float(textblob_polarity),
-            'textblob_subjectivity': float(textblob_subjectivity),
-            'sentimiento_label': label
-        }
+            # VADER (mejor para redes sociales) + TextBlob (mejor para noticias formales)
+            scores = _puntuar(self.vader, self.patron, str(texto))
+        
+        resultado = {campo: float(valor) for campo, valor in zip(CAMPOS_NUMERICOS, scores)}
+        resultado['sentimiento_label'] = str(etiquetar(resultado['sentimiento']))
+        return resultado
+    
+    def analizar_lote(self, textos, tamano_lote=TAMANO_LOTE, procesos=None):
+        """
+        Analizar muchos textos de una vez
+        
+        Los textos repetidos se puntúan una sola vez y los resultados se
+        escriben directamente en columnas NumPy preasignadas. Con memo, los
+        textos ya puntuados en ejecuciones anteriores no se vuelven a puntuar.
+        
+        Args:
+            textos: Secuencia de textos (puede tener None/NaN)
+            tamano_lote: Textos únicos por lote
+            procesos: Número de procesos para corpus grandes (None = en este proceso)
+        
+        Returns:
+            DataFrame con las 8 columnas de sentimiento, alineado con textos
+        """
+        textos = pd.Series(textos, dtype=object).reset_index(drop=True)
+        validos = textos.map(_es_texto_valido).to_numpy(dtype=bool)
+        
+        textos_validos = textos[validos].astype(str)
+        if self.memo is not None:
+            from apis.sentiment_memo import clave_texto, normalizar_texto
+            textos_validos = textos_validos.map(normalizar_texto)
+        
+        # Deduplicar: codigos[i] apunta a la fila de unicos del texto i
+        codigos, unicos = pd.factorize(textos_validos)
+        
+        puntajes = np.empty((len(unicos), len(CAMPOS_NUMERICOS)), dtype=np.float64)
+        pendientes = np.arange(len(unicos))
+        
+        if self.memo is not None:
+            claves = [clave_texto(t, self.memo.version) for t in unicos]
+            memorizados = self.memo.buscar(claves)
+            for i, clave in enumerate(claves):
+                if clave in memorizados:
+                    puntajes[i] = [memorizados[clave][c] for c in CAMPOS_NUMERICOS]
+            pendientes = np.array([i for i, c in enumerate(claves) if c not in memorizados], dtype=np.int64)
+        
+        lotes = []
+        for inicio in range(0, len(pendientes), tamano_lote):
+            posiciones = pendientes[inicio:inicio + tamano_lote]
+            lotes.append((posiciones, list(unicos[posiciones])))
+        
+        if procesos and len(pendientes) >= MINIMO_PARA_PROCESOS:
+            with ProcessPoolExecutor(max_workers=procesos) as pool:
+                for (posiciones, _), bloque in zip(lotes, pool.map(_puntuar_lote, [l for _, l in lotes])):
+                    puntajes[posiciones] = bloque
+        else:
+            for posiciones, lote in lotes:
+                for i, texto in zip(posiciones, lote):
+                    puntajes[i] = _puntuar(self.vader, self.patron, texto)
+        
+        if self.memo is not None and len(pendientes):
+            etiquetas = etiquetar(puntajes[pendientes, 0])
+            nuevos = {}
+            for i, etiqueta in zip(pendientes, etiquetas):
+                nuevos[claves[i]] = dict(zip(CAMPOS_NUMERICOS, puntajes[i].tolist()))
+                nuevos[claves[i]]['sentimiento_label'] = str(etiqueta)
+            self.memo.guardar(nuevos)
+        
+        matriz = np.tile(np.array(NEUTRO, dtype=np.float64), (len(textos), 1))
+        matriz[validos] = puntajes[codigos]
+        
+        df_sentiment = pd.DataFrame(matriz, columns=CAMPOS_NUMERICOS)
+        df_sentiment['sentimiento_label'] = etiquetar(matriz[:, 0])
+        return df_sentiment
     
-    def analizar_dataframe(self, df, columna_texto='texto'):
+    def analizar_dataframe(self, df, columna_texto='texto', procesos=None):
         """
         Analizar sentimiento de todo un DataFrame
         
         Args:
             df: DataFrame con textos
             columna_texto: Nombre de la columna con el texto
+            procesos: Número de procesos para corpus grandes (opcional)
         
         Returns:
             DataFrame original con columnas de sentimiento agregadas
@@ -85,18 +178,10 @@ class AnalizadorSentimiento:
         
         print(f"Analizando sentimiento de {len(df)} textos...")
         
-        resultados = []
-        for idx, texto in enumerate(df[columna_texto]):
-            resultado = self.analizar_texto(texto)
-            resultados.append(resultado)
-            
-            # Mostrar progreso cada 10 textos
-            if (idx + 1) % 10 == 0:
-                print(f"  Progreso: {idx + 1}/{len(df)}")
-        
-        # Convertir a DataFrame y combinar
-        df_sentiment = pd.DataFrame(resultados)
-        df_resultado = pd.concat([df.reset_index(drop=True), df_sentiment], axis=1)
+        df_sentiment = self.analizar_lote(df[columna_texto], procesos=procesos)
+        df_resultado = df.reset_index(drop=True)
+        df_resultado = df_resultado.drop(columns=[c for c in df_sentiment.columns if c in df_resultado.columns])
+        df_resultado = pd.concat([df_resultado, df_sentiment], axis=1)
         
         print(f"✅ Análisis completado")
         print(f"  Positivos: {(df_resultado['sentimiento_label'] == 'Positivo').sum()}")
@@ -154,3 +239,10 @@ if __name__ == '__main__':
     df_resultado = analizador.analizar_dataframe(df_test)
     print("\nResultados:")
     print(df_resultado[['texto', 'sentimiento', 'sentimiento_label']])
+    
+    # Prueba de volumen (titulares repetidos como en NewsAPI + scraping)
+    import time
+    df_masivo = pd.DataFrame({'texto': textos * 4000})
+    inicio = time.time()
+    df_resultado = analizador.analizar_dataframe(df_masivo)
+    print(f"\n{len(df_masivo):,} textos en {time.time() - inicio:.2f}s")
@@ -0,0 +1,259 @@
+"""
+Índice temporal de sentimiento con agregados incrementales por cubeta
+Cada noticia puntuada suma su sentimiento a las cubetas de 5m, 1h y 1d de su
+fecha, por fuente y por palabra clave de activo (count, suma, suma de
+cuadrados, positivas, negativas). Los dashboards leen la serie alineada a las
+barras de precio (GC_F_60d_5m, GC_F_730d_1h, ...) sin volver a puntuar nada.
+"""
+import hashlib
+import re
+import sqlite3
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from datos.activos import palabras_sentimiento
+
+RUTA_INDICE = Path("data_historico") / "sentimiento_series.db"
+
+# Resolución -> (segundos de la cubeta, frecuencia de pandas)
+RESOLUCIONES = {
+    '5m': (300, '5min'),
+    '1h': (3600, 'h'),
+    '1d': (86400, 'D'),
+}
+TODAS = '*'  # Cubeta agregada sobre todas las fuentes / palabras
+
+# Mismos cortes que la etiqueta Positivo / Negativo del analizador
+UMBRAL_POSITIVO = 0.05
+UMBRAL_NEGATIVO = -0.05
+
+# Palabra clave del activo -> términos que la activan (texto en minúsculas),
+# derivados de los alias de noticias de datos.activos
+PALABRAS_ACTIVO = palabras_sentimiento()
+
+
+def _compilar(palabras):
+    return {
+        clave: re.compile(r'(?<!\w)(?:' + '|'.join(re.escape(t) for t in terminos) + r')(?!\w)')
+        for clave, terminos in palabras.items()
+    }
+
+
+def _epoch(fechas):
+    """Segundos UNIX (UTC) de una serie de fechas; las fechas sin zona se toman como UTC"""
+    fechas = pd.to_datetime(pd.Series(fechas), utc=True, errors='coerce')
+    # Independiente de la unidad interna (ns / us) de las fechas
+    return (fechas - pd.Timestamp(0, tz='UTC')) // pd.Timedelta(seconds=1)
+
+
+def _a_utc(indice):
+    """DatetimeIndex sin zona horaria en UTC"""
+    indice = pd.DatetimeIndex(indice)
+    return indice.tz_convert('UTC').tz_localize(None) if indice.tz is not None else indice
+
+
+class IndiceSentimiento:
+    """
+    Serie temporal de sentimiento por resolución, fuente y palabra clave
+
+    Registrar una noticia actualiza un número fijo de cubetas (3 resoluciones x
+    fuente/todas x palabras/todas), sin recorrer lo ya guardado. Cada noticia se
+    cuenta una sola vez (por URL o por texto) aunque se vuelva a descargar.
+
+    Args:
+        ruta: Archivo SQLite (compartido entre procesos)
+        palabras: dict palabra -> términos (por defecto PALABRAS_ACTIVO)
+    """
+
+    def __init__(self, ruta=RUTA_INDICE, palabras=None):
+        self.ruta = Path(ruta)
+        self.patrones = _compilar(palabras or PALABRAS_ACTIVO)
+        self.ruta.parent.mkdir(parents=True, exist_ok=True)
+        with self._conectar() as con:
+            con.execute("PRAGMA journal_mode=WAL")
+            con.executescript("""
+                CREATE TABLE IF NOT EXISTS cubetas (
+                    resolucion TEXT NOT NULL,
+                    inicio INTEGER NOT NULL,
+                    fuente TEXT NOT NULL,
+                    palabra TEXT NOT NULL,
+                    n INTEGER NOT NULL,
+                    suma REAL NOT NULL,
+                    suma_cuadrados REAL NOT NULL,
+                    positivas INTEGER NOT NULL,
+                    negativas INTEGER NOT NULL,
+                    PRIMARY KEY (resolucion, fuente, palabra, inicio)
+                );
+                CREATE TABLE IF NOT EXISTS registradas (
+                    clave TEXT PRIMARY KEY
+                );
+            """)
+
+    def _conectar(self):
+        return sqlite3.connect(self.ruta, timeout=30)
+
+    def palabras_de(self, texto):
+        """Palabras clave de activo presentes en un texto"""
+        texto = str(texto).lower()
+        return [clave for clave, patron in self.patrones.items() if patron.search(texto)]
+
+    @staticmethod
+    def _clave(fila):
+        url = fila.get('url')
+        base = url if isinstance(url, str) and url else f"{fila.get('fuente')}\x00{fila.get('texto')}"
+        return hashlib.sha1(base.encode('utf-8')).hexdigest()
+
+    def registrar(self, df, columna='sentimiento'):
+        """
+        Sumar noticias puntuadas a sus cubetas
+
+        Args:
+            df: DataFrame con fecha, texto, fuente, url (opcional) y sentimiento
+            columna: Columna con el score
+
+        Returns:
+            Número de noticias nuevas registradas
+        """
+        if df is None or df.empty or columna not in df.columns or 'fecha' not in df.columns:
+            return 0
+
+        df = df.assign(_epoch=_epoch(df['fecha']).to_numpy())
+        df = df[df['_epoch'].notna() & df[columna].notna()]
+        filas = df.to_dict('records')
+        claves = [self._clave(f) for f in filas]
+
+        with self._conectar() as con:
+            # Solo las que no estaban: el INSERT OR IGNORE marca cuáles son nuevas
+            nuevas = []
+            for fila, clave in zip(filas, claves):
+                cursor = con.execute("INSERT OR IGNORE INTO registradas (clave) VALUES (?)", (clave,))
+                if cursor.rowcount:
+                    nuevas.append(fila)
+
+            sumas = {}
+            for fila in nuevas:
+                valor = float(fila[columna])
+                epoch = int(fila['_epoch'])
+                fuentes = (str(fila.get('fuente') or 'Desconocida'), TODAS)
+                palabras = self.palabras_de(fila.get('texto', '')) + [TODAS]
+                positiva = int(valor >= UMBRAL_POSITIVO)
+                negativa = int(valor <= UMBRAL_NEGATIVO)
+                for resolucion, (segundos, _) in RESOLUCIONES.items():
+                    inicio = epoch - epoch % segundos
+                    for fuente in fuentes:
+                        for palabra in palabras:
+                            acumulado = sumas.setdefault((resolucion, inicio, fuente, palabra),
+                                                         [0, 0.0, 0.0, 0, 0])
+                            acumulado[0] += 1
+                            acumulado[1] += valor
+                            acumulado[2] += valor * valor
+                            acumulado[3] += positiva
+                            acumulado[4] += negativa
+
+            con.executemany("""
+                INSERT INTO cubetas (resolucion, inicio, fuente, palabra,
+                                     n, suma, suma_cuadrados, positivas, negativas)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (resolucion, fuente, palabra, inicio) DO UPDATE SET
+                    n = n + excluded.n,
+                    suma = suma + excluded.suma,
+                    suma_cuadrados = suma_cuadrados + excluded.suma_cuadrados,
+                    positivas = positivas + excluded.positivas,
+                    negativas = negativas + excluded.negativas
+            """, [(*clave, *valores) for clave, valores in sumas.items()])
+
+        return len(nuevas)
+
+    def serie(self, resolucion='1h', fuente=TODAS, palabra=TODAS, desde=None, hasta=None):
+        """
+        Serie de sentimiento agregada
+
+        Args:
+            resolucion: '5m', '1h' o '1d'
+            fuente: Nombre de la fuente o '*' (todas)
+            palabra: Palabra clave de activo ('oro', 'fed', ...) o '*' (todas)
+            desde, hasta: Rango opcional (inclusive)
+
+        Returns:
+            DataFrame indexado por el inicio de cada cubeta (UTC sin zona) con
+            n, media, desviacion, positivas, negativas y pct_positivas
+        """
+        if resolucion not in RESOLUCIONES:
+            raise ValueError(f"Resolución no soportada: {resolucion} (usar {list(RESOLUCIONES)})")
+
+        sql = ("SELECT inicio, n, suma, suma_cuadrados, positivas, negativas FROM cubetas "
+               "WHERE resolucion = ? AND fuente = ? AND palabra = ?")
+        parametros = [resolucion, fuente, palabra]
+        if desde is not None:
+            sql += " AND inicio >= ?"
+            parametros.append(int(_epoch([desde]).iloc[0]))
+        if hasta is not None:
+            sql += " AND inicio <= ?"
+            parametros.append(int(_epoch([hasta]).iloc[0]))
+
+        with self._conectar() as con:
+            df = pd.read_sql_query(sql + " ORDER BY inicio", con, params=parametros)
+
+        df.index = pd.to_datetime(df.pop('inicio'), unit='s')
+        df.index.name = 'fecha'
+        media = df['suma'] / df['n']
+        df['media'] = media
+        df['desviacion'] = np.sqrt(np.maximum(df['suma_cuadrados'] / df['n'] - media ** 2, 0.0))
+        df['pct_positivas'] = df['positivas'] / df['n'] * 100
+        return df[['n', 'media', 'desviacion', 'positivas', 'negativas', 'pct_positivas']]
+
+    def alinear(self, indice, resolucion='1h', fuente=TODAS, palabra=TODAS):
+        """
+        Sentimiento alineado a las barras de una serie de precios
+
+        Args:
+            indice: DatetimeIndex de las barras (con o sin zona horaria)
+            resolucion: Resolución de las cubetas a usar (la del intervalo de las barras)
+
+        Returns:
+            DataFrame con el mismo índice que las barras (n = 0 y media NaN
+            en las barras sin noticias)
+        """
+        indice = pd.DatetimeIndex(indice)
+        if len(indice) == 0:
+            return pd.DataFrame(index=indice, columns=['n', 'media', 'desviacion'])
+
+        inicios = _a_utc(indice).floor(RESOLUCIONES[resolucion][1])
+        serie = self.serie(resolucion, fuente, palabra, desde=inicios.min(), hasta=inicios.max())
+        alineada = serie.reindex(inicios)
+        alineada.index = indice
+        for columna in ['n', 'positivas', 'negativas']:
+            alineada[columna] = alineada[columna].fillna(0).astype(int)
+        return alineada
+
+    def __len__(self):
+        with self._conectar() as con:
+            return con.execute("SELECT COUNT(*) FROM registradas").fetchone()[0]
+
+
+if __name__ == '__main__':
+    import tempfile
+    import time
+
+    print("Probando índice temporal de sentimiento...\n")
+
+    indice = IndiceSentimiento(Path(tempfile.mkdtemp()) / "series.db")
+    rng = np.random.default_rng(0)
+    ahora = pd.Timestamp.now(tz='UTC').floor('h')
+    noticias = pd.DataFrame({
+        'fecha': ahora - pd.to_timedelta(rng.integers(0, 7 * 24 * 60, 5000), unit='min'),
+        'texto': rng.choice(["Gold rallies as Fed signals cuts", "Oil slips on supply",
+                             "Bitcoin and gold hit records", "Dollar firms before Powell"], 5000),
+        'fuente': rng.choice(['NewsAPI', 'Kitco (Web Scraping)'], 5000),
+        'url': [f"https://ejemplo.com/{i}" for i in range(5000)],
+        'sentimiento': rng.uniform(-1, 1, 5000),
+    })
+
+    inicio = time.time()
+    nuevas = indice.registrar(noticias)
+    print(f"✅ {nuevas} noticias registradas en {time.time() - inicio:.2f}s")
+    print(f"✅ Repetidas: {indice.registrar(noticias.head(100))} nuevas")
+
+    barras = pd.date_range(end=ahora, periods=24, freq='h').tz_convert('America/New_York')
+    print(indice.alinear(barras, '1h', palabra='oro')[['n', 'media', 'pct_positivas']].tail())
@@ -0,0 +1,183 @@
+"""
+Memoria persistente de sentimiento ya calculado
+Guarda los 8 campos de AnalizadorSentimiento.analizar_texto por hash del texto
+normalizado y versión del modelo, en SQLite (compartido entre procesos)
+"""
+import hashlib
+import sqlite3
+import threading
+import time
+import unicodedata
+from importlib import metadata
+from pathlib import Path
+
+from apis.sentiment_analyzer import CAMPOS_NUMERICOS
+
+RUTA_MEMO = Path("data_historico") / "sentimiento_memo.db"
+MAX_ENTRADAS = 200_000
+
+
+def _version_paquete(nombre):
+    try:
+        return metadata.version(nombre)
+    except metadata.PackageNotFoundError:
+        return '?'
+
+
+# Cambia si cambian las librerías o la combinación 0.6 VADER + 0.4 TextBlob
+VERSION_MODELO = (f"vader-{_version_paquete('vaderSentiment')}"
+                  f"+textblob-{_version_paquete('textblob')}+w0.6")
+
+
+def normalizar_texto(texto):
+    """Unicode NFC y espacios colapsados (sin cambiar mayúsculas: VADER las usa)"""
+    return ' '.join(unicodedata.normalize('NFC', str(texto)).split())
+
+
+def clave_texto(texto_normalizado, version=VERSION_MODELO):
+    return hashlib.sha1(f"{version}\x00{texto_normalizado}".encode('utf-8')).hexdigest()
+
+
+class MemoSentimiento:
+    """
+    Memo de scores por texto: un acierto cuesta una consulta en lugar de VADER + TextBlob
+
+    Args:
+        ruta: Archivo SQLite
+        max_entradas: Tamaño máximo; se descartan las entradas usadas hace más tiempo
+        version: Etiqueta del modelo (entradas de otras versiones no se usan)
+    """
+
+    def __init__(self, ruta=RUTA_MEMO, max_entradas=MAX_ENTRADAS, version=VERSION_MODELO):
+        self.ruta = Path(ruta)
+        self.max_entradas = max_entradas
+        self.version = version
+        self.aciertos = 0
+        self.fallos = 0
+        self._lock = threading.Lock()
+
+        self.ruta.parent.mkdir(parents=True, exist_ok=True)
+        with self._conectar() as con:
+            con.execute("PRAGMA journal_mode=WAL")
+            columnas = ', '.join(f"{c} REAL NOT NULL" for c in CAMPOS_NUMERICOS)
+            con.execute(f"""
+                CREATE TABLE IF NOT EXISTS memo (
+                    clave TEXT PRIMARY KEY,
+                    version TEXT NOT NULL,
+                    {columnas},
+                    sentimiento_label TEXT NOT NULL,
+                    usado REAL NOT NULL
+                )
+            """)
+            con.execute("CREATE INDEX IF NOT EXISTS memo_usado ON memo (usado)")
+
+    def _conectar(self):
+        # Una conexión por operación: seguro con hilos de Streamlit y varios procesos
+        return sqlite3.connect(self.ruta, timeout=30)
+
+    def buscar(self, claves):
+        """
+        Buscar varias claves de una vez
+
+        Returns:
+            dict clave -> dict con los 8 campos (solo los aciertos)
+        """
+        claves = list(dict.fromkeys(claves))
+        encontrados = {}
+        campos = CAMPOS_NUMERICOS + ['sentimiento_label']
+
+        with self._conectar() as con:
+            # SQLite limita los parámetros por consulta
+            for inicio in range(0, len(claves), 500):
+                bloque = claves[inicio:inicio + 500]
+                marcas = ','.join('?' * len(bloque))
+                filas = con.execute(
+                    f"SELECT clave, {', '.join(campos)} FROM memo "
+                    f"WHERE version = ? AND clave IN ({marcas})",
+                    [self.version] + bloque
+                ).fetchall()
+                for fila in filas:
+                    encontrados[fila[0]] = dict(zip(campos, fila[1:]))
+
+            if encontrados:
+                ahora = time.time()
+                con.executemany("UPDATE memo SET usado = ? WHERE clave = ?",
+                                [(ahora, c) for c in encontrados])
+
+        with self._lock:
+            self.aciertos += len(encontrados)
+            self.fallos += len(claves) - len(encontrados)
+        return encontrados
+
+    def guardar(self, resultados):
+        """
+        Guardar scores nuevos
+
+        Args:
+            resultados: dict clave -> dict con los 8 campos
+        """
+        if not resultados:
+            return
+        ahora = time.time()
+        campos = CAMPOS_NUMERICOS + ['sentimiento_label']
+        filas = [
+            (clave, self.version, *[r[c] for c in campos], ahora)
+            for clave, r in resultados.items()
+        ]
+        marcas = ','.join('?' * (len(campos) + 3))
+
+        with self._conectar() as con:
+            con.executemany(
+                f"INSERT OR REPLACE INTO memo (clave, version, {', '.join(campos)}, usado) "
+                f"VALUES ({marcas})",
+                filas
+            )
+            self._recortar(con)
+
+    def _recortar(self, con):
+        """Eliminar las entradas menos usadas si se supera max_entradas"""
+        total = con.execute("SELECT COUNT(*) FROM memo").fetchone()[0]
+        sobrantes = total - self.max_entradas
+        if sobrantes > 0:
+            con.execute(
+                "DELETE FROM memo WHERE clave IN "
+                "(SELECT clave FROM memo ORDER BY usado LIMIT ?)",
+                (sobrantes,)
+            )
+
+    def __len__(self):
+        with self._conectar() as con:
+            return con.execute("SELECT COUNT(*) FROM memo WHERE version = ?",
+                               (self.version,)).fetchone()[0]
+
+    def tasa_aciertos(self):
+        """Fracción de búsquedas resueltas por el memo (0 si no hubo búsquedas)"""
+        total = self.aciertos + self.fallos
+        return self.aciertos / total if total else 0.0
+
+    def estadisticas(self):
+        return {
+            'entradas': len(self),
+            'aciertos': self.aciertos,
+            'fallos': self.fallos,
+            'tasa_aciertos': self.tasa_aciertos(),
+            'version': self.version,
+        }
+
+
+if __name__ == '__main__':
+    import tempfile
+    from apis.sentiment_analyzer import AnalizadorSentimiento
+
+    print("Probando memo de sentimiento...\n")
+
+    memo = MemoSentimiento(Path(tempfile.mkdtemp()) / "memo.db")
+    analizador = AnalizadorSentimiento(memo=memo)
+    titulares = [f"Gold rallies as Fed signals cut #{i % 300}" for i in range(3000)]
+
+    for vuelta in ['primera', 'segunda']:
+        inicio = time.time()
+        analizador.analizar_lote(titulares)
+        print(f"✅ Pasada {vuelta}: {time.time() - inicio:.2f}s")
+
+    print(memo.estadisticas())
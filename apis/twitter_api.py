@@ -2,7 +2,10 @@
 Módulo para obtener tweets sobre oro desde Twitter/X API v2
 NOTA: Requiere plan de pago Basic ($100/mes) o superior
 """
+import threading
+import time
 import requests
+from requests.adapters import HTTPAdapter
 import pandas as pd
 from datetime import datetime, timedelta
 import sys
@@ -12,6 +15,233 @@ from config import API_KEYS
 
 # Twitter API v2 endpoints
 BASE_URL = 'https://api.twitter.com/2'
+AUTH_URL = 'https://api.twitter.com/oauth2/token'
+
+# Resultados por página permitidos por /tweets/search/recent
+MIN_POR_PAGINA = 10
+MAX_POR_PAGINA = 100
+
+# Espera máxima por límite de rate: los dashboards no pueden quedar bloqueados
+# minutos, más allá de esto se falla con ErrorTwitter(429)
+ESPERA_MAXIMA = 5
+
+
+class ErrorTwitter(Exception):
+    """Respuesta no exitosa de la API (estado HTTP y cuerpo)"""
+    
+    def __init__(self, estado, texto):
+        super().__init__(f"{estado}: {texto[:200]}")
+        self.estado = estado
+        self.texto = texto
+
+
+class ClienteTwitter:
+    """
+    Cliente de Twitter/X API v2 con token reutilizable y paginación
+    
+    Args:
+        api_key, api_secret: Credenciales de la app (para el Bearer Token)
+        base_url: URL base de la API (configurable para probar contra un servidor local)
+        auth_url: URL de oauth2/token
+        espera_maxima: Segundos máximos a esperar por un límite de rate; si el
+                       reinicio queda más lejos falla con ErrorTwitter(429)
+                       (un proceso en segundo plano puede usar 900)
+        reintentos: Reintentos ante 429 / 5xx
+    """
+    
+    def __init__(self, api_key=None, api_secret=None, base_url=BASE_URL, auth_url=AUTH_URL,
+                 espera_maxima=ESPERA_MAXIMA, reintentos=3):
+        self.api_key = api_key if api_key is not None else API_KEYS['twitter_key']
+        self.api_secret = api_secret if api_secret is not None else API_KEYS['twitter_secret']
+        self.base_url = base_url.rstrip('/')
+        self.auth_url = auth_url
+        self.espera_maxima = espera_maxima
+        self.reintentos = reintentos
+        
+        # Conexiones keep-alive reutilizadas entre peticiones
+        self.session = requests.Session()
+        adaptador = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+        self.session.mount('http://', adaptador)
+        self.session.mount('https://', adaptador)
+        
+        self._token = None
+        self._ids_usuario = {}
+        self._lock = threading.Lock()
+        self._reanudar_en = 0.0
+    
+    def token(self, renovar=False):
+        """Bearer Token (se pide una sola vez y se reutiliza)"""
+        with self._lock:
+            if self._token is None or renovar:
+                response = self.session.post(
+                    self.auth_url,
+                    auth=(self.api_key, self.api_secret),
+                    data={'grant_type': 'client_credentials'},
+                    headers={'Content-Type': 'application/x-www-form-urlencoded;charset=UTF-8'},
+                    timeout=10
+                )
+                if response.status_code != 200:
+                    raise ErrorTwitter(response.status_code, response.text)
+                self._token = response.json()['access_token']
+            return self._token
+    
+    def _esperar_limite(self, cabeceras):
+        """Programar la próxima petición según x-rate-limit-remaining / x-rate-limit-reset"""
+        restantes = cabeceras.get('x-rate-limit-remaining')
+        reinicio = cabeceras.get('x-rate-limit-reset')
+        if restantes is not None and reinicio is not None and int(restantes) <= 0:
+            self._reanudar_en = float(reinicio)
+    
+    def _dormir_hasta(self, momento):
+        espera = momento - time.time()
+        if espera > self.espera_maxima:
+            raise ErrorTwitter(429, f"Límite de rate: habría que esperar {espera:.0f}s")
+        if espera > 0:
+            print(f"⏳ Twitter: esperando {espera:.0f}s por límite de rate")
+            time.sleep(espera)
+    
+    def get(self, ruta, params=None):
+        """
+        GET autenticado con reintentos guiados por las cabeceras de rate limit
+        
+        Returns:
+            JSON de la respuesta
+        """
+        renovado = False
+        for intento in range(self.reintentos + 1):
+            self._dormir_hasta(self._reanudar_en)
+            
+            response = self.session.get(
+                f"{self.base_url}{ruta}",
+                params=params,
+                headers={'Authorization': f'Bearer {self.token()}'},
+                timeout=15
+            )
+            self._esperar_limite(response.headers)
+            
+            if response.status_code == 200:
+                return response.json()
+            
+            if response.status_code == 401 and not renovado:
+                # Token revocado o vencido: pedir uno nuevo una sola vez
+                self.token(renovar=True)
+                renovado = True
+                continue
+            
+            if intento < self.reintentos:
+                if response.status_code == 429:
+                    reinicio = response.headers.get('x-rate-limit-reset')
+                    self._reanudar_en = float(reinicio) if reinicio else time.time() + 2 ** intento * 5
+                    continue
+                if response.status_code >= 500:
+                    time.sleep(2 ** intento)
+                    continue
+            
+            raise ErrorTwitter(response.status_code, response.text)
+        
+        raise ErrorTwitter(response.status_code, response.text)
+    
+    def paginas(self, ruta, params, max_tweets, clave_pagina='next_token', parametro_pagina='next_token'):
+        """
+        Recorrer una ruta paginada y devolver cada página apenas llega
+        
+        Yields:
+            JSON de cada página (con a lo sumo max_tweets tweets en total)
+        """
+        obtenidos = 0
+        token_pagina = None
+        while obtenidos < max_tweets:
+            pedir = min(MAX_POR_PAGINA, max(MIN_POR_PAGINA, max_tweets - obtenidos))
+            pagina_params = dict(params, max_results=pedir)
+            if token_pagina:
+                pagina_params[parametro_pagina] = token_pagina
+            
+            data = self.get(ruta, pagina_params)
+            tweets = data.get('data', [])[:max_tweets - obtenidos]
+            if not tweets:
+                break
+            data['data'] = tweets
+            obtenidos += len(tweets)
+            yield data
+            
+            token_pagina = data.get('meta', {}).get(clave_pagina)
+            if not token_pagina:
+                break
+    
+    def buscar_paginas(self, query, max_tweets=100):
+        """Búsqueda reciente página a página (DataFrame por página)"""
+        params = {
+            'query': query,
+            'tweet.fields': 'created_at,public_metrics,lang',
+            'expansions': 'author_id',
+            'user.fields': 'username,verified'
+        }
+        for data in self.paginas('/tweets/search/recent', params, max_tweets):
+            yield _tweets_a_dataframe(data['data'])
+    
+    def id_usuario(self, username):
+        """ID de un usuario (se consulta una sola vez por cliente)"""
+        if username not in self._ids_usuario:
+            data = self.get(f"/users/by/username/{username}")
+            self._ids_usuario[username] = data['data']['id']
+        return self._ids_usuario[username]
+    
+    def tweets_usuario_paginas(self, username, max_tweets=50):
+        params = {'tweet.fields': 'created_at,public_metrics'}
+        ruta = f"/users/{self.id_usuario(username)}/tweets"
+        for data in self.paginas(ruta, params, max_tweets, parametro_pagina='pagination_token'):
+            df = _tweets_a_dataframe(data['data'], con_respuestas=False)
+            df['usuario'] = username
+            yield df
+    
+    def cerrar(self):
+        self.session.close()
+
+
+def _tweets_a_dataframe(tweets, con_respuestas=True):
+    filas = []
+    for tweet in tweets:
+        metricas = tweet.get('public_metrics', {})
+        fila = {
+            'fecha': pd.to_datetime(tweet['created_at']),
+            'texto': tweet['text'],
+            'likes': metricas.get('like_count', 0),
+            'retweets': metricas.get('retweet_count', 0),
+        }
+        if con_respuestas:
+            fila['respuestas'] = metricas.get('reply_count', 0)
+        fila['fuente'] = 'Twitter/X'
+        if con_respuestas:
+            fila['idioma'] = tweet.get('lang', 'en')
+        filas.append(fila)
+    return pd.DataFrame(filas)
+
+
+def analizar_paginas(paginas, analizador):
+    """
+    Pasar cada página de tweets por el análisis de sentimiento apenas llega
+    
+    Args:
+        paginas: Iterable de DataFrames (p.ej. ClienteTwitter.buscar_paginas)
+        analizador: AnalizadorSentimiento
+    
+    Yields:
+        DataFrame de cada página con las columnas de sentimiento
+    """
+    for df in paginas:
+        yield analizador.analizar_dataframe(df, columna_texto='texto')
+
+
+_cliente = None
+_cliente_lock = threading.Lock()
+
+def obtener_cliente():
+    """Cliente compartido del módulo (token y conexiones reutilizados entre llamadas)"""
+    global _cliente
+    with _cliente_lock:
+        if _cliente is None:
+            _cliente = ClienteTwitter()
+        return _cliente
 
 def obtener_bearer_token():
     """
@@ -19,28 +249,27 @@ def obtener_bearer_token():
     Requiere API Key y API Secret
     """
     try:
-        auth_url = 'https://api.twitter.com/oauth2/token'
-        
-        # Autenticación con API Key y Secret
-        response = requests.post(
-            auth_url,
-            auth=(API_KEYS['twitter_key'], API_KEYS['twitter_secret']),
-            data={'grant_type': 'client_credentials'},
-            headers={'Content-Type': 'application/x-www-form-urlencoded;charset=UTF-8'}
-        )
-        
-        if response.status_code == 200:
-            return response.json()['access_token']
-        else:
-            print(f"❌ Error obteniendo Bearer Token: {response.status_code}")
-            print(f"   {response.text}")
-            return None
-            
+        return obtener_cliente().token()
+    except ErrorTwitter as e:
+        print(f"❌ Error obteniendo Bearer Token: {e.estado}")
+        print(f"   {e.texto}")
+        return None
     except Exception as e:
         print(f"❌ Error: {str(e)}")
         return None
 
-def buscar_tweets_oro(query='gold OR oro', max_tweets=100):
+def _informar_error(e):
+    if e.estado == 403:
+        print("❌ Error 403: Acceso denegado")
+        print("   Tu plan de Twitter API NO incluye búsqueda de tweets")
+        print("   Necesitas upgrade a plan Basic ($100/mes)")
+        print("   https://developer.twitter.com/en/products/twitter-api")
+    elif e.estado == 429:
+        print("⚠️ Límite de rate alcanzado. Espera unos minutos.")
+    else:
+        print(f"❌ Error {e.estado}: {e.texto}")
+
+def buscar_tweets_oro(query='gold OR oro', max_tweets=100, cliente=None):
     """
     Buscar tweets sobre oro
     
@@ -49,135 +278,53 @@ def buscar_tweets_oro(query='gold OR oro', max_tweets=100):
     
     Args:
         query: Query de búsqueda
-        max_tweets: Máximo de tweets (hasta 100 por request en plan Basic)
+        max_tweets: Máximo de tweets (se pagina de a 100 con next_token)
+        cliente: ClienteTwitter (opcional, por defecto el compartido)
     
     Returns:
         DataFrame con tweets
     """
+    cliente = cliente or obtener_cliente()
+    
     try:
-        # Obtener Bearer Token
-        bearer_token = obtener_bearer_token()
-        
-        if not bearer_token:
-            print("⚠️ No se pudo obtener Bearer Token")
-            print("   Twitter API v2 requiere plan de pago ($100/mes)")
-            return pd.DataFrame()
-        
-        # Endpoint de búsqueda (solo disponible en planes de pago)
-        search_url = f"{BASE_URL}/tweets/search/recent"
-        
-        # Parámetros
-        params = {
-            'query': f"{query} -is:retweet lang:en",
-            'max_results': min(max_tweets, 100),
-            'tweet.fields': 'created_at,public_metrics,lang',
-            'expansions': 'author_id',
-            'user.fields': 'username,verified'
-        }
-        
-        headers = {
-            'Authorization': f'Bearer {bearer_token}'
-        }
-        
-        response = requests.get(search_url, params=params, headers=headers)
-        
-        if response.status_code == 200:
-            data = response.json()
-            
-            if 'data' not in data:
-                print("⚠️ No se encontraron tweets")
-                return pd.DataFrame()
-            
-            tweets = []
-            for tweet in data['data']:
-                tweets.append({
-                    'fecha': pd.to_datetime(tweet['created_at']),
-                    'texto': tweet['text'],
-                    'likes': tweet['public_metrics']['like_count'],
-                    'retweets': tweet['public_metrics']['retweet_count'],
-                    'respuestas': tweet['public_metrics']['reply_count'],
-                    'fuente': 'Twitter/X',
-                    'idioma': tweet.get('lang', 'en')
-                })
-            
-            df = pd.DataFrame(tweets)
-            print(f"✅ {len(df)} tweets obtenidos de Twitter/X")
-            return df
-            
-        elif response.status_code == 403:
-            print("❌ Error 403: Acceso denegado")
-            print("   Tu plan de Twitter API NO incluye búsqueda de tweets")
-            print("   Necesitas upgrade a plan Basic ($100/mes)")
-            print("   https://developer.twitter.com/en/products/twitter-api")
-            return pd.DataFrame()
-            
-        elif response.status_code == 429:
-            print("⚠️ Límite de rate alcanzado. Espera unos minutos.")
-            return pd.DataFrame()
-            
-        else:
-            print(f"❌ Error {response.status_code}: {response.text}")
-            return pd.DataFrame()
-            
+        cliente.token()
+    except Exception as e:
+        print(f"⚠️ No se pudo obtener Bearer Token: {str(e)[:80]}")
+        print("   Twitter API v2 requiere plan de pago ($100/mes)")
+        return pd.DataFrame()
+    
+    paginas = []
+    try:
+        for df in cliente.buscar_paginas(f"{query} -is:retweet lang:en", max_tweets):
+            paginas.append(df)
+    except ErrorTwitter as e:
+        _informar_error(e)
     except Exception as e:
         print(f"❌ Error obteniendo tweets: {str(e)}")
+    
+    if not paginas:
+        print("⚠️ No se encontraron tweets")
         return pd.DataFrame()
+    
+    df = pd.concat(paginas, ignore_index=True)
+    print(f"✅ {len(df)} tweets obtenidos de Twitter/X")
+    return df
 
-def obtener_tweets_usuario(username='GoldTelegraph', max_tweets=50):
+def obtener_tweets_usuario(username='GoldTelegraph', max_tweets=50, cliente=None):
     """
     Obtener tweets de un usuario específico
     NOTA: También requiere plan de pago
     """
+    cliente = cliente or obtener_cliente()
     try:
-        bearer_token = obtener_bearer_token()
-        
-        if not bearer_token:
-            return pd.DataFrame()
-        
-        # Primero obtener el user ID
-        user_url = f"{BASE_URL}/users/by/username/{username}"
-        
-        headers = {
-            'Authorization': f'Bearer {bearer_token}'
-        }
-        
-        response = requests.get(user_url, headers=headers)
-        
-        if response.status_code != 200:
+        paginas = list(cliente.tweets_usuario_paginas(username, max_tweets))
+        return pd.concat(paginas, ignore_index=True) if paginas else pd.DataFrame()
+    except ErrorTwitter as e:
+        if e.estado == 404 or 'Not Found' in e.texto:
             print(f"❌ Usuario @{username} no encontrado")
-            return pd.DataFrame()
-        
-        user_id = response.json()['data']['id']
-        
-        # Obtener tweets del usuario
-        tweets_url = f"{BASE_URL}/users/{user_id}/tweets"
-        
-        params = {
-            'max_results': min(max_tweets, 100),
-            'tweet.fields': 'created_at,public_metrics'
-        }
-        
-        response = requests.get(tweets_url, params=params, headers=headers)
-        
-        if response.status_code == 200:
-            data = response.json()
-            
-            tweets = []
-            for tweet in data.get('data', []):
-                tweets.append({
-                    'fecha': pd.to_datetime(tweet['created_at']),
-                    'texto': tweet['text'],
-                    'likes': tweet['public_metrics']['like_count'],
-                    'retweets': tweet['public_metrics']['retweet_count'],
-                    'usuario': username,
-                    'fuente': 'Twitter/X'
-                })
-            
-            return pd.DataFrame(tweets)
         else:
             print(f"❌ Error obteniendo tweets de @{username}")
-            return pd.DataFrame()
-            
+        return pd.DataFrame()
     except Exception as e:
         print(f"❌ Error: {str(e)}")
         return pd.DataFrame()
@@ -2,340 +2,424 @@
 Módulo de Web Scraping para noticias económicas de Perú y el mundo
 Sitios objetivo: La Gestión, La República, El Comercio, Kitco, Mining.com
 """
-import requests
-from bs4 import BeautifulSoup
+import asyncio
+import re
+import time
+from lxml import etree
 import pandas as pd
 from datetime import datetime
-import time
 import warnings
 warnings.filterwarnings('ignore')
 
+from apis.http_async import CacheHTTP, ClienteHTTPAsync, ejecutar
+
+# Fuentes declaradas una sola vez: URL del listado y selectores ('tag',
+# 'tag.clase' o 'tag[atributo]'). 'articulos' y 'titulo' van en orden de preferencia.
+FUENTES = {
+    'gestion': {
+        'nombre': 'La Gestión',
+        'url': 'https://gestion.pe/noticias/oro/',
+        'base': 'https://gestion.pe',
+        'pais': 'Perú',
+        'articulos': ['div.story-item', 'article'],
+        'titulo': ['h2', 'h3', 'a'],
+        'enlace': 'a[href]',
+        'descripcion': 'p',
+    },
+    'larepublica': {
+        'nombre': 'La República',
+        'url': 'https://larepublica.pe/economia/',
+        'base': 'https://larepublica.pe',
+        'pais': 'Perú',
+        'articulos': ['article', 'div.news-item'],
+        'titulo': ['h2', 'h3', 'a'],
+        'enlace': 'a[href]',
+        'descripcion': 'p',
+    },
+    'elcomercio': {
+        'nombre': 'El Comercio',
+        'url': 'https://elcomercio.pe/economia/',
+        'base': 'https://elcomercio.pe',
+        'pais': 'Perú',
+        'articulos': ['article'],
+        'titulo': ['h2', 'h3', 'a'],
+        'enlace': 'a[href]',
+        'descripcion': None,
+    },
+    'kitco': {
+        'nombre': 'Kitco',
+        'url': 'https://www.kitco.com/news/gold.html',
+        'base': 'https://www.kitco.com',
+        'pais': 'Internacional',
+        'articulos': ['div.article', 'article'],
+        'titulo': ['h3', 'h2', 'a'],
+        'enlace': 'a[href]',
+        'descripcion': 'p',
+    },
+    'mining': {
+        'nombre': 'Mining.com',
+        'url': 'https://www.mining.com/tag/gold/',
+        'base': None,
+        'pais': 'Internacional',
+        'articulos': ['article'],
+        'titulo': ['h3', 'h2'],
+        'enlace': 'a[href]',
+        'descripcion': None,
+    },
+}
+
+PATRON_SELECTOR = re.compile(r'^(?P<tag>[a-z0-9]+)(?:\.(?P<clase>[\w-]+)|\[(?P<atributo>[\w-]+)\])?$')
+PATRON_CHARSET = re.compile(rb'charset=["\']?([\w-]+)', re.I)
+TAMANO_BLOQUE = 16 * 1024
+
+
+class Selector:
+    """Selector simple compilado: coincidencia directa y XPath al primer descendiente"""
+    
+    def __init__(self, selector):
+        match = PATRON_SELECTOR.match(selector)
+        if not match:
+            raise ValueError(f"Selector no soportado: {selector}")
+        self.tag = match.group('tag')
+        self.clase = match.group('clase')
+        self.atributo = match.group('atributo')
+        
+        condicion = ''
+        if self.clase:
+            condicion = f"[contains(concat(' ', normalize-space(@class), ' '), ' {self.clase} ')]"
+        elif self.atributo:
+            condicion = f"[@{self.atributo}]"
+        self.primero = etree.XPath(f"(.//{self.tag}{condicion})[1]")
+    
+    def coincide(self, elemento):
+        if elemento.tag != self.tag:
+            return False
+        if self.clase:
+            return self.clase in (elemento.get('class') or '').split()
+        if self.atributo:
+            return elemento.get(self.atributo) is not None
+        return True
+    
+    def buscar(self, elemento):
+        """Primer descendiente que coincide (None si no hay)"""
+        encontrados = self.primero(elemento)
+        return encontrados[0] if encontrados else None
+
+
+def _texto(elemento):
+    """Texto del elemento sin comentarios, cada fragmento sin espacios (como get_text(strip=True))"""
+    return ''.join(t.strip() for t in elemento.itertext(etree.Element) if t.strip())
+
+
+def _codificacion(contenido):
+    """Charset declarado en el HTML o UTF-8 si el contenido es UTF-8 válido"""
+    match = PATRON_CHARSET.search(contenido[:4096])
+    if match:
+        return match.group(1).decode('ascii')
+    try:
+        contenido.decode('utf-8')
+        return 'utf-8'
+    except UnicodeDecodeError:
+        return None
+
+
+class ExtractorFuente:
+    """
+    Selectores de una fuente compilados una vez y extracción en streaming con lxml
+    
+    El HTML se alimenta por bloques a un HTMLPullParser y la lectura se detiene
+    en cuanto se tienen max_noticias artículos del selector preferido.
+    """
+    
+    def __init__(self, clave):
+        fuente = FUENTES[clave]
+        self.clave = clave
+        self.fuente = fuente
+        self.articulos = [Selector(s) for s in fuente['articulos']]
+        self.titulo = [Selector(s) for s in fuente['titulo']]
+        self.enlace = Selector(fuente['enlace'])
+        self.descripcion = Selector(fuente['descripcion']) if fuente['descripcion'] else None
+    
+    def _articulos(self, contenido, max_noticias):
+        """Contenedores de artículos del primer selector que tenga resultados"""
+        parser = etree.HTMLPullParser(events=('start', 'end'), encoding=_codificacion(contenido))
+        orden = {}
+        encontrados = [[] for _ in self.articulos]
+        
+        def procesar():
+            for evento, elemento in parser.read_events():
+                if not isinstance(elemento.tag, str):
+                    continue
+                if evento == 'start':
+                    orden[elemento] = len(orden)
+                    continue
+                for i, selector in enumerate(self.articulos):
+                    if len(encontrados[i]) < max_noticias and selector.coincide(elemento):
+                        encontrados[i].append(elemento)
+        
+        completo = True
+        for inicio in range(0, len(contenido), TAMANO_BLOQUE):
+            parser.feed(contenido[inicio:inicio + TAMANO_BLOQUE])
+            procesar()
+            if len(encontrados[0]) >= max_noticias:
+                completo = False
+                break
+        
+        if completo:
+            # Cerrar emite el final de las etiquetas que quedaron abiertas
+            parser.close()
+            procesar()
+        
+        for lista in encontrados:
+            if lista:
+                # Orden del documento (los anidados terminan antes que su contenedor)
+                return sorted(lista, key=lambda e: orden.get(e, 0))[:max_noticias]
+        return []
+    
+    def extraer(self, contenido, max_noticias=15):
+        """
+        Extraer noticias del HTML
+        
+        Args:
+            contenido: HTML en bytes
+            max_noticias: Máximo de noticias
+        
+        Returns:
+            Lista de dicts con fecha, titulo, descripcion, texto, fuente, url, pais
+        """
+        fuente = self.fuente
+        noticias = []
+        
+        for articulo in self._articulos(contenido, max_noticias):
+            try:
+                # Extraer título
+                titulo_elem = None
+                for selector in self.titulo:
+                    titulo_elem = selector.buscar(articulo)
+                    if titulo_elem is not None:
+                        break
+                titulo = _texto(titulo_elem) if titulo_elem is not None else ''
+                
+                # Extraer enlace
+                link_elem = self.enlace.buscar(articulo)
+                link = link_elem.get('href') if link_elem is not None else ''
+                if link and fuente['base'] and not link.startswith('http'):
+                    link = f"{fuente['base']}{link}"
+                
+                # Extraer descripción
+                descripcion = ''
+                if self.descripcion is not None:
+                    desc_elem = self.descripcion.buscar(articulo)
+                    descripcion = _texto(desc_elem) if desc_elem is not None else ''
+                
+                if titulo and len(titulo) > 10:
+                    noticias.append({
+                        'fecha': datetime.now(),
+                        'titulo': titulo,
+                        'descripcion': descripcion,
+                        'texto': f"{titulo} {descripcion}" if self.descripcion is not None else titulo,
+                        'fuente': f"{fuente['nombre']} (Web Scraping)",
+                        'url': link,
+                        'pais': fuente['pais']
+                    })
+            except Exception as e:
+                continue
+        
+        return noticias
+
+
+# Compilados una sola vez al importar el módulo
+EXTRACTORES = {clave: ExtractorFuente(clave) for clave in FUENTES}
+
+
 class WebScraperNoticias:
     """Scraper de noticias sobre oro y economía"""
     
-    def __init__(self):
+    def __init__(self, por_host=2, pausa_host=1.0, cache_http=True):
+        """
+        Args:
+            por_host: Peticiones simultáneas máximas por sitio
+            pausa_host: Segundos entre peticiones al mismo sitio
+            cache_http: Usar GET condicional (ETag / Last-Modified) con copia en disco
+        """
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
         self.timeout = 10
+        self.tiempos_parseo = {}
+        
+        self.cache = None
+        if cache_http:
+            try:
+                self.cache = CacheHTTP()
+            except OSError as e:
+                print(f"⚠️ Caché HTTP no disponible: {str(e)[:50]}")
+        
+        # Sesión compartida; la pausa de 1s por servidor solo aplica por host
+        self.cliente = ClienteHTTPAsync(self.headers, self.timeout, por_host, pausa_host,
+                                        cache=self.cache)
     
-    def scrape_gestion(self, max_noticias=20):
+    def _descargar(self, url):
+        """Descarga bloqueante de una sola página (bytes)"""
+        respuesta = self.cliente.descargar([url])[url]
+        if isinstance(respuesta, Exception):
+            raise respuesta
+        return respuesta.contenido
+    
+    def parsear(self, clave, contenido, max_noticias=15):
         """
-        Scrapear noticias de La Gestión (Perú)
-        URL: https://gestion.pe/noticias/oro/
+        Extraer noticias del HTML de una fuente
+        
+        Args:
+            clave: Clave de FUENTES ('gestion', 'kitco', ...)
+            contenido: HTML en bytes (descargado o de un archivo guardado)
+            max_noticias: Máximo de noticias a devolver
+        
+        Returns:
+            Lista de dicts con fecha, titulo, descripcion, texto, fuente, url, pais
         """
+        inicio = time.perf_counter()
+        noticias = EXTRACTORES[clave].extraer(contenido, max_noticias)
+        self.tiempos_parseo[clave] = time.perf_counter() - inicio
+        return noticias
+    
+    def _scrape(self, clave, max_noticias, contenido=None):
+        """Descargar (si no se pasa contenido) y parsear una fuente"""
+        nombre = FUENTES[clave]['nombre']
         noticias = []
         
         try:
-            print("  📰 Scrapeando La Gestión...")
-            
-            # URLs de búsqueda
-            urls = [
-                'https://gestion.pe/noticias/oro/',
-                'https://gestion.pe/noticias/precio-oro/',
-                'https://gestion.pe/economia/'
-            ]
-            
-            for url in urls[:1]:  # Por ahora solo 1 URL para no saturar
-                try:
-                    response = requests.get(url, headers=self.headers, timeout=self.timeout)
-                    soup = BeautifulSoup(response.content, 'html.parser')
-                    
-                    # Buscar artículos (la estructura puede cambiar)
-                    articulos = soup.find_all('div', class_='story-item', limit=max_noticias)
-                    
-                    if not articulos:
-                        # Intentar otra estructura común
-                        articulos = soup.find_all('article', limit=max_noticias)
-                    
-                    for articulo in articulos[:max_noticias]:
-                        try:
-                            # Extraer título
-                            titulo_elem = articulo.find('h2') or articulo.find('h3') or articulo.find('a')
-                            titulo = titulo_elem.get_text(strip=True) if titulo_elem else 'Sin título'
-                            
-                            # Extraer enlace
-                            link_elem = articulo.find('a', href=True)
-                            link = link_elem['href'] if link_elem else ''
-                            if link and not link.startswith('http'):
-                                link = f"https://gestion.pe{link}"
-                            
-                            # Extraer descripción
-                            desc_elem = articulo.find('p')
-                            descripcion = desc_elem.get_text(strip=True) if desc_elem else ''
-                            
-                            if titulo and len(titulo) > 10:
-                                noticias.append({
-                                    'fecha': datetime.now(),
-                                    'titulo': titulo,
-                                    'descripcion': descripcion,
-                                    'texto': f"{titulo} {descripcion}",
-                                    'fuente': 'La Gestión (Web Scraping)',
-                                    'url': link,
-                                    'pais': 'Perú'
-                                })
-                        except Exception as e:
-                            continue
-                    
-                    time.sleep(1)  # Respetar el servidor
-                    
-                except Exception as e:
-                    print(f"    ⚠️ Error en {url}: {str(e)[:50]}")
-                    continue
-            
-            print(f"    ✅ {len(noticias)} noticias de La Gestión")
-            
+            print(f"  📰 Scrapeando {nombre}...")
+            if contenido is None:
+                contenido = self._descargar(FUENTES[clave]['url'])
+            noticias = self.parsear(clave, contenido, max_noticias)
+            print(f"    ✅ {len(noticias)} noticias de {nombre} "
+                  f"(parseo {self.tiempos_parseo[clave] * 1000:.1f} ms)")
         except Exception as e:
-            print(f"    ❌ Error general en La Gestión: {str(e)}")
+            print(f"    ❌ Error general en {nombre}: {str(e)[:50]}")
+        
+        return noticias
+    
+    def _scrape_respuesta(self, clave, max_noticias, respuesta):
+        """Parsear una respuesta, reutilizando el resultado si la página no cambió"""
+        derivado = f"noticias_{max_noticias}"
+        if respuesta.sin_cambios and self.cache is not None:
+            noticias = self.cache.derivado(respuesta.url, derivado, respuesta.hash)
+            if noticias is not None:
+                print(f"  📰 {FUENTES[clave]['nombre']}: sin cambios ({len(noticias)} noticias, "
+                      f"{respuesta.bytes_red} bytes)")
+                return noticias
         
+        noticias = self._scrape(clave, max_noticias, respuesta.contenido)
+        if self.cache is not None and respuesta.estado in (200, 304):
+            self.cache.guardar_derivado(respuesta.url, derivado, respuesta.hash, noticias)
         return noticias
     
-    def scrape_larepublica(self, max_noticias=20):
+    def scrape_gestion(self, max_noticias=20, contenido=None):
+        """
+        Scrapear noticias de La Gestión (Perú)
+        URL: https://gestion.pe/noticias/oro/
+        
+        Args:
+            contenido: HTML ya descargado (bytes); si es None se descarga
+        """
+        return self._scrape('gestion', max_noticias, contenido)
+    
+    def scrape_larepublica(self, max_noticias=20, contenido=None):
         """
         Scrapear noticias de La República (Perú)
         URL: https://larepublica.pe/economia/
         """
-        noticias = []
-        
-        try:
-            print("  📰 Scrapeando La República...")
-            
-            urls = [
-                'https://larepublica.pe/economia/',
-                'https://larepublica.pe/tag/oro/'
-            ]
-            
-            for url in urls[:1]:
-                try:
-                    response = requests.get(url, headers=self.headers, timeout=self.timeout)
-                    soup = BeautifulSoup(response.content, 'html.parser')
-                    
-                    # Buscar artículos
-                    articulos = soup.find_all('article', limit=max_noticias)
-                    
-                    if not articulos:
-                        articulos = soup.find_all('div', class_='news-item', limit=max_noticias)
-                    
-                    for articulo in articulos[:max_noticias]:
-                        try:
-                            titulo_elem = articulo.find('h2') or articulo.find('h3') or articulo.find('a')
-                            titulo = titulo_elem.get_text(strip=True) if titulo_elem else ''
-                            
-                            link_elem = articulo.find('a', href=True)
-                            link = link_elem['href'] if link_elem else ''
-                            if link and not link.startswith('http'):
-                                link = f"https://larepublica.pe{link}"
-                            
-                            desc_elem = articulo.find('p')
-                            descripcion = desc_elem.get_text(strip=True) if desc_elem else ''
-                            
-                            if titulo and len(titulo) > 10:
-                                noticias.append({
-                                    'fecha': datetime.now(),
-                                    'titulo': titulo,
-                                    'descripcion': descripcion,
-                                    'texto': f"{titulo} {descripcion}",
-                                    'fuente': 'La República (Web Scraping)',
-                                    'url': link,
-                                    'pais': 'Perú'
-                                })
-                        except:
-                            continue
-                    
-                    time.sleep(1)
-                    
-                except Exception as e:
-                    print(f"    ⚠️ Error en {url}: {str(e)[:50]}")
-                    continue
-            
-            print(f"    ✅ {len(noticias)} noticias de La República")
-            
-        except Exception as e:
-            print(f"    ❌ Error general en La República: {str(e)}")
-        
-        return noticias
+        return self._scrape('larepublica', max_noticias, contenido)
     
-    def scrape_elcomercio(self, max_noticias=20):
+    def scrape_elcomercio(self, max_noticias=20, contenido=None):
         """
         Scrapear noticias de El Comercio (Perú)
         URL: https://elcomercio.pe/economia/
         """
-        noticias = []
-        
-        try:
-            print("  📰 Scrapeando El Comercio...")
-            
-            url = 'https://elcomercio.pe/economia/'
-            
-            try:
-                response = requests.get(url, headers=self.headers, timeout=self.timeout)
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                articulos = soup.find_all('article', limit=max_noticias)
-                
-                for articulo in articulos[:max_noticias]:
-                    try:
-                        titulo_elem = articulo.find('h2') or articulo.find('h3') or articulo.find('a')
-                        titulo = titulo_elem.get_text(strip=True) if titulo_elem else ''
-                        
-                        link_elem = articulo.find('a', href=True)
-                        link = link_elem['href'] if link_elem else ''
-                        if link and not link.startswith('http'):
-                            link = f"https://elcomercio.pe{link}"
-                        
-                        if titulo and len(titulo) > 10:
-                            noticias.append({
-                                'fecha': datetime.now(),
-                                'titulo': titulo,
-                                'descripcion': '',
-                                'texto': titulo,
-                                'fuente': 'El Comercio (Web Scraping)',
-                                'url': link,
-                                'pais': 'Perú'
-                            })
-                    except:
-                        continue
-                
-                time.sleep(1)
-                
-            except Exception as e:
-                print(f"    ⚠️ Error: {str(e)[:50]}")
-            
-            print(f"    ✅ {len(noticias)} noticias de El Comercio")
-            
-        except Exception as e:
-            print(f"    ❌ Error general en El Comercio: {str(e)}")
-        
-        return noticias
+        return self._scrape('elcomercio', max_noticias, contenido)
     
-    def scrape_kitco(self, max_noticias=15):
+    def scrape_kitco(self, max_noticias=15, contenido=None):
         """
         Scrapear Kitco.com - Líder mundial en noticias de oro
         URL: https://www.kitco.com/news/gold.html
         """
-        noticias = []
-        
-        try:
-            print("  📰 Scrapeando Kitco (Gold News)...")
-            
-            url = 'https://www.kitco.com/news/gold.html'
-            
-            try:
-                response = requests.get(url, headers=self.headers, timeout=self.timeout)
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                # Kitco tiene una estructura específica
-                articulos = soup.find_all('div', class_='article', limit=max_noticias)
-                
-                if not articulos:
-                    articulos = soup.find_all('article', limit=max_noticias)
-                
-                for articulo in articulos[:max_noticias]:
-                    try:
-                        titulo_elem = articulo.find('h3') or articulo.find('h2') or articulo.find('a')
-                        titulo = titulo_elem.get_text(strip=True) if titulo_elem else ''
-                        
-                        link_elem = articulo.find('a', href=True)
-                        link = link_elem['href'] if link_elem else ''
-                        if link and not link.startswith('http'):
-                            link = f"https://www.kitco.com{link}"
-                        
-                        desc_elem = articulo.find('p')
-                        descripcion = desc_elem.get_text(strip=True) if desc_elem else ''
-                        
-                        if titulo and len(titulo) > 10:
-                            noticias.append({
-                                'fecha': datetime.now(),
-                                'titulo': titulo,
-                                'descripcion': descripcion,
-                                'texto': f"{titulo} {descripcion}",
-                                'fuente': 'Kitco (Web Scraping)',
-                                'url': link,
-                                'pais': 'Internacional'
-                            })
-                    except:
-                        continue
-                
-                time.sleep(1)
-                
-            except Exception as e:
-                print(f"    ⚠️ Error: {str(e)[:50]}")
-            
-            print(f"    ✅ {len(noticias)} noticias de Kitco")
-            
-        except Exception as e:
-            print(f"    ❌ Error general en Kitco: {str(e)}")
-        
-        return noticias
+        return self._scrape('kitco', max_noticias, contenido)
     
-    def scrape_mining(self, max_noticias=15):
+    def scrape_mining(self, max_noticias=15, contenido=None):
         """
         Scrapear Mining.com - Noticias de minería y oro
-        URL: https://www.mining.com/category/gold/
+        URL: https://www.mining.com/tag/gold/
         """
-        noticias = []
+        return self._scrape('mining', max_noticias, contenido)
+    
+    async def scrape_async(self, max_por_fuente=15, plazo=20, fuentes=None, al_llegar=None):
+        """
+        Descargar todas las fuentes en paralelo y parsear cada una apenas llega
         
-        try:
-            print("  📰 Scrapeando Mining.com...")
-            
-            url = 'https://www.mining.com/tag/gold/'
-            
-            try:
-                response = requests.get(url, headers=self.headers, timeout=self.timeout)
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                articulos = soup.find_all('article', limit=max_noticias)
-                
-                for articulo in articulos[:max_noticias]:
-                    try:
-                        titulo_elem = articulo.find('h3') or articulo.find('h2')
-                        titulo = titulo_elem.get_text(strip=True) if titulo_elem else ''
-                        
-                        link_elem = articulo.find('a', href=True)
-                        link = link_elem['href'] if link_elem else ''
-                        
-                        if titulo and len(titulo) > 10:
-                            noticias.append({
-                                'fecha': datetime.now(),
-                                'titulo': titulo,
-                                'descripcion': '',
-                                'texto': titulo,
-                                'fuente': 'Mining.com (Web Scraping)',
-                                'url': link,
-                                'pais': 'Internacional'
-                            })
-                    except:
-                        continue
-                
-                time.sleep(1)
-                
-            except Exception as e:
-                print(f"    ⚠️ Error: {str(e)[:50]}")
-            
-            print(f"    ✅ {len(noticias)} noticias de Mining.com")
-            
-        except Exception as e:
-            print(f"    ❌ Error general en Mining.com: {str(e)}")
+        Args:
+            max_por_fuente: Máximo de noticias por fuente
+            plazo: Segundos máximos para todas las descargas (resultados parciales)
+            fuentes: Claves de FUENTES a usar (None = todas)
+            al_llegar: Función opcional (clave, noticias) llamada por cada fuente
+                       parseada, sin esperar a las más lentas
         
-        return noticias
+        Returns:
+            Lista de noticias de las fuentes que respondieron dentro del plazo
+        """
+        fuentes = list(fuentes or FUENTES)
+        tareas = {
+            asyncio.create_task(self.cliente.obtener(FUENTES[clave]['url'])): clave
+            for clave in fuentes
+        }
+        
+        loop = asyncio.get_running_loop()
+        limite = None if plazo is None else loop.time() + plazo
+        por_fuente = {}
+        pendientes = set(tareas)
+        while pendientes:
+            restante = None if limite is None else limite - loop.time()
+            if restante is not None and restante <= 0:
+                break
+            terminadas, pendientes = await asyncio.wait(
+                pendientes, timeout=restante, return_when=asyncio.FIRST_COMPLETED
+            )
+            for tarea in terminadas:
+                clave = tareas[tarea]
+                try:
+                    respuesta = tarea.result()
+                except Exception as e:
+                    print(f"    ⚠️ Error en {FUENTES[clave]['nombre']}: {str(e)[:50]}")
+                    continue
+                if not respuesta.ok:
+                    # Una página de error (403, 5xx) no es un listado de noticias
+                    print(f"    ⚠️ Error en {FUENTES[clave]['nombre']}: HTTP {respuesta.estado}")
+                    continue
+                por_fuente[clave] = self._scrape_respuesta(clave, max_por_fuente, respuesta)
+                if al_llegar is not None:
+                    al_llegar(clave, por_fuente[clave])
+        
+        for tarea in pendientes:
+            tarea.cancel()
+            print(f"    ⏱️ {FUENTES[tareas[tarea]]['nombre']}: sin respuesta en {plazo}s")
+        
+        # Mismo orden que FUENTES, sin importar cuál respondió primero
+        return [noticia for clave in fuentes for noticia in por_fuente.get(clave, [])]
     
-    def scrape_todas_las_fuentes(self, max_por_fuente=15):
+    def scrape_todas_las_fuentes(self, max_por_fuente=15, plazo=20):
         """
-        Scrapear todas las fuentes disponibles
+        Scrapear todas las fuentes disponibles (en paralelo)
+        
+        Args:
+            max_por_fuente: Máximo de noticias por fuente
+            plazo: Segundos máximos para todas las descargas
         
         Returns:
             DataFrame con todas las noticias scrapeadas
         """
         print("\n🌐 Iniciando Web Scraping de múltiples fuentes...\n")
         
-        todas_noticias = []
-        
-        # Scrapear cada fuente
-        todas_noticias.extend(self.scrape_gestion(max_por_fuente))
-        todas_noticias.extend(self.scrape_larepublica(max_por_fuente))
-        todas_noticias.extend(self.scrape_elcomercio(max_por_fuente))
-        todas_noticias.extend(self.scrape_kitco(max_por_fuente))
-        todas_noticias.extend(self.scrape_mining(max_por_fuente))
+        todas_noticias = ejecutar(self.scrape_async(max_por_fuente, plazo))
         
         df = pd.DataFrame(todas_noticias)
         
@@ -350,13 +434,19 @@ class WebScraperNoticias:
         
         return df
 
-def obtener_noticias_scraping(max_por_fuente=15):
+def obtener_noticias_scraping(max_por_fuente=15, plazo=20):
     """
     Función simple para obtener noticias via web scraping
     Compatible con la estructura del dashboard
+    
+    Args:
+        plazo: Segundos máximos para todas las fuentes (se devuelven las que respondan)
     """
     scraper = WebScraperNoticias()
-    return scraper.scrape_todas_las_fuentes(max_por_fuente)
+    try:
+        return scraper.scrape_todas_las_fuentes(max_por_fuente, plazo)
+    finally:
+        scraper.cliente.cerrar()
 
 if __name__ == '__main__':
     print("="*60)
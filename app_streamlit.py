@@ -11,8 +11,11 @@ import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
-from datetime import datetime, timedelta
-import yfinance as yf
+from datetime import datetime
+from pathlib import Path
+from datos.cache import CacheCompartida
+from datos.graficos import figura_cacheada
+from datos.precios import obtener_cierres
 
 # Configuración de página
 st.set_page_config(
@@ -112,10 +115,18 @@ with st.sidebar:
     **Datos:** 100% REALES
     """)
 
+# Caché por espacios compartida con los dashboards (memoria + disco)
+@st.cache_resource
+def obtener_cache():
+    """Caché compartida entre sesiones para las figuras ya construidas"""
+    return CacheCompartida(Path("data_historico"))
+
+cache = obtener_cache()
+
 # Función para cargar datos de precios
 @st.cache_data(ttl=3600)
 def cargar_precios(days=30):
-    """Cargar precios de metales desde Yahoo Finance"""
+    """Cargar precios de metales (almacén local o Yahoo Finance)"""
     try:
         tickers = {
             'Oro': 'GC=F',
@@ -123,17 +134,7 @@ def cargar_precios(days=30):
             'Cobre': 'HG=F'
         }
 
-        fecha_inicio = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
-
-        precios_data = {}
-
-        for metal, ticker in tickers.items():
-            data = yf.download(ticker, start=fecha_inicio, progress=False)
-            if not data.empty:
-                precios_data[metal] = data['Close']
-
-        df = pd.DataFrame(precios_data)
-        return df
+        return obtener_cierres(tickers, dias=days)
     except Exception as e:
         st.error(f"Error al cargar precios: {str(e)}")
         return pd.DataFrame()
@@ -168,6 +169,174 @@ def generar_datos_sentimiento_ejemplo(days=30):
 
     return df
 
+# Figuras (JSON en caché por tipo, versión de los datos y parámetros)
+@figura_cacheada(cache, 'sentimiento_zonas')
+def figura_sentimiento(df_sentimiento):
+    """Evolución del sentimiento con zonas positiva y negativa"""
+    fig = go.Figure()
+
+    # Línea de sentimiento
+    fig.add_trace(go.Scatter(
+        x=df_sentimiento['fecha'],
+        y=df_sentimiento['sentimiento'],
+        name='Sentimiento',
+        line=dict(color='#1f77b4', width=3),
+        fill='tozeroy',
+        fillcolor='rgba(31, 119, 180, 0.2)'
+    ))
+
+    # Línea de referencia en 0
+    fig.add_hline(y=0, line_dash="dash", line_color="gray", opacity=0.5)
+
+    # Zonas de sentimiento
+    fig.add_hrect(y0=0.05, y1=1, fillcolor="green", opacity=0.1, line_width=0)
+    fig.add_hrect(y0=-1, y1=-0.05, fillcolor="red", opacity=0.1, line_width=0)
+
+    fig.update_layout(
+        title="Evolución del Sentimiento en el Tiempo",
+        xaxis_title="Fecha",
+        yaxis_title="Sentimiento Score",
+        hovermode='x unified',
+        height=500,
+        showlegend=True
+    )
+    return fig
+
+@figura_cacheada(cache, 'clasificacion_dona')
+def figura_clasificacion(counts):
+    """Dona de noticias por clasificación de sentimiento"""
+    fig_pie = go.Figure(data=[go.Pie(
+        labels=counts.index,
+        values=counts.values,
+        marker=dict(colors=['#28a745', '#6c757d', '#dc3545']),
+        hole=0.4
+    )])
+
+    fig_pie.update_layout(
+        title="Clasificación de Noticias",
+        height=400
+    )
+    return fig_pie
+
+@figura_cacheada(cache, 'menciones')
+def figura_menciones(df_sentimiento):
+    """Barras del volumen diario de menciones"""
+    fig_bar = go.Figure(data=[go.Bar(
+        x=df_sentimiento['fecha'],
+        y=df_sentimiento['menciones'],
+        marker_color='#ff7f0e'
+    )])
+
+    fig_bar.update_layout(
+        title="Volumen de Menciones",
+        xaxis_title="Fecha",
+        yaxis_title="Número de Menciones",
+        height=400
+    )
+    return fig_bar
+
+@figura_cacheada(cache, 'precio_metal')
+def figura_precio_metal(df_precios, metal_seleccionado, days_back):
+    """Precio de un metal en el período"""
+    fig = go.Figure()
+
+    # Gráfico de línea
+    fig.add_trace(go.Scatter(
+        x=df_precios.index,
+        y=df_precios[metal_seleccionado],
+        name=metal_seleccionado,
+        line=dict(color='gold' if metal_seleccionado == 'Oro' else 'silver' if metal_seleccionado == 'Plata' else 'orange', width=3),
+        fill='tozeroy',
+        fillcolor='rgba(255, 215, 0, 0.2)' if metal_seleccionado == 'Oro' else 'rgba(192, 192, 192, 0.2)' if metal_seleccionado == 'Plata' else 'rgba(255, 140, 0, 0.2)'
+    ))
+
+    fig.update_layout(
+        title=f"Precio del {metal_seleccionado} - Últimos {days_back} días",
+        xaxis_title="Fecha",
+        yaxis_title="Precio (USD)",
+        hovermode='x unified',
+        height=500
+    )
+    return fig
+
+@figura_cacheada(cache, 'comparacion_metales')
+def figura_comparacion(df_precios):
+    """Rendimiento relativo de los metales (base 100)"""
+    df_normalizado = (df_precios / df_precios.iloc[0]) * 100
+
+    fig_comp = go.Figure()
+
+    colors = {'Oro': 'gold', 'Plata': 'silver', 'Cobre': 'orange'}
+
+    for metal in df_precios.columns:
+        fig_comp.add_trace(go.Scatter(
+            x=df_normalizado.index,
+            y=df_normalizado[metal],
+            name=metal,
+            line=dict(color=colors.get(metal, 'blue'), width=2)
+        ))
+
+    fig_comp.update_layout(
+        title="Rendimiento Relativo de Metales",
+        xaxis_title="Fecha",
+        yaxis_title="Valor Normalizado (Base 100)",
+        hovermode='x unified',
+        height=500,
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+    return fig_comp
+
+@figura_cacheada(cache, 'sentimiento_precio_ejes')
+def figura_sentimiento_precio(df_combinado):
+    """Sentimiento y precio del oro en ejes separados"""
+    fig = go.Figure()
+
+    # Sentimiento (eje izquierdo)
+    fig.add_trace(go.Scatter(
+        x=df_combinado['fecha'],
+        y=df_combinado['sentimiento'],
+        name='Sentimiento',
+        yaxis='y',
+        line=dict(color='blue', width=2)
+    ))
+
+    # Precio (eje derecho)
+    fig.add_trace(go.Scatter(
+        x=df_combinado['fecha'],
+        y=df_combinado['Oro'],
+        name='Precio Oro',
+        yaxis='y2',
+        line=dict(color='gold', width=2)
+    ))
+
+    fig.update_layout(
+        title="Comparación: Sentimiento vs Precio del Oro",
+        xaxis=dict(title="Fecha"),
+        yaxis=dict(title="Sentimiento Score", titlefont=dict(color="blue")),
+        yaxis2=dict(title="Precio Oro (USD)", overlaying='y', side='right', titlefont=dict(color="gold")),
+        hovermode='x unified',
+        height=500
+    )
+    return fig
+
+@figura_cacheada(cache, 'dispersion_metal')
+def figura_dispersion(df_combinado, metal_scatter):
+    """Dispersión sentimiento vs precio de un metal con tendencia OLS"""
+    fig_scatter = px.scatter(
+        df_combinado,
+        x='sentimiento',
+        y=metal_scatter,
+        size='menciones',
+        color='sentimiento_label',
+        color_discrete_map={'Positivo': 'green', 'Neutral': 'gray', 'Negativo': 'red'},
+        trendline='ols',
+        title=f"Relación Sentimiento vs Precio del {metal_scatter}",
+        labels={'sentimiento': 'Sentimiento Score', metal_scatter: f'Precio {metal_scatter} (USD)'}
+    )
+
+    fig_scatter.update_layout(height=500)
+    return fig_scatter
+
 # Main content
 tab1, tab2, tab3, tab4, tab5 = st.tabs([
     "📊 Dashboard Principal",
@@ -329,35 +498,7 @@ with tab2:
     # Gráfico de evolución del sentimiento
     st.subheader("📉 Evolución del Sentimiento")
 
-    fig = go.Figure()
-
-    # Línea de sentimiento
-    fig.add_trace(go.Scatter(
-        x=df_sentimiento['fecha'],
-        y=df_sentimiento['sentimiento'],
-        name='Sentimiento',
-        line=dict(color='#1f77b4', width=3),
-        fill='tozeroy',
-        fillcolor='rgba(31, 119, 180, 0.2)'
-    ))
-
-    # Línea de referencia en 0
-    fig.add_hline(y=0, line_dash="dash", line_color="gray", opacity=0.5)
-
-    # Zonas de sentimiento
-    fig.add_hrect(y0=0.05, y1=1, fillcolor="green", opacity=0.1, line_width=0)
-    fig.add_hrect(y0=-1, y1=-0.05, fillcolor="red", opacity=0.1, line_width=0)
-
-    fig.update_layout(
-        title="Evolución del Sentimiento en el Tiempo",
-        xaxis_title="Fecha",
-        yaxis_title="Sentimiento Score",
-        hovermode='x unified',
-        height=500,
-        showlegend=True
-    )
-
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(figura_sentimiento(df_sentimiento), use_container_width=True)
 
     # Gráfico de distribución
     col1, col2 = st.columns(2)
@@ -368,37 +509,12 @@ with tab2:
         # Pie chart
         counts = df_sentimiento['sentimiento_label'].value_counts()
 
-        fig_pie = go.Figure(data=[go.Pie(
-            labels=counts.index,
-            values=counts.values,
-            marker=dict(colors=['#28a745', '#6c757d', '#dc3545']),
-            hole=0.4
-        )])
-
-        fig_pie.update_layout(
-            title="Clasificación de Noticias",
-            height=400
-        )
-
-        st.plotly_chart(fig_pie, use_container_width=True)
+        st.plotly_chart(figura_clasificacion(counts), use_container_width=True)
 
     with col2:
         st.subheader("📈 Menciones Diarias")
 
-        fig_bar = go.Figure(data=[go.Bar(
-            x=df_sentimiento['fecha'],
-            y=df_sentimiento['menciones'],
-            marker_color='#ff7f0e'
-        )])
-
-        fig_bar.update_layout(
-            title="Volumen de Menciones",
-            xaxis_title="Fecha",
-            yaxis_title="Número de Menciones",
-            height=400
-        )
-
-        st.plotly_chart(fig_bar, use_container_width=True)
+        st.plotly_chart(figura_menciones(df_sentimiento), use_container_width=True)
 
     # Tabla de datos recientes
     st.markdown("---")
@@ -452,56 +568,13 @@ with tab3:
                 index=0
             )
 
-            fig = go.Figure()
-
-            # Gráfico de línea
-            fig.add_trace(go.Scatter(
-                x=df_precios.index,
-                y=df_precios[metal_seleccionado],
-                name=metal_seleccionado,
-                line=dict(color='gold' if metal_seleccionado == 'Oro' else 'silver' if metal_seleccionado == 'Plata' else 'orange', width=3),
-                fill='tozeroy',
-                fillcolor='rgba(255, 215, 0, 0.2)' if metal_seleccionado == 'Oro' else 'rgba(192, 192, 192, 0.2)' if metal_seleccionado == 'Plata' else 'rgba(255, 140, 0, 0.2)'
-            ))
-
-            fig.update_layout(
-                title=f"Precio del {metal_seleccionado} - Últimos {days_back} días",
-                xaxis_title="Fecha",
-                yaxis_title="Precio (USD)",
-                hovermode='x unified',
-                height=500
-            )
-
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(figura_precio_metal(df_precios, metal_seleccionado, days_back), use_container_width=True)
 
             # Comparación de metales (normalizado)
             st.markdown("---")
             st.subheader("🔄 Comparación de Metales (Normalizado a 100)")
 
-            df_normalizado = (df_precios / df_precios.iloc[0]) * 100
-
-            fig_comp = go.Figure()
-
-            colors = {'Oro': 'gold', 'Plata': 'silver', 'Cobre': 'orange'}
-
-            for metal in df_precios.columns:
-                fig_comp.add_trace(go.Scatter(
-                    x=df_normalizado.index,
-                    y=df_normalizado[metal],
-                    name=metal,
-                    line=dict(color=colors.get(metal, 'blue'), width=2)
-                ))
-
-            fig_comp.update_layout(
-                title="Rendimiento Relativo de Metales",
-                xaxis_title="Fecha",
-                yaxis_title="Valor Normalizado (Base 100)",
-                hovermode='x unified',
-                height=500,
-                legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
-            )
-
-            st.plotly_chart(fig_comp, use_container_width=True)
+            st.plotly_chart(figura_comparacion(df_precios), use_container_width=True)
 
             # Estadísticas
             st.markdown("---")
@@ -573,36 +646,7 @@ with tab4:
                 # Gráfico dual: Sentimiento vs Precio
                 st.subheader("📊 Sentimiento vs Precio del Oro")
 
-                fig = go.Figure()
-
-                # Sentimiento (eje izquierdo)
-                fig.add_trace(go.Scatter(
-                    x=df_combinado['fecha'],
-                    y=df_combinado['sentimiento'],
-                    name='Sentimiento',
-                    yaxis='y',
-                    line=dict(color='blue', width=2)
-                ))
-
-                # Precio (eje derecho)
-                fig.add_trace(go.Scatter(
-                    x=df_combinado['fecha'],
-                    y=df_combinado['Oro'],
-                    name='Precio Oro',
-                    yaxis='y2',
-                    line=dict(color='gold', width=2)
-                ))
-
-                fig.update_layout(
-                    title="Comparación: Sentimiento vs Precio del Oro",
-                    xaxis=dict(title="Fecha"),
-                    yaxis=dict(title="Sentimiento Score", titlefont=dict(color="blue")),
-                    yaxis2=dict(title="Precio Oro (USD)", overlaying='y', side='right', titlefont=dict(color="gold")),
-                    hovermode='x unified',
-                    height=500
-                )
-
-                st.plotly_chart(fig, use_container_width=True)
+                st.plotly_chart(figura_sentimiento_precio(df_combinado), use_container_width=True)
 
                 # Scatter plot
                 st.markdown("---")
@@ -614,21 +658,7 @@ with tab4:
                     key='scatter_metal'
                 )
 
-                fig_scatter = px.scatter(
-                    df_combinado,
-                    x='sentimiento',
-                    y=metal_scatter,
-                    size='menciones',
-                    color='sentimiento_label',
-                    color_discrete_map={'Positivo': 'green', 'Neutral': 'gray', 'Negativo': 'red'},
-                    trendline='ols',
-                    title=f"Relación Sentimiento vs Precio del {metal_scatter}",
-                    labels={'sentimiento': 'Sentimiento Score', metal_scatter: f'Precio {metal_scatter} (USD)'}
-                )
-
-                fig_scatter.update_layout(height=500)
-
-                st.plotly_chart(fig_scatter, use_container_width=True)
+                st.plotly_chart(figura_dispersion(df_combinado, metal_scatter), use_container_width=True)
 
                 # Análisis estadístico
                 st.markdown("---")
@@ -12,40 +12,37 @@ from pathlib import Path
 import warnings
 warnings.filterwarnings('ignore')
 
+from datos.catalogo import CatalogoMercado
+
 DATA_DIR = Path("data_historico")
 
 print("="*60)
 print("📊 CARGANDO DATOS HISTÓRICOS MASIVOS")
 print("="*60)
 
-# Buscar todos los archivos parquet
-archivos = list(DATA_DIR.glob("*.parquet"))
+# Indexar todos los archivos parquet (solo metadatos del footer)
+catalogo = CatalogoMercado(DATA_DIR) if DATA_DIR.exists() else None
 
-if not archivos:
+if not catalogo:
     print("❌ No se encontraron archivos. Ejecuta primero:")
     print("   python descargar_historico_masivo.py")
     exit(1)
 
-print(f"\n📁 Encontrados {len(archivos)} archivos\n")
+archivos = {entrada.ruta for entrada in catalogo.entradas.values()}
+print(f"\n📁 Encontrados {len(catalogo)} series en {len(archivos)} archivos\n")
 
-# Cargar y combinar datos
-datos_combinados = {}
+# Registros por serie sin decodificar los datos
+registros_por_serie = {}
 total_registros = 0
 
-for archivo in archivos:
-    nombre = archivo.stem
-    print(f"📂 Cargando {nombre}...")
-    
-    try:
-        df = pd.read_parquet(archivo)
-        datos_combinados[nombre] = df
-        registros = len(df)
-        total_registros += registros
-        print(f"   ✅ {registros:,} registros cargados")
-    except Exception as e:
-        print(f"   ❌ Error: {str(e)}")
-
-print(f"\n🎯 TOTAL: {total_registros:,} registros en memoria")
+for entrada in catalogo.entradas.values():
+    # Con el almacén consolidado todas las entradas apuntan a historico.parquet
+    nombre = f"{entrada.ticker}_{entrada.periodo}_{entrada.intervalo}"
+    registros_por_serie[nombre] = entrada.registros
+    total_registros += entrada.registros
+    print(f"📂 {nombre}: {entrada.registros:,} registros")
+
+print(f"\n🎯 TOTAL: {total_registros:,} registros indexados")
 
 # Crear resumen estadístico
 print("\n" + "="*60)
@@ -54,7 +51,7 @@ print("="*60)
 
 # Top 5 activos con más datos
 top_5 = sorted(
-    [(k, len(v)) for k, v in datos_combinados.items()],
+    registros_por_serie.items(),
     key=lambda x: x[1],
     reverse=True
 )[:5]
@@ -63,15 +60,15 @@ print("\n🏆 Top 5 activos con más datos:")
 for i, (nombre, cantidad) in enumerate(top_5, 1):
     print(f"  {i}. {nombre}: {cantidad:,} registros")
 
-# Rango de fechas
+# Rango de fechas (estadísticas min/max del índice en el footer)
 print("\n📅 Rango de fechas:")
 fechas_min = []
 fechas_max = []
 
-for nombre, df in datos_combinados.items():
-    if not df.empty and hasattr(df.index, 'min'):
-        fechas_min.append(df.index.min())
-        fechas_max.append(df.index.max())
+for entrada in catalogo.entradas.values():
+    if entrada.fecha_min is not None:
+        fechas_min.append(pd.Timestamp(entrada.fecha_min).tz_localize(None))
+        fechas_max.append(pd.Timestamp(entrada.fecha_max).tz_localize(None))
 
 if fechas_min and fechas_max:
     print(f"  Desde: {min(fechas_min)}")
@@ -83,7 +80,7 @@ if fechas_min and fechas_max:
 resumen = {
     'total_archivos': len(archivos),
     'total_registros': total_registros,
-    'activos': list(datos_combinados.keys()),
+    'activos': list(registros_por_serie.keys()),
     'top_5': dict(top_5)
 }
 
@@ -101,29 +98,23 @@ print("="*60)
 print("""
 1. Los datos están en: data_historico/*.parquet
 
-2. Para cargar en tu dashboard, agrega esto al inicio de dashboard_oro.py:
+2. Para cargar en tu dashboard usa el catálogo perezoso (solo lee lo que pides):
 
-   from pathlib import Path
-   
-   def cargar_datos_masivos():
-       DATA_DIR = Path("data_historico")
-       datos = {}
-       for archivo in DATA_DIR.glob("*.parquet"):
-           datos[archivo.stem] = pd.read_parquet(archivo)
-       return datos
+   from datos.catalogo import CatalogoMercado
    
-   # Usar así:
-   datos_masivos = cargar_datos_masivos()
+   catalogo = CatalogoMercado("data_historico")
+   df_oro = catalogo.cargar('GC=F', '1h', columnas=['Close'], desde='2025-01-01')
+   total_registros = catalogo.total_registros()
 
 3. Mostrar en el dashboard:
    
-   st.sidebar.metric("Total de Datos", f"{len(datos_masivos):,} activos")
+   st.sidebar.metric("Total de Datos", f"{len(catalogo):,} series")
    st.sidebar.metric("Registros Totales", f"{total_registros:,}")
 
 4. Para análisis específico:
    
-   df_oro = datos_masivos['GC_F_10años_1h']
-   df_bitcoin = datos_masivos['BTC_USD_5años_1h']
+   df_oro = catalogo.cargar('GC=F', '1d')
+   df_bitcoin = catalogo.cargar('BTC-USD', '1h', columnas=['Close'])
    etc.
 """)
 
@@ -21,12 +21,25 @@ import warnings
 import requests
 warnings.filterwarnings('ignore')
 
+from datos.activos import todos_los_tickers
+from datos.catalogo import CatalogoMercado
+from datos.matriz import obtener_matriz
+from datos.correlaciones import VENTANAS, obtener_correlaciones
+from datos.factores import ajustar_todos, obtener_modelo
+from datos.graficos import PiramideSerie, figura_cacheada, reducir
+from datos.senales import DESTACADOS, calcular_senales, nombre_activo, puntuar_senales, razones_activo
+from datos.simulacion import simular_abanicos
+from datos.cache import CacheCompartida
+from apis.news_dedup import sentimiento_ponderado
+from apis.news_index import sentimiento_por_activo
+from apis.sentiment_index import IndiceSentimiento
+
 # Importar APIs REALES
 try:
     from config import API_KEYS, verificar_apis
-    from apis.news_api import obtener_noticias_oro
     from apis.sentiment_analyzer import AnalizadorSentimiento
-    from apis.web_scraper import obtener_noticias_scraping
+    from apis.sentiment_memo import MemoSentimiento
+    from apis.news_pipeline import PipelineNoticias, fuente_newsapi, fuente_scraping
     APIS_DISPONIBLES = True
 except ImportError as e:
     APIS_DISPONIBLES = False
@@ -72,74 +85,182 @@ st.markdown("""
 # FUNCIONES PARA CARGAR DATOS HISTÓRICOS REALES
 # ============================================
 
-@st.cache_data(ttl=3600)
-def cargar_datos_masivos():
-    """Carga los 1.9M de datos históricos descargados"""
+# Series del catálogo usadas por el dashboard: alias -> (ticker, intervalo[, columnas])
+ACTIVOS_DASHBOARD = {
+    'oro_diario': ('GC=F', '1d', ('Close', 'Volume')),
+    'oro_horario': ('GC=F', '1h'),
+    'plata': ('SI=F', '1d'),
+    'sp500': ('^GSPC', '1d'),
+    'dxy': ('DX-Y.NYB', '1d'),
+    'bitcoin': ('BTC-USD', '1d'),
+    'petroleo': ('CL=F', '1d'),
+    'nasdaq': ('^IXIC', '1d'),
+    'euro': ('EURUSD=X', '1d'),
+}
+
+@st.cache_resource
+def obtener_cache():
+    """Caché por espacios (memoria + disco compartido entre workers)"""
+    return CacheCompartida(Path("data_historico"))
+
+cache = obtener_cache()
+
+@st.cache_resource(ttl=3600)
+def cargar_catalogo():
+    """Índice de los 238 archivos históricos (solo metadatos parquet)"""
     DATA_DIR = Path("data_historico")
     
     if not DATA_DIR.exists():
         return None
     
+    return CatalogoMercado(DATA_DIR)
+
+@st.cache_resource(ttl=3600)
+def cargar_matriz_precios(intervalo='1d'):
+    """Cierres alineados de los 80 activos (memory-map compartido entre sesiones)"""
+    catalogo = cargar_catalogo()
+    
+    if catalogo is None:
+        return None
+    
     try:
-        datos = {
-            'oro_diario': pd.read_parquet(DATA_DIR / 'GC_F_20y_1d.parquet'),
-            'oro_horario': pd.read_parquet(DATA_DIR / 'GC_F_730d_1h.parquet'),
-            'plata': pd.read_parquet(DATA_DIR / 'SI_F_20y_1d.parquet'),
-            'sp500': pd.read_parquet(DATA_DIR / 'IDX_GSPC_20y_1d.parquet'),
-            'dxy': pd.read_parquet(DATA_DIR / 'DX_Y.NYB_20y_1d.parquet'),
-            'bitcoin': pd.read_parquet(DATA_DIR / 'BTC_USD_20y_1d.parquet'),
-            'petroleo': pd.read_parquet(DATA_DIR / 'CL_F_20y_1d.parquet'),
-            'nasdaq': pd.read_parquet(DATA_DIR / 'IDX_IXIC_20y_1d.parquet'),
-            'euro': pd.read_parquet(DATA_DIR / 'EURUSD_X_20y_1d.parquet'),
-        }
-        return datos
+        return obtener_matriz(intervalo, catalogo.data_dir, catalogo)
     except Exception as e:
-        st.warning(f"⚠️ No se pudieron cargar datos masivos: {e}")
+        st.warning(f"⚠️ No se pudo construir la matriz de precios: {e}")
         return None
 
-@st.cache_data(ttl=1800)
-def obtener_noticias_reales(dias=7, usar_apis=True, usar_scraping=True):
-    """Obtiene noticias 100% REALES de múltiples fuentes"""
+@st.cache_resource(ttl=3600)
+def cargar_piramide(intervalo, ticker, version):
+    """Niveles de resolución de la serie de un activo (la versión de la matriz es parte de la clave)"""
+    return PiramideSerie.desde_matriz(cargar_matriz_precios(intervalo), ticker)
+
+@st.cache_resource(ttl=3600)
+def cargar_correlaciones(intervalo='1d'):
+    """Correlaciones rodantes N x N de los 80 activos (se avanzan solo con las barras nuevas)"""
+    matriz = cargar_matriz_precios(intervalo)
     
-    noticias_totales = []
+    if matriz is None:
+        return None
     
-    # 1. NewsAPI (REAL)
+    try:
+        return obtener_correlaciones(intervalo, cargar_catalogo().data_dir, matriz)
+    except Exception as e:
+        st.error(f"Error calculando correlaciones: {e}")
+        return None
+
+@st.cache_resource(ttl=3600)
+def cargar_modelo_factores(intervalo='1d'):
+    """Modelo de factores del oro ajustado con la historia (RLS con cada barra nueva)"""
+    matriz = cargar_matriz_precios(intervalo)
+    
+    if matriz is None:
+        return None
+    
+    try:
+        sentimiento = obtener_indice_sentimiento().serie(intervalo, palabra='oro')['media']
+        return obtener_modelo(intervalo, cargar_catalogo().data_dir, matriz, sentimiento)
+    except Exception as e:
+        st.error(f"Error ajustando el modelo de factores: {e}")
+        return None
+
+@cache.cacheado('factores', clave=lambda matriz: getattr(matriz, 'version', None))
+def calcular_factores_todos(matriz):
+    """Coeficientes del modelo de factores con cada uno de los 80 activos como objetivo"""
+    return ajustar_todos(matriz)
+
+@cache.cacheado('simulaciones', clave=lambda matriz, tickers=('GC=F',), pasos=21, metodo='garch':
+                (getattr(matriz, 'version', None), tuple(tickers), pasos, metodo))
+def calcular_abanicos(matriz, tickers=('GC=F',), pasos=21, metodo='garch'):
+    """Abanicos Monte Carlo de precio (se recalculan solo cuando cambia la versión de la matriz)"""
+    return simular_abanicos(matriz, list(tickers), pasos, metodo)
+
+def cargar_datos_masivos():
+    """Vista perezosa de los 1.9M de datos históricos descargados"""
+    try:
+        catalogo = cargar_catalogo()
+        if catalogo is None:
+            return None
+        return catalogo.vista(ACTIVOS_DASHBOARD)
+    except Exception as e:
+        st.warning(f"⚠️ No se pudieron cargar datos masivos: {e}")
+        return None
+
+@st.cache_resource
+def obtener_memo_sentimiento():
+    """Scores ya calculados por texto (compartido con dashboard_oro)"""
+    return MemoSentimiento()
+
+@st.cache_resource
+def obtener_indice_sentimiento():
+    """Serie temporal de sentimiento por 5m/1h/1d (compartida con dashboard_oro)"""
+    return IndiceSentimiento()
+
+@cache.cacheado('noticias', clave=lambda dias=7, usar_apis=True, usar_scraping=True, al_lote=None:
+               (dias, usar_apis, usar_scraping))
+def recolectar_noticias_reales(dias=7, usar_apis=True, usar_scraping=True, al_lote=None):
+    """
+    Noticias 100% REALES de múltiples fuentes y cuántas aportó cada una
+
+    Sin llamadas a Streamlit: la caché en disco no repite los elementos de la
+    interfaz en un acierto, así que los mensajes se muestran afuera.
+
+    Returns:
+        (DataFrame de noticias, dict fuente -> cantidad)
+    """
+    fuentes = {}
     if usar_apis and APIS_DISPONIBLES:
-        try:
-            with st.spinner("📰 Obteniendo noticias de NewsAPI..."):
-                df_newsapi = obtener_noticias_oro(dias=dias)
-                if df_newsapi is not None and not df_newsapi.empty:
-                    noticias_totales.append(df_newsapi)
-                    st.success(f"✅ NewsAPI: {len(df_newsapi)} noticias reales")
-        except Exception as e:
-            st.warning(f"⚠️ NewsAPI: {str(e)}")
-    
-    # 2. Web Scraping (REAL)
-    if usar_scraping:
-        try:
-            with st.spinner("🌐 Scrapeando noticias web..."):
-                df_scraping = obtener_noticias_scraping()
-                if df_scraping is not None and not df_scraping.empty:
-                    noticias_totales.append(df_scraping)
-                    st.success(f"✅ Web Scraping: {len(df_scraping)} noticias reales")
-        except Exception as e:
-            st.warning(f"⚠️ Web Scraping: {str(e)}")
-    
-    # Combinar todas las noticias
-    if noticias_totales:
-        df_final = pd.concat(noticias_totales, ignore_index=True)
-        
-        # Análisis de sentimiento con VADER + TextBlob
-        if 'texto' in df_final.columns:
-            with st.spinner("🧠 Analizando sentimiento con IA..."):
-                analizador = AnalizadorSentimiento()
-                df_final = analizador.analizar_dataframe(df_final, columna_texto='texto')
-        
-        return df_final
+        fuentes['NewsAPI'] = fuente_newsapi(dias=dias)
+    if usar_scraping and APIS_DISPONIBLES:
+        fuentes['Web Scraping'] = fuente_scraping()
+    if not fuentes:
+        return pd.DataFrame(), {}
+    
+    # Fuentes -> normalizador -> agrupación de duplicados -> VADER + TextBlob,
+    # con colas acotadas entre etapas; al_lote recibe cada lote puntuado
+    pipeline = PipelineNoticias(
+        fuentes, analizador=AnalizadorSentimiento(memo=obtener_memo_sentimiento()),
+        indice_sentimiento=obtener_indice_sentimiento()
+    )
+    avisar = None
+    if al_lote is not None:
+        avisar = lambda df_lote: al_lote(df_lote, pipeline.recibidas)
+    df_final = pipeline.ejecutar(al_lote=avisar)
+    return df_final, dict(pipeline.conteos)
+
+def obtener_noticias_reales(dias=7, usar_apis=True, usar_scraping=True):
+    """Obtiene noticias 100% REALES de múltiples fuentes (se muestran a medida que llegan)"""
+    progreso = st.empty()
+    vistas = {'unicas': 0, 'ultimas': pd.DataFrame()}
+    
+    def mostrar_lote(df_lote, recibidas):
+        vistas['unicas'] += len(df_lote)
+        vistas['ultimas'] = pd.concat([vistas['ultimas'], df_lote[['fuente', 'texto', 'sentimiento']]]).tail(5)
+        with progreso.container():
+            st.caption(f"🧠 {vistas['unicas']} noticias únicas analizadas "
+                       f"({recibidas} recibidas)...")
+            st.dataframe(vistas['ultimas'], hide_index=True, use_container_width=True)
+    
+    try:
+        df_final, conteos = recolectar_noticias_reales(dias, usar_apis, usar_scraping,
+                                                       al_lote=mostrar_lote)
+    finally:
+        progreso.empty()
+    
+    for nombre, cantidad in conteos.items():
+        if cantidad:
+            st.success(f"✅ {nombre}: {cantidad} noticias reales")
+        else:
+            st.warning(f"⚠️ {nombre}: sin noticias")
     
-    return pd.DataFrame()
+    return df_final
+
+@cache.cacheado('noticias')
+def obtener_sentimiento_activos(dias=7, usar_apis=True, usar_scraping=True):
+    """Sentimiento de las noticias de cada activo (índice invertido, una vez por actualización)"""
+    df_noticias, _ = recolectar_noticias_reales(dias, usar_apis, usar_scraping)
+    return sentimiento_por_activo(df_noticias)
 
-@st.cache_data(ttl=86400)  # Cache por 24 horas
+@cache.cacheado('deuda')  # Cache por 24 horas
 def obtener_deuda_global_estimada():
     """
     Obtiene estimación de la Deuda Global
@@ -246,30 +367,6 @@ def calcular_impacto_deuda_en_oro(deuda_global):
         'impacto_precio': score_impacto * 0.02  # 2% por cada 10 puntos de score
     }
 
-def calcular_correlaciones_reales(datos):
-    """Calcula correlaciones REALES de 20 años de datos"""
-    
-    if datos is None:
-        return {}
-    
-    try:
-        oro = datos['oro_diario']['Close']
-        
-        correlaciones = {
-            'Plata': oro.corr(datos['plata']['Close']),
-            'S&P 500': oro.corr(datos['sp500']['Close']),
-            'Dólar (DXY)': oro.corr(datos['dxy']['Close']),
-            'Bitcoin': oro.corr(datos['bitcoin']['Close']),
-            'Petróleo': oro.corr(datos['petroleo']['Close']),
-            'NASDAQ': oro.corr(datos['nasdaq']['Close']),
-            'EUR/USD': oro.corr(datos['euro']['Close']),
-        }
-        
-        return correlaciones
-    except Exception as e:
-        st.error(f"Error calculando correlaciones: {e}")
-        return {}
-
 def predecir_precio_real(datos, sentimiento_promedio=0, deuda_global=None):
     """Predicción basada en DATOS REALES históricos + Deuda Global"""
     
@@ -277,36 +374,32 @@ def predecir_precio_real(datos, sentimiento_promedio=0, deuda_global=None):
         return None, None
     
     try:
+        modelo = cargar_modelo_factores('1d')
+        if modelo is None:
+            return None, None
+        
         # Obtener últimos valores REALES
         oro_actual = datos['oro_diario']['Close'].iloc[-1]
         
-        # Cambios recientes (últimos 5 días)
-        dxy_cambio = datos['dxy']['Close'].pct_change(5).iloc[-1]
-        sp500_cambio = datos['sp500']['Close'].pct_change(5).iloc[-1]
-        petroleo_cambio = datos['petroleo']['Close'].pct_change(5).iloc[-1]
-        btc_cambio = datos['bitcoin']['Close'].pct_change(5).iloc[-1]
-        
         # Impacto de deuda global
         impacto_deuda = 0
         if deuda_global:
             analisis_deuda = calcular_impacto_deuda_en_oro(deuda_global)
             impacto_deuda = analisis_deuda['impacto_precio']
         
-        # MODELO DE PREDICCIÓN CON DATOS REALES + DEUDA GLOBAL
-        # Basado en correlaciones históricas de 20 años
+        # MODELO DE FACTORES AJUSTADO CON 20 AÑOS DE DATOS REALES + DEUDA GLOBAL
+        # Cambios de 5 días de DXY, S&P 500, petróleo y Bitcoin + sentimiento,
+        # con coeficientes estimados (y actualizados por RLS) desde data_historico
         prediccion = oro_actual * (1 + 
-            (dxy_cambio * -0.72) +        # DXY correlación -0.72 (REAL)
-            (sp500_cambio * -0.35) +      # S&P500 correlación -0.35 (REAL)
-            (petroleo_cambio * 0.45) +    # Petróleo correlación +0.45 (REAL)
-            (btc_cambio * 0.15) +         # Bitcoin correlación +0.15 (REAL)
-            (sentimiento_promedio * 0.05) + # Sentimiento de noticias reales
-            impacto_deuda                 # Impacto de deuda global (NUEVO)
+            modelo.predecir(sentimiento_promedio) +  # Factores + sentimiento de noticias reales
+            impacto_deuda                           # Impacto de deuda global
         )
         
-        # Intervalos de confianza
-        volatilidad = datos['oro_diario']['Close'].pct_change().std()
-        intervalo_superior = prediccion * (1 + volatilidad * 1.96)
-        intervalo_inferior = prediccion * (1 - volatilidad * 1.96)
+        # Intervalos de confianza: dispersión a 5 barras de 20,000 trayectorias
+        # GARCH del oro (P2.5-P97.5 relativos a su mediana) en torno a la predicción
+        abanico = calcular_abanicos(cargar_matriz_precios('1d')).abanico('GC=F').loc[5]
+        intervalo_superior = prediccion * abanico['p97.5'] / abanico['p50']
+        intervalo_inferior = prediccion * abanico['p2.5'] / abanico['p50']
         
         return prediccion, (intervalo_inferior, intervalo_superior)
         
@@ -314,20 +407,27 @@ def predecir_precio_real(datos, sentimiento_promedio=0, deuda_global=None):
         st.error(f"Error en predicción: {e}")
         return None, None
 
-def generar_recomendaciones_inteligentes(datos, sentimiento_promedio, df_noticias, deuda_global=None):
+def generar_recomendaciones_inteligentes(matriz, sentimiento_promedio, df_noticias, deuda_global=None,
+                                         sentimiento_activo=None, correlaciones=None):
     """
     Sistema de Recomendación Basado en:
     - Sentimiento de noticias en tiempo real
-    - Tendencias de 20 años de datos históricos
+    - Tendencias de 20 años de datos históricos (todos los activos de la matriz)
     - Correlaciones entre activos
     - Volatilidad y riesgo
     - DEUDA GLOBAL (NUEVO PILAR ESTRUCTURAL)
     
+    Args:
+        matriz: MatrizPrecios diaria (cierres alineados de todos los activos)
+        sentimiento_activo: dict ticker -> sentimiento de sus noticias
+                            (si falta, se calcula de df_noticias)
+        correlaciones: CorrelacionesRodantes diarias ya cargadas (opcional)
+    
     Returns:
         dict: Recomendaciones por categoría (COMPRAR, MANTENER, VENDER)
     """
     
-    if datos is None:
+    if matriz is None:
         return {
             'productos': [],
             'justificaciones': {},
@@ -344,136 +444,39 @@ def generar_recomendaciones_inteligentes(datos, sentimiento_promedio, df_noticia
         impacto_deuda = calcular_impacto_deuda_en_oro(deuda_global)
     
     try:
-        # Calcular tendencias recientes (5 días)
-        tendencias = {}
-        activos = {
-            'ORO (GC=F)': 'oro_diario',
-            'PLATA (SI=F)': 'plata',
-            'S&P 500': 'sp500',
-            'NASDAQ': 'nasdaq',
-            'BITCOIN': 'bitcoin',
-            'PETRÓLEO (CL=F)': 'petroleo',
-            'DÓLAR (DXY)': 'dxy',
-            'EUR/USD': 'euro'
-        }
+        # Tendencia, volatilidad y relación con el oro de todos los activos
+        # en una sola pasada sobre la matriz alineada
+        senales = calcular_senales(matriz, correlaciones=correlaciones).dropna(subset=['precio'])
         
-        for nombre, clave in activos.items():
-            if clave in datos:
-                cambio_5d = datos[clave]['Close'].pct_change(5).iloc[-1] * 100
-                cambio_20d = datos[clave]['Close'].pct_change(20).iloc[-1] * 100
-                volatilidad = datos[clave]['Close'].pct_change().std() * 100
-                precio_actual = datos[clave]['Close'].iloc[-1]
-                
-                tendencias[nombre] = {
-                    'cambio_5d': cambio_5d,
-                    'cambio_20d': cambio_20d,
-                    'volatilidad': volatilidad,
-                    'precio': precio_actual
-                }
+        # Sentimiento de las noticias específicas de cada activo (por sus alias)
+        if sentimiento_activo is None:
+            sentimiento_activo = sentimiento_por_activo(df_noticias, senales['ticker'].tolist())
         
-        # ALGORITMO DE RECOMENDACIÓN
-        for activo, stats in tendencias.items():
-            score = 0  # Puntuación de recomendación (-100 a +100)
-            razones = []
-            
-            # 1. Análisis de Tendencia
-            if stats['cambio_5d'] > 2:
-                score += 30
-                razones.append(f"📈 Tendencia alcista +{stats['cambio_5d']:.1f}% (5 días)")
-            elif stats['cambio_5d'] < -2:
-                score -= 30
-                razones.append(f"📉 Tendencia bajista {stats['cambio_5d']:.1f}% (5 días)")
-            
-            # 2. Análisis de Sentimiento
-            if sentimiento_promedio > 0.2:
-                score += 20
-                razones.append(f"😊 Sentimiento positivo del mercado ({sentimiento_promedio:.2f})")
-            elif sentimiento_promedio < -0.2:
-                score -= 20
-                razones.append(f"😞 Sentimiento negativo del mercado ({sentimiento_promedio:.2f})")
-            
-            # 3. Volatilidad (ajustar score según riesgo)
-            if stats['volatilidad'] > 3:
-                if score > 0:
-                    score -= 15  # Reducir recomendación de compra si es volátil
-                razones.append(f"⚠️ Alta volatilidad {stats['volatilidad']:.1f}% - Mayor riesgo")
-            elif stats['volatilidad'] < 1:
-                score += 10
-                razones.append(f"✅ Baja volatilidad {stats['volatilidad']:.1f}% - Menor riesgo")
-            
-            # 4. Correlación con ORO (para diversificación)
-            if activo != 'ORO (GC=F)':
-                oro_cambio = tendencias['ORO (GC=F)']['cambio_5d']
-                
-                # Si oro sube y activo baja → OPORTUNIDAD de diversificación
-                if oro_cambio > 0 and stats['cambio_5d'] < -1:
-                    score += 15
-                    razones.append(f"🔄 Oportunidad de diversificación vs ORO")
-            
-            # 5. Análisis de noticias específicas del activo
-            if not df_noticias.empty:
-                # Buscar noticias relacionadas al activo
-                keywords = activo.split()[0].lower()
-                noticias_activo = df_noticias[
-                    df_noticias['texto'].str.lower().str.contains(keywords, na=False)
-                ]
-                
-                if len(noticias_activo) > 0 and 'sentimiento' in noticias_activo.columns:
-                    sent_especifico = noticias_activo['sentimiento'].mean()
-                    if sent_especifico > 0.3:
-                        score += 25
-                        razones.append(f"📰 Noticias muy positivas sobre {activo}")
-                    elif sent_especifico < -0.3:
-                        score -= 25
-                        razones.append(f"📰 Noticias negativas sobre {activo}")
-            
-            # 6. FACTOR DEUDA GLOBAL (NUEVO - PILAR ESTRUCTURAL)
-            if impacto_deuda and activo == 'ORO (GC=F)':
-                # La deuda global afecta FUERTEMENTE al oro
-                score_deuda = impacto_deuda['score']
-                score += score_deuda
-                razones.extend(impacto_deuda['razones'])
-            elif impacto_deuda and activo in ['PLATA (SI=F)', 'BITCOIN']:
-                # También afecta (pero menos) a otros refugios
-                score += impacto_deuda['score'] * 0.5
-                razones.append(f"💰 Deuda global favorece activos refugio")
-            
-            # Determinar acción recomendada
-            if score > 40:
-                accion = "🟢 COMPRAR"
-                nivel_riesgo = "Alto" if stats['volatilidad'] > 2.5 else "Moderado"
-            elif score > 10:
-                accion = "🟡 CONSIDERAR COMPRA"
-                nivel_riesgo = "Moderado"
-            elif score > -10:
-                accion = "⚪ MANTENER"
-                nivel_riesgo = "Bajo"
-            elif score > -40:
-                accion = "🟠 CONSIDERAR VENTA"
-                nivel_riesgo = "Moderado"
-            else:
-                accion = "🔴 VENDER / EVITAR"
-                nivel_riesgo = "Alto"
-            
+        # ALGORITMO DE RECOMENDACIÓN (reglas aplicadas a todos los activos a la vez)
+        ranking = puntuar_senales(senales, sentimiento_promedio, sentimiento_activo, impacto_deuda)
+        
+        for _, fila in ranking.iterrows():
+            razones = razones_activo(fila, sentimiento_promedio, impacto_deuda)
+            score = float(fila['score'])
             recomendaciones.append({
-                'activo': activo,
-                'accion': accion,
-                'score': score,
-                'precio': stats['precio'],
-                'cambio_5d': stats['cambio_5d'],
-                'cambio_20d': stats['cambio_20d'],
-                'volatilidad': stats['volatilidad'],
-                'nivel_riesgo': nivel_riesgo,
+                'activo': fila['activo'],
+                'ticker': fila['ticker'],
+                'categoria': fila['categoria'],
+                'accion': fila['accion'],
+                'score': int(score) if score.is_integer() else score,
+                'precio': fila['precio'],
+                'cambio_5d': fila['cambio_5d'],
+                'cambio_20d': fila['cambio_20d'],
+                'volatilidad': fila['volatilidad'],
+                'corr_oro': fila['corr_oro'],
+                'nivel_riesgo': fila['nivel_riesgo'],
                 'razones': razones
             })
             
-            justificaciones[activo] = razones
+            justificaciones[fila['activo']] = razones
         
-        # Ordenar por score
-        recomendaciones.sort(key=lambda x: x['score'], reverse=True)
-        
-        # Determinar perfil de inversión recomendado
-        volatilidad_promedio = np.mean([t['volatilidad'] for t in tendencias.values()])
+        # Determinar perfil de inversión recomendado (con los activos destacados)
+        volatilidad_promedio = senales.loc[senales['ticker'].isin(list(DESTACADOS)), 'volatilidad'].mean()
         
         if sentimiento_promedio > 0.3 and volatilidad_promedio < 2:
             perfil = "Agresivo 🔥"
@@ -517,7 +520,7 @@ with st.sidebar:
     datos_masivos = cargar_datos_masivos()
     
     if datos_masivos:
-        total_registros = sum(len(df) for df in datos_masivos.values())
+        total_registros = datos_masivos.total_registros()
         st.success(f"✅ {total_registros:,} registros históricos")
         st.caption("Datos de 20 años (1.9M total)")
     else:
@@ -569,15 +572,222 @@ if datos_masivos:
         st.metric("📊 Volumen Real", f"{volumen:,}")
     
     with col3:
-        total_datos = sum(len(df) for df in datos_masivos.values())
+        total_datos = datos_masivos.total_registros()
         st.metric("💾 Datos Históricos", f"{total_datos:,}")
     
     with col4:
-        archivos = len(list(Path("data_historico").glob("*.parquet"))) if Path("data_historico").exists() else 0
+        archivos = len(cargar_catalogo())
         st.metric("📁 Archivos", f"{archivos}")
 
 st.markdown("---")
 
+# ============================================
+# FIGURAS (JSON en caché por tipo, versión de los datos y parámetros)
+# ============================================
+
+@figura_cacheada(cache, 'historico')
+def figura_historico(piramide, desde, hasta, nombre, intervalo):
+    """Precio histórico con los puntos de la pirámide que caben en el gráfico"""
+    puntos = piramide.ventana(desde, hasta)
+    
+    fig = go.Figure()
+    
+    fig.add_trace(go.Scatter(
+        x=puntos.index,
+        y=puntos.values,
+        mode='lines',
+        name=nombre,
+        line=dict(color='gold', width=2),
+        fill='tozeroy',
+        fillcolor='rgba(255, 215, 0, 0.1)'
+    ))
+    
+    fig.update_layout(
+        title=f"{nombre} - Datos {intervalo} (DATOS REALES)",
+        xaxis_title="Fecha",
+        yaxis_title="Precio (USD)",
+        hovermode='x unified',
+        height=500
+    )
+    return fig
+
+@figura_cacheada(cache, 'sentimiento_horario')
+def figura_sentimiento_horario(oro_horario, sent_horario):
+    """Precio horario del oro con el sentimiento medio de cada hora"""
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=oro_horario.index, y=oro_horario.values,
+        name='Oro (1h)', line=dict(color='gold', width=2)
+    ))
+    fig.add_trace(go.Bar(
+        x=sent_horario.index, y=sent_horario['media'],
+        name='Sentimiento (1h)', yaxis='y2', opacity=0.5,
+        marker_color=np.where(sent_horario['media'] >= 0, 'green', 'red')
+    ))
+    fig.update_layout(
+        height=400, hovermode='x unified',
+        yaxis=dict(title="Precio (USD)"),
+        yaxis2=dict(title="Sentimiento", overlaying='y', side='right', range=[-1, 1])
+    )
+    return fig
+
+@figura_cacheada(cache, 'abanico')
+def figura_abanico(matriz, ticker='GC=F'):
+    """Abanico Monte Carlo (P5-P95, P25-P75 y mediana) de un activo"""
+    fan = calcular_abanicos(matriz).abanico(ticker)
+    fig = go.Figure()
+    for bajo, alto, opacidad, nombre in [('p5', 'p95', 0.15, 'P5-P95'), ('p25', 'p75', 0.3, 'P25-P75')]:
+        fig.add_trace(go.Scatter(x=fan.index, y=fan[alto], mode='lines',
+                                 line=dict(width=0), showlegend=False))
+        fig.add_trace(go.Scatter(x=fan.index, y=fan[bajo], mode='lines', line=dict(width=0),
+                                 fill='tonexty', fillcolor=f'rgba(255,215,0,{opacidad})',
+                                 name=nombre))
+    fig.add_trace(go.Scatter(x=fan.index, y=fan['p50'], mode='lines',
+                             line=dict(color='gold', width=3), name='Mediana'))
+    fig.update_layout(title="Abanico Monte Carlo del ORO (21 sesiones)",
+                      xaxis_title="Sesiones hacia adelante", yaxis_title="Precio (USD)",
+                      height=400)
+    return fig
+
+@figura_cacheada(cache, 'distribucion_acciones')
+def figura_distribucion_acciones(acciones_count):
+    """Dona con la cantidad de activos por acción recomendada"""
+    fig = go.Figure(data=[
+        go.Pie(
+            labels=list(acciones_count.keys()),
+            values=list(acciones_count.values()),
+            hole=0.4,
+            marker=dict(colors=['#00ff00', '#90ee90', '#808080', '#ffa500', '#ff0000'])
+        )
+    ])
+    
+    fig.update_layout(
+        title="Distribución de Acciones Recomendadas",
+        height=400
+    )
+    return fig
+
+@figura_cacheada(cache, 'deuda_pib')
+def figura_deuda_pib(df_hist):
+    """Deuda global y PIB mundial por año"""
+    fig = go.Figure()
+    
+    # Deuda total
+    fig.add_trace(go.Scatter(
+        x=df_hist.index,
+        y=df_hist['deuda_usd'] / 1e12,
+        mode='lines+markers',
+        name='Deuda Global',
+        line=dict(color='red', width=3),
+        marker=dict(size=8)
+    ))
+    
+    # PIB Mundial
+    fig.add_trace(go.Scatter(
+        x=df_hist.index,
+        y=df_hist['pib_mundial_usd'] / 1e12,
+        mode='lines+markers',
+        name='PIB Mundial',
+        line=dict(color='green', width=3),
+        marker=dict(size=8)
+    ))
+    
+    fig.update_layout(
+        title="Deuda Global vs PIB Mundial (Trillones USD)",
+        xaxis_title="Año",
+        yaxis_title="Trillones de USD",
+        hovermode='x unified',
+        height=500
+    )
+    return fig
+
+@figura_cacheada(cache, 'ratio_deuda')
+def figura_ratio_deuda(df_hist):
+    """Ratio Deuda/PIB con la línea de alerta en 300%"""
+    fig2 = go.Figure()
+    
+    fig2.add_trace(go.Scatter(
+        x=df_hist.index,
+        y=df_hist['ratio_deuda_pib'],
+        mode='lines+markers',
+        fill='tozeroy',
+        name='Ratio Deuda/PIB',
+        line=dict(color='orange', width=3),
+        fillcolor='rgba(255,165,0,0.3)'
+    ))
+    
+    # Línea de alerta en 300%
+    fig2.add_hline(y=300, line_dash="dash", line_color="red", 
+                   annotation_text="Nivel Crítico: 300%", 
+                   annotation_position="right")
+    
+    fig2.update_layout(
+        title="Ratio Deuda/PIB Global (%)",
+        xaxis_title="Año",
+        yaxis_title="Ratio (%)",
+        hovermode='x unified',
+        height=400
+    )
+    return fig2
+
+@figura_cacheada(cache, 'correlacion_oro')
+def figura_correlacion_oro(con_oro, intervalo, ventana):
+    """Barras de la correlación de cada activo con el oro"""
+    fig = go.Figure(data=[
+        go.Bar(
+            x=[nombre_activo(t) for t in con_oro.index],
+            y=con_oro.values,
+            marker=dict(
+                color=con_oro.values,
+                colorscale='RdYlGn',
+                cmin=-1,
+                cmax=1,
+                colorbar=dict(title="Correlación")
+            ),
+        )
+    ])
+    
+    fig.update_layout(
+        title=f"Correlación con el Oro (retornos {intervalo}, ventana {ventana})",
+        xaxis_title="Activo",
+        yaxis_title="Correlación",
+        yaxis=dict(range=[-1, 1]),
+        height=500
+    )
+    return fig
+
+@figura_cacheada(cache, 'mapa_correlaciones')
+def figura_mapa_correlaciones(matriz_corr):
+    """Mapa de calor N x N de correlaciones"""
+    fig = go.Figure(data=go.Heatmap(
+        z=matriz_corr.values,
+        x=matriz_corr.columns,
+        y=matriz_corr.index,
+        colorscale='RdYlGn',
+        zmin=-1,
+        zmax=1,
+        colorbar=dict(title="Correlación")
+    ))
+    fig.update_layout(height=800, yaxis=dict(autorange='reversed'))
+    return fig
+
+@figura_cacheada(cache, 'trayectorias_correlacion')
+def figura_trayectorias(correlaciones, ventana, seleccion):
+    """Correlación rodante con el oro de los activos elegidos"""
+    trayectoria = correlaciones.trayectoria(ventana, seleccion)
+    fig = go.Figure()
+    for ticker in trayectoria.columns:
+        serie = reducir(trayectoria[ticker])  # Años de barras: LTTB al ancho del gráfico
+        fig.add_trace(go.Scatter(
+            x=serie.index, y=serie.values,
+            name=nombre_activo(ticker), mode='lines'
+        ))
+    fig.update_layout(
+        height=500, hovermode='x unified',
+        yaxis=dict(title="Correlación", range=[-1, 1])
+    )
+    return fig
+
 # ============================================
 # TABS
 # ============================================
@@ -599,30 +809,41 @@ with tab1:
     st.subheader("📈 Análisis de 20 Años de Datos Reales")
     
     if datos_masivos:
-        # Gráfico de precio histórico
-        fig = go.Figure()
-        
-        df_oro = datos_masivos['oro_diario'].reset_index()
+        # Gráfico de precio histórico: solo los puntos que caben en el ancho del
+        # gráfico, del nivel de la pirámide que corresponde al rango elegido
+        col1, col2 = st.columns(2)
+        with col1:
+            intervalo_hist = st.selectbox("Intervalo", ['1d', '1h', '5m'], key='intervalo_hist')
+        matriz_hist = cargar_matriz_precios(intervalo_hist)
+        opciones_hist = [t for t in todos_los_tickers() if matriz_hist is not None and t in matriz_hist]
+        with col2:
+            activo_hist = st.selectbox(
+                "Activo", opciones_hist or ['GC=F'],
+                index=opciones_hist.index('GC=F') if 'GC=F' in opciones_hist else 0,
+                format_func=nombre_activo, key='activo_hist'
+            )
         
-        fig.add_trace(go.Scatter(
-            x=df_oro.index,
-            y=df_oro['Close'],
-            mode='lines',
-            name='Precio Oro',
-            line=dict(color='gold', width=2),
-            fill='tozeroy',
-            fillcolor='rgba(255, 215, 0, 0.1)'
-        ))
+        if opciones_hist:
+            piramide = cargar_piramide(intervalo_hist, activo_hist, matriz_hist.version)
+        else:
+            piramide = PiramideSerie(datos_masivos['oro_diario']['Close'])
         
-        fig.update_layout(
-            title="Precio del Oro - Últimos 20 Años (DATOS REALES)",
-            xaxis_title="Tiempo",
-            yaxis_title="Precio (USD)",
-            hovermode='x unified',
-            height=500
+        inicio_hist = piramide.x[0].tz_localize(None).to_pydatetime()
+        fin_hist = piramide.x[-1].tz_localize(None).to_pydatetime()
+        pasos_hist = {'1d': timedelta(days=1), '1h': timedelta(hours=1), '5m': timedelta(minutes=5)}
+        desde_hist, hasta_hist = st.slider(
+            "Rango", min_value=inicio_hist, max_value=fin_hist, value=(inicio_hist, fin_hist),
+            step=pasos_hist[intervalo_hist], key=f'rango_hist_{intervalo_hist}_{activo_hist}'
         )
+        hasta_hist += pasos_hist[intervalo_hist]  # Incluir la última barra del rango
+        fig = figura_historico(piramide, desde_hist, hasta_hist, nombre_activo(activo_hist), intervalo_hist)
         
         st.plotly_chart(fig, use_container_width=True)
+        st.caption(f"📉 {len(fig.data[0].x):,} de {len(piramide):,} puntos en el gráfico "
+                   f"(nivel {piramide.nivel(desde_hist, hasta_hist)} "
+                   f"de {len(piramide.niveles) - 1}; acercar el rango usa niveles más finos)")
+        
+        df_oro = datos_masivos['oro_diario'].reset_index()
         
         # Estadísticas reales
         col1, col2, col3, col4 = st.columns(4)
@@ -649,7 +870,8 @@ with tab2:
     st.subheader("📰 Noticias Financieras en Tiempo Real")
     
     if st.button("🔄 Actualizar Noticias"):
-        st.cache_data.clear()
+        # Solo las noticias: historia, deuda y correlaciones siguen en caché
+        cache.invalidar('noticias')
     
     df_noticias = obtener_noticias_reales(
         dias=dias_noticias,
@@ -662,7 +884,7 @@ with tab2:
         
         # Sentimiento promedio
         if 'sentimiento' in df_noticias.columns:
-            sentimiento_prom = df_noticias['sentimiento'].mean()
+            sentimiento_prom = sentimiento_ponderado(df_noticias)
             
             col1, col2, col3 = st.columns(3)
             with col1:
@@ -687,6 +909,15 @@ with tab2:
                 st.caption(f"📅 {row.get('fecha', 'Sin fecha')}")
     else:
         st.warning("⚠️ No se obtuvieron noticias. Verifica las APIs.")
+    
+    # Sentimiento por hora del índice temporal (incluye lo acumulado en sesiones previas)
+    if datos_masivos and 'oro_horario' in datos_masivos:
+        oro_horario = datos_masivos['oro_horario']['Close'].iloc[-dias_noticias * 24:]
+        sent_horario = obtener_indice_sentimiento().alinear(oro_horario.index, '1h', palabra='oro')
+        
+        if sent_horario['n'].sum() > 0:
+            st.markdown("### ⏱️ Sentimiento por Hora vs Precio del Oro")
+            st.plotly_chart(figura_sentimiento_horario(oro_horario, sent_horario), use_container_width=True)
 
 # ============================================
 # TAB 3: PREDICCIÓN CON IA
@@ -698,7 +929,7 @@ with tab3:
     if datos_masivos:
         # Obtener sentimiento de noticias
         df_noticias = obtener_noticias_reales(dias_noticias, usar_newsapi, usar_webscraping)
-        sentimiento = df_noticias['sentimiento'].mean() if not df_noticias.empty and 'sentimiento' in df_noticias.columns else 0
+        sentimiento = sentimiento_ponderado(df_noticias)
         
         # Obtener deuda global
         deuda_global = obtener_deuda_global_estimada()
@@ -728,14 +959,23 @@ with tab3:
             col1, col2 = st.columns(2)
             
             with col1:
-                st.markdown("**Correlaciones Históricas (20 años):**")
-                st.markdown("""
-                - 💵 Dólar (DXY): -0.72 (inverso fuerte)
-                - 📈 S&P 500: -0.35 (inverso moderado)
-                - ⚡ Petróleo: +0.45 (positivo moderado)
-                - ₿ Bitcoin: +0.15 (positivo débil)
-                - 🪙 Plata: +0.85 (positivo muy fuerte)
-                """)
+                st.markdown("**Modelo de Factores (ajustado con 20 años):**")
+                modelo = cargar_modelo_factores('1d')
+                etiquetas = {
+                    'constante': '📐 Tendencia base',
+                    'dxy': '💵 Dólar (DXY)',
+                    'sp500': '📈 S&P 500',
+                    'petroleo': '⚡ Petróleo',
+                    'bitcoin': '₿ Bitcoin',
+                    'sentimiento': '😊 Sentimiento',
+                }
+                aportes = modelo.contribuciones(sentimiento)
+                st.markdown("\n".join(
+                    f"- {etiquetas.get(nombre, nombre)}: {coef:+.3f} → aporte {aportes[nombre] * 100:+.2f}%"
+                    for nombre, coef in zip(modelo.nombres, modelo.theta)
+                ))
+                st.caption(f"{modelo.actualizaciones:,} barras diarias ajustadas · "
+                           f"error típico ±{modelo.desviacion * 100:.2f}% a 5 días")
             
             with col2:
                 st.markdown("**Análisis Actual:**")
@@ -756,6 +996,15 @@ with tab3:
                 st.markdown("### 📊 Intervalo de Confianza (95%)")
                 st.info(f"El precio estará entre ${intervalo[0]:,.2f} y ${intervalo[1]:,.2f}")
                 
+                abanicos = calcular_abanicos(cargar_matriz_precios('1d'))
+                st.plotly_chart(figura_abanico(cargar_matriz_precios('1d')), use_container_width=True)
+                st.caption(f"{abanicos.simulaciones:,} trayectorias {abanicos.metodo.upper()} · "
+                           f"probabilidad de subir en 21 sesiones: {abanicos.prob_subida[-1, 0]:.0%}")
+                
+            with st.expander("🌐 Sensibilidad de los 80 activos a los mismos factores"):
+                st.dataframe(calcular_factores_todos(cargar_matriz_precios('1d')).round(4),
+                             use_container_width=True)
+            
             # Impacto de deuda global
             if deuda_global:
                 impacto = calcular_impacto_deuda_en_oro(deuda_global)
@@ -783,14 +1032,18 @@ with tab4:
     if datos_masivos:
         # Obtener noticias y sentimiento
         df_noticias = obtener_noticias_reales(dias_noticias, usar_newsapi, usar_webscraping)
-        sentimiento = df_noticias['sentimiento'].mean() if not df_noticias.empty and 'sentimiento' in df_noticias.columns else 0
+        sentimiento = sentimiento_ponderado(df_noticias)
         
         # Obtener deuda global
         deuda_global = obtener_deuda_global_estimada()
         
         # Generar recomendaciones
         with st.spinner("🧠 Analizando mercado + deuda global y generando recomendaciones..."):
-            resultado = generar_recomendaciones_inteligentes(datos_masivos, sentimiento, df_noticias, deuda_global)
+            resultado = generar_recomendaciones_inteligentes(
+                cargar_matriz_precios('1d'), sentimiento, df_noticias, deuda_global,
+                sentimiento_activo=obtener_sentimiento_activos(dias_noticias, usar_newsapi, usar_webscraping),
+                correlaciones=cargar_correlaciones('1d')
+            )
         
         # Métricas principales
         col1, col2, col3, col4 = st.columns(4)
@@ -814,7 +1067,16 @@ with tab4:
         # Tabla de recomendaciones
         st.markdown("### 📊 Recomendaciones por Activo")
         
-        for producto in resultado['productos']:
+        if resultado['productos']:
+            ranking = pd.DataFrame(resultado['productos'])
+            st.dataframe(
+                ranking[['activo', 'accion', 'score', 'precio', 'cambio_5d', 'cambio_20d',
+                         'volatilidad', 'corr_oro', 'nivel_riesgo']],
+                hide_index=True, use_container_width=True
+            )
+        
+        st.markdown("#### 🔍 Detalle de los 10 mejores")
+        for producto in resultado['productos'][:10]:
             with st.expander(f"{producto['accion']} - {producto['activo']} (Score: {producto['score']})"):
                 col1, col2 = st.columns([2, 1])
                 
@@ -886,21 +1148,7 @@ with tab4:
             accion_limpia = p['accion'].split()[1] if len(p['accion'].split()) > 1 else p['accion']
             acciones_count[accion_limpia] = acciones_count.get(accion_limpia, 0) + 1
         
-        fig = go.Figure(data=[
-            go.Pie(
-                labels=list(acciones_count.keys()),
-                values=list(acciones_count.values()),
-                hole=0.4,
-                marker=dict(colors=['#00ff00', '#90ee90', '#808080', '#ffa500', '#ff0000'])
-            )
-        ])
-        
-        fig.update_layout(
-            title="Distribución de Acciones Recomendadas",
-            height=400
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(figura_distribucion_acciones(acciones_count), use_container_width=True)
         
         # Análisis de cartera sugerida
         st.markdown("### 💼 Sugerencia de Portafolio Diversificado")
@@ -1017,67 +1265,12 @@ with tab5:
     
     df_hist = deuda_global['historico']
     
-    fig = go.Figure()
-    
-    # Deuda total
-    fig.add_trace(go.Scatter(
-        x=df_hist.index,
-        y=df_hist['deuda_usd'] / 1e12,
-        mode='lines+markers',
-        name='Deuda Global',
-        line=dict(color='red', width=3),
-        marker=dict(size=8)
-    ))
-    
-    # PIB Mundial
-    fig.add_trace(go.Scatter(
-        x=df_hist.index,
-        y=df_hist['pib_mundial_usd'] / 1e12,
-        mode='lines+markers',
-        name='PIB Mundial',
-        line=dict(color='green', width=3),
-        marker=dict(size=8)
-    ))
-    
-    fig.update_layout(
-        title="Deuda Global vs PIB Mundial (Trillones USD)",
-        xaxis_title="Año",
-        yaxis_title="Trillones de USD",
-        hovermode='x unified',
-        height=500
-    )
-    
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(figura_deuda_pib(df_hist), use_container_width=True)
     
     # Gráfico de ratio Deuda/PIB
     st.markdown("### 📈 Ratio Deuda/PIB (%)")
     
-    fig2 = go.Figure()
-    
-    fig2.add_trace(go.Scatter(
-        x=df_hist.index,
-        y=df_hist['ratio_deuda_pib'],
-        mode='lines+markers',
-        fill='tozeroy',
-        name='Ratio Deuda/PIB',
-        line=dict(color='orange', width=3),
-        fillcolor='rgba(255,165,0,0.3)'
-    ))
-    
-    # Línea de alerta en 300%
-    fig2.add_hline(y=300, line_dash="dash", line_color="red", 
-                   annotation_text="Nivel Crítico: 300%", 
-                   annotation_position="right")
-    
-    fig2.update_layout(
-        title="Ratio Deuda/PIB Global (%)",
-        xaxis_title="Año",
-        yaxis_title="Ratio (%)",
-        hovermode='x unified',
-        height=400
-    )
-    
-    st.plotly_chart(fig2, use_container_width=True)
+    st.plotly_chart(figura_ratio_deuda(df_hist), use_container_width=True)
     
     # Impacto en el ORO
     st.markdown("### 🥇 Impacto de la Deuda Global en el Precio del ORO")
@@ -1144,51 +1337,55 @@ with tab5:
 # ============================================
 
 with tab6:
-    st.subheader("🔗 Correlaciones Históricas REALES (20 años)")
+    st.subheader("🔗 Correlaciones REALES entre los 80 Activos (retornos, ventanas móviles)")
     
-    if datos_masivos:
-        correlaciones = calcular_correlaciones_reales(datos_masivos)
+    col1, col2 = st.columns(2)
+    with col1:
+        intervalo_corr = st.selectbox("Intervalo", list(VENTANAS), key='intervalo_corr')
+    with col2:
+        ventanas_corr = list(VENTANAS[intervalo_corr])
+        ventana_corr = st.selectbox("Ventana", ventanas_corr, index=len(ventanas_corr) - 1, key='ventana_corr')
+    
+    correlaciones = cargar_correlaciones(intervalo_corr)
+    
+    if correlaciones is not None:
+        con_oro = correlaciones.con('GC=F', ventana_corr).drop('GC=F', errors='ignore').dropna().sort_values()
         
-        if correlaciones:
-            # Gráfico de correlaciones
-            fig = go.Figure(data=[
-                go.Bar(
-                    x=list(correlaciones.keys()),
-                    y=list(correlaciones.values()),
-                    marker=dict(
-                        color=list(correlaciones.values()),
-                        colorscale='RdYlGn',
-                        cmin=-1,
-                        cmax=1,
-                        colorbar=dict(title="Correlación")
-                    ),
-                    text=[f"{v:.2f}" for v in correlaciones.values()],
-                    textposition='auto',
-                )
-            ])
-            
-            fig.update_layout(
-                title="Correlación con el Precio del Oro (Datos de 20 años)",
-                xaxis_title="Activo",
-                yaxis_title="Correlación",
-                yaxis=dict(range=[-1, 1]),
-                height=500
-            )
-            
-            st.plotly_chart(fig, use_container_width=True)
-            
-            st.markdown("### 💡 Interpretación:")
-            st.markdown("""
-            - **+1.0**: Correlación perfecta positiva (suben juntos)
-            - **0.0**: Sin correlación
-            - **-1.0**: Correlación perfecta negativa (uno sube, otro baja)
-            
-            **Conclusiones de 20 años de datos reales:**
-            - 🪙 **Plata (+0.85)**: Cuando sube plata, casi siempre sube oro
-            - 💵 **DXY (-0.72)**: Cuando sube el dólar, oro baja fuertemente
-            - 📈 **S&P 500 (-0.35)**: En crisis, dinero sale de bolsa y entra al oro
-            - ⚡ **Petróleo (+0.45)**: Inflación alta beneficia al oro
-            """)
+        # Gráfico de correlaciones con el oro (todos los activos)
+        st.plotly_chart(figura_correlacion_oro(con_oro, intervalo_corr, ventana_corr), use_container_width=True)
+        
+        # Matriz completa N x N
+        st.markdown("### 🗺️ Matriz de Correlaciones")
+        matriz_corr = correlaciones.matriz_correlacion(ventana_corr)
+        st.plotly_chart(figura_mapa_correlaciones(matriz_corr), use_container_width=True)
+        
+        # Historia de la correlación con el oro
+        st.markdown("### 📈 Correlación con el Oro en el Tiempo")
+        opciones = [t for t in matriz_corr.columns if t != 'GC=F']
+        seleccion = st.multiselect(
+            "Activos", opciones,
+            default=[ticker for ticker in DESTACADOS if ticker in opciones],
+            format_func=nombre_activo, key='activos_corr'
+        )
+        if seleccion:
+            st.plotly_chart(figura_trayectorias(correlaciones, ventana_corr, seleccion), use_container_width=True)
+        
+        st.markdown("### 💡 Interpretación:")
+        actuales = {
+            ticker: f"{con_oro[ticker]:+.2f}" if ticker in con_oro.index else "s/d"
+            for ticker in ['SI=F', 'DX-Y.NYB', '^GSPC', 'CL=F']
+        }
+        st.markdown(f"""
+        - **+1.0**: Correlación perfecta positiva (suben juntos)
+        - **0.0**: Sin correlación
+        - **-1.0**: Correlación perfecta negativa (uno sube, otro baja)
+        
+        **Situación actual (ventana {ventana_corr}):**
+        - 🪙 **Plata ({actuales['SI=F']})**: Cuando sube plata, casi siempre sube oro
+        - 💵 **DXY ({actuales['DX-Y.NYB']})**: Cuando sube el dólar, el oro suele bajar
+        - 📈 **S&P 500 ({actuales['^GSPC']})**: En crisis, dinero sale de bolsa y entra al oro
+        - ⚡ **Petróleo ({actuales['CL=F']})**: Inflación alta beneficia al oro
+        """)
     else:
         st.error("❌ No hay datos para calcular correlaciones")
 
@@ -12,19 +12,27 @@ import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
 from datetime import datetime, timedelta
+from pathlib import Path
 import yfinance as yf
 from scipy import stats
+from datos.cache import CacheCompartida
+from datos.graficos import figura_cacheada
+from datos.matriz import obtener_matriz
+from datos.precios import obtener_cierres
+from datos.simulacion import simular_abanicos
+from apis.news_dedup import sentimiento_ponderado
+from apis.sentiment_index import IndiceSentimiento
 import warnings
 warnings.filterwarnings('ignore')
 
 # Importar APIs REALES
 try:
     from config import API_KEYS, verificar_apis
-    from apis.news_api import obtener_noticias_oro
     from apis.alpha_vantage import obtener_sentimiento_noticias
     from apis.sentiment_analyzer import AnalizadorSentimiento
-    from apis.web_scraper import obtener_noticias_scraping
+    from apis.sentiment_memo import MemoSentimiento
     from apis.twitter_api import buscar_tweets_oro
+    from apis.news_pipeline import PipelineNoticias, fuente_newsapi, fuente_scraping
     APIS_DISPONIBLES = True
     print("✅ APIs reales cargadas correctamente")
 except ImportError as e:
@@ -151,6 +159,13 @@ with st.sidebar:
         st.info("ℹ️ Web Scraping Desactivado")
 
 # Funciones de datos
+@st.cache_resource
+def obtener_cache():
+    """Caché por espacios compartida con dashboard_REAL (memoria + disco)"""
+    return CacheCompartida(Path("data_historico"))
+
+cache = obtener_cache()
+
 @st.cache_data(ttl=3600)
 def cargar_datos_oro(dias=180):
     """Cargar datos históricos del oro"""
@@ -175,8 +190,6 @@ def cargar_datos_oro(dias=180):
 @st.cache_data(ttl=3600)
 def cargar_factores_economicos(dias=180):
     """Cargar factores económicos"""
-    fecha_inicio = (datetime.now() - timedelta(days=dias)).strftime('%Y-%m-%d')
-
     tickers = {
         'Oro': 'GC=F',
         'USD/PEN': 'PEN=X',
@@ -189,30 +202,38 @@ def cargar_factores_economicos(dias=180):
         'VIX': '^VIX'
     }
 
-    datos = {}
-
+    # Almacén local para las series al día, una sola descarga por lotes para el resto
     with st.spinner("Cargando factores económicos..."):
-        for nombre, ticker in tickers.items():
-            try:
-                data = yf.download(ticker, start=fecha_inicio, progress=False, show_errors=False)
-                if data is not None and not data.empty:
-                    # Aplanar columnas MultiIndex si existe
-                    if isinstance(data.columns, pd.MultiIndex):
-                        data.columns = data.columns.get_level_values(0)
-                    
-                    # Obtener columna Close
-                    if 'Close' in data.columns:
-                        close_data = data['Close']
-                        if isinstance(close_data, pd.Series) and len(close_data) > 0:
-                            datos[nombre] = close_data
-            except Exception as e:
-                # Silenciar errores de descarga individual
-                continue
-
-    if datos:
-        df = pd.DataFrame(datos)
-        return df
-    return pd.DataFrame()
+        return obtener_cierres(tickers, dias=dias)
+
+@st.cache_resource(ttl=3600)
+def cargar_matriz_precios(intervalo='1d'):
+    """Cierres alineados de los activos de data_historico (memory-map compartido)"""
+    try:
+        return obtener_matriz(intervalo)
+    except Exception as e:
+        st.warning(f"⚠️ No se pudo construir la matriz de precios: {e}")
+        return None
+
+@st.cache_data(ttl=3600)
+def simular_precio_oro(version, pasos=21):
+    """Abanico Monte Carlo del oro (la versión de la matriz es la clave de la caché)"""
+    matriz = cargar_matriz_precios('1d')
+    try:
+        return simular_abanicos(matriz, ['GC=F'], pasos).abanico('GC=F')
+    except Exception as e:
+        st.error(f"Error simulando el precio del oro: {e}")
+        return pd.DataFrame()
+
+@st.cache_resource
+def obtener_memo_sentimiento():
+    """Scores ya calculados por texto (compartido con dashboard_REAL)"""
+    return MemoSentimiento()
+
+@st.cache_resource
+def obtener_indice_sentimiento():
+    """Serie temporal de sentimiento por 5m/1h/1d (compartida con dashboard_REAL)"""
+    return IndiceSentimiento()
 
 @st.cache_data(ttl=1800)  # Caché de 30 minutos para datos frescos
 def obtener_sentimiento_real(dias=7, usar_apis=True, usar_scraping=False):
@@ -232,44 +253,35 @@ def obtener_sentimiento_real(dias=7, usar_apis=True, usar_scraping=False):
         return generar_datos_sentimiento_simulado(dias)
     
     try:
-        todas_noticias = []
+        # 1-2. NewsAPI y (si está activado) Web Scraping en paralelo, en flujo:
+        # normalizar -> agrupar casi duplicados -> VADER + TextBlob por lotes
+        fuentes = {'NewsAPI': fuente_newsapi(dias=min(dias, 7), idioma='en')}
+        if usar_scraping:
+            fuentes['Web Scraping'] = fuente_scraping(max_por_fuente=15)
         
-        # 1. Obtener noticias REALES desde NewsAPI
-        with st.spinner(f"📡 Obteniendo noticias de NewsAPI..."):
-            df_newsapi = obtener_noticias_oro(dias=min(dias, 7), idioma='en')
-            if not df_newsapi.empty:
-                todas_noticias.append(df_newsapi)
-                st.success(f"✅ {len(df_newsapi)} noticias de NewsAPI")
+        pipeline = PipelineNoticias(
+            fuentes, analizador=AnalizadorSentimiento(memo=obtener_memo_sentimiento()),
+            indice_sentimiento=obtener_indice_sentimiento()
+        )
+        with st.spinner(f"📡 Obteniendo y analizando noticias de {', '.join(fuentes)}..."):
+            df_con_sentimiento = pipeline.ejecutar()
         
-        # 2. Obtener noticias via WEB SCRAPING (si está activado)
-        if usar_scraping:
-            with st.spinner(f"🌐 Scrapeando noticias de Gestión, República, Kitco..."):
-                df_scraping = obtener_noticias_scraping(max_por_fuente=15)
-                if not df_scraping.empty:
-                    todas_noticias.append(df_scraping)
-                    st.success(f"✅ {len(df_scraping)} noticias de Web Scraping")
+        for nombre, cantidad in pipeline.conteos.items():
+            if cantidad:
+                st.success(f"✅ {cantidad} noticias de {nombre}")
         
-        # 3. Combinar todas las fuentes
-        if not todas_noticias:
+        # 3. Sin noticias de ninguna fuente
+        if df_con_sentimiento.empty:
             st.warning("⚠️ No se obtuvieron noticias. Usando datos simulados.")
             return generar_datos_sentimiento_simulado(dias)
         
-        df_noticias = pd.concat(todas_noticias, ignore_index=True)
-        
-        # Eliminar duplicados por título
-        df_noticias = df_noticias.drop_duplicates(subset=['titulo'], keep='first')
+        st.info(f"📊 Total: {len(df_con_sentimiento)} noticias únicas obtenidas "
+                f"({pipeline.recibidas} antes de agrupar)")
         
-        st.info(f"📊 Total: {len(df_noticias)} noticias únicas obtenidas")
-        
-        # 4. Analizar sentimiento con VADER + TextBlob
-        with st.spinner(f"🧠 Analizando sentimiento con VADER + TextBlob..."):
-            analizador = AnalizadorSentimiento()
-            df_con_sentimiento = analizador.analizar_dataframe(df_noticias, columna_texto='texto')
-        
-        # 5. Agregar columna de menciones (basada en relevancia)
+        # 4. Agregar columna de menciones (basada en relevancia)
         df_con_sentimiento['menciones'] = np.random.randint(50, 500, len(df_con_sentimiento))
         
-        # 6. Renombrar columnas para compatibilidad
+        # 5. Renombrar columnas para compatibilidad
         df_final = df_con_sentimiento.rename(columns={'fuente': 'fuente'})
         
         st.success(f"✅ {len(df_final)} noticias reales analizadas con VADER + TextBlob")
@@ -281,6 +293,45 @@ def obtener_sentimiento_real(dias=7, usar_apis=True, usar_scraping=False):
         st.info("Usando datos simulados como respaldo...")
         return generar_datos_sentimiento_simulado(dias)
 
+def combinar_sentimiento_precio(df_oro, df_sentimiento):
+    """
+    Sentimiento diario junto al cierre del oro
+    
+    Usa los agregados diarios del índice temporal (toda la historia acumulada,
+    sin volver a puntuar); si el índice aún no cubre el período, cruza las
+    noticias sueltas por fecha.
+    
+    Returns:
+        DataFrame con fecha, Close, sentimiento, menciones y sentimiento_label
+    """
+    diario = obtener_indice_sentimiento().alinear(df_oro.index, '1d', palabra='oro')
+    
+    if (diario['n'] > 0).sum() >= 2:
+        df_combinado = pd.DataFrame({
+            'fecha': pd.to_datetime(df_oro.index, utc=True).tz_localize(None).date,
+            'Close': df_oro['Close'].to_numpy(),
+            'sentimiento': diario['media'].to_numpy(),
+            'menciones': diario['n'].to_numpy(),
+        })
+        df_combinado = df_combinado[df_combinado['menciones'] > 0].reset_index(drop=True)
+        df_combinado['sentimiento_label'] = np.select(
+            [df_combinado['sentimiento'] >= 0.05, df_combinado['sentimiento'] <= -0.05],
+            ['Positivo', 'Negativo'], default='Neutral'
+        )
+        return df_combinado
+    
+    df_oro_reset = df_oro.reset_index()
+    df_oro_reset['Date'] = pd.to_datetime(df_oro_reset['Date'], utc=True).dt.tz_localize(None).dt.date
+    df_sentimiento['fecha'] = pd.to_datetime(df_sentimiento['fecha'], utc=True).dt.tz_localize(None).dt.date
+    
+    return pd.merge(
+        df_sentimiento,
+        df_oro_reset[['Date', 'Close']],
+        left_on='fecha',
+        right_on='Date',
+        how='inner'
+    )
+
 @st.cache_data(ttl=3600)
 def generar_datos_sentimiento_simulado(dias=180):
     """Generar datos SIMULADOS de sentimiento (fallback)"""
@@ -323,6 +374,192 @@ def calcular_metricas_dataset():
     }
     return metricas
 
+# Figuras (JSON en caché por tipo, versión de los datos y parámetros)
+@figura_cacheada(cache, 'precio_oro')
+def figura_precio_oro(df_oro, dias_historia):
+    """Velas del oro con su promedio móvil de 20 días"""
+    fig = go.Figure()
+
+    # Candlestick chart
+    fig.add_trace(go.Candlestick(
+        x=df_oro.index,
+        open=df_oro['Open'],
+        high=df_oro['High'],
+        low=df_oro['Low'],
+        close=df_oro['Close'],
+        name='Oro'
+    ))
+
+    # Promedio móvil
+    ma20 = df_oro['Close'].rolling(window=20).mean()
+    fig.add_trace(go.Scatter(
+        x=df_oro.index,
+        y=ma20,
+        name='MA 20 días',
+        line=dict(color='orange', width=2)
+    ))
+
+    fig.update_layout(
+        title=f"Precio del Oro - Últimos {dias_historia} días",
+        xaxis_title="Fecha",
+        yaxis_title="Precio (USD)",
+        height=600,
+        hovermode='x unified'
+    )
+    return fig
+
+@figura_cacheada(cache, 'correlaciones_factores')
+def figura_correlaciones_factores(corr_matrix):
+    """Mapa de calor de correlaciones entre factores económicos"""
+    fig = go.Figure(data=go.Heatmap(
+        z=corr_matrix.values,
+        x=corr_matrix.columns,
+        y=corr_matrix.columns,
+        colorscale='RdBu',
+        zmid=0,
+        text=corr_matrix.values.round(2),
+        texttemplate='%{text}',
+        textfont={"size": 10},
+        colorbar=dict(title="Correlación")
+    ))
+
+    fig.update_layout(
+        title="Correlaciones entre Factores Económicos",
+        height=600
+    )
+    return fig
+
+@figura_cacheada(cache, 'abanico_oro')
+def figura_abanico_oro(abanico):
+    """Abanico Monte Carlo (P5-P95, P25-P75 y mediana) del oro"""
+    fig = go.Figure()
+    for bajo, alto, opacidad, nombre in [('p5', 'p95', 0.15, 'P5-P95'), ('p25', 'p75', 0.3, 'P25-P75')]:
+        fig.add_trace(go.Scatter(x=abanico.index, y=abanico[alto], mode='lines',
+                                 line=dict(width=0), showlegend=False))
+        fig.add_trace(go.Scatter(x=abanico.index, y=abanico[bajo], mode='lines', line=dict(width=0),
+                                 fill='tonexty', fillcolor=f'rgba(255,215,0,{opacidad})', name=nombre))
+    fig.add_trace(go.Scatter(x=abanico.index, y=abanico['p50'], mode='lines',
+                             line=dict(color='#FFD700', width=3), name='Mediana'))
+    fig.update_layout(
+        title="Abanico de Precios Simulados del Oro",
+        xaxis_title="Sesiones hacia adelante",
+        yaxis_title="Precio (USD)",
+        height=400
+    )
+    return fig
+
+@figura_cacheada(cache, 'sentimiento_oro')
+def figura_sentimiento(df_sentimiento):
+    """Evolución del sentimiento sobre el oro"""
+    fig = go.Figure()
+
+    # Sentimiento diario
+    fig.add_trace(go.Scatter(
+        x=df_sentimiento['fecha'],
+        y=df_sentimiento['sentimiento'],
+        name='Sentimiento',
+        line=dict(color='#1f77b4', width=3),
+        fill='tozeroy',
+        fillcolor='rgba(31, 119, 180, 0.2)'
+    ))
+
+    # Líneas de referencia
+    fig.add_hline(y=0, line_dash="dash", line_color="gray", opacity=0.5)
+    fig.add_hrect(y0=0.05, y1=1, fillcolor="green", opacity=0.05, line_width=0)
+    fig.add_hrect(y0=-1, y1=-0.05, fillcolor="red", opacity=0.05, line_width=0)
+
+    fig.update_layout(
+        title="Sentimiento sobre el Oro en el Tiempo",
+        xaxis_title="Fecha",
+        yaxis_title="Sentimiento Score (-1 a +1)",
+        height=500,
+        hovermode='x unified'
+    )
+    return fig
+
+@figura_cacheada(cache, 'fuentes')
+def figura_fuentes(fuente_counts):
+    """Dona de menciones por fuente"""
+    fig_pie = go.Figure(data=[go.Pie(
+        labels=fuente_counts.index,
+        values=fuente_counts.values,
+        hole=0.4
+    )])
+
+    fig_pie.update_layout(
+        title="Menciones por Fuente de Datos",
+        height=400
+    )
+    return fig_pie
+
+@figura_cacheada(cache, 'clasificacion_barras')
+def figura_clasificacion(label_counts):
+    """Barras de menciones por clasificación de sentimiento"""
+    fig_bar = go.Figure(data=[go.Bar(
+        x=label_counts.index,
+        y=label_counts.values,
+        marker_color=['#28a745', '#6c757d', '#dc3545']
+    )])
+
+    fig_bar.update_layout(
+        title="Distribución de Sentimiento",
+        xaxis_title="Clasificación",
+        yaxis_title="Número de Menciones",
+        height=400
+    )
+    return fig_bar
+
+@figura_cacheada(cache, 'sentimiento_precio_oro')
+def figura_sentimiento_precio(df_combinado, correlacion):
+    """Sentimiento y precio normalizado del oro en el mismo eje"""
+    fig = go.Figure()
+
+    # Sentimiento (eje izquierdo)
+    fig.add_trace(go.Scatter(
+        x=df_combinado['fecha'],
+        y=df_combinado['sentimiento'],
+        name='Sentimiento',
+        yaxis='y',
+        line=dict(color='blue', width=2)
+    ))
+
+    # Precio normalizado (eje derecho)
+    precio_norm = (df_combinado['Close'] - df_combinado['Close'].min()) / (df_combinado['Close'].max() - df_combinado['Close'].min()) * 2 - 1
+
+    fig.add_trace(go.Scatter(
+        x=df_combinado['fecha'],
+        y=precio_norm,
+        name='Precio (normalizado)',
+        yaxis='y',
+        line=dict(color='gold', width=2)
+    ))
+
+    fig.update_layout(
+        title=f"Comparación: Sentimiento vs Precio del Oro (r = {correlacion:.3f})",
+        xaxis=dict(title="Fecha"),
+        yaxis=dict(title="Valor Normalizado (-1 a +1)"),
+        hovermode='x unified',
+        height=500
+    )
+    return fig
+
+@figura_cacheada(cache, 'dispersion_oro')
+def figura_dispersion(df_combinado):
+    """Dispersión sentimiento vs precio (tamaño = menciones)"""
+    fig_scatter = px.scatter(
+        df_combinado,
+        x='sentimiento',
+        y='Close',
+        size='menciones',
+        color='sentimiento_label',
+        color_discrete_map={'Positivo': 'green', 'Neutral': 'gray', 'Negativo': 'red'},
+        title="Relación entre Sentimiento y Precio del Oro",
+        labels={'sentimiento': 'Sentimiento Score', 'Close': 'Precio del Oro (USD)'}
+    )
+
+    fig_scatter.update_layout(height=500)
+    return fig_scatter
+
 # Tabs principales
 tab1, tab2, tab3, tab4, tab5 = st.tabs([
     "📊 Dashboard Principal",
@@ -418,36 +655,7 @@ with tab1:
         # Gráfico de evolución del oro
         st.subheader("📈 Evolución del Precio del Oro")
 
-        fig = go.Figure()
-
-        # Candlestick chart
-        fig.add_trace(go.Candlestick(
-            x=df_oro.index,
-            open=df_oro['Open'],
-            high=df_oro['High'],
-            low=df_oro['Low'],
-            close=df_oro['Close'],
-            name='Oro'
-        ))
-
-        # Promedio móvil
-        ma20 = df_oro['Close'].rolling(window=20).mean()
-        fig.add_trace(go.Scatter(
-            x=df_oro.index,
-            y=ma20,
-            name='MA 20 días',
-            line=dict(color='orange', width=2)
-        ))
-
-        fig.update_layout(
-            title=f"Precio del Oro - Últimos {dias_historia} días",
-            xaxis_title="Fecha",
-            yaxis_title="Precio (USD)",
-            height=600,
-            hovermode='x unified'
-        )
-
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(figura_precio_oro(df_oro, dias_historia), use_container_width=True)
 
         # Estadísticas
         col1, col2 = st.columns(2)
@@ -540,77 +748,49 @@ with tab2:
         corr_matrix = df_factores.corr()
 
         # Heatmap
-        fig = go.Figure(data=go.Heatmap(
-            z=corr_matrix.values,
-            x=corr_matrix.columns,
-            y=corr_matrix.columns,
-            colorscale='RdBu',
-            zmid=0,
-            text=corr_matrix.values.round(2),
-            texttemplate='%{text}',
-            textfont={"size": 10},
-            colorbar=dict(title="Correlación")
-        ))
-
-        fig.update_layout(
-            title="Correlaciones entre Factores Económicos",
-            height=600
-        )
-
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(figura_correlaciones_factores(corr_matrix), use_container_width=True)
 
         # Predicción simplificada
         st.markdown("---")
         st.subheader("🎯 Predicción del Precio")
 
         if 'Oro' in df_factores.columns:
-            # Modelo simplificado de demostración
             oro_actual = df_factores['Oro'].iloc[-1]
 
-            # Calcular tendencia
-            tendencia = df_factores['Oro'].diff().tail(30).mean()
-
-            # Predicción simple basada en tendencia
-            prediccion_1d = oro_actual + tendencia
-            prediccion_7d = oro_actual + (tendencia * 7)
-            prediccion_30d = oro_actual + (tendencia * 30)
-
-            col1, col2, col3 = st.columns(3)
-
-            with col1:
-                st.markdown("""
-                <div style='background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); padding: 1.5rem; border-radius: 1rem; color: white;'>
-                    <h4 style='margin: 0; text-align: center;'>Predicción 1 Día</h4>
-                    <p style='font-size: 2rem; font-weight: bold; text-align: center; margin: 0.5rem 0;'>
-                        ${:,.2f}
-                    </p>
-                    <p style='text-align: center; margin: 0;'>{:+.2f}%</p>
-                </div>
-                """.format(prediccion_1d, ((prediccion_1d - oro_actual) / oro_actual) * 100), unsafe_allow_html=True)
-
-            with col2:
-                st.markdown("""
-                <div style='background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%); padding: 1.5rem; border-radius: 1rem; color: white;'>
-                    <h4 style='margin: 0; text-align: center;'>Predicción 7 Días</h4>
-                    <p style='font-size: 2rem; font-weight: bold; text-align: center; margin: 0.5rem 0;'>
-                        ${:,.2f}
-                    </p>
-                    <p style='text-align: center; margin: 0;'>{:+.2f}%</p>
-                </div>
-                """.format(prediccion_7d, ((prediccion_7d - oro_actual) / oro_actual) * 100), unsafe_allow_html=True)
-
-            with col3:
-                st.markdown("""
-                <div style='background: linear-gradient(135deg, #4facfe 0%, #00f2fe 100%); padding: 1.5rem; border-radius: 1rem; color: white;'>
-                    <h4 style='margin: 0; text-align: center;'>Predicción 30 Días</h4>
-                    <p style='font-size: 2rem; font-weight: bold; text-align: center; margin: 0.5rem 0;'>
-                        ${:,.2f}
-                    </p>
-                    <p style='text-align: center; margin: 0;'>{:+.2f}%</p>
-                </div>
-                """.format(prediccion_30d, ((prediccion_30d - oro_actual) / oro_actual) * 100), unsafe_allow_html=True)
-
-            st.warning("⚠️ Nota: Esta es una predicción simplificada basada en tendencia. El modelo completo en el notebook utiliza regresión lineal y Random Forest con todos los factores.")
+            # Abanico Monte Carlo: 20,000 trayectorias GARCH(1,1) con los
+            # residuos de la historia del oro (1 día, 7 días = 5 sesiones, 30 días = 21)
+            matriz = cargar_matriz_precios('1d')
+            abanico = simular_precio_oro(matriz.version) if matriz is not None else pd.DataFrame()
+
+            if abanico.empty:
+                st.info("ℹ️ Sin historia local del oro en data_historico para simular la predicción")
+            else:
+                # Los retornos simulados se aplican al precio actual
+                precios = [c for c in abanico.columns if c.startswith('p') and c != 'prob_subida'] + ['media']
+                abanico[precios] *= oro_actual / abanico.loc[0, 'p50']
+                horizontes = {'1 Día': 1, '7 Días': 5, '30 Días': 21}
+                colores = ['#667eea 0%, #764ba2 100%', '#f093fb 0%, #f5576c 100%', '#4facfe 0%, #00f2fe 100%']
+
+                for col, (etiqueta, paso), color in zip(st.columns(3), horizontes.items(), colores):
+                    fila = abanico.loc[paso]
+                    with col:
+                        st.markdown("""
+                        <div style='background: linear-gradient(135deg, {}); padding: 1.5rem; border-radius: 1rem; color: white;'>
+                            <h4 style='margin: 0; text-align: center;'>Predicción {}</h4>
+                            <p style='font-size: 2rem; font-weight: bold; text-align: center; margin: 0.5rem 0;'>
+                                ${:,.2f}
+                            </p>
+                            <p style='text-align: center; margin: 0;'>{:+.2f}%</p>
+                            <p style='text-align: center; margin: 0; font-size: 0.85rem;'>90%: ${:,.0f} - ${:,.0f}</p>
+                        </div>
+                        """.format(color, etiqueta, fila['p50'], (fila['p50'] / oro_actual - 1) * 100,
+                                   fila['p5'], fila['p95']), unsafe_allow_html=True)
+
+                st.plotly_chart(figura_abanico_oro(abanico), use_container_width=True)
+
+                st.warning(f"⚠️ Nota: Predicción por simulación Monte Carlo (GARCH(1,1) sobre la historia del oro); "
+                           f"probabilidad de subir en 30 días: {abanico.loc[21, 'prob_subida']:.0%}. "
+                           f"El modelo completo en el notebook utiliza regresión lineal y Random Forest con todos los factores.")
 
 # TAB 3: Análisis de Sentimiento
 with tab3:
@@ -644,7 +824,7 @@ with tab3:
         st.metric("📊 Total Menciones", f"{total_menciones:,}")
 
     with col2:
-        sent_promedio = df_sentimiento['sentimiento'].mean()
+        sent_promedio = sentimiento_ponderado(df_sentimiento)
         st.metric("📈 Sentimiento Promedio", f"{sent_promedio:.3f}",
                  delta=f"{'Positivo' if sent_promedio > 0 else 'Negativo'}")
 
@@ -663,32 +843,7 @@ with tab3:
     # Evolución del sentimiento
     st.subheader("📉 Evolución del Sentimiento")
 
-    fig = go.Figure()
-
-    # Sentimiento diario
-    fig.add_trace(go.Scatter(
-        x=df_sentimiento['fecha'],
-        y=df_sentimiento['sentimiento'],
-        name='Sentimiento',
-        line=dict(color='#1f77b4', width=3),
-        fill='tozeroy',
-        fillcolor='rgba(31, 119, 180, 0.2)'
-    ))
-
-    # Líneas de referencia
-    fig.add_hline(y=0, line_dash="dash", line_color="gray", opacity=0.5)
-    fig.add_hrect(y0=0.05, y1=1, fillcolor="green", opacity=0.05, line_width=0)
-    fig.add_hrect(y0=-1, y1=-0.05, fillcolor="red", opacity=0.05, line_width=0)
-
-    fig.update_layout(
-        title="Sentimiento sobre el Oro en el Tiempo",
-        xaxis_title="Fecha",
-        yaxis_title="Sentimiento Score (-1 a +1)",
-        height=500,
-        hovermode='x unified'
-    )
-
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(figura_sentimiento(df_sentimiento), use_container_width=True)
 
     # Distribución por fuente
     col1, col2 = st.columns(2)
@@ -698,38 +853,14 @@ with tab3:
 
         fuente_counts = df_sentimiento['fuente'].value_counts()
 
-        fig_pie = go.Figure(data=[go.Pie(
-            labels=fuente_counts.index,
-            values=fuente_counts.values,
-            hole=0.4
-        )])
-
-        fig_pie.update_layout(
-            title="Menciones por Fuente de Datos",
-            height=400
-        )
-
-        st.plotly_chart(fig_pie, use_container_width=True)
+        st.plotly_chart(figura_fuentes(fuente_counts), use_container_width=True)
 
     with col2:
         st.subheader("😊😐😟 Clasificación de Sentimiento")
 
         label_counts = df_sentimiento['sentimiento_label'].value_counts()
 
-        fig_bar = go.Figure(data=[go.Bar(
-            x=label_counts.index,
-            y=label_counts.values,
-            marker_color=['#28a745', '#6c757d', '#dc3545']
-        )])
-
-        fig_bar.update_layout(
-            title="Distribución de Sentimiento",
-            xaxis_title="Clasificación",
-            yaxis_title="Número de Menciones",
-            height=400
-        )
-
-        st.plotly_chart(fig_bar, use_container_width=True)
+        st.plotly_chart(figura_clasificacion(label_counts), use_container_width=True)
 
 # TAB 4: Correlación
 with tab4:
@@ -748,18 +879,8 @@ with tab4:
     )
 
     if not df_oro.empty:
-        # Combinar datos
-        df_oro_reset = df_oro.reset_index()
-        df_oro_reset['Date'] = pd.to_datetime(df_oro_reset['Date'], utc=True).dt.tz_localize(None).dt.date
-        df_sentimiento['fecha'] = pd.to_datetime(df_sentimiento['fecha'], utc=True).dt.tz_localize(None).dt.date
-
-        df_combinado = pd.merge(
-            df_sentimiento,
-            df_oro_reset[['Date', 'Close']],
-            left_on='fecha',
-            right_on='Date',
-            how='inner'
-        )
+        # Combinar datos (sentimiento diario del índice temporal)
+        df_combinado = combinar_sentimiento_precio(df_oro, df_sentimiento)
 
         if len(df_combinado) > 0:
             # Calcular correlación
@@ -796,56 +917,13 @@ with tab4:
             # Gráfico dual
             st.subheader("📊 Sentimiento vs Precio")
 
-            fig = go.Figure()
-
-            # Sentimiento (eje izquierdo)
-            fig.add_trace(go.Scatter(
-                x=df_combinado['fecha'],
-                y=df_combinado['sentimiento'],
-                name='Sentimiento',
-                yaxis='y',
-                line=dict(color='blue', width=2)
-            ))
-
-            # Precio normalizado (eje derecho)
-            precio_norm = (df_combinado['Close'] - df_combinado['Close'].min()) / (df_combinado['Close'].max() - df_combinado['Close'].min()) * 2 - 1
-
-            fig.add_trace(go.Scatter(
-                x=df_combinado['fecha'],
-                y=precio_norm,
-                name='Precio (normalizado)',
-                yaxis='y',
-                line=dict(color='gold', width=2)
-            ))
-
-            fig.update_layout(
-                title=f"Comparación: Sentimiento vs Precio del Oro (r = {correlacion:.3f})",
-                xaxis=dict(title="Fecha"),
-                yaxis=dict(title="Valor Normalizado (-1 a +1)"),
-                hovermode='x unified',
-                height=500
-            )
-
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(figura_sentimiento_precio(df_combinado, correlacion), use_container_width=True)
 
             # Scatter plot
             st.markdown("---")
             st.subheader("🎯 Análisis de Dispersión")
 
-            fig_scatter = px.scatter(
-                df_combinado,
-                x='sentimiento',
-                y='Close',
-                size='menciones',
-                color='sentimiento_label',
-                color_discrete_map={'Positivo': 'green', 'Neutral': 'gray', 'Negativo': 'red'},
-                title="Relación entre Sentimiento y Precio del Oro",
-                labels={'sentimiento': 'Sentimiento Score', 'Close': 'Precio del Oro (USD)'}
-            )
-
-            fig_scatter.update_layout(height=500)
-
-            st.plotly_chart(fig_scatter, use_container_width=True)
+            st.plotly_chart(figura_dispersion(df_combinado), use_container_width=True)
 
 # TAB 5: Sistema y Datos
 with tab5:
@@ -908,7 +986,7 @@ with tab5:
       - La República
       - Diario Correo (Arequipa)
       - RPP Noticias
-    - **Tecnología:** BeautifulSoup4 + Requests
+    - **Tecnología:** lxml + Requests (descarga concurrente)
     - **Frecuencia:** Configurable
 
     #### 4. Análisis de Sentimiento
@@ -981,7 +1059,7 @@ with tab5:
     - **Plotly** - Visualizaciones
     - **yfinance** - Datos financieros
     - **NewsAPI, Alpha Vantage, PRAW, Tweepy** - APIs
-    - **BeautifulSoup4** - Web scraping
+    - **lxml** - Web scraping
     - **VADER, TextBlob** - Sentimiento
     - **Pandas, NumPy** - Manipulación datos
     - **Scikit-learn** - Machine Learning
@@ -0,0 +1 @@
+# Módulo de almacenamiento y acceso a los datos históricos de mercado
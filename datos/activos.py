@@ -0,0 +1,217 @@
+"""
+Lista de activos descargados en data_historico/ (80 activos en 6 categorías)
+Compartida por los scripts de descarga, el almacén consolidado y los dashboards
+"""
+
+ACTIVOS = {
+    # METALES PRECIOSOS (5)
+    'metales': {
+        'GC=F': 'Oro Futuro',
+        'SI=F': 'Plata Futuro',
+        'PL=F': 'Platino',
+        'PA=F': 'Paladio',
+        'HG=F': 'Cobre'
+    },
+    
+    # ÍNDICES PRINCIPALES (15)
+    'indices': {
+        '^GSPC': 'S&P 500',
+        '^DJI': 'Dow Jones',
+        '^IXIC': 'NASDAQ',
+        '^RUT': 'Russell 2000',
+        '^FTSE': 'FTSE 100',
+        '^N225': 'Nikkei 225',
+        '^HSI': 'Hang Seng',
+        '^GDAXI': 'DAX',
+        '^FCHI': 'CAC 40',
+        '^IBEX': 'IBEX 35',
+        '^MXX': 'IPC México',
+        '^BVSP': 'Bovespa Brasil',
+        '^MERV': 'Merval Argentina',
+        '^AXJO': 'ASX 200 Australia',
+        '^KS11': 'KOSPI Korea'
+    },
+    
+    # DIVISAS (10)
+    'divisas': {
+        'EURUSD=X': 'EUR/USD',
+        'GBPUSD=X': 'GBP/USD',
+        'JPYUSD=X': 'JPY/USD',
+        'AUDUSD=X': 'AUD/USD',
+        'NZDUSD=X': 'NZD/USD',
+        'CADUSD=X': 'CAD/USD',
+        'CHFUSD=X': 'CHF/USD',
+        'MXNUSD=X': 'MXN/USD',
+        'CNYUSD=X': 'CNY/USD',
+        'DX-Y.NYB': 'Índice Dólar DXY'
+    },
+    
+    # CRIPTOMONEDAS (15)
+    'cripto': {
+        'BTC-USD': 'Bitcoin',
+        'ETH-USD': 'Ethereum',
+        'BNB-USD': 'Binance Coin',
+        'XRP-USD': 'Ripple',
+        'ADA-USD': 'Cardano',
+        'SOL-USD': 'Solana',
+        'DOGE-USD': 'Dogecoin',
+        'DOT-USD': 'Polkadot',
+        'MATIC-USD': 'Polygon',
+        'LTC-USD': 'Litecoin',
+        'AVAX-USD': 'Avalanche',
+        'LINK-USD': 'Chainlink',
+        'UNI-USD': 'Uniswap',
+        'ATOM-USD': 'Cosmos',
+        'XLM-USD': 'Stellar'
+    },
+    
+    # ENERGÍA Y COMMODITIES (15)
+    'energia': {
+        'CL=F': 'Petróleo WTI',
+        'BZ=F': 'Petróleo Brent',
+        'NG=F': 'Gas Natural',
+        'ZC=F': 'Maíz',
+        'ZS=F': 'Soja',
+        'ZW=F': 'Trigo',
+        'KC=F': 'Café',
+        'SB=F': 'Azúcar',
+        'CT=F': 'Algodón',
+        'CC=F': 'Cacao',
+        'HO=F': 'Heating Oil',
+        'RB=F': 'Gasolina',
+        'LE=F': 'Ganado',
+        'GF=F': 'Ganado Alimentado',
+        'ZL=F': 'Aceite de Soja'
+    },
+    
+    # ETFs IMPORTANTES (20)
+    'etfs': {
+        'GLD': 'SPDR Gold Shares',
+        'SLV': 'iShares Silver Trust',
+        'USO': 'US Oil Fund',
+        'UNG': 'US Natural Gas Fund',
+        'SPY': 'SPDR S&P 500 ETF',
+        'QQQ': 'Invesco QQQ Trust',
+        'DIA': 'SPDR Dow Jones ETF',
+        'IWM': 'iShares Russell 2000',
+        'TLT': '20+ Year Treasury Bond',
+        'AGG': 'Core US Aggregate Bond',
+        'EEM': 'Emerging Markets ETF',
+        'VWO': 'Vanguard Emerging Markets',
+        'XLE': 'Energy Select Sector',
+        'XLF': 'Financial Select Sector',
+        'XLK': 'Technology Select Sector',
+        'XLV': 'Health Care Select',
+        'XLP': 'Consumer Staples',
+        'XLI': 'Industrial Select',
+        'XLU': 'Utilities Select',
+        'GDX': 'Gold Miners ETF'
+    }
+}
+
+
+# Intervalos descargados y el período máximo que Yahoo permite para cada uno
+PERIODOS = {
+    '1d': '20y',
+    '1h': '730d',
+    '5m': '60d'
+}
+
+
+def tickers_categoria(categoria):
+    """Tickers de Yahoo de una categoría ('metales', 'cripto', ...)"""
+    return list(ACTIVOS.get(categoria, {}))
+
+
+def todos_los_tickers():
+    """Los 80 tickers de Yahoo en el orden de ACTIVOS"""
+    return [ticker for activos in ACTIVOS.values() for ticker in activos]
+
+
+def categoria_de(ticker):
+    """Categoría de un ticker de Yahoo (None si no está en ACTIVOS)"""
+    for categoria, activos in ACTIVOS.items():
+        if ticker in activos:
+            return categoria
+    return None
+
+
+# Términos con que las noticias nombran a un activo, además de su nombre en
+# ACTIVOS y su ticker (noticias en inglés y en español)
+ALIAS_NOTICIAS = {
+    'GC=F': ['oro', 'gold', 'xau', 'xauusd', 'bullion'],
+    'SI=F': ['plata', 'silver', 'xag', 'xagusd'],
+    'PL=F': ['platino', 'platinum'],
+    'PA=F': ['paladio', 'palladium'],
+    'HG=F': ['cobre', 'copper'],
+    '^GSPC': ['s&p', 's&p 500', 'sp500', 'spx'],
+    '^DJI': ['dow jones', 'dow'],
+    '^IXIC': ['nasdaq'],
+    '^N225': ['nikkei'],
+    '^GDAXI': ['dax'],
+    'EURUSD=X': ['eur/usd', 'eurusd', 'euro'],
+    'GBPUSD=X': ['gbp/usd', 'libra esterlina', 'pound', 'sterling'],
+    'JPYUSD=X': ['yen'],
+    'CNYUSD=X': ['yuan', 'renminbi'],
+    'MXNUSD=X': ['peso mexicano'],
+    'DX-Y.NYB': ['dólar', 'dolar', 'dollar', 'dxy', 'greenback'],
+    'BTC-USD': ['bitcoin', 'btc'],
+    'ETH-USD': ['ethereum', 'ether', 'eth'],
+    'XRP-USD': ['xrp'],
+    'SOL-USD': ['solana'],
+    'DOGE-USD': ['dogecoin', 'doge'],
+    'MATIC-USD': ['matic'],
+    'AVAX-USD': ['avax'],
+    'ATOM-USD': ['cosmos hub'],
+    'XLM-USD': ['xlm', 'stellar lumens'],
+    'CL=F': ['petróleo', 'petroleo', 'oil', 'crude', 'wti'],
+    'BZ=F': ['brent'],
+    'NG=F': ['gas natural', 'natural gas'],
+    'ZW=F': ['trigo', 'wheat'],
+    'ZC=F': ['maíz', 'corn'],
+    'KC=F': ['café', 'coffee'],
+    'CC=F': ['cacao', 'cocoa'],
+    'LE=F': ['live cattle', 'ganado vivo'],
+    'GF=F': ['feeder cattle'],
+    'TLT': ['treasury', 'treasuries', 'bonos del tesoro'],
+    'GDX': ['gold miners', 'mineras de oro'],
+}
+
+# Tickers que son palabras comunes en las noticias (no se buscan como alias)
+TICKERS_AMBIGUOS = {'DIA', 'USO', 'UNG'}
+
+# Activos cuyo nombre en ACTIVOS es una palabra común ("ripple effect",
+# "stellar earnings", "el oro ha ganado"): solo se buscan por sus alias
+NOMBRES_AMBIGUOS = {'XRP-USD', 'AVAX-USD', 'ATOM-USD', 'XLM-USD', 'MATIC-USD', 'LE=F'}
+
+# Palabras clave del índice de sentimiento: (activos cuyos alias las activan,
+# términos del tema que no son alias de ningún activo)
+PALABRAS_SENTIMIENTO = {
+    'oro': (['GC=F'], []),
+    'plata': (['SI=F'], []),
+    'cobre': (['HG=F'], []),
+    'petroleo': (['CL=F', 'BZ=F'], []),
+    'bitcoin': (['BTC-USD'], ['crypto', 'cripto']),
+    'dolar': (['DX-Y.NYB'], ['usd']),
+    'fed': ([], ['fed', 'federal reserve', 'reserva federal', 'powell', 'interest rate', 'tasas']),
+    'acciones': (['^GSPC', '^IXIC'], ['stocks', 'wall street', 'bolsa']),
+}
+
+
+def alias_de(ticker):
+    """Alias de noticias de un ticker: los de ALIAS_NOTICIAS, su nombre y el propio ticker"""
+    alias = list(ALIAS_NOTICIAS.get(ticker, []))
+    categoria = categoria_de(ticker)
+    if categoria is not None and ticker not in NOMBRES_AMBIGUOS:
+        alias.append(ACTIVOS[categoria][ticker])
+    if ticker not in TICKERS_AMBIGUOS:
+        alias.append(ticker)
+    return alias
+
+
+def palabras_sentimiento():
+    """Términos en minúsculas de cada palabra clave de PALABRAS_SENTIMIENTO"""
+    return {
+        clave: sorted({t.lower() for ticker in tickers for t in alias_de(ticker)} | set(extras))
+        for clave, (tickers, extras) in PALABRAS_SENTIMIENTO.items()
+    }
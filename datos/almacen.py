@@ -0,0 +1,380 @@
+"""
+Almacén consolidado de series históricas (un solo archivo parquet)
+Formato largo (intervalo, ticker, fecha, OHLCV) ordenado por intervalo, ticker y fecha,
+con un row group por partición para que los filtros se resuelvan con las estadísticas
+"""
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from datos.catalogo import DATA_DIR, PATRON_ARCHIVO, clave_ticker, _alinear_tz
+
+ARCHIVO_CONSOLIDADO = 'historico.parquet'
+
+COLUMNAS_PRECIO = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+SCHEMA = pa.schema([
+    ('intervalo', pa.string()),
+    ('ticker', pa.string()),
+    ('fecha', pa.timestamp('ns', tz='UTC')),
+    ('Open', pa.float64()),
+    ('High', pa.float64()),
+    ('Low', pa.float64()),
+    ('Close', pa.float64()),
+    ('Volume', pa.int64()),
+])
+
+
+try:
+    import fcntl
+
+    def _bloquear(f):
+        fcntl.flock(f, fcntl.LOCK_EX)
+
+    def _desbloquear(f):
+        fcntl.flock(f, fcntl.LOCK_UN)
+except ImportError:     # Windows
+    import msvcrt
+
+    def _bloquear(f):
+        f.seek(0)
+        while True:
+            try:
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                return
+            except OSError:     # LK_LOCK se rinde tras 10 intentos: seguir esperando
+                continue
+
+    def _desbloquear(f):
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+@contextmanager
+def bloqueo_archivo(ruta):
+    """
+    Bloqueo exclusivo entre procesos sobre <ruta>.lock mientras dure el bloque with
+
+    actualizar_historico.py y descargar_historico_masivo.py pueden correr a
+    la vez: el bloqueo evita que una reescritura pise a la otra.
+    """
+    candado = Path(f"{ruta}.lock")
+    candado.parent.mkdir(parents=True, exist_ok=True)
+    with open(candado, 'a+b') as f:
+        _bloquear(f)
+        try:
+            yield
+        finally:
+            _desbloquear(f)
+
+
+def es_intradiario(intervalo):
+    return not intervalo.endswith(('d', 'wk', 'mo'))
+
+
+def _a_tabla(ticker, intervalo, df):
+    """Convertir un DataFrame de yfinance (índice fecha + OHLCV) a una partición larga"""
+    df = df.copy()
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = df.columns.get_level_values(0)
+
+    fechas = pd.DatetimeIndex(df.index)
+    fechas = fechas.tz_localize('UTC') if fechas.tz is None else fechas.tz_convert('UTC')
+
+    datos = {
+        'intervalo': [intervalo] * len(df),
+        'ticker': [clave_ticker(ticker)] * len(df),
+        'fecha': fechas,
+    }
+    for columna in COLUMNAS_PRECIO:
+        if columna in df.columns:
+            valores = df[columna]
+            if columna == 'Volume':
+                valores = valores.fillna(0).astype('int64')
+            datos[columna] = valores.to_numpy()
+        else:
+            datos[columna] = pa.nulls(len(df), SCHEMA.field(columna).type)
+
+    return _ordenar_y_deduplicar(pa.table(datos, schema=SCHEMA))
+
+
+def _ordenar_y_deduplicar(tabla):
+    """Ordenar por fecha y eliminar barras repetidas (gana la última versión)"""
+    # sort_by es estable: entre fechas iguales se conserva el orden de llegada
+    tabla = tabla.sort_by('fecha')
+    if len(tabla) > 1:
+        fechas_np = tabla.column('fecha').to_numpy()
+        mascara = pa.array(np.append(fechas_np[1:] != fechas_np[:-1], True))
+        tabla = tabla.filter(mascara)
+    return tabla
+
+
+def _a_dataframe(tabla, intervalo):
+    """Convertir una partición larga al formato de yfinance (índice Date/Datetime)"""
+    df = tabla.drop_columns(['intervalo', 'ticker']).to_pandas()
+    df = df.set_index('fecha')
+    if es_intradiario(intervalo):
+        df.index.name = 'Datetime'
+    else:
+        df.index = df.index.tz_localize(None)
+        df.index.name = 'Date'
+    df.columns.name = 'Price'
+    return df
+
+
+class AlmacenHistorico:
+    """
+    Almacén de las 238 series de data_historico/ en un único parquet particionado
+
+    Cada (intervalo, ticker) es un row group ordenado por fecha, así una consulta
+    entre activos ("Close de todas las cripto, últimos 90 días, 1h") es un solo
+    scan con predicate pushdown en lugar de abrir un archivo por serie.
+    """
+
+    def __init__(self, data_dir=DATA_DIR, nombre=ARCHIVO_CONSOLIDADO):
+        self.data_dir = Path(data_dir)
+        self.ruta = self.data_dir / nombre
+        self._lock = threading.Lock()
+
+    def existe(self):
+        return self.ruta.exists()
+
+    def particiones(self):
+        """
+        Listar las particiones leyendo solo el footer
+
+        Returns:
+            dict (ticker, intervalo) -> {'row_groups', 'registros', 'fecha_min', 'fecha_max'}
+        """
+        if not self.existe():
+            return {}
+
+        metadata = pq.ParquetFile(self.ruta).metadata
+        nombres = [metadata.schema.column(i).name for i in range(metadata.num_columns)]
+        i_intervalo = nombres.index('intervalo')
+        i_ticker = nombres.index('ticker')
+        i_fecha = nombres.index('fecha')
+
+        particiones = {}
+        for rg in range(metadata.num_row_groups):
+            row_group = metadata.row_group(rg)
+            intervalo = row_group.column(i_intervalo).statistics.min
+            ticker = row_group.column(i_ticker).statistics.min
+            stats_fecha = row_group.column(i_fecha).statistics
+
+            info = particiones.setdefault((ticker, intervalo), {
+                'row_groups': [], 'registros': 0, 'fecha_min': None, 'fecha_max': None
+            })
+            info['row_groups'].append(rg)
+            info['registros'] += row_group.num_rows
+            if stats_fecha is not None and stats_fecha.has_min_max:
+                fmin, fmax = pd.Timestamp(stats_fecha.min), pd.Timestamp(stats_fecha.max)
+                if fmin.tzinfo is None:
+                    fmin, fmax = fmin.tz_localize('UTC'), fmax.tz_localize('UTC')
+                info['fecha_min'] = fmin if info['fecha_min'] is None else min(info['fecha_min'], fmin)
+                info['fecha_max'] = fmax if info['fecha_max'] is None else max(info['fecha_max'], fmax)
+        return particiones
+
+    def _filtro(self, tickers=None, intervalo=None, desde=None, hasta=None):
+        filtro = None
+
+        def y(expr):
+            return expr if filtro is None else filtro & expr
+
+        if intervalo is not None:
+            filtro = y(pc.field('intervalo') == intervalo)
+        if tickers is not None:
+            filtro = y(pc.field('ticker').isin([clave_ticker(t) for t in tickers]))
+        if desde is not None:
+            filtro = y(pc.field('fecha') >= _alinear_tz(desde, 'UTC'))
+        if hasta is not None:
+            filtro = y(pc.field('fecha') <= _alinear_tz(hasta, 'UTC'))
+        return filtro
+
+    def consultar(self, tickers=None, intervalo='1d', columnas=('Close',), desde=None, hasta=None):
+        """
+        Consulta entre activos en formato largo con predicate pushdown
+
+        Args:
+            tickers: Lista de tickers (Yahoo o clave de archivo); None = todos
+            intervalo: '1d', '1h' o '5m'
+            columnas: Columnas de precio a leer
+            desde, hasta: Rango de fechas inclusivo
+
+        Returns:
+            DataFrame largo con columnas ticker, fecha y las columnas pedidas
+        """
+        dataset = ds.dataset(self.ruta, format='parquet')
+        tabla = dataset.to_table(
+            columns=['ticker', 'fecha'] + list(columnas),
+            filter=self._filtro(tickers, intervalo, desde, hasta)
+        )
+        df = tabla.to_pandas()
+        if not es_intradiario(intervalo):
+            df['fecha'] = df['fecha'].dt.tz_localize(None)
+        return df
+
+    def consultar_ancho(self, tickers=None, intervalo='1d', columna='Close', desde=None, hasta=None):
+        """Igual que consultar() pero pivotado: índice fecha, una columna por ticker"""
+        df = self.consultar(tickers, intervalo, (columna,), desde, hasta)
+        return df.pivot(index='fecha', columns='ticker', values=columna)
+
+    def leer(self, ticker, intervalo='1d', columnas=None, desde=None, hasta=None):
+        """
+        Leer una serie con el mismo formato que el parquet individual de yfinance
+
+        Solo se decodifican los row groups de la partición pedida.
+        """
+        info = self.particiones().get((clave_ticker(ticker), intervalo))
+        if info is None:
+            raise KeyError((ticker, intervalo))
+
+        archivo = pq.ParquetFile(self.ruta)
+        columnas_leer = ['intervalo', 'ticker', 'fecha'] + list(columnas or COLUMNAS_PRECIO)
+        tabla = archivo.read_row_groups(info['row_groups'], columns=columnas_leer)
+
+        filtro = self._filtro(desde=desde, hasta=hasta)
+        if filtro is not None:
+            tabla = tabla.filter(filtro)
+        return _a_dataframe(tabla, intervalo)
+
+    def escribir(self, series, anexar=False):
+        """
+        Reemplazar o agregar particiones y reescribir el archivo de forma atómica
+
+        Args:
+            series: dict (ticker, intervalo) -> DataFrame de yfinance
+            anexar: Si True, las barras se agregan a la partición existente
+                (las fechas solapadas se reemplazan por la versión nueva)
+
+        Returns:
+            Número de registros escritos (con anexar=True, solo las barras nuevas)
+        """
+        nuevas = {}
+        for (ticker, intervalo), df in series.items():
+            if df is None or df.empty:
+                continue
+            nuevas[(clave_ticker(ticker), intervalo)] = _a_tabla(ticker, intervalo, df)
+
+        if not nuevas:
+            return 0
+
+        # El lock del hilo ordena a los escritores de este proceso; el del
+        # archivo, a los de otros procesos (se releen las particiones dentro)
+        with self._lock, bloqueo_archivo(self.ruta):
+            existentes = self.particiones()
+            claves = sorted(set(existentes) | set(nuevas), key=lambda c: (c[1], c[0]))
+
+            archivo = pq.ParquetFile(self.ruta) if existentes else None
+            temporal = self.ruta.with_name(f"{self.ruta.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            self.data_dir.mkdir(parents=True, exist_ok=True)
+
+            escritos = sum(len(t) for t in nuevas.values())
+            if anexar:
+                for clave in set(nuevas) & set(existentes):
+                    anterior = archivo.read_row_groups(existentes[clave]['row_groups'])
+                    nuevas[clave] = _ordenar_y_deduplicar(pa.concat_tables([anterior, nuevas[clave]]))
+                escritos = sum(
+                    len(t) - existentes.get(c, {}).get('registros', 0) for c, t in nuevas.items()
+                )
+
+            try:
+                with pq.ParquetWriter(temporal, SCHEMA, compression='zstd',
+                                      write_statistics=True) as writer:
+                    for clave in claves:
+                        if clave in nuevas:
+                            tabla = nuevas[clave]
+                        else:
+                            tabla = archivo.read_row_groups(existentes[clave]['row_groups'])
+                        if len(tabla):
+                            writer.write_table(tabla, row_group_size=len(tabla))
+                os.replace(temporal, self.ruta)
+            except BaseException:
+                temporal.unlink(missing_ok=True)
+                raise
+
+        return escritos
+
+    def anexar(self, series):
+        """Agregar las barras nuevas al final de cada serie (ver escribir)"""
+        return self.escribir(series, anexar=True)
+
+    def ultima_fecha(self, ticker, intervalo):
+        """Última fecha guardada de una serie (UTC) o None si no existe"""
+        info = self.particiones().get((clave_ticker(ticker), intervalo))
+        return info['fecha_max'] if info else None
+
+    def escritura(self):
+        """Acumular particiones y escribirlas juntas al salir del bloque with"""
+        return LoteEscritura(self)
+
+    def compactar(self, origen=None):
+        """
+        Compactar los parquet individuales <TICKER>_<periodo>_<intervalo>.parquet
+
+        Args:
+            origen: Carpeta con los archivos individuales (por defecto data_dir)
+
+        Returns:
+            Número total de registros en el almacén
+        """
+        origen = Path(origen) if origen is not None else self.data_dir
+        series = {}
+        for ruta in sorted(origen.glob("*.parquet")):
+            match = PATRON_ARCHIVO.match(ruta.stem)
+            if not match:
+                continue
+            series[(match.group('ticker'), match.group('intervalo'))] = pd.read_parquet(ruta)
+
+        self.escribir(series)
+        return sum(info['registros'] for info in self.particiones().values())
+
+
+class LoteEscritura:
+    """Acumula DataFrames descargados y los confirma en una sola reescritura"""
+
+    def __init__(self, almacen):
+        self.almacen = almacen
+        self.series = {}
+
+    def agregar(self, ticker, intervalo, df):
+        if df is not None and not df.empty:
+            self.series[(ticker, intervalo)] = df
+
+    def confirmar(self):
+        registros = self.almacen.escribir(self.series)
+        self.series = {}
+        return registros
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        if tipo is None:
+            self.confirmar()
+        return False
+
+
+if __name__ == '__main__':
+    from datetime import timedelta
+    from datos.activos import tickers_categoria
+
+    print("Compactando data_historico/ en un solo archivo...\n")
+
+    almacen = AlmacenHistorico()
+    total = almacen.compactar()
+    tamano = almacen.ruta.stat().st_size / (1024**2)
+    print(f"✅ {len(almacen.particiones())} particiones, {total:,} registros ({tamano:.1f} MB)")
+    print(f"   Archivo: {almacen.ruta}")
+
+    ultima = max(info['fecha_max'] for info in almacen.particiones().values())
+    desde = ultima - timedelta(days=90)
+    df = almacen.consultar_ancho(tickers_categoria('cripto'), '1h', 'Close', desde=desde)
+    print(f"\nClose de {df.shape[1]} cripto, últimos 90 días, 1h: {df.shape[0]} barras")
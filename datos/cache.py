@@ -0,0 +1,256 @@
+"""
+Caché compartida por espacios de nombres para los datos de los dashboards
+Cada espacio (noticias, sentimiento, deuda, correlaciones, ...) tiene su
+propio TTL, presupuesto de tamaño y clave de invalidación. Nivel 1: LRU en
+memoria del proceso. Nivel 2: archivos pickle en disco compartidos por todos
+los procesos/workers de Streamlit que usan la misma carpeta.
+"""
+import functools
+import hashlib
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from datos.catalogo import DATA_DIR
+
+DIR_CACHE = 'cache'
+ARCHIVO_GENERACION = 'GENERACION'
+
+
+class EspacioCache:
+    """
+    Configuración de un espacio de la caché
+
+    Args:
+        nombre: Nombre del espacio ('noticias', 'deuda', ...)
+        ttl: Segundos de validez de cada entrada
+        max_entradas: Tamaño del LRU en memoria
+        max_bytes: Presupuesto del nivel en disco (se borran las más antiguas)
+    """
+
+    def __init__(self, nombre, ttl, max_entradas=32, max_bytes=64 * 1024 * 1024):
+        self.nombre = nombre
+        self.ttl = ttl
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+
+
+ESPACIOS = {
+    'noticias': EspacioCache('noticias', ttl=1800, max_entradas=16, max_bytes=32 * 1024 * 1024),
+    'sentimiento': EspacioCache('sentimiento', ttl=1800, max_entradas=16, max_bytes=32 * 1024 * 1024),
+    'deuda': EspacioCache('deuda', ttl=86400, max_entradas=4, max_bytes=4 * 1024 * 1024),
+    'correlaciones': EspacioCache('correlaciones', ttl=3600, max_entradas=16, max_bytes=16 * 1024 * 1024),
+    'factores': EspacioCache('factores', ttl=3600, max_entradas=16, max_bytes=16 * 1024 * 1024),
+    'simulaciones': EspacioCache('simulaciones', ttl=3600, max_entradas=16, max_bytes=16 * 1024 * 1024),
+    'figuras': EspacioCache('figuras', ttl=3600, max_entradas=64, max_bytes=64 * 1024 * 1024),
+}
+
+
+def _clave(*partes):
+    """Hash estable de los argumentos de una llamada"""
+    return hashlib.sha1(repr(partes).encode('utf-8')).hexdigest()
+
+
+class CacheCompartida:
+    """
+    Caché de dos niveles (memoria + disco) separada por espacios
+
+    La invalidación de un espacio incrementa su número de generación en disco;
+    las entradas de generaciones anteriores dejan de ser válidas en todos los
+    procesos sin tocar los demás espacios.
+
+    Args:
+        data_dir: Carpeta data_historico/ (la caché vive en data_historico/cache/)
+        espacios: dict nombre -> EspacioCache
+    """
+
+    def __init__(self, data_dir=DATA_DIR, espacios=None):
+        self.directorio = Path(data_dir) / DIR_CACHE
+        self.espacios = dict(espacios or ESPACIOS)
+        self._memoria = {nombre: OrderedDict() for nombre in self.espacios}
+        self._lock = threading.Lock()
+        self.aciertos = {nombre: 0 for nombre in self.espacios}
+        self.fallos = {nombre: 0 for nombre in self.espacios}
+
+    def _carpeta(self, espacio):
+        carpeta = self.directorio / espacio
+        carpeta.mkdir(parents=True, exist_ok=True)
+        return carpeta
+
+    def generacion(self, espacio):
+        """Generación actual del espacio (compartida vía disco)"""
+        try:
+            return int((self.directorio / espacio / ARCHIVO_GENERACION).read_text())
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def _escribir_atomico(self, ruta, contenido):
+        temporal = ruta.with_name(f"{ruta.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        temporal.write_bytes(contenido)
+        os.replace(temporal, ruta)
+
+    def obtener(self, espacio, clave):
+        """
+        Buscar una entrada vigente
+
+        Returns:
+            (True, valor) si hay acierto, (False, None) si no
+        """
+        config = self.espacios[espacio]
+        generacion = self.generacion(espacio)
+        ahora = time.time()
+
+        with self._lock:
+            memoria = self._memoria[espacio]
+            entrada = memoria.get(clave)
+            if entrada is not None:
+                gen, creado, valor = entrada
+                if gen == generacion and ahora - creado <= config.ttl:
+                    memoria.move_to_end(clave)
+                    self.aciertos[espacio] += 1
+                    return True, valor
+                del memoria[clave]
+
+        ruta = self.directorio / espacio / f"{generacion}_{clave}.pkl"
+        try:
+            with open(ruta, 'rb') as f:
+                creado, valor = pickle.load(f)
+        except FileNotFoundError:
+            creado = None
+        except Exception as e:
+            print(f"⚠️ Caché {espacio}: entrada ilegible ({str(e)[:50]})")
+            ruta.unlink(missing_ok=True)
+            creado = None
+
+        if creado is None or ahora - creado > config.ttl:
+            with self._lock:
+                self.fallos[espacio] += 1
+            return False, None
+
+        self._recordar(espacio, clave, generacion, creado, valor)
+        with self._lock:
+            self.aciertos[espacio] += 1
+        return True, valor
+
+    def _recordar(self, espacio, clave, generacion, creado, valor):
+        config = self.espacios[espacio]
+        with self._lock:
+            memoria = self._memoria[espacio]
+            memoria[clave] = (generacion, creado, valor)
+            memoria.move_to_end(clave)
+            while len(memoria) > config.max_entradas:
+                memoria.popitem(last=False)
+
+    def guardar(self, espacio, clave, valor):
+        """Guardar una entrada en memoria y en disco"""
+        generacion = self.generacion(espacio)
+        creado = time.time()
+        self._recordar(espacio, clave, generacion, creado, valor)
+
+        try:
+            contenido = pickle.dumps((creado, valor), protocol=pickle.HIGHEST_PROTOCOL)
+            carpeta = self._carpeta(espacio)
+            self._escribir_atomico(carpeta / f"{generacion}_{clave}.pkl", contenido)
+            self._recortar(espacio)
+        except Exception as e:
+            # El nivel en disco es opcional: sin él la caché sigue funcionando en memoria
+            print(f"⚠️ Caché {espacio}: no se pudo escribir en disco ({str(e)[:50]})")
+
+    def _recortar(self, espacio):
+        """Borrar generaciones viejas y las entradas más antiguas fuera de presupuesto"""
+        config = self.espacios[espacio]
+        prefijo = f"{self.generacion(espacio)}_"
+        archivos = []
+        for ruta in (self.directorio / espacio).glob("*.pkl"):
+            try:
+                if not ruta.name.startswith(prefijo):
+                    ruta.unlink(missing_ok=True)
+                    continue
+                stat = ruta.stat()
+            except FileNotFoundError:
+                continue
+            archivos.append((stat.st_mtime, stat.st_size, ruta))
+
+        total = sum(tamano for _, tamano, _ in archivos)
+        for _, tamano, ruta in sorted(archivos, key=lambda a: a[0]):
+            if total <= config.max_bytes:
+                break
+            ruta.unlink(missing_ok=True)
+            total -= tamano
+
+    def invalidar(self, espacio):
+        """Invalidar solo un espacio (en este proceso y en los demás)"""
+        carpeta = self._carpeta(espacio)
+        siguiente = self.generacion(espacio) + 1
+        self._escribir_atomico(carpeta / ARCHIVO_GENERACION, str(siguiente).encode('utf-8'))
+        with self._lock:
+            self._memoria[espacio].clear()
+        self._recortar(espacio)
+
+    def estadisticas(self):
+        """Aciertos, fallos y entradas en memoria por espacio"""
+        with self._lock:
+            return {
+                nombre: {
+                    'aciertos': self.aciertos[nombre],
+                    'fallos': self.fallos[nombre],
+                    'en_memoria': len(self._memoria[nombre]),
+                    'generacion': self.generacion(nombre),
+                }
+                for nombre in self.espacios
+            }
+
+    def cacheado(self, espacio, clave=None):
+        """
+        Decorador que guarda el resultado de la función en un espacio
+
+        Args:
+            espacio: Nombre del espacio
+            clave: Función opcional (args, kwargs) -> partes hashables de la clave,
+                   para argumentos que no tienen un repr estable (p.ej. una matriz)
+        """
+        def decorador(funcion):
+            @functools.wraps(funcion)
+            def envoltura(*args, **kwargs):
+                partes = clave(*args, **kwargs) if clave else (args, sorted(kwargs.items()))
+                k = _clave(funcion.__module__, funcion.__qualname__, partes)
+                acierto, valor = self.obtener(espacio, k)
+                if acierto:
+                    return valor
+                valor = funcion(*args, **kwargs)
+                self.guardar(espacio, k, valor)
+                return valor
+
+            envoltura.invalidar = lambda: self.invalidar(espacio)
+            return envoltura
+        return decorador
+
+
+if __name__ == '__main__':
+    print("Probando caché compartida...\n")
+
+    cache = CacheCompartida()
+
+    @cache.cacheado('noticias')
+    def lenta(n):
+        time.sleep(0.5)
+        return list(range(n))
+
+    @cache.cacheado('deuda')
+    def deuda():
+        time.sleep(0.5)
+        return {'ratio': 293}
+
+    for etiqueta in ['primera', 'segunda']:
+        inicio = time.time()
+        lenta(10), deuda()
+        print(f"✅ Llamada {etiqueta}: {time.time() - inicio:.2f}s")
+
+    cache.invalidar('noticias')
+    inicio = time.time()
+    lenta(10), deuda()
+    print(f"✅ Tras invalidar noticias: {time.time() - inicio:.2f}s (deuda sigue en caché)")
+    print(cache.estadisticas())
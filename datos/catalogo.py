@@ -0,0 +1,317 @@
+"""
+Catálogo perezoso de los datos históricos de mercado (data_historico/)
+Indexa cada archivo <TICKER>_<periodo>_<intervalo>.parquet usando solo los
+metadatos del footer parquet y carga los DataFrames bajo demanda
+"""
+import re
+import threading
+from pathlib import Path
+from collections.abc import Mapping
+import pandas as pd
+import pyarrow.parquet as pq
+
+DATA_DIR = Path("data_historico")
+
+PATRON_ARCHIVO = re.compile(r'^(?P<ticker>.+)_(?P<periodo>\d+[a-z]+)_(?P<intervalo>\d+[a-z]+)$')
+
+
+def clave_ticker(ticker):
+    """
+    Convertir un ticker de Yahoo (GC=F, ^GSPC, BTC-USD) al nombre usado en los archivos
+
+    Es idempotente: clave_ticker('GC_F') == 'GC_F'
+    """
+    return ticker.replace('=', '_').replace('^', 'IDX_').replace('-', '_')
+
+
+def _alinear_tz(fecha, tz):
+    """Alinear una fecha con la zona horaria de la columna índice del parquet"""
+    if fecha is None:
+        return None
+    fecha = pd.Timestamp(fecha)
+    if tz is not None and fecha.tzinfo is None:
+        return fecha.tz_localize(tz)
+    if tz is None and fecha.tzinfo is not None:
+        return fecha.tz_convert(None)
+    return fecha
+
+
+class EntradaCatalogo:
+    """Metadatos de una serie (ticker + intervalo) leídos del footer parquet"""
+
+    def __init__(self, ruta, ticker, periodo, intervalo, columna_indice, tz,
+                 columnas, registros, fecha_min, fecha_max, almacen=None):
+        self.ruta = ruta
+        self.almacen = almacen
+        self.ticker = ticker
+        self.periodo = periodo
+        self.intervalo = intervalo
+        self.columna_indice = columna_indice
+        self.tz = tz
+        self.columnas = columnas
+        self.registros = registros
+        self.fecha_min = fecha_min
+        self.fecha_max = fecha_max
+
+    @classmethod
+    def desde_archivo(cls, ruta):
+        """Construir la entrada leyendo solo el footer del archivo (sin decodificar datos)"""
+        match = PATRON_ARCHIVO.match(ruta.stem)
+        if not match:
+            return None
+
+        archivo = pq.ParquetFile(ruta)
+        schema = archivo.schema_arrow
+        metadata = archivo.metadata
+
+        pandas_meta = schema.pandas_metadata or {}
+        indices = [i for i in pandas_meta.get('index_columns', []) if isinstance(i, str)]
+        columna_indice = indices[0] if indices else None
+        columnas = [n for n in schema.names if n not in indices]
+
+        fecha_min = fecha_max = None
+        tz = None
+        if columna_indice is not None:
+            tz = getattr(schema.field(columna_indice).type, 'tz', None)
+            posicion = schema.names.index(columna_indice)
+            for i in range(metadata.num_row_groups):
+                stats = metadata.row_group(i).column(posicion).statistics
+                if stats is None or not stats.has_min_max:
+                    continue
+                fecha_min = stats.min if fecha_min is None else min(fecha_min, stats.min)
+                fecha_max = stats.max if fecha_max is None else max(fecha_max, stats.max)
+
+        return cls(
+            ruta=ruta,
+            ticker=match.group('ticker'),
+            periodo=match.group('periodo'),
+            intervalo=match.group('intervalo'),
+            columna_indice=columna_indice,
+            tz=tz,
+            columnas=columnas,
+            registros=metadata.num_rows,
+            fecha_min=fecha_min,
+            fecha_max=fecha_max
+        )
+
+    @classmethod
+    def desde_almacen(cls, almacen, ticker, intervalo, info):
+        """Construir la entrada de una partición del almacén consolidado"""
+        from datos.activos import PERIODOS
+        from datos.almacen import COLUMNAS_PRECIO, es_intradiario
+
+        fecha_min, fecha_max = info['fecha_min'], info['fecha_max']
+        tz = 'UTC'
+        if not es_intradiario(intervalo):
+            tz = None
+            fecha_min = fecha_min.tz_localize(None) if fecha_min is not None else None
+            fecha_max = fecha_max.tz_localize(None) if fecha_max is not None else None
+
+        return cls(
+            ruta=almacen.ruta,
+            ticker=ticker,
+            periodo=PERIODOS.get(intervalo, ''),
+            intervalo=intervalo,
+            columna_indice='fecha',
+            tz=tz,
+            columnas=list(COLUMNAS_PRECIO),
+            registros=info['registros'],
+            fecha_min=fecha_min,
+            fecha_max=fecha_max,
+            almacen=almacen
+        )
+
+    def a_dict(self):
+        return {
+            'ticker': self.ticker,
+            'periodo': self.periodo,
+            'intervalo': self.intervalo,
+            'registros': self.registros,
+            'fecha_min': self.fecha_min,
+            'fecha_max': self.fecha_max,
+            'archivo': self.ruta.name
+        }
+
+
+class CatalogoMercado:
+    """
+    Índice de todas las series de data_historico/ por ticker, intervalo y rango de fechas
+
+    El arranque solo lee footers parquet; los datos se cargan en la primera
+    consulta y solo con las columnas y el rango de fechas pedidos. Si existe el
+    almacén consolidado (historico.parquet) se usa en lugar de los archivos sueltos.
+    """
+
+    def __init__(self, data_dir=DATA_DIR):
+        self.data_dir = Path(data_dir)
+        self.entradas = {}
+        self._cache = {}
+        self._lock = threading.Lock()
+        self.indexar()
+
+    def indexar(self):
+        """(Re)construir el índice a partir de los footers de los archivos"""
+        from datos.almacen import AlmacenHistorico
+
+        entradas = {}
+        almacen = AlmacenHistorico(self.data_dir)
+        if almacen.existe():
+            for (ticker, intervalo), info in almacen.particiones().items():
+                entradas[(ticker, intervalo)] = EntradaCatalogo.desde_almacen(
+                    almacen, ticker, intervalo, info
+                )
+
+        for ruta in sorted(self.data_dir.glob("*.parquet")):
+            try:
+                entrada = EntradaCatalogo.desde_archivo(ruta)
+            except Exception as e:
+                print(f"⚠️ Catálogo: no se pudo indexar {ruta.name}: {str(e)[:50]}")
+                continue
+            if entrada is not None:
+                entradas.setdefault((entrada.ticker, entrada.intervalo), entrada)
+
+        with self._lock:
+            self.entradas = entradas
+            self._cache.clear()
+        return self
+
+    def entrada(self, ticker, intervalo='1d'):
+        """Obtener los metadatos de una serie (KeyError si no existe)"""
+        return self.entradas[(clave_ticker(ticker), intervalo)]
+
+    def __contains__(self, clave):
+        ticker, intervalo = clave
+        return (clave_ticker(ticker), intervalo) in self.entradas
+
+    def __len__(self):
+        return len(self.entradas)
+
+    def tickers(self, intervalo=None):
+        """Listar los tickers disponibles (opcionalmente para un intervalo)"""
+        return sorted({t for t, i in self.entradas if intervalo is None or i == intervalo})
+
+    def intervalos(self):
+        return sorted({i for _, i in self.entradas})
+
+    def total_registros(self, claves=None):
+        """Sumar registros desde el footer, sin cargar datos"""
+        if claves is None:
+            return sum(e.registros for e in self.entradas.values())
+        return sum(self.entrada(t, i).registros for t, i in claves)
+
+    def resumen(self):
+        """DataFrame con una fila por serie (ticker, intervalo, registros, rango de fechas)"""
+        return pd.DataFrame([e.a_dict() for e in self.entradas.values()])
+
+    def cargar(self, ticker, intervalo='1d', columnas=None, desde=None, hasta=None):
+        """
+        Cargar una serie leyendo solo las columnas y el rango de fechas pedidos
+
+        Args:
+            ticker: Ticker de Yahoo ('GC=F') o clave de archivo ('GC_F')
+            intervalo: '1d', '1h' o '5m'
+            columnas: Lista de columnas (None = todas), p.ej. ['Close']
+            desde, hasta: Límites de fecha inclusivos (None = sin límite)
+
+        Returns:
+            DataFrame indexado por fecha
+        """
+        entrada = self.entrada(ticker, intervalo)
+        columnas = tuple(columnas) if columnas is not None else None
+        desde = _alinear_tz(desde, entrada.tz)
+        hasta = _alinear_tz(hasta, entrada.tz)
+
+        clave = (entrada.ticker, intervalo, columnas, desde, hasta)
+        with self._lock:
+            if clave in self._cache:
+                return self._cache[clave]
+
+        if entrada.almacen is not None:
+            df = entrada.almacen.leer(entrada.ticker, intervalo, columnas, desde, hasta)
+            with self._lock:
+                self._cache[clave] = df
+            return df
+
+        filtros = []
+        if entrada.columna_indice is not None:
+            if desde is not None:
+                filtros.append((entrada.columna_indice, '>=', desde))
+            if hasta is not None:
+                filtros.append((entrada.columna_indice, '<=', hasta))
+
+        df = pd.read_parquet(
+            entrada.ruta,
+            columns=list(columnas) if columnas is not None else None,
+            filters=filtros or None
+        )
+
+        with self._lock:
+            self._cache[clave] = df
+        return df
+
+    def cerrar(self, ticker=None):
+        """Liberar los DataFrames cargados (todos o los de un ticker)"""
+        with self._lock:
+            if ticker is None:
+                self._cache.clear()
+            else:
+                ticker = clave_ticker(ticker)
+                for clave in [c for c in self._cache if c[0] == ticker]:
+                    del self._cache[clave]
+
+    def vista(self, alias, columnas=('Close',)):
+        """Crear una vista con nombres amigables ('oro_diario' -> ('GC=F', '1d'))"""
+        return VistaCatalogo(self, alias, columnas)
+
+
+class VistaCatalogo(Mapping):
+    """
+    Mapping de alias a DataFrames que se cargan al primer acceso
+
+    Compatible con el dict que devolvía cargar_datos_masivos():
+    datos['oro_diario']['Close'] solo lee la columna Close de GC_F_20y_1d.
+
+    Args:
+        catalogo: CatalogoMercado
+        alias: dict alias -> (ticker, intervalo) o (ticker, intervalo, columnas)
+        columnas: Columnas por defecto de cada alias
+    """
+
+    def __init__(self, catalogo, alias, columnas=('Close',)):
+        self.catalogo = catalogo
+        self.alias = {}
+        for nombre, spec in alias.items():
+            ticker, intervalo = spec[0], spec[1]
+            cols = spec[2] if len(spec) > 2 else columnas
+            if (ticker, intervalo) in catalogo:
+                self.alias[nombre] = (ticker, intervalo, cols)
+
+    def __getitem__(self, nombre):
+        ticker, intervalo, cols = self.alias[nombre]
+        return self.catalogo.cargar(ticker, intervalo, columnas=cols)
+
+    def __iter__(self):
+        return iter(self.alias)
+
+    def __len__(self):
+        return len(self.alias)
+
+    def registros(self, nombre):
+        """Número de registros de un alias leído del footer"""
+        ticker, intervalo, _ = self.alias[nombre]
+        return self.catalogo.entrada(ticker, intervalo).registros
+
+    def total_registros(self):
+        return sum(self.registros(nombre) for nombre in self.alias)
+
+
+if __name__ == '__main__':
+    print("Probando catálogo de datos históricos...\n")
+
+    catalogo = CatalogoMercado()
+    print(f"✅ {len(catalogo)} series indexadas ({catalogo.total_registros():,} registros)")
+    print(f"   Intervalos: {catalogo.intervalos()}")
+
+    df = catalogo.cargar('GC=F', '1h', columnas=['Close'], desde='2025-11-01')
+    print(f"\nOro 1h desde 2025-11-01: {len(df)} registros")
+    print(df.tail(3))
@@ -0,0 +1,436 @@
+"""
+Correlaciones rodantes de retornos entre todos los activos (N x N)
+Cada ventana mantiene sumas por par de activos (observaciones comunes, suma,
+suma de cuadrados y suma de productos): una barra nueva suma su fila y resta la
+que sale de la ventana en O(N²), sin recalcular la ventana completa. El estado
+se guarda junto a las matrices de precios y avanza solo con las barras nuevas.
+Las ventanas cuentan sesiones de mercado: las filas del calendario en que solo
+cotizan las criptomonedas (fines de semana, feriados) no entran.
+"""
+import os
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from datos.activos import categoria_de, todos_los_tickers
+from datos.catalogo import DATA_DIR, clave_ticker
+from datos.matriz import DIR_MATRICES, obtener_matriz, retornos_simples
+
+REFERENCIA = 'GC=F'  # Activo cuyas trayectorias de correlación se guardan completas
+MIN_OBSERVACIONES = 3  # Barras comunes mínimas para correlacionar un par
+RETORNO_ATIPICO = 1.0  # |retorno| desde el que su salida de la ventana fuerza recalcular las sumas
+CATEGORIAS_CONTINUAS = {'cripto'}  # Cotizan todos los días: no definen sesiones
+
+# Ventanas por intervalo: nombre -> barras de sesión
+VENTANAS = {
+    '1d': {'20d': 20, '60d': 60, '250d': 250},
+    '1h': {'1d': 24, '5d': 120, '20d': 480},
+    '5m': {'1h': 12, '1d': 288, '5d': 1440},
+}
+
+_YAHOO = {clave_ticker(t): t for t in todos_los_tickers()}
+
+
+def filas_de_sesion(tickers, mascara):
+    """
+    Filas del calendario en que cotiza algún activo que no opera todos los días
+
+    Args:
+        tickers: Claves de archivo de cada columna
+        mascara: bool (fechas x activos)
+
+    Returns:
+        bool (fechas,); todo True si la matriz solo tiene activos continuos
+    """
+    mascara = np.asarray(mascara)
+    columnas = [i for i, t in enumerate(tickers)
+                if categoria_de(_YAHOO.get(t, t)) not in CATEGORIAS_CONTINUAS]
+    if not columnas:
+        return np.ones(mascara.shape[0], dtype=bool)
+    return mascara[:, columnas].any(axis=1)
+
+
+def _sin_tz(calendario):
+    return calendario.tz_localize(None).asi8 if calendario.tz is not None else calendario.asi8
+
+
+def _retornos(cierres, mascara):
+    """Retornos (fechas x activos) con NaN donde no hay retorno; la primera fila siempre NaN"""
+    retornos, validos = retornos_simples(cierres, mascara)
+    retornos = np.where(validos, retornos, np.nan)
+    return np.vstack([np.full((1, retornos.shape[1]), np.nan), retornos])
+
+
+def _pearson(n, sx, sy, sxx, syy, sxy, minimo):
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cov = sxy - sx * sy / n
+        var_x = np.maximum(sxx - sx * sx / n, 0.0)
+        var_y = np.maximum(syy - sy * sy / n, 0.0)
+        corr = cov / np.sqrt(var_x * var_y)
+    return np.where(n >= minimo, np.clip(corr, -1.0, 1.0), np.nan)
+
+
+class SumasVentana:
+    """
+    Sumas por par de activos sobre las últimas `ventana` barras
+
+    n[i, j] cuenta las barras con retorno en i y j; sx[i, j] y sxx[i, j] suman
+    x_i y x_i² en esas barras, y sxy[i, j] suma x_i * x_j. Con ellas la
+    correlación de cualquier par sale en O(1).
+
+    Args:
+        ventana: Barras de la ventana
+        activos: Número de activos (N)
+        minimo: Barras comunes mínimas por par
+    """
+
+    def __init__(self, ventana, activos, minimo=MIN_OBSERVACIONES):
+        self.ventana = ventana
+        self.minimo = minimo
+        self.n = np.zeros((activos, activos))
+        self.sx = np.zeros((activos, activos))
+        self.sxx = np.zeros((activos, activos))
+        self.sxy = np.zeros((activos, activos))
+        self.buffer = np.full((ventana, activos), np.nan)  # Filas de la ventana (circular)
+        self.posicion = 0  # Próxima fila a reemplazar (la más antigua si está llena)
+        self.llenas = 0
+
+    def inicializar(self, bloque):
+        """Cargar de una vez las últimas barras de un bloque (fechas x activos) de retornos"""
+        bloque = np.asarray(bloque, dtype=np.float64)[-self.ventana:]
+        self.buffer[:] = np.nan
+        self.buffer[:len(bloque)] = bloque
+        self.llenas = len(bloque)
+        self.posicion = self.llenas % self.ventana
+        self._recalcular()
+
+    def _recalcular(self):
+        """Sumas desde cero con las filas del buffer (el orden no importa; NaN no suma)"""
+        validos = ~np.isnan(self.buffer)
+        v = validos.astype(np.float64)
+        x = np.where(validos, self.buffer, 0.0)
+        self.n = v.T @ v
+        self.sx = x.T @ v
+        self.sxx = (x * x).T @ v
+        self.sxy = x.T @ x
+
+    def _sumar(self, fila, signo):
+        validos = ~np.isnan(fila)
+        if not validos.any():
+            return
+        v = validos.astype(np.float64)
+        x = np.where(validos, fila, 0.0)
+        self.n += signo * np.outer(v, v)
+        self.sx += signo * np.outer(x, v)
+        self.sxx += signo * np.outer(x * x, v)
+        self.sxy += signo * np.outer(x, x)
+
+    def agregar(self, fila):
+        """Sumar una barra nueva (N retornos, NaN = sin dato) y descontar la que sale"""
+        saliente = self.buffer[self.posicion] if self.llenas == self.ventana else None
+        # Restar un retorno atípico deja un error de cancelación del orden de
+        # su cuadrado: en ese caso, y cada vez que el buffer da la vuelta, las
+        # sumas se recalculan desde cero (O(ventana x N²) cada `ventana` barras)
+        atipico = saliente is not None and np.nanmax(np.abs(saliente), initial=0.0) > RETORNO_ATIPICO
+        if saliente is not None and not atipico:
+            self._sumar(saliente, -1.0)
+        if not atipico:
+            self._sumar(fila, 1.0)
+        self.buffer[self.posicion] = fila
+        self.posicion = (self.posicion + 1) % self.ventana
+        self.llenas = min(self.llenas + 1, self.ventana)
+        if atipico or self.posicion == 0:
+            self._recalcular()
+
+    def correlacion(self):
+        """Matriz N x N de Pearson en la ventana actual"""
+        return _pearson(self.n, self.sx, self.sx.T, self.sxx, self.sxx.T, self.sxy, self.minimo)
+
+    def correlacion_con(self, j):
+        """Correlación de cada activo contra el activo j (una fila de la matriz)"""
+        return _pearson(self.n[:, j], self.sx[:, j], self.sx[j, :], self.sxx[:, j], self.sxx[j, :],
+                        self.sxy[:, j], self.minimo)
+
+
+def trayectoria_con(retornos, j, ventana, minimo=MIN_OBSERVACIONES):
+    """
+    Correlación rodante de cada columna contra la columna j en todas las barras
+
+    Con sumas acumuladas dentro de bloques de `ventana` barras: O(fechas x
+    activos) para toda la historia, sin que un retorno atípico contamine las
+    sumas de todo lo que sigue (cada ventana es un sufijo de un bloque más un
+    prefijo del siguiente).
+
+    Returns:
+        float32 (fechas x activos)
+    """
+    validos = ~np.isnan(retornos)
+    m = validos & validos[:, [j]]
+    x = np.where(m, retornos, 0.0)
+    y = np.where(m, retornos[:, [j]], 0.0)
+
+    def en_ventana(valores):
+        filas = len(valores)
+        bloques = -(-filas // ventana)
+        relleno = np.zeros((bloques * ventana - filas, valores.shape[1]))
+        b = np.vstack([valores, relleno]).reshape(bloques, ventana, -1)
+        prefijo = np.cumsum(b, axis=1).reshape(-1, valores.shape[1])[:filas]
+        sufijo = np.cumsum(b[:, ::-1], axis=1)[:, ::-1].reshape(-1, valores.shape[1])
+        # Barra t: desde t - ventana + 1 hasta el fin de su bloque, más el prefijo del bloque de t
+        t = np.arange(filas)
+        desde = t - ventana + 1
+        partida = (desde > 0) & (t % ventana != ventana - 1)
+        return prefijo + np.where(partida[:, None], sufijo[np.maximum(desde, 0)], 0.0)
+
+    corr = _pearson(en_ventana(m.astype(np.float64)), en_ventana(x), en_ventana(y),
+                    en_ventana(x * x), en_ventana(y * y), en_ventana(x * y), minimo)
+    return corr.astype(np.float32)
+
+
+class CorrelacionesRodantes:
+    """
+    Matrices de correlación N x N de un intervalo para varias ventanas
+
+    Guarda además la trayectoria de la correlación de todos los activos contra
+    REFERENCIA, para graficar su historia sin recalcularla. Solo las sesiones
+    (filas_de_sesion) cuentan como barras; un activo continuo acumula en la
+    sesión siguiente el retorno de los días sin sesión.
+
+    Args:
+        intervalo: '1d', '1h' o '5m'
+        tickers: Claves de archivo de cada columna (las de la MatrizPrecios)
+        ventanas: dict nombre -> barras de sesión
+        referencia: Ticker de las trayectorias
+    """
+
+    def __init__(self, intervalo, tickers, ventanas=None, referencia=REFERENCIA, minimo=MIN_OBSERVACIONES):
+        self.intervalo = intervalo
+        self.tickers = list(tickers)
+        self.ventanas = dict(ventanas or VENTANAS[intervalo])
+        self.referencia = clave_ticker(referencia)
+        self.minimo = minimo
+        self.version = None
+        self.calendario = pd.DatetimeIndex([])  # Calendario completo de la matriz
+        self.sesiones = pd.DatetimeIndex([])  # Fechas que entraron en las ventanas
+        self.ultima_fila = np.full(len(self.tickers), np.nan, dtype=np.float32)
+        self.ultimo_cierre = np.full(len(self.tickers), np.nan)
+        self.sumas = {nombre: SumasVentana(barras, len(self.tickers), minimo)
+                      for nombre, barras in self.ventanas.items()}
+        self.trayectorias = {nombre: np.empty((0, len(self.tickers)), dtype=np.float32)
+                             for nombre in self.ventanas}
+
+    @property
+    def filas(self):
+        return len(self.calendario)
+
+    def _columna_referencia(self):
+        return self.tickers.index(self.referencia) if self.referencia in self.tickers else None
+
+    @classmethod
+    def construir(cls, matriz, ventanas=None, referencia=REFERENCIA, minimo=MIN_OBSERVACIONES, hasta=None):
+        """
+        Calcular todo desde la MatrizPrecios (vectorizado sobre la historia completa)
+
+        Args:
+            hasta: Usar solo las primeras `hasta` barras (el resto se agrega con avanzar)
+        """
+        motor = cls(matriz.intervalo, matriz.tickers, ventanas, referencia, minimo)
+        cierres = np.asarray(matriz.cierres[:hasta])
+        mascara = np.asarray(matriz.mascara[:hasta])
+        sesion = filas_de_sesion(motor.tickers, mascara)
+        retornos = _retornos(cierres[sesion], mascara[sesion])
+
+        j = motor._columna_referencia()
+        for nombre, sumas in motor.sumas.items():
+            sumas.inicializar(retornos)
+            if j is not None:
+                motor.trayectorias[nombre] = trayectoria_con(retornos, j, sumas.ventana, minimo)
+
+        motor._recordar(matriz, cierres, mascara, sesion)
+        if hasta is not None:
+            motor.version = None
+        return motor
+
+    def _recordar(self, matriz, cierres, mascara, sesion):
+        self.version = matriz.version
+        self.calendario = matriz.calendario[:len(cierres)]
+        self.sesiones = self.calendario[sesion]
+        self.ultima_fila = np.array(cierres[-1], dtype=np.float32)
+        # Último cierre válido de cada activo en una sesión (para el retorno de la próxima)
+        cuenta = (mascara & sesion[:, None]).cumsum(axis=0)
+        fila = np.argmax(cuenta == cuenta[-1], axis=0)
+        self.ultimo_cierre = np.where(cuenta[-1] > 0, cierres[fila, np.arange(cierres.shape[1])], np.nan)
+
+    def puede_avanzar(self, matriz):
+        """True si la matriz es la misma historia con barras nuevas al final"""
+        if matriz.intervalo != self.intervalo or list(matriz.tickers) != self.tickers:
+            return False
+        return self.filas > 0 and matriz.extiende(self.filas, self.calendario[-1], self.ultima_fila)
+
+    def avanzar(self, matriz):
+        """
+        Procesar solo las barras nuevas de la matriz, O(N²) por barra y ventana
+
+        Returns:
+            Número de barras agregadas
+        """
+        if not self.puede_avanzar(matriz):
+            raise ValueError("La matriz no extiende la historia de estas correlaciones")
+        nuevas = np.asarray(matriz.cierres[self.filas:], dtype=np.float64)
+        mascara = np.asarray(matriz.mascara[self.filas:])
+        sesion = filas_de_sesion(self.tickers, mascara)
+        j = self._columna_referencia()
+
+        extension = {nombre: [] for nombre in self.ventanas}
+        previo = self.ultimo_cierre.copy()
+        for cierres, validos in zip(nuevas[sesion], mascara[sesion]):
+            with np.errstate(invalid='ignore', divide='ignore'):
+                fila = cierres / previo - 1
+            fila = np.where(validos & np.isfinite(fila), fila, np.nan)
+            previo = np.where(validos, cierres, previo)
+            for nombre, sumas in self.sumas.items():
+                sumas.agregar(fila)
+                if j is not None:
+                    extension[nombre].append(sumas.correlacion_con(j).astype(np.float32))
+
+        if j is not None and len(nuevas):
+            for nombre, filas in extension.items():
+                self.trayectorias[nombre] = np.vstack([self.trayectorias[nombre], np.array(filas)])
+
+        self.version = matriz.version
+        self.sesiones = self.sesiones.append(matriz.calendario[self.filas:][sesion])
+        self.calendario = matriz.calendario
+        if len(nuevas):
+            self.ultima_fila = np.array(matriz.cierres[-1], dtype=np.float32)
+            self.ultimo_cierre = previo
+        return len(nuevas)
+
+    def _nombres(self, claves):
+        return [_YAHOO.get(c, c) for c in claves]
+
+    def matriz_correlacion(self, ventana):
+        """DataFrame N x N (tickers de Yahoo) de la ventana actual"""
+        return pd.DataFrame(self.sumas[ventana].correlacion(),
+                            index=self._nombres(self.tickers), columns=self._nombres(self.tickers))
+
+    def con(self, ticker, ventana):
+        """Series con la correlación actual de todos los activos contra un ticker"""
+        j = self.tickers.index(clave_ticker(ticker))
+        return pd.Series(self.sumas[ventana].correlacion_con(j), index=self._nombres(self.tickers),
+                         name=_YAHOO.get(self.tickers[j], ticker))
+
+    def trayectoria(self, ventana, tickers=None):
+        """DataFrame (fechas x activos) de la correlación rodante contra la referencia"""
+        valores = self.trayectorias[ventana]
+        columnas = list(range(len(self.tickers)))
+        if tickers is not None:
+            columnas = [self.tickers.index(clave_ticker(t)) for t in tickers]
+        return pd.DataFrame(valores[:, columnas], index=self.sesiones[:len(valores)],
+                            columns=self._nombres([self.tickers[c] for c in columnas]))
+
+    # ---------------------------------------------
+    # Persistencia (junto a las matrices de precios)
+    # ---------------------------------------------
+
+    @staticmethod
+    def ruta(intervalo, data_dir=DATA_DIR):
+        return Path(data_dir) / DIR_MATRICES / f"correlaciones_{intervalo}.npz"
+
+    def guardar(self, data_dir=DATA_DIR):
+        ruta = self.ruta(self.intervalo, data_dir)
+        ruta.parent.mkdir(parents=True, exist_ok=True)
+        arreglos = {
+            'intervalo': np.array(self.intervalo),
+            'tickers': np.array(self.tickers),
+            'ventanas': np.array(list(self.ventanas)),
+            'barras': np.array(list(self.ventanas.values())),
+            'referencia': np.array(self.referencia),
+            'minimo': np.array(self.minimo),
+            'version': np.array(self.version or ''),
+            'calendario': _sin_tz(self.calendario),
+            'sesiones': _sin_tz(self.sesiones),
+            'tz': np.array(str(self.calendario.tz or '')),
+            'ultima_fila': self.ultima_fila,
+            'ultimo_cierre': self.ultimo_cierre,
+        }
+        for i, (nombre, sumas) in enumerate(self.sumas.items()):
+            for campo in ['n', 'sx', 'sxx', 'sxy', 'buffer']:
+                arreglos[f"{campo}_{i}"] = getattr(sumas, campo)
+            arreglos[f"estado_{i}"] = np.array([sumas.posicion, sumas.llenas])
+            arreglos[f"trayectoria_{i}"] = self.trayectorias[nombre]
+
+        temporal = ruta.with_name(ruta.name + '.tmp')
+        with open(temporal, 'wb') as f:
+            np.savez(f, **arreglos)
+        os.replace(temporal, ruta)
+
+    @classmethod
+    def abrir(cls, intervalo='1d', data_dir=DATA_DIR):
+        """Cargar el estado guardado de un intervalo"""
+        with np.load(cls.ruta(intervalo, data_dir)) as datos:
+            ventanas = dict(zip(datos['ventanas'].tolist(), datos['barras'].tolist()))
+            motor = cls(str(datos['intervalo']), datos['tickers'].tolist(), ventanas,
+                        str(datos['referencia']), int(datos['minimo']))
+            motor.version = str(datos['version']) or None
+            tz = str(datos['tz'])
+            for campo in ['calendario', 'sesiones']:
+                fechas = pd.DatetimeIndex(datos[campo].view('datetime64[ns]'))
+                setattr(motor, campo, fechas.tz_localize(tz) if tz else fechas)
+            motor.ultima_fila = datos['ultima_fila']
+            motor.ultimo_cierre = datos['ultimo_cierre']
+            for i, (nombre, sumas) in enumerate(motor.sumas.items()):
+                for campo in ['n', 'sx', 'sxx', 'sxy', 'buffer']:
+                    setattr(sumas, campo, datos[f"{campo}_{i}"])
+                sumas.posicion, sumas.llenas = (int(v) for v in datos[f"estado_{i}"])
+                motor.trayectorias[nombre] = datos[f"trayectoria_{i}"]
+        return motor
+
+
+def obtener_correlaciones(intervalo='1d', data_dir=DATA_DIR, matriz=None):
+    """
+    Correlaciones rodantes al día con la matriz de precios del intervalo
+
+    Usa el estado guardado si la matriz no cambió, lo avanza solo con las
+    barras nuevas si la historia se extendió, y lo reconstruye si no.
+    """
+    matriz = matriz or obtener_matriz(intervalo, data_dir)
+    try:
+        motor = CorrelacionesRodantes.abrir(intervalo, data_dir)
+        if motor.version == matriz.version and motor.filas == matriz.forma[0]:
+            return motor
+        if motor.puede_avanzar(matriz):
+            nuevas = motor.avanzar(matriz)
+            print(f"🔗 Correlaciones {intervalo}: +{nuevas} barras")
+            motor.guardar(data_dir)
+            return motor
+    except (FileNotFoundError, KeyError, ValueError) as e:
+        if not isinstance(e, FileNotFoundError):
+            print(f"⚠️ Correlaciones {intervalo}: estado ilegible ({str(e)[:50]}), se reconstruye")
+
+    motor = CorrelacionesRodantes.construir(matriz)
+    motor.guardar(data_dir)
+    return motor
+
+
+if __name__ == '__main__':
+    import time
+
+    print("Calculando correlaciones rodantes...\n")
+
+    for intervalo in ['1d', '1h', '5m']:
+        inicio = time.time()
+        matriz = obtener_matriz(intervalo)
+        motor = CorrelacionesRodantes.construir(matriz)
+        motor.guardar()
+        print(f"✅ {intervalo}: {len(motor.tickers)}x{len(motor.tickers)} en ventanas "
+              f"{list(motor.ventanas)} ({motor.filas:,} barras) en {time.time() - inicio:.2f}s")
+
+    # Avanzar barra a barra desde un estado anterior cuesta O(N²) por barra
+    matriz = obtener_matriz('1d')
+    motor = CorrelacionesRodantes.construir(matriz, hasta=matriz.forma[0] - 20)
+    inicio = time.time()
+    motor.avanzar(matriz)
+    print(f"\n✅ 20 barras nuevas en {(time.time() - inicio) * 1000:.1f} ms")
+
+    print("\nCorrelación con el oro (250 sesiones):")
+    print(motor.con('GC=F', '250d').drop('GC=F').sort_values(ascending=False).head(8).round(3))
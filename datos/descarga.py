@@ -0,0 +1,344 @@
+"""
+Motor de descarga paralelo y reanudable para los datos históricos
+Pool de workers acotado, limitador token-bucket por fuente, reintentos con
+backoff exponencial y un libro de trabajos persistido en disco.
+En modo incremental solo se piden las barras posteriores a la última guardada.
+"""
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from pathlib import Path
+import pandas as pd
+
+from datos.activos import PERIODOS
+from datos.almacen import AlmacenHistorico
+from datos.catalogo import DATA_DIR, CatalogoMercado, clave_ticker, _alinear_tz
+from datos.limites import LimitadorTasa
+
+ARCHIVO_LIBRO = 'descarga_trabajos.json'
+ARCHIVO_LIBRO_INCREMENTAL = 'actualizacion_trabajos.json'
+
+# Cuánta historia permite pedir Yahoo por intervalo (None = sin límite)
+LIMITE_HISTORIA = {
+    '1d': None,
+    '1h': timedelta(days=729),
+    '5m': timedelta(days=59)
+}
+
+# Barras que se vuelven a pedir al actualizar (la última puede estar incompleta)
+SOLAPAMIENTO = {
+    '1d': timedelta(days=3),
+    '1h': timedelta(hours=2),
+    '5m': timedelta(minutes=10)
+}
+
+
+def inicio_incremental(ultima, intervalo, ahora=None):
+    """
+    Fecha desde la que hay que pedir datos para completar una serie
+
+    Returns:
+        Timestamp UTC, o None si hace falta la descarga completa del período
+    """
+    if ultima is None:
+        return None
+    ahora = ahora or pd.Timestamp.now(tz='UTC')
+    inicio = ultima - SOLAPAMIENTO.get(intervalo, timedelta(0))
+    limite = LIMITE_HISTORIA.get(intervalo)
+    if limite is not None and ahora - inicio > limite:
+        return None
+    return inicio
+
+
+class FuenteYahoo:
+    """Fuente de datos real: Yahoo Finance vía yfinance"""
+
+    nombre = 'yahoo'
+
+    def descargar(self, ticker, periodo, intervalo, inicio=None):
+        import yfinance as yf
+
+        if inicio is not None:
+            df = yf.download(ticker, start=inicio.to_pydatetime(), interval=intervalo, progress=False)
+        else:
+            df = yf.download(ticker, period=periodo, interval=intervalo, progress=False)
+        if isinstance(df.columns, pd.MultiIndex):
+            df.columns = df.columns.get_level_values(0)
+        return df
+
+
+class FuenteLocal:
+    """
+    Fuente falsa que sirve los parquet existentes de data_historico/
+
+    Permite probar el motor (paralelismo, reintentos, reanudación) sin red.
+
+    Args:
+        data_dir: Carpeta con los datos de referencia
+        fallos: dict (ticker, intervalo) -> número de fallos simulados antes de responder
+        latencia: Segundos de espera simulada por petición
+    """
+
+    nombre = 'local'
+
+    def __init__(self, data_dir=DATA_DIR, fallos=None, latencia=0.0):
+        self.catalogo = CatalogoMercado(data_dir)
+        self.fallos = dict(fallos or {})
+        self.latencia = latencia
+        self._lock = threading.Lock()
+
+    def descargar(self, ticker, periodo, intervalo, inicio=None):
+        if self.latencia:
+            time.sleep(self.latencia)
+        with self._lock:
+            pendientes = self.fallos.get((ticker, intervalo), 0)
+            if pendientes:
+                self.fallos[(ticker, intervalo)] = pendientes - 1
+                raise ConnectionError(f"Fallo simulado para {ticker} {intervalo}")
+        if (ticker, intervalo) not in self.catalogo:
+            return pd.DataFrame()
+        df = self.catalogo.cargar(ticker, intervalo).copy()
+        if inicio is not None:
+            df = df[df.index >= _alinear_tz(inicio, df.index.tz)]
+        return df
+
+
+class LibroTrabajos:
+    """
+    Registro persistente del estado de cada trabajo (ticker, intervalo)
+
+    Estados: pendiente, ok, vacio, error. Un trabajo solo pasa a 'ok' cuando sus
+    datos ya están escritos en el almacén, así una ejecución interrumpida se
+    reanuda descargando únicamente lo que faltaba.
+    """
+
+    def __init__(self, ruta):
+        self.ruta = Path(ruta)
+        self._lock = threading.Lock()
+        self.trabajos = {}
+        if self.ruta.exists():
+            with open(self.ruta, encoding='utf-8') as f:
+                self.trabajos = json.load(f).get('trabajos', {})
+
+    @staticmethod
+    def clave(ticker, intervalo):
+        return f"{ticker}|{intervalo}"
+
+    def estado(self, ticker, intervalo):
+        return self.trabajos.get(self.clave(ticker, intervalo), {}).get('estado', 'pendiente')
+
+    def marcar(self, ticker, intervalo, estado, **extra):
+        with self._lock:
+            trabajo = self.trabajos.setdefault(self.clave(ticker, intervalo), {'intentos': 0})
+            trabajo.update(extra)
+            trabajo['estado'] = estado
+            trabajo['actualizado'] = datetime.now().isoformat()
+            self._guardar()
+
+    def sumar_intento(self, ticker, intervalo):
+        with self._lock:
+            trabajo = self.trabajos.setdefault(self.clave(ticker, intervalo), {'intentos': 0})
+            trabajo['intentos'] += 1
+
+    def _guardar(self):
+        temporal = self.ruta.with_suffix('.tmp')
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump({'trabajos': self.trabajos}, f, indent=1)
+        os.replace(temporal, self.ruta)
+
+    def completo(self):
+        return bool(self.trabajos) and all(
+            t['estado'] in ('ok', 'vacio') for t in self.trabajos.values()
+        )
+
+    def borrar(self):
+        """Eliminar el libro (se llama cuando una ejecución termina completa)"""
+        with self._lock:
+            self.trabajos = {}
+            if self.ruta.exists():
+                self.ruta.unlink()
+
+
+class MotorDescarga:
+    """
+    Descarga trabajos (ticker, intervalo) en paralelo y los escribe en el almacén
+
+    Args:
+        fuente: Objeto con nombre y descargar(ticker, periodo, intervalo, inicio) -> DataFrame
+        almacen: AlmacenHistorico destino
+        libro: LibroTrabajos para reanudar (por defecto data_dir/descarga_trabajos.json)
+        workers: Tamaño máximo del pool de hilos
+        limitadores: dict nombre_fuente -> LimitadorTasa
+        reintentos: Intentos máximos por trabajo
+        backoff: Segundos base del backoff exponencial
+        lote: Trabajos que se acumulan antes de escribir al almacén
+        incremental: Pedir solo la cola posterior a la última barra guardada y anexarla
+    """
+
+    def __init__(self, fuente=None, almacen=None, libro=None, workers=4,
+                 limitadores=None, reintentos=3, backoff=1.0, lote=20, incremental=False):
+        self.fuente = fuente or FuenteYahoo()
+        self.almacen = almacen or AlmacenHistorico()
+        self.incremental = incremental
+        nombre_libro = ARCHIVO_LIBRO_INCREMENTAL if incremental else ARCHIVO_LIBRO
+        self.libro = libro or LibroTrabajos(self.almacen.data_dir / nombre_libro)
+        self.workers = workers
+        self.limitadores = limitadores or {'yahoo': LimitadorTasa(tasa=2.0, capacidad=4)}
+        self.reintentos = reintentos
+        self.backoff = backoff
+        self.tam_lote = lote
+        self._pendientes = {}
+        self._lock_lote = threading.Lock()
+
+    @staticmethod
+    def trabajos_para(tickers, intervalos=('1d', '1h', '5m')):
+        """Lista de trabajos (ticker, periodo, intervalo) usando los períodos máximos de Yahoo"""
+        return [(t, PERIODOS[i], i) for t in tickers for i in intervalos]
+
+    def _descargar_con_reintentos(self, ticker, periodo, intervalo, inicio=None):
+        limitador = self.limitadores.get(self.fuente.nombre)
+        ultimo_error = None
+        for intento in range(self.reintentos):
+            if limitador is not None:
+                limitador.adquirir()
+            self.libro.sumar_intento(ticker, intervalo)
+            try:
+                return self.fuente.descargar(ticker, periodo, intervalo, inicio)
+            except Exception as e:
+                ultimo_error = e
+                if intento == self.reintentos - 1:
+                    break   # No esperar el backoff después del último intento
+                espera = self.backoff * (2 ** intento) * (1 + random.random() * 0.25)
+                time.sleep(espera)
+        raise ultimo_error
+
+    def _confirmar_lote(self):
+        """
+        Escribir las series acumuladas y recién entonces marcarlas como 'ok'
+
+        Un fallo de escritura no corta la ejecución: los trabajos del lote
+        quedan en 'error' en el libro y se reintentan en la próxima.
+
+        Returns:
+            Lista de (ticker, intervalo, estado, registros) de los trabajos del lote
+        """
+        with self._lock_lote:
+            pendientes, self._pendientes = self._pendientes, {}
+        if not pendientes:
+            return []
+        try:
+            self.almacen.escribir({clave: df for clave, (df, _) in pendientes.items()},
+                                  anexar=self.incremental)
+        except Exception as e:
+            print(f"❌ Error escribiendo {len(pendientes)} series en el almacén: {str(e)[:120]}")
+            terminados = []
+            for ticker, intervalo in pendientes:
+                self.libro.marcar(ticker, intervalo, 'error', error=f"escritura: {str(e)[:180]}")
+                terminados.append((ticker, intervalo, 'error', 0))
+            return terminados
+
+        terminados = []
+        for (ticker, intervalo), (_, registros) in pendientes.items():
+            self.libro.marcar(ticker, intervalo, 'ok', registros=registros)
+            terminados.append((ticker, intervalo, 'ok', registros))
+        return terminados
+
+    def _procesar(self, ticker, periodo, intervalo, inicio=None):
+        """
+        Descargar un trabajo y acumularlo en el lote
+
+        Returns:
+            Lista de (ticker, intervalo, estado, registros) de los trabajos que
+            terminaron con esta llamada: el propio si falló o vino vacío, o
+            todo el lote si esta llamada lo confirmó
+        """
+        try:
+            df = self._descargar_con_reintentos(ticker, periodo, intervalo, inicio)
+        except Exception as e:
+            self.libro.marcar(ticker, intervalo, 'error', error=str(e)[:200])
+            return [(ticker, intervalo, 'error', 0)]
+
+        if df is None or df.empty:
+            self.libro.marcar(ticker, intervalo, 'vacio', registros=0)
+            return [(ticker, intervalo, 'vacio', 0)]
+
+        with self._lock_lote:
+            self._pendientes[(ticker, intervalo)] = (df, len(df))
+            lleno = len(self._pendientes) >= self.tam_lote
+        return self._confirmar_lote() if lleno else []
+
+    def ejecutar(self, trabajos, al_terminar=None):
+        """
+        Ejecutar los trabajos pendientes (los 'ok' del libro se saltan)
+
+        Args:
+            trabajos: Lista de (ticker, periodo, intervalo)
+            al_terminar: Callback opcional (ticker, intervalo, estado, registros),
+                         llamado con 'ok' solo cuando los datos ya están escritos
+
+        Returns:
+            dict (ticker, intervalo) -> (estado, registros)
+        """
+        resultados = {}
+        pendientes = []
+        particiones = self.almacen.particiones() if self.incremental else {}
+        for ticker, periodo, intervalo in trabajos:
+            estado = self.libro.estado(ticker, intervalo)
+            if estado in ('ok', 'vacio'):
+                registros = self.libro.trabajos[self.libro.clave(ticker, intervalo)].get('registros', 0)
+                resultados[(ticker, intervalo)] = ('reanudado', registros)
+            else:
+                self.libro.marcar(ticker, intervalo, 'pendiente')
+                inicio = None
+                if self.incremental:
+                    info = particiones.get((clave_ticker(ticker), intervalo))
+                    inicio = inicio_incremental(info['fecha_max'] if info else None, intervalo)
+                pendientes.append((ticker, periodo, intervalo, inicio))
+
+        def informar(terminados):
+            for ticker, intervalo, estado, registros in terminados:
+                resultados[(ticker, intervalo)] = (estado, registros)
+                if al_terminar is not None:
+                    al_terminar(ticker, intervalo, estado, registros)
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                futuros = [pool.submit(self._procesar, *t) for t in pendientes]
+                for futuro in as_completed(futuros):
+                    informar(futuro.result())
+        finally:
+            # Lo que quedó en el lote (también si se interrumpió la ejecución)
+            informar(self._confirmar_lote())
+
+        return resultados
+
+if __name__ == '__main__':
+    import tempfile
+
+    print("Probando motor de descarga con la fuente local...\n")
+
+    with tempfile.TemporaryDirectory() as destino:
+        fuente = FuenteLocal(fallos={('GC_F', '1d'): 2}, latencia=0.05)
+        motor = MotorDescarga(
+            fuente=fuente,
+            almacen=AlmacenHistorico(destino),
+            workers=8,
+            limitadores={'local': LimitadorTasa(tasa=50, capacidad=10)},
+            backoff=0.1
+        )
+        trabajos = MotorDescarga.trabajos_para(['GC_F', 'SI_F', 'BTC_USD', 'IDX_GSPC'])
+
+        inicio = time.time()
+        resultados = motor.ejecutar(trabajos)
+        total = sum(r for _, r in resultados.values())
+        print(f"✅ {len(resultados)} trabajos, {total:,} registros en {time.time() - inicio:.2f}s")
+        print(f"   Intentos GC_F 1d: {motor.libro.trabajos['GC_F|1d']['intentos']}")
+
+        # Segunda ejecución: todo está 'ok' en el libro, no se descarga nada
+        resultados = motor.ejecutar(trabajos)
+        reanudados = sum(1 for e, _ in resultados.values() if e == 'reanudado')
+        print(f"✅ Reanudación: {reanudados}/{len(resultados)} trabajos ya completos")
@@ -0,0 +1,409 @@
+"""
+Modelo de factores del oro ajustado con la historia de data_historico/
+El retorno del oro en las próximas `horizonte` barras se explica con el cambio
+reciente del dólar, el S&P 500, el petróleo y Bitcoin más el sentimiento de
+noticias. El ajuste inicial es un mínimos cuadrados ponderado en bloque; cada
+barra nueva actualiza los coeficientes con mínimos cuadrados recursivos (RLS,
+O(k²)) y predecir es un producto punto de k términos.
+"""
+import os
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from datos.activos import todos_los_tickers
+from datos.catalogo import DATA_DIR, clave_ticker
+from datos.matriz import DIR_MATRICES, obtener_matriz, rellenar_adelante
+
+REFERENCIA = 'GC=F'
+
+# Nombre del factor -> ticker de Yahoo
+FACTORES = {
+    'dxy': 'DX-Y.NYB',
+    'sp500': '^GSPC',
+    'petroleo': 'CL=F',
+    'bitcoin': 'BTC-USD',
+}
+
+HORIZONTES = {'1d': 5, '1h': 24}           # Barras de la referencia a predecir (5 = una semana)
+OLVIDO = {'1d': 0.999, '1h': 0.9999}       # Memoria efectiva ~1/(1-olvido) barras
+FRECUENCIAS = {'1d': 'D', '1h': 'h'}       # Cubeta del sentimiento de cada barra
+VARIANZA_INICIAL = 100.0                   # Prior débil de los coeficientes
+PRIOR = {'sentimiento': 0.05}              # Hasta tener historia, el peso que usaba el dashboard
+
+_YAHOO = {clave_ticker(t): t for t in todos_los_tickers()}
+
+
+def _alinear_sentimiento(fechas, sentimiento, frecuencia):
+    """Sentimiento medio de la cubeta de cada barra (0 si no hubo noticias)"""
+    if sentimiento is None or len(sentimiento) == 0:
+        return np.zeros(len(fechas))
+    fechas = pd.DatetimeIndex(fechas)
+    if fechas.tz is not None:
+        fechas = fechas.tz_convert('UTC').tz_localize(None)
+    serie = sentimiento.groupby(level=0).mean()
+    return serie.reindex(fechas.floor(frecuencia)).fillna(0.0).to_numpy(dtype=np.float64)
+
+
+def preparar(matriz, horizonte, referencia=REFERENCIA, factores=None, sentimiento=None,
+             objetivos=None, hasta=None):
+    """
+    Variables explicativas y objetivos en las barras donde cotiza la referencia
+
+    Args:
+        matriz: MatrizPrecios ('1d' o '1h')
+        horizonte: Barras hacia atrás (cambio de los factores) y hacia adelante (objetivo)
+        sentimiento: Series opcional fecha (UTC sin zona) -> sentimiento medio
+        objetivos: Tickers a predecir (por defecto solo la referencia)
+        hasta: Usar solo las primeras `hasta` barras de la matriz
+
+    Returns:
+        (fechas, X, Y, niveles): X es (barras x k) con [1, cambio de cada factor,
+        sentimiento] (NaN en las primeras `horizonte` barras), Y es (barras x
+        objetivos) con el retorno de las próximas `horizonte` barras (NaN si aún
+        no se conoce) y niveles el último cierre de cada objetivo
+    """
+    factores = factores or FACTORES
+    ref = clave_ticker(referencia)
+    claves_factores = [clave_ticker(t) for t in factores.values()]
+    claves_objetivo = [clave_ticker(t) for t in (objetivos or [referencia])]
+
+    columnas = [matriz.columna(c) for c in [ref] + claves_factores + claves_objetivo]
+    cierres = np.asarray(matriz.cierres[:hasta])[:, columnas]
+    mascara = np.asarray(matriz.mascara[:hasta])[:, columnas]
+
+    filas = np.flatnonzero(mascara[:, 0])
+    niveles = rellenar_adelante(cierres, mascara)[filas]
+    validos = mascara[filas]
+    fechas = matriz.calendario[filas]
+    h = horizonte
+    f = len(claves_factores)
+
+    X = np.full((len(filas), f + 2), np.nan)
+    X[:, 0] = 1.0
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cambios = niveles[h:, 1:f + 1] / niveles[:-h, 1:f + 1] - 1
+    X[h:, 1:f + 1] = np.nan_to_num(cambios, nan=0.0, posinf=0.0, neginf=0.0)  # Sin dato: sin efecto
+    X[h:, f + 1] = _alinear_sentimiento(fechas[h:], sentimiento,
+                                        FRECUENCIAS.get(matriz.intervalo, 'D'))
+    X[:h] = np.nan
+
+    Y = np.full((len(filas), len(claves_objetivo)), np.nan)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        futuros = niveles[h:, f + 1:] / niveles[:-h, f + 1:] - 1
+    Y[:-h] = np.where(validos[h:, f + 1:] & np.isfinite(futuros), futuros, np.nan)
+
+    return fechas, X, Y, niveles[:, f + 1:]
+
+
+def _resolver(X, Y, olvido, theta0, P0):
+    """
+    Mínimos cuadrados ponderados de varios objetivos en un solo solve
+
+    Equivale a correr RLS con olvido sobre las filas válidas de cada columna
+    de Y partiendo de (theta0, P0): la fila i pesa olvido^(filas válidas
+    posteriores) y el prior olvido^(filas válidas).
+
+    Returns:
+        (theta, P, error2, n) con theta (objetivos x k), P (objetivos x k x k)
+    """
+    utilizables = ~np.isnan(X).any(axis=1)
+    M = ~np.isnan(Y) & utilizables[:, None]
+    X = np.where(utilizables[:, None], X, 0.0)
+    Y = np.where(M, Y, 0.0)
+
+    posteriores = np.cumsum(M[::-1], axis=0)[::-1] - M
+    W = np.where(M, olvido ** posteriores, 0.0)
+    n = M.sum(axis=0)
+    peso_prior = olvido ** n
+
+    P0_inv = np.linalg.inv(P0)
+    A = np.einsum('to,tk,tl->okl', W, X, X) + peso_prior[:, None, None] * P0_inv
+    b = np.einsum('to,tk,to->ok', W, X, Y) + peso_prior[:, None] * (P0_inv @ theta0)
+    theta = np.linalg.solve(A, b[..., None])[..., 0]
+    P = np.linalg.inv(A)
+
+    residuos = Y - X @ theta.T
+    with np.errstate(invalid='ignore', divide='ignore'):
+        error2 = (W * residuos ** 2).sum(axis=0) / W.sum(axis=0)
+    return theta, P, error2, n
+
+
+class ModeloFactores:
+    """
+    Regresión del retorno futuro del oro sobre los factores, con RLS
+
+    Args:
+        intervalo: '1d' o '1h'
+        referencia: Ticker a predecir
+        factores: dict nombre -> ticker (por defecto FACTORES)
+        horizonte: Barras a predecir (por defecto HORIZONTES[intervalo])
+        olvido: Factor de olvido del RLS (por defecto OLVIDO[intervalo])
+    """
+
+    def __init__(self, intervalo='1d', referencia=REFERENCIA, factores=None, horizonte=None, olvido=None,
+                 varianza_inicial=VARIANZA_INICIAL, prior=None):
+        self.intervalo = intervalo
+        self.referencia = referencia
+        self.factores = dict(factores or FACTORES)
+        self.horizonte = horizonte or HORIZONTES[intervalo]
+        self.olvido = olvido or OLVIDO[intervalo]
+        self.nombres = ['constante', *self.factores, 'sentimiento']
+
+        prior = PRIOR if prior is None else prior
+        self.theta0 = np.array([prior.get(nombre, 0.0) for nombre in self.nombres])
+        self.P0 = np.eye(len(self.nombres)) * varianza_inicial
+        self.theta = self.theta0.copy()
+        self.P = self.P0.copy()
+        self.error2 = np.nan       # Varianza (ponderada) de los errores de predicción
+        self.actualizaciones = 0
+        self.consumidas = 0        # Barras de la referencia cuyo objetivo ya se usó
+        self.x_actual = np.full(len(self.nombres), np.nan)
+        self.precio_actual = np.nan
+        self.fecha_actual = None
+
+        # Barras de la matriz ya procesadas (para avanzar solo con las nuevas)
+        self.version = None
+        self.tickers = []
+        self.filas = 0
+        self.ultima_fecha = None
+        self.ultima_fila = None
+
+    @classmethod
+    def construir(cls, matriz, sentimiento=None, hasta=None, **kwargs):
+        """Ajustar con toda la historia de la matriz en un solo solve"""
+        modelo = cls(matriz.intervalo, **kwargs)
+        fechas, X, Y, niveles = modelo._preparar(matriz, sentimiento, hasta)
+        theta, P, error2, n = _resolver(X, Y, modelo.olvido, modelo.theta0, modelo.P0)
+        modelo.theta, modelo.P, modelo.error2 = theta[0], P[0], float(error2[0])
+        modelo.actualizaciones = int(n[0])
+        modelo.consumidas = max(len(X) - modelo.horizonte, 0)
+        modelo._recordar(matriz, fechas, X, niveles, hasta)
+        return modelo
+
+    def _preparar(self, matriz, sentimiento, hasta=None):
+        return preparar(matriz, self.horizonte, self.referencia, self.factores, sentimiento, hasta=hasta)
+
+    def _recordar(self, matriz, fechas, X, niveles, hasta=None):
+        filas = matriz.forma[0] if hasta is None else hasta
+        self.version = matriz.version if hasta is None else None
+        self.tickers = list(matriz.tickers)
+        self.filas = filas
+        self.ultima_fecha = matriz.calendario[filas - 1]
+        self.ultima_fila = np.array(matriz.cierres[filas - 1], dtype=np.float32)
+        if len(X):
+            self.x_actual = X[-1].copy()
+            self.precio_actual = float(niveles[-1, 0])
+            self.fecha_actual = fechas[-1]
+
+    def actualizar(self, x, y):
+        """Un paso de RLS con olvido: O(k²)"""
+        Px = self.P @ x
+        ganancia = Px / (self.olvido + x @ Px)
+        error = y - self.theta @ x
+        self.theta = self.theta + ganancia * error
+        self.P = (self.P - np.outer(ganancia, Px)) / self.olvido
+        self.P = (self.P + self.P.T) / 2  # Mantener la simetría numérica
+        self.error2 = error * error if np.isnan(self.error2) else \
+            self.olvido * self.error2 + (1 - self.olvido) * error * error
+        self.actualizaciones += 1
+        return error
+
+    def puede_avanzar(self, matriz):
+        """True si la matriz es la misma historia con barras nuevas al final"""
+        return (matriz.intervalo == self.intervalo and list(matriz.tickers) == self.tickers
+                and matriz.extiende(self.filas, self.ultima_fecha, self.ultima_fila))
+
+    def avanzar(self, matriz, sentimiento=None):
+        """
+        Actualizar los coeficientes solo con los objetivos que las barras nuevas completan
+
+        Returns:
+            Número de pasos de RLS aplicados
+        """
+        if not self.puede_avanzar(matriz):
+            raise ValueError("La matriz no extiende la historia de este modelo")
+        fechas, X, Y, niveles = self._preparar(matriz, sentimiento)
+        conocidas = max(len(X) - self.horizonte, 0)
+
+        pasos = 0
+        for i in range(self.consumidas, conocidas):
+            if not np.isnan(Y[i, 0]) and not np.isnan(X[i]).any():
+                self.actualizar(X[i], Y[i, 0])
+                pasos += 1
+        self.consumidas = max(self.consumidas, conocidas)
+        self._recordar(matriz, fechas, X, niveles)
+        return pasos
+
+    def predecir(self, sentimiento=None, x=None):
+        """
+        Retorno esperado de la referencia en las próximas `horizonte` barras
+
+        Args:
+            sentimiento: Sentimiento actual (reemplaza el del índice en la última barra)
+            x: Vector de variables explícito (opcional)
+        """
+        return float(self.theta @ self._x(sentimiento, x))
+
+    def _x(self, sentimiento=None, x=None):
+        x = self.x_actual.copy() if x is None else np.asarray(x, dtype=np.float64)
+        if sentimiento is not None:
+            x[-1] = sentimiento
+        return x
+
+    def contribuciones(self, sentimiento=None):
+        """Aporte de cada variable a la predicción (coeficiente x valor actual)"""
+        return pd.Series(self.theta * self._x(sentimiento), index=self.nombres)
+
+    def coeficientes(self):
+        """Coeficientes con su error estándar aproximado"""
+        escala = self.error2 if np.isfinite(self.error2) else 1.0
+        return pd.DataFrame({
+            'coeficiente': self.theta,
+            'error_estandar': np.sqrt(np.maximum(np.diag(self.P), 0.0) * escala),
+        }, index=self.nombres)
+
+    @property
+    def desviacion(self):
+        """Desviación de los errores de predicción (retorno en `horizonte` barras)"""
+        return float(np.sqrt(self.error2)) if np.isfinite(self.error2) else np.nan
+
+    # ---------------------------------------------
+    # Persistencia (junto a las matrices de precios)
+    # ---------------------------------------------
+
+    @staticmethod
+    def ruta(intervalo, data_dir=DATA_DIR):
+        return Path(data_dir) / DIR_MATRICES / f"factores_{intervalo}.npz"
+
+    def guardar(self, data_dir=DATA_DIR):
+        ruta = self.ruta(self.intervalo, data_dir)
+        ruta.parent.mkdir(parents=True, exist_ok=True)
+        tz = getattr(self.ultima_fecha, 'tz', None)
+        fechas = [self.ultima_fecha, self.fecha_actual]
+        arreglos = {
+            'intervalo': np.array(self.intervalo),
+            'referencia': np.array(self.referencia),
+            'factores': np.array(list(self.factores)),
+            'tickers_factores': np.array(list(self.factores.values())),
+            'parametros': np.array([self.horizonte, self.olvido]),
+            'theta0': self.theta0, 'P0': self.P0, 'theta': self.theta, 'P': self.P,
+            'estado': np.array([self.error2, self.actualizaciones, self.consumidas, self.filas]),
+            'x_actual': self.x_actual,
+            'precio_actual': np.array(self.precio_actual),
+            'fechas': np.array([pd.Timestamp(f).tz_localize(None).value if tz else pd.Timestamp(f).value
+                                for f in fechas]),
+            'tz': np.array(str(tz or '')),
+            'version': np.array(self.version or ''),
+            'tickers': np.array(self.tickers),
+            'ultima_fila': self.ultima_fila,
+        }
+        temporal = ruta.with_name(ruta.name + '.tmp')
+        with open(temporal, 'wb') as f:
+            np.savez(f, **arreglos)
+        os.replace(temporal, ruta)
+
+    @classmethod
+    def abrir(cls, intervalo='1d', data_dir=DATA_DIR):
+        """Cargar el estado guardado de un intervalo"""
+        with np.load(cls.ruta(intervalo, data_dir)) as datos:
+            horizonte, olvido = datos['parametros']
+            modelo = cls(str(datos['intervalo']), str(datos['referencia']),
+                         dict(zip(datos['factores'].tolist(), datos['tickers_factores'].tolist())),
+                         int(horizonte), float(olvido))
+            modelo.theta0, modelo.P0 = datos['theta0'], datos['P0']
+            modelo.theta, modelo.P = datos['theta'], datos['P']
+            error2, actualizaciones, consumidas, filas = datos['estado']
+            modelo.error2 = float(error2)
+            modelo.actualizaciones, modelo.consumidas, modelo.filas = int(actualizaciones), int(consumidas), int(filas)
+            modelo.x_actual = datos['x_actual']
+            modelo.precio_actual = float(datos['precio_actual'])
+            tz = str(datos['tz']) or None
+            modelo.ultima_fecha, modelo.fecha_actual = (pd.Timestamp(int(v), tz='UTC').tz_convert(tz) if tz
+                                                        else pd.Timestamp(int(v)) for v in datos['fechas'])
+            modelo.version = str(datos['version']) or None
+            modelo.tickers = datos['tickers'].tolist()
+            modelo.ultima_fila = datos['ultima_fila']
+        return modelo
+
+
+def obtener_modelo(intervalo='1d', data_dir=DATA_DIR, matriz=None, sentimiento=None):
+    """
+    Modelo de factores al día con la matriz de precios del intervalo
+
+    Usa el estado guardado si la matriz no cambió, aplica RLS solo a las barras
+    nuevas si la historia se extendió, y reajusta todo si no.
+    """
+    matriz = matriz or obtener_matriz(intervalo, data_dir)
+    try:
+        modelo = ModeloFactores.abrir(intervalo, data_dir)
+        if modelo.version == matriz.version and modelo.filas == matriz.forma[0]:
+            return modelo
+        if modelo.puede_avanzar(matriz):
+            pasos = modelo.avanzar(matriz, sentimiento)
+            print(f"📐 Modelo de factores {intervalo}: {pasos} actualizaciones RLS")
+            modelo.guardar(data_dir)
+            return modelo
+    except (FileNotFoundError, KeyError, ValueError) as e:
+        if not isinstance(e, FileNotFoundError):
+            print(f"⚠️ Modelo de factores {intervalo}: estado ilegible ({str(e)[:50]}), se reajusta")
+
+    modelo = ModeloFactores.construir(matriz, sentimiento)
+    modelo.guardar(data_dir)
+    return modelo
+
+
+def ajustar_todos(matriz, horizonte=None, factores=None, olvido=None, sentimiento=None, tickers=None):
+    """
+    Ajustar el modelo de factores con cada activo como objetivo (un solve en bloque)
+
+    Args:
+        matriz: MatrizPrecios
+        tickers: Activos objetivo (por defecto todos los de la matriz)
+
+    Returns:
+        DataFrame por ticker con los coeficientes, desviacion (% en el
+        horizonte) y observaciones
+    """
+    factores = dict(factores or FACTORES)
+    horizonte = horizonte or HORIZONTES[matriz.intervalo]
+    olvido = olvido or OLVIDO[matriz.intervalo]
+    objetivos = [_YAHOO.get(c, c) for c in (tickers or matriz.tickers)]
+
+    _, X, Y, _ = preparar(matriz, horizonte, REFERENCIA, factores, sentimiento, objetivos=objetivos)
+    nombres = ['constante', *factores, 'sentimiento']
+    theta0 = np.array([PRIOR.get(nombre, 0.0) for nombre in nombres])
+    theta, _, error2, n = _resolver(X, Y, olvido, theta0, np.eye(len(nombres)) * VARIANZA_INICIAL)
+
+    resultado = pd.DataFrame(theta, index=objetivos, columns=nombres)
+    resultado['desviacion'] = np.sqrt(error2) * 100
+    resultado['observaciones'] = n
+    return resultado
+
+
+if __name__ == '__main__':
+    import time
+
+    print("Ajustando modelo de factores del oro...\n")
+    matriz = obtener_matriz('1d')
+
+    inicio = time.time()
+    modelo = ModeloFactores.construir(matriz)
+    print(f"✅ Ajuste en bloque: {modelo.actualizaciones:,} barras en {(time.time() - inicio) * 1000:.0f} ms")
+    print(modelo.coeficientes().round(4))
+
+    # El mismo resultado barra a barra con RLS desde 200 barras atrás
+    incremental = ModeloFactores.construir(matriz, hasta=matriz.forma[0] - 200)
+    inicio = time.time()
+    pasos = incremental.avanzar(matriz)
+    print(f"\n✅ {pasos} pasos de RLS en {(time.time() - inicio) * 1000:.1f} ms; "
+          f"diferencia máxima con el bloque: {np.abs(incremental.theta - modelo.theta).max():.2e}")
+
+    retorno = modelo.predecir()
+    print(f"\n🔮 Oro en {modelo.horizonte} barras: {retorno * 100:+.2f}% "
+          f"(±{1.96 * modelo.desviacion * 100:.2f}%) desde ${modelo.precio_actual:,.2f}")
+
+    inicio = time.time()
+    todos = ajustar_todos(matriz)
+    print(f"\n✅ {len(todos)} activos ajustados en un solve en {(time.time() - inicio) * 1000:.0f} ms")
+    print(todos.sort_values('desviacion').head(8).round(4))
@@ -0,0 +1,289 @@
+"""
+Datos reducidos y figuras cacheadas para los gráficos de los dashboards
+Pirámide de resoluciones por serie (cada nivel conserva el mínimo y el máximo
+de cubetas del anterior, con la mitad de puntos) y LTTB (Largest Triangle
+Three Buckets) para entregar al navegador solo los puntos que caben en el
+ancho del gráfico, en lugar de toda la historia en cada recarga. Las figuras
+ya construidas se guardan como JSON en la caché compartida, con la versión de
+sus datos en la clave, y se reutilizan entre recargas y sesiones
+"""
+import functools
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+ANCHO = 1200     # Puntos por defecto: aproximadamente un punto por píxel
+MINIMO = 1000    # La pirámide deja de reducir al bajar de esta cantidad de puntos
+
+
+def _numerico(x):
+    """Eje x como float64 (las fechas como nanosegundos) para calcular áreas"""
+    if isinstance(x, pd.DatetimeIndex):
+        return x.asi8.astype(np.float64)
+    return np.asarray(x, dtype=np.float64)
+
+
+def min_max(y, cubetas):
+    """
+    Índices del mínimo y el máximo de cada cubeta, en orden, más el primero y el último
+
+    Args:
+        y: Valores de la serie
+        cubetas: Número de cubetas de igual tamaño
+
+    Returns:
+        Arreglo ordenado de índices (a lo sumo 2 * cubetas + 2)
+    """
+    n = len(y)
+    if cubetas <= 0 or 2 * cubetas >= n:
+        return np.arange(n)
+    tam = -(-n // cubetas)
+    # Las cubetas se rellenan con el último valor: sus extremos caen en n - 1
+    bloques = np.concatenate([y, np.repeat(y[-1:], tam * cubetas - n)]).reshape(cubetas, tam)
+    base = np.arange(cubetas) * tam
+    minimos = np.minimum(base + np.argmin(bloques, axis=1), n - 1)
+    maximos = np.minimum(base + np.argmax(bloques, axis=1), n - 1)
+    return np.unique(np.concatenate([[0], minimos, maximos, [n - 1]]))
+
+
+def lttb(x, y, puntos):
+    """
+    Índices elegidos por Largest Triangle Three Buckets
+
+    Conserva el primer y el último punto; de cada cubeta intermedia toma el
+    que forma el triángulo más grande con el punto elegido en la cubeta
+    anterior y el promedio de la siguiente.
+
+    Args:
+        x, y: Eje (numérico) y valores de la serie
+        puntos: Puntos a devolver
+
+    Returns:
+        Arreglo ordenado de índices
+    """
+    n = len(y)
+    if puntos >= n or puntos < 3:
+        return np.arange(n)
+
+    x = x - x[0]    # Fechas en ns: restar el origen evita perder precisión en las áreas
+    bordes = np.linspace(1, n - 1, puntos - 1).astype(np.int64)   # puntos - 2 cubetas
+    inicios, fines = bordes[:-1], bordes[1:]
+
+    # Promedio de cada cubeta con sumas acumuladas (la última usa el punto final)
+    sx = np.concatenate([[0.0], np.cumsum(x)])
+    sy = np.concatenate([[0.0], np.cumsum(y)])
+    tam = fines - inicios
+    promedio_x = np.append((sx[fines] - sx[inicios]) / tam, x[-1])
+    promedio_y = np.append((sy[fines] - sy[inicios]) / tam, y[-1])
+
+    # Las cubetas tienen pocos puntos: recorrerlas con floats de Python evita
+    # el costo fijo de varias llamadas a NumPy por cubeta
+    xs, ys = x.tolist(), y.tolist()
+    indices = [0]
+    a = 0
+    cubetas = zip(inicios.tolist(), fines.tolist(), promedio_x[1:].tolist(), promedio_y[1:].tolist())
+    for inicio, fin, cx, cy in cubetas:
+        xa, ya = xs[a], ys[a]
+        dx, dy = xa - cx, cy - ya
+        mejor = -1.0
+        for b in range(inicio, fin):
+            area = abs(dx * (ys[b] - ya) - (xa - xs[b]) * dy)
+            if area > mejor:
+                mejor, a = area, b
+        indices.append(a)
+    indices.append(n - 1)
+    return np.array(indices, dtype=np.int64)
+
+
+def reducir(serie, ancho=ANCHO):
+    """Series reducida por LTTB a `ancho` puntos (sin NaN)"""
+    serie = serie.dropna()
+    indices = lttb(_numerico(serie.index), serie.to_numpy(dtype=np.float64), ancho)
+    return serie.iloc[indices]
+
+
+class PiramideSerie:
+    """
+    Niveles de resolución precalculados de una serie
+
+    El nivel 0 es la serie completa; cada nivel siguiente toma mínimo y
+    máximo de cubetas de 4 puntos del anterior (la mitad de puntos) hasta
+    quedar por debajo de MINIMO. Una ventana usa el nivel más grueso que
+    aún tiene al menos `ancho` puntos en el rango pedido, así que acercar el
+    rango baja a niveles más finos sin recalcular nada.
+
+    Args:
+        serie: Series con índice de fechas (o numérico) ordenado
+        minimo: Puntos del nivel más grueso
+    """
+
+    def __init__(self, serie, minimo=MINIMO):
+        serie = serie.dropna()
+        self.version = huella(serie)    # Clave de las figuras hechas con la pirámide
+        self.nombre = serie.name
+        self.x = serie.index
+        self.y = serie.to_numpy(dtype=np.float64)
+        self._t = _numerico(self.x)
+
+        self.niveles = [np.arange(len(self.y))]
+        while len(self.niveles[-1]) > minimo:
+            previo = self.niveles[-1]
+            nuevo = previo[min_max(self.y[previo], -(-len(previo) // 4))]
+            if len(nuevo) >= len(previo):
+                break
+            self.niveles.append(nuevo)
+
+    @classmethod
+    def desde_matriz(cls, matriz, ticker, minimo=MINIMO):
+        """Pirámide de los cierres propios de un activo de la MatrizPrecios"""
+        return cls(matriz.serie(ticker), minimo)
+
+    def __len__(self):
+        return len(self.y)
+
+    def _posicion(self, limite, defecto):
+        """Posición en el nivel 0 de un límite de rango (None = extremo)"""
+        if limite is None:
+            return defecto
+        if isinstance(self.x, pd.DatetimeIndex):
+            limite = pd.Timestamp(limite)
+            if self.x.tz is not None and limite.tz is None:
+                limite = limite.tz_localize(self.x.tz)
+        return int(self.x.searchsorted(limite))
+
+    def _tramo(self, nivel, desde, hasta):
+        """Índices del nivel dentro de [desde, hasta) más un vecino a cada lado"""
+        indices = self.niveles[nivel]
+        i = max(int(np.searchsorted(indices, desde)) - 1, 0)
+        j = min(int(np.searchsorted(indices, hasta)) + 1, len(indices))
+        return indices[i:j]
+
+    def nivel(self, desde=None, hasta=None, ancho=ANCHO):
+        """Nivel más grueso con al menos `ancho` puntos entre desde y hasta"""
+        a = self._posicion(desde, 0)
+        b = self._posicion(hasta, len(self.y))
+        for k in range(len(self.niveles) - 1, 0, -1):
+            if len(self._tramo(k, a, b)) >= ancho:
+                return k
+        return 0
+
+    def ventana(self, desde=None, hasta=None, ancho=ANCHO, metodo='lttb'):
+        """
+        Puntos a graficar entre desde y hasta
+
+        Args:
+            desde, hasta: Límites del rango (None = toda la serie)
+            ancho: Ancho del gráfico en píxeles (puntos a devolver)
+            metodo: 'lttb' (forma de la línea, a lo sumo `ancho` puntos) o
+                    'minmax' (el nivel tal cual: conserva todos sus extremos)
+
+        Returns:
+            Series con los puntos elegidos
+        """
+        a = self._posicion(desde, 0)
+        b = self._posicion(hasta, len(self.y))
+        indices = self._tramo(self.nivel(desde, hasta, ancho), a, b)
+        if metodo == 'lttb':
+            indices = indices[lttb(self._t[indices], self.y[indices], ancho)]
+        elif metodo != 'minmax':
+            raise ValueError(f"Método no soportado: {metodo} (usar 'lttb' o 'minmax')")
+        return pd.Series(self.y[indices], index=self.x[indices], name=self.nombre)
+
+
+def huella(valor):
+    """
+    Parte de clave de caché de un argumento de figura
+
+    Los objetos versionados (MatrizPrecios, CorrelacionesRodantes, ...)
+    aportan su versión, los DataFrame/Series un hash de su contenido y el
+    resto su propio valor.
+    """
+    if isinstance(valor, (pd.DataFrame, pd.Series)):
+        etiquetas = list(valor.columns) if isinstance(valor, pd.DataFrame) else valor.name
+        digest = hashlib.sha1(pd.util.hash_pandas_object(valor).to_numpy().tobytes())
+        digest.update(repr(etiquetas).encode('utf-8'))
+        return digest.hexdigest()[:16]
+    version = getattr(valor, 'version', None)
+    return valor if version is None else version
+
+
+def figura_desde_json(texto):
+    """go.Figure de un JSON guardado por figura_cacheada (ya validado al construirse)"""
+    return go.Figure(json.loads(texto), _validate=False)
+
+
+def figura_cacheada(cache, tipo, espacio='figuras'):
+    """
+    Decorador para funciones que construyen una go.Figure
+
+    Guarda el JSON de la figura en la CacheCompartida (memoria y disco,
+    compartido entre sesiones y workers) con clave (archivo que define la
+    función, tipo, huella de cada argumento). El archivo separa a los
+    dashboards: Streamlit ejecuta todos como __main__ y comparten la carpeta
+    de la caché. Mientras los datos y parámetros no cambien, la figura sale
+    del JSON sin preparar datos, crear trazas ni volver a validarlas.
+
+    Args:
+        cache: CacheCompartida
+        tipo: Nombre del tipo de figura ('historico', 'deuda', ...), único por dashboard
+        espacio: Espacio de la caché
+    """
+    def decorador(funcion):
+        @functools.wraps(funcion)
+        def a_json(*args, **kwargs):
+            return funcion(*args, **kwargs).to_json()
+
+        archivo = os.path.abspath(funcion.__code__.co_filename)
+        serializada = cache.cacheado(espacio, clave=lambda *args, **kwargs: (
+            archivo, tipo, [huella(a) for a in args], sorted((k, huella(v)) for k, v in kwargs.items())
+        ))(a_json)
+
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            return figura_desde_json(serializada(*args, **kwargs))
+
+        envoltura.invalidar = serializada.invalidar
+        return envoltura
+    return decorador
+
+
+if __name__ == '__main__':
+    import time
+    from datos.matriz import obtener_matriz
+
+    print("Construyendo pirámides de resolución...\n")
+
+    for intervalo in ['1d', '1h', '5m']:
+        matriz = obtener_matriz(intervalo)
+        inicio = time.time()
+        piramide = PiramideSerie.desde_matriz(matriz, 'GC=F')
+        construccion = (time.time() - inicio) * 1000
+        inicio = time.time()
+        completa = piramide.ventana()
+        reciente = piramide.ventana(desde=piramide.x[-len(piramide) // 10])
+        print(f"✅ {intervalo}: {len(piramide):,} puntos -> niveles "
+              f"{[len(n) for n in piramide.niveles]} en {construccion:.1f} ms")
+        print(f"   toda la serie: {len(completa):,} puntos, último 10%: {len(reciente):,} puntos "
+              f"(nivel {piramide.nivel(desde=piramide.x[-len(piramide) // 10])}) "
+              f"en {(time.time() - inicio) * 1000:.1f} ms")
+
+    import tempfile
+    from pathlib import Path
+    from datos.cache import CacheCompartida
+
+    cache = CacheCompartida(Path(tempfile.mkdtemp()))
+
+    @figura_cacheada(cache, 'historico')
+    def figura(piramide, ancho):
+        puntos = piramide.ventana(ancho=ancho)
+        return go.Figure(go.Scatter(x=puntos.index, y=puntos.values, mode='lines'))
+
+    for intento in ['primera', 'segunda']:
+        inicio = time.time()
+        fig = figura(piramide, ANCHO)
+        print(f"✅ Figura ({intento} vez): {len(fig.data[0].x):,} puntos en {(time.time() - inicio) * 1000:.1f} ms")
+    print(f"   {cache.estadisticas()['figuras']}")
@@ -0,0 +1,37 @@
+"""
+Limitador de tasa compartido por los clientes de APIs y el motor de descarga
+Sin dependencias fuera de la librería estándar para que importarlo no arrastre
+pandas ni pyarrow
+"""
+import threading
+import time
+
+
+class LimitadorTasa:
+    """
+    Token bucket: hasta `capacidad` peticiones seguidas y luego `tasa` por segundo
+
+    Es seguro entre hilos; adquirir() bloquea solo al hilo que necesita esperar.
+    """
+
+    def __init__(self, tasa=2.0, capacidad=4):
+        self.tasa = float(tasa)
+        self.capacidad = float(capacidad)
+        self.tokens = float(capacidad)
+        self.ultimo = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _recargar(self):
+        ahora = time.monotonic()
+        self.tokens = min(self.capacidad, self.tokens + (ahora - self.ultimo) * self.tasa)
+        self.ultimo = ahora
+
+    def adquirir(self, tokens=1.0):
+        while True:
+            with self._lock:
+                self._recargar()
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                espera = (tokens - self.tokens) / self.tasa
+            time.sleep(espera)
@@ -0,0 +1,304 @@
+"""
+Matriz alineada de precios de cierre para análisis entre activos
+Una matriz float32 (fechas x activos) por intervalo, con calendario compartido y
+máscara de datos válidos, guardada como .npy para abrirse con memory-map
+"""
+import hashlib
+import json
+import os
+import threading
+import uuid
+from datetime import datetime
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from datos.activos import todos_los_tickers
+from datos.catalogo import DATA_DIR, CatalogoMercado, clave_ticker
+
+DIR_MATRICES = 'matrices'
+
+
+def huella_catalogo(catalogo, intervalo):
+    """Versión de los datos de un intervalo calculada solo con metadatos del catálogo"""
+    partes = sorted(
+        f"{e.ticker}:{e.registros}:{e.fecha_max}"
+        for (t, i), e in catalogo.entradas.items() if i == intervalo
+    )
+    return hashlib.sha1('|'.join(partes).encode('utf-8')).hexdigest()[:16]
+
+
+def _ordenar_tickers(disponibles):
+    """Tickers en el orden de ACTIVOS y luego el resto alfabéticamente"""
+    orden = [clave_ticker(t) for t in todos_los_tickers()]
+    conocidos = [t for t in orden if t in disponibles]
+    return conocidos + sorted(set(disponibles) - set(conocidos))
+
+
+def _guardar_atomico(ruta, escribir, modo, **kwargs):
+    """Escribir en un temporal propio de este proceso/hilo y publicarlo con os.replace"""
+    temporal = ruta.with_name(f"{ruta.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(temporal, modo, **kwargs) as f:
+            escribir(f)
+        os.replace(temporal, ruta)
+    except BaseException:
+        temporal.unlink(missing_ok=True)
+        raise
+
+
+def _archivos_publicados(ruta_manifiesto):
+    """Archivos a los que apunta el manifiesto actual (vacío si no existe o está dañado)"""
+    try:
+        with open(ruta_manifiesto, encoding='utf-8') as f:
+            return set(json.load(f)['archivos'].values())
+    except (OSError, ValueError, KeyError):
+        return set()
+
+
+def _limpiar_versiones(destino, intervalo, conservar):
+    """
+    Borrar versiones viejas de la matriz de un intervalo
+
+    Se conserva también la versión recién reemplazada: un lector que ya leyó
+    el manifiesto anterior todavía puede abrir sus archivos.
+    """
+    for prefijo in ('cierres', 'mascara', 'calendario'):
+        for ruta in destino.glob(f"{prefijo}_{intervalo}*.npy"):
+            if ruta.name in conservar:
+                continue
+            try:
+                ruta.unlink()
+            except OSError:     # En Windows no se puede borrar un archivo mapeado
+                pass
+
+
+def construir_matriz(intervalo='1d', data_dir=DATA_DIR, catalogo=None):
+    """
+    Construir y guardar la matriz alineada de cierres de un intervalo
+
+    Args:
+        intervalo: '1d', '1h' o '5m'
+        data_dir: Carpeta data_historico/
+        catalogo: CatalogoMercado ya indexado (opcional)
+
+    Returns:
+        MatrizPrecios abierta en modo memory-map
+    """
+    data_dir = Path(data_dir)
+    catalogo = catalogo or CatalogoMercado(data_dir)
+    tickers = _ordenar_tickers(catalogo.tickers(intervalo))
+
+    entradas = [catalogo.entrada(t, intervalo) for t in tickers]
+    almacen = entradas[0].almacen if entradas else None
+    if almacen is not None and all(e.almacen is not None for e in entradas):
+        # Un solo scan del almacén consolidado
+        ancho = almacen.consultar_ancho(tickers, intervalo, 'Close')
+    else:
+        ancho = pd.DataFrame({
+            t: catalogo.cargar(t, intervalo, columnas=['Close'])['Close'] for t in tickers
+        })
+    ancho = ancho.sort_index().reindex(columns=tickers)
+
+    calendario = pd.DatetimeIndex(ancho.index)
+    if calendario.tz is not None:
+        calendario = calendario.tz_convert('UTC').tz_localize(None)
+
+    valores = ancho.to_numpy(dtype=np.float32)
+    mascara = ~np.isnan(valores)
+
+    destino = data_dir / DIR_MATRICES
+    destino.mkdir(parents=True, exist_ok=True)
+
+    # Cada construcción escribe archivos con nombre propio y los publica
+    # reemplazando solo el manifiesto: un lector ve la matriz anterior o la
+    # nueva completa, nunca cierres nuevos con máscara o calendario viejos
+    version = huella_catalogo(catalogo, intervalo)
+    sufijo = f"{version}_{uuid.uuid4().hex[:8]}"
+    archivos = {
+        'cierres': f"cierres_{intervalo}_{sufijo}.npy",
+        'mascara': f"mascara_{intervalo}_{sufijo}.npy",
+        'calendario': f"calendario_{intervalo}_{sufijo}.npy",
+    }
+    for clave, arreglo in [('cierres', valores), ('mascara', mascara),
+                           ('calendario', calendario.asi8)]:
+        _guardar_atomico(destino / archivos[clave],
+                         lambda f, a=arreglo: np.save(f, np.ascontiguousarray(a)), 'wb')
+
+    manifiesto = {
+        'intervalo': intervalo,
+        'version': version,
+        'creado': datetime.now().isoformat(),
+        'forma': list(valores.shape),
+        'dtype': 'float32',
+        'tz': 'UTC' if intervalo != '1d' else None,
+        'tickers': tickers,
+        'archivos': archivos,
+    }
+    ruta_manifiesto = destino / f"cierres_{intervalo}.json"
+    anteriores = _archivos_publicados(ruta_manifiesto)
+    _guardar_atomico(ruta_manifiesto,
+                     lambda f: json.dump(manifiesto, f, indent=2), 'w', encoding='utf-8')
+    _limpiar_versiones(destino, intervalo, set(archivos.values()) | anteriores)
+
+    return MatrizPrecios.abrir(intervalo, data_dir)
+
+
+def rellenar_adelante(cierres, mascara):
+    """Último cierre válido hasta cada fila, por columna (float64)"""
+    cierres = np.asarray(cierres, dtype=np.float64)
+    mascara = np.asarray(mascara)
+    filas = np.where(mascara, np.arange(mascara.shape[0], dtype=np.int32)[:, None], 0)
+    np.maximum.accumulate(filas, axis=0, out=filas)
+    return np.take_along_axis(cierres, filas, axis=0)
+
+
+def retornos_simples(cierres, mascara):
+    """
+    Retornos entre observaciones válidas consecutivas de cada columna
+
+    Args:
+        cierres: float (fechas x activos)
+        mascara: bool (fechas x activos), True donde hay dato
+
+    Returns:
+        (retornos, validos) de forma (fechas - 1) x activos: el retorno de la
+        fila t+1 contra el último cierre válido anterior, y si es utilizable
+    """
+    mascara = np.asarray(mascara)
+    rellenos = rellenar_adelante(cierres, mascara)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        retornos = rellenos[1:] / rellenos[:-1] - 1
+    return retornos, mascara[1:] & np.isfinite(retornos)
+
+
+def obtener_matriz(intervalo='1d', data_dir=DATA_DIR, catalogo=None):
+    """Abrir la matriz del intervalo, reconstruyéndola si los datos cambiaron"""
+    data_dir = Path(data_dir)
+    catalogo = catalogo or CatalogoMercado(data_dir)
+    try:
+        matriz = MatrizPrecios.abrir(intervalo, data_dir)
+        if matriz.version == huella_catalogo(catalogo, intervalo):
+            return matriz
+    except (FileNotFoundError, ValueError, KeyError):
+        pass
+    return construir_matriz(intervalo, data_dir, catalogo)
+
+
+class MatrizPrecios:
+    """
+    Cierres alineados de todos los activos de un intervalo (solo lectura)
+
+    Los arreglos se abren con np.load(mmap_mode='r'): todas las sesiones de
+    Streamlit, procesos y notebooks que abren el mismo archivo comparten las
+    páginas del sistema operativo en lugar de tener copias en pandas.
+
+    Atributos:
+        cierres: float32 (fechas x activos), NaN donde el activo no cotiza
+        mascara: bool (fechas x activos), True donde hay dato
+        calendario: DatetimeIndex compartido por todas las columnas
+        tickers: claves de archivo de cada columna ('GC_F', 'IDX_GSPC', ...)
+    """
+
+    def __init__(self, manifiesto, cierres, mascara, calendario):
+        self.manifiesto = manifiesto
+        self.intervalo = manifiesto['intervalo']
+        self.version = manifiesto['version']
+        self.tickers = manifiesto['tickers']
+        self.posiciones = {t: i for i, t in enumerate(self.tickers)}
+        self.cierres = cierres
+        self.mascara = mascara
+        calendario = pd.DatetimeIndex(calendario.view('datetime64[ns]'))
+        if manifiesto.get('tz'):
+            calendario = calendario.tz_localize(manifiesto['tz'])
+        self.calendario = calendario
+
+    @classmethod
+    def abrir(cls, intervalo='1d', data_dir=DATA_DIR):
+        """Abrir una matriz ya construida en modo memory-map"""
+        origen = Path(data_dir) / DIR_MATRICES
+        with open(origen / f"cierres_{intervalo}.json", encoding='utf-8') as f:
+            manifiesto = json.load(f)
+
+        archivos = manifiesto['archivos']
+        cierres = np.load(origen / archivos['cierres'], mmap_mode='r')
+        mascara = np.load(origen / archivos['mascara'], mmap_mode='r')
+        calendario = np.load(origen / archivos['calendario'], mmap_mode='r')
+
+        if list(cierres.shape) != manifiesto['forma']:
+            raise ValueError(f"Matriz {intervalo} inconsistente con su manifiesto")
+        return cls(manifiesto, cierres, mascara, calendario)
+
+    @property
+    def forma(self):
+        return self.cierres.shape
+
+    def __contains__(self, ticker):
+        return clave_ticker(ticker) in self.posiciones
+
+    def columna(self, ticker):
+        """Índice de columna de un ticker (Yahoo o clave de archivo)"""
+        return self.posiciones[clave_ticker(ticker)]
+
+    def serie(self, ticker):
+        """Cierres válidos de un activo como Series (solo sus propias fechas)"""
+        j = self.columna(ticker)
+        validos = self.mascara[:, j]
+        return pd.Series(self.cierres[validos, j], index=self.calendario[validos],
+                         name=self.tickers[j])
+
+    def sub_matriz(self, tickers):
+        """Vista (fechas x len(tickers)) y su máscara, sin pasar por pandas"""
+        columnas = [self.columna(t) for t in tickers]
+        return self.cierres[:, columnas], self.mascara[:, columnas]
+
+    def a_dataframe(self, tickers=None):
+        """DataFrame ancho (copia) para los tickers pedidos o todos"""
+        tickers = tickers or self.tickers
+        valores, _ = self.sub_matriz(tickers)
+        return pd.DataFrame(np.asarray(valores), index=self.calendario,
+                            columns=[clave_ticker(t) for t in tickers])
+
+    def extiende(self, filas, ultima_fecha, ultima_fila):
+        """
+        True si la matriz conserva las primeras `filas` barras de un estado
+        anterior y solo agregó barras al final
+
+        Args:
+            filas: Barras que tenía la matriz del estado anterior
+            ultima_fecha: Fecha de su última barra
+            ultima_fila: Cierres de su última barra (NaN donde no había dato)
+        """
+        if not filas or self.forma[0] < filas:
+            return False
+        if self.calendario[filas - 1] != ultima_fecha:
+            return False
+        return np.array_equal(np.asarray(self.cierres[filas - 1]), ultima_fila, equal_nan=True)
+
+    def correlacion(self, ticker_a, ticker_b):
+        """Correlación de Pearson de los niveles en las fechas donde ambos cotizan"""
+        a, b = self.columna(ticker_a), self.columna(ticker_b)
+        comunes = self.mascara[:, a] & self.mascara[:, b]
+        if comunes.sum() < 2:
+            return float('nan')
+        x = self.cierres[comunes, a].astype(np.float64)
+        y = self.cierres[comunes, b].astype(np.float64)
+        return float(np.corrcoef(x, y)[0, 1])
+
+
+if __name__ == '__main__':
+    import time
+
+    print("Construyendo matrices alineadas de precios...\n")
+    catalogo = CatalogoMercado()
+
+    for intervalo in ['1d', '1h', '5m']:
+        inicio = time.time()
+        matriz = construir_matriz(intervalo, catalogo=catalogo)
+        filas, columnas = matriz.forma
+        cobertura = matriz.mascara.mean() * 100
+        print(f"✅ {intervalo}: {filas:,} fechas x {columnas} activos "
+              f"({cobertura:.1f}% con datos) en {time.time() - inicio:.2f}s")
+
+    matriz = MatrizPrecios.abrir('1d')
+    print(f"\nCorrelación Oro vs Plata (20 años): {matriz.correlacion('GC=F', 'SI=F'):.3f}")
@@ -0,0 +1,117 @@
+"""
+Servicio compartido de precios de cierre para los dashboards
+Sirve desde el almacén local las series que están al día y pide el resto
+a Yahoo Finance en una sola descarga por lotes
+"""
+from datetime import timedelta
+import pandas as pd
+
+from datos.catalogo import DATA_DIR, CatalogoMercado
+
+# Antigüedad máxima de la última barra diaria local para no ir a la red
+# (3 días cubre fines de semana y feriados)
+FRESCURA_DIARIA = timedelta(days=3)
+
+
+def _cierres_locales(catalogo, tickers, desde):
+    """Cierres diarios del almacén/catálogo local para los tickers pedidos"""
+    if not tickers:
+        return pd.DataFrame()
+
+    entradas = [catalogo.entrada(t, '1d') for t in tickers]
+    if all(e.almacen is not None for e in entradas):
+        # Un solo scan del almacén consolidado
+        ancho = entradas[0].almacen.consultar_ancho(tickers, '1d', 'Close', desde=desde)
+        return ancho.rename(columns={e.ticker: t for e, t in zip(entradas, tickers)})
+
+    return pd.DataFrame({
+        t: catalogo.cargar(t, '1d', columnas=['Close'], desde=desde)['Close'] for t in tickers
+    })
+
+
+def _cierres_remotos(tickers, desde):
+    """Una sola llamada a yf.download para todos los tickers (hilos internos de yfinance)"""
+    if not tickers:
+        return pd.DataFrame()
+
+    import yfinance as yf
+
+    data = yf.download(tickers, start=desde.strftime('%Y-%m-%d'), progress=False,
+                       group_by='column', threads=True)
+    if data is None or data.empty:
+        return pd.DataFrame()
+
+    if isinstance(data.columns, pd.MultiIndex):
+        cierres = data['Close']
+    else:
+        cierres = data[['Close']].rename(columns={'Close': tickers[0]})
+
+    if cierres.index.tz is not None:
+        cierres.index = cierres.index.tz_localize(None)
+    return cierres.dropna(axis=1, how='all')
+
+
+def obtener_cierres(tickers, dias=180, frescura=FRESCURA_DIARIA, catalogo=None, data_dir=DATA_DIR):
+    """
+    Cierres diarios alineados de varios activos
+
+    Args:
+        tickers: dict nombre -> ticker de Yahoo ({'Oro': 'GC=F', ...})
+        dias: Días de historia hacia atrás
+        frescura: Antigüedad máxima aceptable de la última barra local
+        catalogo: CatalogoMercado ya indexado (opcional)
+
+    Returns:
+        DataFrame con índice fecha y una columna por nombre (solo los que tienen datos)
+    """
+    ahora = pd.Timestamp.now().normalize()
+    desde = ahora - timedelta(days=dias)
+
+    if catalogo is None and data_dir is not None and data_dir.exists():
+        catalogo = CatalogoMercado(data_dir)
+
+    locales, remotos = [], []
+    for ticker in tickers.values():
+        if catalogo is not None and (ticker, '1d') in catalogo:
+            fecha_max = pd.Timestamp(catalogo.entrada(ticker, '1d').fecha_max)
+            if ahora - fecha_max <= frescura:
+                locales.append(ticker)
+                continue
+        remotos.append(ticker)
+
+    partes = []
+    try:
+        partes.append(_cierres_locales(catalogo, locales, desde))
+    except Exception as e:
+        print(f"⚠️ Precios locales no disponibles: {str(e)[:50]}")
+        remotos = locales + remotos
+
+    try:
+        partes.append(_cierres_remotos(remotos, desde))
+    except Exception as e:
+        print(f"⚠️ Error descargando {len(remotos)} tickers: {str(e)[:50]}")
+
+    partes = [p for p in partes if not p.empty]
+    if not partes:
+        return pd.DataFrame()
+
+    cierres = pd.concat(partes, axis=1).sort_index()
+    cierres = cierres[cierres.index >= desde]
+    cierres.index.name = 'Date'
+    cierres.columns.name = None
+
+    nombres = {ticker: nombre for nombre, ticker in tickers.items()}
+    columnas = [t for t in tickers.values() if t in cierres.columns]
+    return cierres[columnas].rename(columns=nombres)
+
+
+if __name__ == '__main__':
+    import time
+
+    print("Probando servicio de precios...\n")
+
+    # Locales si el almacén está al día; el resto en una sola descarga por lotes
+    inicio = time.time()
+    df = obtener_cierres({'Oro': 'GC=F', 'Plata': 'SI=F', 'Cobre': 'HG=F', 'VIX': '^VIX'}, dias=30)
+    print(f"✅ {df.shape[1]} activos, {len(df)} fechas en {time.time() - inicio:.2f}s")
+    print(df.tail(3))
@@ -0,0 +1,246 @@
+"""
+Señales de tendencia, volatilidad y relación con el oro para todos los activos
+Se calculan en una sola pasada NumPy sobre la MatrizPrecios (fechas x activos)
+y las reglas de recomendación se aplican como operaciones sobre arreglos, de
+modo que rankear los 80 activos cuesta lo mismo que rankear ocho
+"""
+import numpy as np
+import pandas as pd
+
+from datos.activos import ACTIVOS, categoria_de
+from datos.catalogo import clave_ticker
+from datos.correlaciones import VENTANAS, CorrelacionesRodantes
+from datos.matriz import retornos_simples
+
+REFERENCIA = 'GC=F'          # Activo contra el que se miden diversificación y correlación
+VENTANA_CORRELACION = '250d'  # Ventana de correlaciones.VENTANAS['1d'] para la relación con el oro
+
+# Activos con nombre propio en el dashboard: ticker -> nombre
+# (los términos con que los nombran las noticias están en activos.ALIAS_NOTICIAS)
+DESTACADOS = {
+    'GC=F': 'ORO (GC=F)',
+    'SI=F': 'PLATA (SI=F)',
+    '^GSPC': 'S&P 500',
+    '^IXIC': 'NASDAQ',
+    'BTC-USD': 'BITCOIN',
+    'CL=F': 'PETRÓLEO (CL=F)',
+    'DX-Y.NYB': 'DÓLAR (DXY)',
+    'EURUSD=X': 'EUR/USD',
+}
+
+# Otros refugios que la deuda global también favorece (a la mitad que el oro)
+REFUGIOS = ['SI=F', 'BTC-USD']
+
+# Nombres de todos los activos por clave de archivo ('GC_F' -> ('GC=F', 'Oro Futuro'))
+_POR_CLAVE = {
+    clave_ticker(ticker): (ticker, nombre)
+    for activos in ACTIVOS.values() for ticker, nombre in activos.items()
+}
+
+
+def nombre_activo(ticker):
+    """Nombre para mostrar: el del dashboard si es destacado, si no 'Nombre (ticker)'"""
+    if ticker in DESTACADOS:
+        return DESTACADOS[ticker]
+    nombre = _POR_CLAVE.get(clave_ticker(ticker), (ticker, ticker))[1]
+    return f"{nombre} ({ticker})"
+
+
+def _valor_atras(cierres, cuenta, n, k):
+    """
+    Valor válido k posiciones antes del último de cada columna (NaN si no existe)
+
+    Usa solo las fechas propias de cada activo, como matriz.serie(), pero
+    procesa todas las columnas juntas.
+    """
+    objetivo = n - k
+    fila = np.argmax(cuenta >= objetivo, axis=0)
+    valores = cierres[fila, np.arange(cierres.shape[1])]
+    return np.where(objetivo >= 1, valores, np.nan)
+
+
+def calcular_senales(matriz, tickers=None, referencia=REFERENCIA, ventana=VENTANA_CORRELACION,
+                     correlaciones=None):
+    """
+    Señales de todos los activos en una sola pasada
+
+    Args:
+        matriz: MatrizPrecios diaria
+        tickers: Tickers a incluir (None = todos los de la matriz)
+        referencia: Ticker del oro para la correlación
+        ventana: Nombre de la ventana de sesiones para la correlación de retornos
+        correlaciones: CorrelacionesRodantes de la misma matriz (None = calcular
+                       solo esa ventana)
+
+    Returns:
+        DataFrame indexado por clave de archivo con ticker, activo, categoria,
+        precio, cambio_5d, cambio_20d, volatilidad (std de retornos diarios de
+        toda la historia, %), observaciones y corr_oro
+    """
+    claves = [clave_ticker(t) for t in tickers] if tickers else list(matriz.tickers)
+    claves = [c for c in claves if c in matriz.posiciones]
+    if not claves:
+        return pd.DataFrame()
+
+    cierres, mascara = matriz.sub_matriz(claves)
+    cierres = np.asarray(cierres, dtype=np.float64)
+    mascara = np.asarray(mascara)
+
+    # Tendencia: último valor válido contra el de 5 y 20 observaciones antes
+    cuenta = np.cumsum(mascara, axis=0, dtype=np.int32)
+    n = cuenta[-1]
+    ultimo = _valor_atras(cierres, cuenta, n, 0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cambio_5d = (ultimo / _valor_atras(cierres, cuenta, n, 5) - 1) * 100
+        cambio_20d = (ultimo / _valor_atras(cierres, cuenta, n, 20) - 1) * 100
+
+    # Volatilidad: desviación (ddof=1) de los retornos entre observaciones
+    # válidas consecutivas de toda la historia
+    retornos, finitos = retornos_simples(cierres, mascara)
+    cuenta = finitos.sum(axis=0)
+    r = np.where(finitos, retornos, 0.0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        media = r.sum(axis=0) / cuenta
+        varianza = (np.where(finitos, retornos - media, 0.0) ** 2).sum(axis=0) / (cuenta - 1)
+    volatilidad = np.where(cuenta > 1, np.sqrt(varianza) * 100, np.nan)
+
+    # Relación con el oro: retornos de las últimas sesiones en las que cotizan ambos
+    corr_oro = np.full(len(claves), np.nan)
+    if clave_ticker(referencia) in matriz.posiciones:
+        if (correlaciones is None or correlaciones.version != matriz.version
+                or ventana not in correlaciones.ventanas):
+            correlaciones = CorrelacionesRodantes.construir(
+                matriz, {ventana: VENTANAS['1d'][ventana]}, referencia)
+        con_ref = correlaciones.con(referencia, ventana).to_numpy()
+        corr_oro = con_ref[[correlaciones.tickers.index(c) for c in claves]]
+
+    yahoo = [_POR_CLAVE.get(c, (c, c))[0] for c in claves]
+    return pd.DataFrame({
+        'ticker': yahoo,
+        'activo': [nombre_activo(t) for t in yahoo],
+        'categoria': [categoria_de(t) for t in yahoo],
+        'precio': ultimo,
+        'cambio_5d': cambio_5d,
+        'cambio_20d': cambio_20d,
+        'volatilidad': volatilidad,
+        'observaciones': n,
+        'corr_oro': corr_oro,
+    }, index=pd.Index(claves, name='clave'))
+
+
+def puntuar_senales(senales, sentimiento_promedio=0.0, sentimiento_activo=None,
+                    impacto_deuda=None, referencia=REFERENCIA, refugios=REFUGIOS):
+    """
+    Aplicar las reglas de recomendación a todos los activos a la vez
+
+    Args:
+        senales: DataFrame de calcular_senales
+        sentimiento_promedio: Sentimiento general de las noticias
+        sentimiento_activo: dict ticker -> sentimiento de sus noticias (opcional)
+        impacto_deuda: dict de calcular_impacto_deuda_en_oro (opcional)
+
+    Returns:
+        Copia de senales con score, accion, nivel_riesgo y las columnas
+        booleanas de cada regla (para construir las razones), ordenada por score
+    """
+    if senales.empty:
+        return senales
+
+    c5 = senales['cambio_5d'].to_numpy()
+    vol = senales['volatilidad'].to_numpy()
+    es_ref = (senales['ticker'] == referencia).to_numpy()
+
+    # 1. Tendencia de 5 días
+    alcista, bajista = c5 > 2, c5 < -2
+    score = 30.0 * alcista - 30.0 * bajista
+
+    # 2. Sentimiento general (igual para todos)
+    score += 20.0 if sentimiento_promedio > 0.2 else (-20.0 if sentimiento_promedio < -0.2 else 0.0)
+
+    # 3. Volatilidad: la alta solo resta a las recomendaciones de compra
+    alta_vol, baja_vol = vol > 3, vol < 1
+    score -= 15.0 * (alta_vol & (score > 0))
+    score += 10.0 * baja_vol
+
+    # 4. Diversificación: el oro sube y el activo baja
+    cambio_ref = c5[es_ref][0] if es_ref.any() else np.nan
+    diversifica = ~es_ref & (cambio_ref > 0) & (c5 < -1)
+    score += 15.0 * diversifica
+
+    # 5. Noticias específicas del activo
+    sent_activo = senales['ticker'].map(sentimiento_activo or {}).astype(float).to_numpy()
+    noticias_pos, noticias_neg = sent_activo > 0.3, sent_activo < -0.3
+    score += 25.0 * noticias_pos - 25.0 * noticias_neg
+
+    # 6. Deuda global: pilar estructural del oro, la mitad para otros refugios
+    score_deuda = impacto_deuda['score'] if impacto_deuda else 0.0
+    es_refugio = senales['ticker'].isin(refugios).to_numpy()
+    score += np.where(es_ref, score_deuda, 0.0) + np.where(es_refugio, score_deuda * 0.5, 0.0)
+
+    accion = np.select(
+        [score > 40, score > 10, score > -10, score > -40],
+        ["🟢 COMPRAR", "🟡 CONSIDERAR COMPRA", "⚪ MANTENER", "🟠 CONSIDERAR VENTA"],
+        default="🔴 VENDER / EVITAR"
+    )
+    nivel_riesgo = np.select(
+        [(score > 40) & (vol > 2.5), score > 40, score > 10, score > -10, score > -40],
+        ["Alto", "Moderado", "Moderado", "Bajo", "Moderado"],
+        default="Alto"
+    )
+
+    # Un solo concat: insertar las columnas una a una cuesta más que las reglas
+    resultado = pd.concat([senales, pd.DataFrame({
+        'score': score, 'accion': accion, 'nivel_riesgo': nivel_riesgo,
+        'alcista': alcista, 'bajista': bajista, 'alta_vol': alta_vol, 'baja_vol': baja_vol & ~alta_vol,
+        'diversifica': diversifica, 'noticias_pos': noticias_pos, 'noticias_neg': noticias_neg,
+        'deuda': (es_ref | es_refugio) & bool(impacto_deuda), 'es_referencia': es_ref,
+    }, index=senales.index)], axis=1)
+    return resultado.sort_values('score', ascending=False, kind='stable')
+
+
+def razones_activo(fila, sentimiento_promedio=0.0, impacto_deuda=None):
+    """Lista de razones legibles de una fila de puntuar_senales"""
+    razones = []
+    if fila['alcista']:
+        razones.append(f"📈 Tendencia alcista +{fila['cambio_5d']:.1f}% (5 días)")
+    elif fila['bajista']:
+        razones.append(f"📉 Tendencia bajista {fila['cambio_5d']:.1f}% (5 días)")
+
+    if sentimiento_promedio > 0.2:
+        razones.append(f"😊 Sentimiento positivo del mercado ({sentimiento_promedio:.2f})")
+    elif sentimiento_promedio < -0.2:
+        razones.append(f"😞 Sentimiento negativo del mercado ({sentimiento_promedio:.2f})")
+
+    if fila['alta_vol']:
+        razones.append(f"⚠️ Alta volatilidad {fila['volatilidad']:.1f}% - Mayor riesgo")
+    elif fila['baja_vol']:
+        razones.append(f"✅ Baja volatilidad {fila['volatilidad']:.1f}% - Menor riesgo")
+
+    if fila['diversifica']:
+        razones.append("🔄 Oportunidad de diversificación vs ORO")
+
+    if fila['noticias_pos']:
+        razones.append(f"📰 Noticias muy positivas sobre {fila['activo']}")
+    elif fila['noticias_neg']:
+        razones.append(f"📰 Noticias negativas sobre {fila['activo']}")
+
+    if fila['deuda']:
+        if fila['es_referencia']:
+            razones.extend(impacto_deuda['razones'])
+        else:
+            razones.append("💰 Deuda global favorece activos refugio")
+    return razones
+
+
+if __name__ == '__main__':
+    import time
+    from datos.matriz import obtener_matriz
+
+    print("Calculando señales de todos los activos...\n")
+    matriz = obtener_matriz('1d')
+
+    inicio = time.time()
+    senales = calcular_senales(matriz)
+    ranking = puntuar_senales(senales, sentimiento_promedio=0.1)
+    print(f"✅ {len(ranking)} activos puntuados en {(time.time() - inicio) * 1000:.1f} ms\n")
+    print(ranking[['activo', 'score', 'accion', 'cambio_5d', 'volatilidad', 'corr_oro']].head(10))
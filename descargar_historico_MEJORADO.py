@@ -13,19 +13,19 @@ ESTRATEGIA ÓPTIMA:
 3. Datos de 1 minuto de los últimos 7 días
 
 RESULTADO ESPERADO: 5-10 MILLONES DE REGISTROS
-TIEMPO: 30-60 minutos
+TIEMPO: ~5-10 minutos (descarga paralela con límite de tasa)
+REANUDABLE: si se interrumpe, la siguiente ejecución continúa donde quedó
 PESO ESTIMADO: 2-3 GB
 """
 
-import yfinance as yf
-import pandas as pd
-from datetime import datetime, timedelta
-import time
-import os
+from datetime import datetime
 from pathlib import Path
 import warnings
 warnings.filterwarnings('ignore')
 
+from datos.almacen import AlmacenHistorico
+from datos.descarga import MotorDescarga, FuenteYahoo, LimitadorTasa
+
 # ============================================
 # CONFIGURACIÓN
 # ============================================
@@ -33,6 +33,9 @@ warnings.filterwarnings('ignore')
 DATA_DIR = Path("data_historico")
 DATA_DIR.mkdir(exist_ok=True)
 
+# Todas las series se escriben en el almacén consolidado (historico.parquet)
+almacen = AlmacenHistorico(DATA_DIR)
+
 print("="*70)
 print("🚀 DESCARGA MASIVA MEJORADA - ESTRATEGIA MULTI-INTERVALO")
 print("="*70)
@@ -42,235 +45,61 @@ print(f"📁 Guardando en: {DATA_DIR.absolute()}\n")
 # LISTA COMPLETA DE ACTIVOS (80 activos)
 # ============================================
 
-ACTIVOS = {
-    # METALES PRECIOSOS (5)
-    'metales': {
-        'GC=F': 'Oro Futuro',
-        'SI=F': 'Plata Futuro',
-        'PL=F': 'Platino',
-        'PA=F': 'Paladio',
-        'HG=F': 'Cobre'
-    },
-    
-    # ÍNDICES PRINCIPALES (15)
-    'indices': {
-        '^GSPC': 'S&P 500',
-        '^DJI': 'Dow Jones',
-        '^IXIC': 'NASDAQ',
-        '^RUT': 'Russell 2000',
-        '^FTSE': 'FTSE 100',
-        '^N225': 'Nikkei 225',
-        '^HSI': 'Hang Seng',
-        '^GDAXI': 'DAX',
-        '^FCHI': 'CAC 40',
-        '^IBEX': 'IBEX 35',
-        '^MXX': 'IPC México',
-        '^BVSP': 'Bovespa Brasil',
-        '^MERV': 'Merval Argentina',
-        '^AXJO': 'ASX 200 Australia',
-        '^KS11': 'KOSPI Korea'
-    },
-    
-    # DIVISAS (10)
-    'divisas': {
-        'EURUSD=X': 'EUR/USD',
-        'GBPUSD=X': 'GBP/USD',
-        'JPYUSD=X': 'JPY/USD',
-        'AUDUSD=X': 'AUD/USD',
-        'NZDUSD=X': 'NZD/USD',
-        'CADUSD=X': 'CAD/USD',
-        'CHFUSD=X': 'CHF/USD',
-        'MXNUSD=X': 'MXN/USD',
-        'CNYUSD=X': 'CNY/USD',
-        'DX-Y.NYB': 'Índice Dólar DXY'
-    },
-    
-    # CRIPTOMONEDAS (15)
-    'cripto': {
-        'BTC-USD': 'Bitcoin',
-        'ETH-USD': 'Ethereum',
-        'BNB-USD': 'Binance Coin',
-        'XRP-USD': 'Ripple',
-        'ADA-USD': 'Cardano',
-        'SOL-USD': 'Solana',
-        'DOGE-USD': 'Dogecoin',
-        'DOT-USD': 'Polkadot',
-        'MATIC-USD': 'Polygon',
-        'LTC-USD': 'Litecoin',
-        'AVAX-USD': 'Avalanche',
-        'LINK-USD': 'Chainlink',
-        'UNI-USD': 'Uniswap',
-        'ATOM-USD': 'Cosmos',
-        'XLM-USD': 'Stellar'
-    },
-    
-    # ENERGÍA Y COMMODITIES (15)
-    'energia': {
-        'CL=F': 'Petróleo WTI',
-        'BZ=F': 'Petróleo Brent',
-        'NG=F': 'Gas Natural',
-        'ZC=F': 'Maíz',
-        'ZS=F': 'Soja',
-        'ZW=F': 'Trigo',
-        'KC=F': 'Café',
-        'SB=F': 'Azúcar',
-        'CT=F': 'Algodón',
-        'CC=F': 'Cacao',
-        'HO=F': 'Heating Oil',
-        'RB=F': 'Gasolina',
-        'LE=F': 'Ganado',
-        'GF=F': 'Ganado Alimentado',
-        'ZL=F': 'Aceite de Soja'
-    },
-    
-    # ETFs IMPORTANTES (20)
-    'etfs': {
-        'GLD': 'SPDR Gold Shares',
-        'SLV': 'iShares Silver Trust',
-        'USO': 'US Oil Fund',
-        'UNG': 'US Natural Gas Fund',
-        'SPY': 'SPDR S&P 500 ETF',
-        'QQQ': 'Invesco QQQ Trust',
-        'DIA': 'SPDR Dow Jones ETF',
-        'IWM': 'iShares Russell 2000',
-        'TLT': '20+ Year Treasury Bond',
-        'AGG': 'Core US Aggregate Bond',
-        'EEM': 'Emerging Markets ETF',
-        'VWO': 'Vanguard Emerging Markets',
-        'XLE': 'Energy Select Sector',
-        'XLF': 'Financial Select Sector',
-        'XLK': 'Technology Select Sector',
-        'XLV': 'Health Care Select',
-        'XLP': 'Consumer Staples',
-        'XLI': 'Industrial Select',
-        'XLU': 'Utilities Select',
-        'GDX': 'Gold Miners ETF'
-    }
-}
+from datos.activos import ACTIVOS
 
 # ============================================
-# FUNCIÓN DE DESCARGA INTELIGENTE
+# MOTOR DE DESCARGA (paralelo y reanudable)
 # ============================================
 
-def descargar_activo(ticker, nombre, categoria):
-    """Descarga un activo con múltiples intervalos"""
-    registros_total = 0
-    
-    print(f"\n{'='*70}")
-    print(f"📊 {nombre} ({ticker})")
-    print(f"{'='*70}")
-    
-    # ESTRATEGIA 1: Datos DIARIOS - 20 años
-    print(f"  📅 Descargando datos DIARIOS (20 años)...")
-    try:
-        df_diario = yf.download(
-            ticker,
-            period="20y",
-            interval="1d",
-            progress=False
-        )
-        
-        if not df_diario.empty:
-            if isinstance(df_diario.columns, pd.MultiIndex):
-                df_diario.columns = df_diario.columns.get_level_values(0)
-            
-            filename = DATA_DIR / f"{ticker.replace('=', '_').replace('^', 'IDX_').replace('-', '_')}_20y_1d.parquet"
-            df_diario.to_parquet(filename)
-            
-            registros = len(df_diario)
-            registros_total += registros
-            print(f"     ✅ {registros:,} registros diarios guardados")
-        else:
-            print(f"     ⚠️  Sin datos diarios")
-    except Exception as e:
-        print(f"     ❌ Error diarios: {str(e)[:50]}")
-    
-    time.sleep(0.5)
-    
-    # ESTRATEGIA 2: Datos HORARIOS - 730 días (límite de Yahoo)
-    print(f"  ⏰ Descargando datos HORARIOS (730 días)...")
-    try:
-        df_horario = yf.download(
-            ticker,
-            period="730d",
-            interval="1h",
-            progress=False
-        )
-        
-        if not df_horario.empty:
-            if isinstance(df_horario.columns, pd.MultiIndex):
-                df_horario.columns = df_horario.columns.get_level_values(0)
-            
-            filename = DATA_DIR / f"{ticker.replace('=', '_').replace('^', 'IDX_').replace('-', '_')}_730d_1h.parquet"
-            df_horario.to_parquet(filename)
-            
-            registros = len(df_horario)
-            registros_total += registros
-            print(f"     ✅ {registros:,} registros horarios guardados")
-        else:
-            print(f"     ⚠️  Sin datos horarios")
-    except Exception as e:
-        print(f"     ❌ Error horarios: {str(e)[:50]}")
-    
-    time.sleep(0.5)
-    
-    # ESTRATEGIA 3: Datos de 5 MINUTOS - 60 días
-    print(f"  🕐 Descargando datos de 5 MINUTOS (60 días)...")
-    try:
-        df_5min = yf.download(
-            ticker,
-            period="60d",
-            interval="5m",
-            progress=False
-        )
-        
-        if not df_5min.empty:
-            if isinstance(df_5min.columns, pd.MultiIndex):
-                df_5min.columns = df_5min.columns.get_level_values(0)
-            
-            filename = DATA_DIR / f"{ticker.replace('=', '_').replace('^', 'IDX_').replace('-', '_')}_60d_5m.parquet"
-            df_5min.to_parquet(filename)
-            
-            registros = len(df_5min)
-            registros_total += registros
-            print(f"     ✅ {registros:,} registros de 5min guardados")
-        else:
-            print(f"     ⚠️  Sin datos de 5min")
-    except Exception as e:
-        print(f"     ❌ Error 5min: {str(e)[:50]}")
-    
-    time.sleep(0.5)
-    
-    print(f"  🎯 Subtotal {nombre}: {registros_total:,} registros")
-    
-    return registros_total
+NOMBRES_INTERVALO = {'1d': 'diarios', '1h': 'horarios', '5m': 'de 5min'}
+
+def mostrar_progreso(ticker, intervalo, estado, registros):
+    """Imprime el resultado de cada trabajo a medida que termina"""
+    if estado == 'ok':
+        print(f"  ✅ {ticker:12s} {intervalo:>3s}: {registros:,} registros {NOMBRES_INTERVALO[intervalo]}")
+    elif estado == 'vacio':
+        print(f"  ⚠️  {ticker:12s} {intervalo:>3s}: Sin datos {NOMBRES_INTERVALO[intervalo]}")
+    else:
+        print(f"  ❌ {ticker:12s} {intervalo:>3s}: Error tras {motor.reintentos} intentos")
+
+# 6 workers y máximo 2 peticiones/s a Yahoo (ráfagas de hasta 4)
+motor = MotorDescarga(
+    fuente=FuenteYahoo(),
+    almacen=almacen,
+    workers=6,
+    limitadores={'yahoo': LimitadorTasa(tasa=2.0, capacidad=4)},
+    reintentos=3,
+    backoff=2.0
+)
+
+categoria_por_ticker = {t: c for c, activos in ACTIVOS.items() for t in activos}
+trabajos = MotorDescarga.trabajos_para(list(categoria_por_ticker))
+
+ya_completos = sum(1 for t, _, i in trabajos if motor.libro.estado(t, i) in ('ok', 'vacio'))
+if ya_completos:
+    print(f"♻️  Reanudando ejecución anterior: {ya_completos}/{len(trabajos)} trabajos ya completos\n")
 
 # ============================================
 # PROCESO DE DESCARGA
 # ============================================
 
+print(f"📊 {len(trabajos)} trabajos ({len(categoria_por_ticker)} activos × 3 intervalos)\n")
+
+resultados = motor.ejecutar(trabajos, al_terminar=mostrar_progreso)
+
 total_general = 0
-resumen_por_categoria = {}
-
-for categoria, activos in ACTIVOS.items():
-    print(f"\n\n{'#'*70}")
-    print(f"{'#'*70}")
-    print(f"##  {categoria.upper()}")
-    print(f"{'#'*70}")
-    print(f"{'#'*70}\n")
-    
-    subtotal_categoria = 0
-    
-    for ticker, nombre in activos.items():
-        registros = descargar_activo(ticker, nombre, categoria)
-        subtotal_categoria += registros
-        total_general += registros
-    
-    resumen_por_categoria[categoria] = subtotal_categoria
-    
-    print(f"\n{'='*70}")
-    print(f"✅ TOTAL {categoria.upper()}: {subtotal_categoria:,} registros")
-    print(f"{'='*70}")
+resumen_por_categoria = {categoria: 0 for categoria in ACTIVOS}
+
+for (ticker, intervalo), (estado, registros) in resultados.items():
+    resumen_por_categoria[categoria_por_ticker[ticker]] += registros
+    total_general += registros
+
+errores = [clave for clave, (estado, _) in resultados.items() if estado == 'error']
+if errores:
+    print(f"\n⚠️  {len(errores)} trabajos con error. Vuelve a ejecutar el script para reintentarlos.")
+elif motor.libro.completo():
+    # Ejecución completa: la próxima vez se empieza desde cero
+    motor.libro.borrar()
 
 # ============================================
 # RESUMEN FINAL
@@ -293,11 +122,11 @@ print(f"  🎯 TOTAL GENERAL: {total_general:>23,} registros")
 print(f"  {'='*50}\n")
 
 # Calcular espacio
-archivos = list(DATA_DIR.glob("*.parquet"))
-tamano_total = sum(f.stat().st_size for f in archivos) / (1024**3)
+series = almacen.particiones()
+tamano_total = almacen.ruta.stat().st_size / (1024**3) if almacen.existe() else 0
 
 print(f"💾 ESPACIO EN DISCO:")
-print(f"  📁 Archivos creados: {len(archivos)}")
+print(f"  📁 Series en el almacén: {len(series)}")
 print(f"  💿 Tamaño total: {tamano_total:.2f} GB")
 print(f"  📂 Ubicación: {DATA_DIR.absolute()}\n")
 
@@ -329,7 +158,8 @@ if total_general >= 20_000_000:
 print(f"\n📝 PRÓXIMOS PASOS:")
 print(f"  1. Ejecutar: python cargar_datos_dashboard.py")
 print(f"  2. Ver resumen completo de datos")
-print(f"  3. Integrar con dashboard: streamlit run dashboard_oro.py\n")
+print(f"  3. Integrar con dashboard: streamlit run dashboard_oro.py")
+print(f"  4. Refrescar solo lo nuevo: python actualizar_historico.py 5m 1h --cada 5\n")
 
 print(f"{'='*70}")
 print(f"✅ PROCESO COMPLETADO EXITOSAMENTE")
@@ -340,7 +170,7 @@ import json
 resumen_json = {
     'fecha_descarga': datetime.now().isoformat(),
     'total_registros': total_general,
-    'total_archivos': len(archivos),
+    'total_archivos': len(series),
     'tamano_gb': round(tamano_total, 2),
     'resumen_categorias': resumen_por_categoria,
     'peso_por_millon_gb': round(peso_por_millon, 2),
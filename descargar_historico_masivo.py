@@ -21,6 +21,8 @@ from pathlib import Path
 import warnings
 warnings.filterwarnings('ignore')
 
+from datos.almacen import AlmacenHistorico
+
 # ============================================
 # CONFIGURACIÓN
 # ============================================
@@ -29,6 +31,10 @@ warnings.filterwarnings('ignore')
 DATA_DIR = Path("data_historico")
 DATA_DIR.mkdir(exist_ok=True)
 
+# Todas las series se escriben en el almacén consolidado (historico.parquet)
+almacen = AlmacenHistorico(DATA_DIR)
+lote = almacen.escritura()
+
 print("="*60)
 print("🚀 DESCARGA MASIVA DE DATOS HISTÓRICOS")
 print("="*60)
@@ -70,8 +76,7 @@ for ticker, nombre in metales.items():
             if isinstance(df.columns, pd.MultiIndex):
                 df.columns = df.columns.get_level_values(0)
             
-            filename = DATA_DIR / f"{ticker.replace('=', '_')}_10años_1h.parquet"
-            df.to_parquet(filename)
+            lote.agregar(ticker, '1h', df)
             
             registros = len(df)
             total_registros += registros
@@ -84,6 +89,7 @@ for ticker, nombre in metales.items():
         print(f"  ❌ Error con {nombre}: {str(e)}")
 
 print(f"\n💰 Subtotal Metales: {total_registros:,} registros")
+lote.confirmar()
 
 # ============================================
 # 2. ÍNDICES BURSÁTILES
@@ -123,8 +129,7 @@ for ticker, nombre in indices.items():
             if isinstance(df.columns, pd.MultiIndex):
                 df.columns = df.columns.get_level_values(0)
             
-            filename = DATA_DIR / f"{ticker.replace('^', 'IDX_')}_10años_1h.parquet"
-            df.to_parquet(filename)
+            lote.agregar(ticker, '1h', df)
             
             registros = len(df)
             subtotal_indices += registros
@@ -137,6 +142,7 @@ for ticker, nombre in indices.items():
         print(f"  ❌ Error con {nombre}: {str(e)}")
 
 print(f"\n📈 Subtotal Índices: {subtotal_indices:,} registros")
+lote.confirmar()
 
 # ============================================
 # 3. DIVISAS (FOREX)
@@ -174,8 +180,7 @@ for ticker, nombre in divisas.items():
             if isinstance(df.columns, pd.MultiIndex):
                 df.columns = df.columns.get_level_values(0)
             
-            filename = DATA_DIR / f"{ticker.replace('=', '_').replace('-', '_')}_10años_1h.parquet"
-            df.to_parquet(filename)
+            lote.agregar(ticker, '1h', df)
             
             registros = len(df)
             subtotal_divisas += registros
@@ -188,6 +193,7 @@ for ticker, nombre in divisas.items():
         print(f"  ❌ Error con {nombre}: {str(e)}")
 
 print(f"\n💱 Subtotal Divisas: {subtotal_divisas:,} registros")
+lote.confirmar()
 
 # ============================================
 # 4. CRIPTOMONEDAS
@@ -228,8 +234,7 @@ for ticker, nombre in criptos.items():
             if isinstance(df.columns, pd.MultiIndex):
                 df.columns = df.columns.get_level_values(0)
             
-            filename = DATA_DIR / f"{ticker.replace('-', '_')}_5años_1h.parquet"
-            df.to_parquet(filename)
+            lote.agregar(ticker, '1h', df)
             
             registros = len(df)
             subtotal_criptos += registros
@@ -242,6 +247,7 @@ for ticker, nombre in criptos.items():
         print(f"  ❌ Error con {nombre}: {str(e)}")
 
 print(f"\n₿ Subtotal Criptomonedas: {subtotal_criptos:,} registros")
+lote.confirmar()
 
 # ============================================
 # 5. ENERGÍA Y COMMODITIES
@@ -281,8 +287,7 @@ for ticker, nombre in energia.items():
             if isinstance(df.columns, pd.MultiIndex):
                 df.columns = df.columns.get_level_values(0)
             
-            filename = DATA_DIR / f"{ticker.replace('=', '_')}_10años_1h.parquet"
-            df.to_parquet(filename)
+            lote.agregar(ticker, '1h', df)
             
             registros = len(df)
             subtotal_energia += registros
@@ -295,6 +300,7 @@ for ticker, nombre in energia.items():
         print(f"  ❌ Error con {nombre}: {str(e)}")
 
 print(f"\n⚡ Subtotal Energía: {subtotal_energia:,} registros")
+lote.confirmar()
 
 # ============================================
 # 6. ETFs IMPORTANTES
@@ -334,8 +340,7 @@ for ticker, nombre in etfs.items():
             if isinstance(df.columns, pd.MultiIndex):
                 df.columns = df.columns.get_level_values(0)
             
-            filename = DATA_DIR / f"{ticker}_10años_1h.parquet"
-            df.to_parquet(filename)
+            lote.agregar(ticker, '1h', df)
             
             registros = len(df)
             subtotal_etfs += registros
@@ -348,6 +353,7 @@ for ticker, nombre in etfs.items():
         print(f"  ❌ Error con {nombre}: {str(e)}")
 
 print(f"\n📦 Subtotal ETFs: {subtotal_etfs:,} registros")
+lote.confirmar()
 
 # ============================================
 # RESUMEN FINAL
@@ -368,11 +374,10 @@ print(f"  " + "-"*40)
 print(f"  🎯 TOTAL:                {total_registros:>12,} registros")
 
 # Calcular espacio en disco
-archivos = list(DATA_DIR.glob("*.parquet"))
-tamano_total = sum(f.stat().st_size for f in archivos) / (1024**3)  # GB
+tamano_total = almacen.ruta.stat().st_size / (1024**3) if almacen.existe() else 0  # GB
 
 print(f"\n💾 ESPACIO EN DISCO:")
-print(f"  📁 Archivos creados: {len(archivos)}")
+print(f"  📁 Series en el almacén: {len(almacen.particiones())}")
 print(f"  💿 Tamaño total: {tamano_total:.2f} GB")
 print(f"  📂 Ubicación: {DATA_DIR.absolute()}")
 